@@ -421,6 +421,12 @@ class LazyASGIApp:
                 # Register graceful shutdown handlers
                 from sharewarez.utils.shutdown import register_shutdown_handlers
                 register_shutdown_handlers()
+                # Library watcher thread; idle unless enabled in the server settings
+                from sharewarez.utils.library_watcher import start_library_watcher_service
+                start_library_watcher_service()
+                # Scan scheduler thread; runs scan jobs that have a schedule
+                from sharewarez.utils.scan_scheduler import start_scan_scheduler_service
+                start_scan_scheduler_service()
                 await send({"type": "lifespan.startup.complete"})
             except Exception as e:
                 print(f"Startup failed: {e}")
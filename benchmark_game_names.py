@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Game name cleanup benchmark for SharewareZ.
+Cleans a synthetic corpus of release-style folder names with a synthetic
+release group list and reports the compile time and per-name cost.
+"""
+
+import argparse
+import random
+import time
+
+from sharewarez.utils.gamenames import get_name_normalizer, clear_name_normalizer_cache
+
+TITLES = [
+    'The Witcher', 'Doom', 'Half Life', 'Baldurs Gate', 'Quake', 'Heroes of Might and Magic',
+    'Age of Empires', 'Tomb Raider', 'A Tale of Two Kingdoms', 'Resident Evil', 'Fallout',
+    'Dark Souls', 'Stardew Valley', 'Command and Conquer', 'Hollow Knight', 'Mass Effect',
+]
+SUFFIXES = ['', '2', '3', 'II', 'IV', 'Remastered', 'GOTY', 'G.O.T.Y.', 'Definitive Edition', 'Deluxe']
+VERSIONS = ['', 'v1.0', 'v1.0.3', '1.9.23494.3', 'Build.1234', '(51906)', '+5DLCs']
+SEPARATORS = [' ', '.', '_']
+
+
+def build_release_groups(count, seed=0):
+    """Random release group names in the (insensitive, sensitive) shape of load_scanning_filter_patterns."""
+    rng = random.Random(seed)
+    names = ['CODEX', 'RELOADED', 'SKIDROW', 'FitGirl', 'DODI', 'GOG', 'PLAZA', 'TiNYiSO']
+    while len(names) < count:
+        names.append(''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghij') for _ in range(rng.randint(3, 9))))
+    insensitive = ['-' + name for name in names] + ['.' + name for name in names]
+    sensitive = []
+    for index, name in enumerate(names):
+        is_case_sensitive = index % 2 == 0
+        sensitive.append(('-' + name, is_case_sensitive))
+        sensitive.append(('.' + name, is_case_sensitive))
+    return names, insensitive, sensitive
+
+
+def build_corpus(size, group_names, seed=0):
+    """Random folder names mixing titles, sequels, versions, build numbers and release groups."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        separator = rng.choice(SEPARATORS)
+        parts = [rng.choice(TITLES), rng.choice(SUFFIXES), rng.choice(VERSIONS)]
+        name = separator.join(part.replace(' ', separator) for part in parts if part)
+        if rng.random() < 0.7:
+            name += rng.choice('-.') + rng.choice(group_names)
+        if rng.random() < 0.1:
+            name = 'setup_' + name
+        corpus.append(name)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SharewareZ game name cleanup')
+    parser.add_argument('--names', type=int, default=50000,
+                        help='Number of folder names to clean (default: 50000)')
+    parser.add_argument('--groups', type=int, default=200,
+                        help='Number of release groups (default: 200)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the corpus (default: 0)')
+    args = parser.parse_args()
+
+    group_names, insensitive, sensitive = build_release_groups(args.groups, args.seed)
+    corpus = build_corpus(args.names, group_names, args.seed)
+    print(f"📦 {len(corpus)} names, {len(group_names)} release groups "
+          f"({len(insensitive)} insensitive / {len(sensitive)} sensitive patterns)")
+
+    clear_name_normalizer_cache()
+    start = time.perf_counter()
+    normalizer = get_name_normalizer(insensitive, sensitive)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in corpus:
+        normalizer.clean(name)
+    elapsed = time.perf_counter() - start
+
+    print(f"⏱️  Compiling release groups: {compile_seconds * 1000:.1f} ms")
+    print(f"⏱️  Cleaned {len(corpus)} names in {elapsed:.2f} s "
+          f"({elapsed / len(corpus) * 1e6:.1f} µs/name, {len(corpus) / elapsed:,.0f} names/s)")
+    for name in corpus[:5]:
+        print(f"   {name!r} -> {normalizer.clean(name)!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Library scan benchmark for SharewareZ.
+Generates a synthetic library tree of configurable shape, serves a matching
+catalog from a local fake IGDB/Twitch server with configurable latency and rate
+limit, and runs scan_and_add_games over it end to end against a test database:
+a first full scan and an incremental rescan. Reports throughput, IGDB API calls,
+database statements and peak memory per game, optionally as JSON, and can
+compare a run against a saved baseline to catch regressions.
+
+Needs a disposable Postgres database: BENCHMARK_DATABASE_URL (or TEST_DATABASE_URL),
+whose name must contain 'test' or 'bench'. Everything the benchmark adds to it is
+removed afterwards.
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from uuid import uuid4
+
+ADJECTIVES = [
+    'Amber', 'Silent', 'Crimson', 'Hidden', 'Frozen', 'Golden', 'Broken', 'Distant', 'Hollow', 'Iron',
+    'Lonely', 'Scarlet', 'Savage', 'Wandering', 'Burning', 'Ancient', 'Shattered', 'Verdant', 'Obsidian', 'Pale',
+    'Restless', 'Sunken', 'Wicked', 'Velvet', 'Radiant', 'Bitter', 'Clockwork', 'Drowned', 'Feral', 'Gilded',
+    'Howling', 'Ivory', 'Jagged', 'Lucid', 'Molten', 'Nameless', 'Painted', 'Quiet', 'Rusted', 'Starlit',
+    'Tangled', 'Umber', 'Vanishing', 'Woven', 'Cobalt', 'Emerald', 'Fading', 'Sleeping',
+]
+NOUNS = [
+    'Falcon', 'Harbor', 'Lantern', 'Citadel', 'Serpent', 'Compass', 'Warden', 'Orchard', 'Glacier', 'Monolith',
+    'Voyager', 'Beacon', 'Cathedral', 'Drifter', 'Engine', 'Fortress', 'Garden', 'Horizon', 'Island', 'Jackal',
+    'Kingdom', 'Labyrinth', 'Mariner', 'Nomad', 'Oracle', 'Pilgrim', 'Quarry', 'Raven', 'Sentinel', 'Tempest',
+    'Vanguard', 'Wolf', 'Bastion', 'Canyon', 'Dynasty', 'Ember', 'Frontier', 'Golem', 'Hermit', 'Lighthouse',
+    'Mirage', 'Outpost', 'Phantom', 'Reliquary', 'Spire', 'Thicket', 'Utopia', 'Wyvern',
+]
+PLACES = [
+    'the North', 'the Deep', 'the Marsh', 'the Dunes', 'the Abyss', 'the Tundra', 'the Archipelago', 'the Steppe',
+    'the Hollows', 'the Reach', 'the Expanse', 'the Barrens', 'the Peaks', 'the Fjords', 'the Wilds', 'the Vale',
+    'the Shallows', 'the Badlands', 'the Canopy', 'the Ruins', 'the Mire', 'the Cliffs', 'the Lowlands', 'the Wastes',
+    'the Glades', 'the Caverns', 'the Highlands', 'the Delta', 'the Moors', 'the Rift', 'the Sound', 'the Thaw',
+]
+VERSIONS = ['', '', 'v1.0', 'v1.0.3', 'v2.1.14', '(51906)']
+SEPARATORS = [' ', '.', '_']
+
+# Metrics where a larger value is a regression; games_per_second is the other way round
+LOWER_IS_BETTER = ('api_calls_per_game', 'db_statements_per_game', 'peak_rss_growth_mb')
+
+
+def build_titles(count, seed=0):
+    """Unique 'Adjective Noun of Place' titles; no numerals, so name cleanup keeps them intact."""
+    combinations = len(ADJECTIVES) * len(NOUNS) * len(PLACES)
+    if count > combinations:
+        raise ValueError(f"At most {combinations} unique synthetic titles are available, {count} requested")
+    rng = random.Random(seed)
+    titles = []
+    for index in rng.sample(range(combinations), count):
+        index, place = divmod(index, len(PLACES))
+        adjective, noun = divmod(index, len(NOUNS))
+        titles.append(f"{ADJECTIVES[adjective]} {NOUNS[noun]} of {PLACES[place]}")
+    return titles
+
+
+def build_release_groups(count, seed=0):
+    """Synthetic release group names, prefixed so they can't collide with real filters."""
+    rng = random.Random(seed)
+    groups = set()
+    while len(groups) < count:
+        groups.add('BENCH' + ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(3, 7))))
+    return sorted(groups)
+
+
+def folder_name_for(title, release_groups, rng):
+    """A release-style folder name for a title: separators, an optional version and release group."""
+    separator = rng.choice(SEPARATORS)
+    parts = [title.replace(' ', separator)]
+    version = rng.choice(VERSIONS)
+    if version:
+        parts.append(version)
+    name = separator.join(parts)
+    if release_groups and rng.random() < 0.7:
+        name += '-' + rng.choice(release_groups)
+    return name
+
+
+def write_files(folder, count, depth, file_size, prefix):
+    """Spread `count` sparse files of `file_size` bytes over `depth` nested directories."""
+    directory = folder
+    for level in range(depth):
+        directory = os.path.join(directory, f"{prefix}_data{level}")
+    os.makedirs(directory, exist_ok=True)
+    for index in range(count):
+        target = folder if depth and index % 2 == 0 else directory
+        with open(os.path.join(target, f"{prefix}_{index:03d}.bin"), 'wb') as handle:
+            handle.truncate(file_size)
+
+
+def build_library(root, options, release_groups):
+    """
+    Create the synthetic library under `root`.
+
+    Returns:
+        tuple: (catalog of fake IGDB games, number of folders, number of folders without a catalog entry)
+    """
+    rng = random.Random(options.seed)
+    titles = build_titles(options.games, options.seed)
+    catalog = []
+    unmatched = 0
+    for igdb_id, title in enumerate(titles, start=1):
+        folder = os.path.join(root, folder_name_for(title, release_groups, rng))
+        os.makedirs(folder)
+        write_files(folder, options.files, options.depth, options.file_size, 'game')
+        if rng.random() < options.updates_rate:
+            write_files(os.path.join(folder, 'updates'), 2, 0, options.file_size, 'update')
+        if rng.random() < options.extras_rate:
+            write_files(os.path.join(folder, 'extras'), 2, 0, options.file_size, 'extra')
+        if rng.random() < options.unmatched_rate:
+            unmatched += 1
+            continue
+        # No cover or screenshots: image downloads are outside what this benchmark measures
+        catalog.append({'id': igdb_id, 'name': title, 'summary': f"{title} is a synthetic benchmark game.",
+                        'first_release_date': 946684800 + igdb_id * 86400, 'updated_at': 1})
+    return catalog, len(titles), unmatched
+
+
+class StatementCounter:
+    """Counts the SQL statements an engine executes, from any thread."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        from sqlalchemy import event
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+@contextlib.contextmanager
+def redirect_igdb(fake, app):
+    """Point the IGDB and Twitch traffic of the app at the fake server for the duration of the block."""
+    from unittest.mock import patch
+    import requests
+    from sharewarez.utils.igdb_async import AsyncIGDBClient
+
+    real_post = requests.post
+    hosts = ('https://api.igdb.com', 'https://id.twitch.tv')
+
+    def post(url, *args, **kwargs):
+        for host in hosts:
+            if url.startswith(host):
+                url = fake.base_url + url[len(host):]
+        return real_post(url, *args, **kwargs)
+
+    real_from_settings = AsyncIGDBClient.from_settings.__func__
+
+    def from_settings(cls, games_endpoint, **kwargs):
+        kwargs.setdefault('token_url', fake.token_url)
+        kwargs.setdefault('covers_endpoint', fake.covers_url)
+        return real_from_settings(cls, games_endpoint, **kwargs)
+
+    with patch('requests.post', post), \
+            patch.object(AsyncIGDBClient, 'from_settings', classmethod(from_settings)), \
+            patch.dict(app.config, {'IGDB_API_ENDPOINT': fake.games_url}):
+        yield
+
+
+@contextlib.contextmanager
+def benchmark_settings(release_groups):
+    """
+    Give GlobalSettings fake IGDB credentials with updates and extras enabled and
+    the offline catalog off, and add the synthetic release groups and the file types
+    the scan needs. Everything is put back afterwards.
+    """
+    from sqlalchemy import select, delete
+    from sharewarez import db
+    from sharewarez.models import GlobalSettings, ReleaseGroup, AllowedFileType
+
+    overrides = {'igdb_client_id': 'benchmark_client', 'igdb_client_secret': 'benchmark_secret',
+                 'use_igdb_catalog': False, 'enable_game_updates': True, 'enable_game_extras': True}
+    settings = db.session.execute(select(GlobalSettings)).scalars().first()
+    created_settings = settings is None
+    if created_settings:
+        settings = GlobalSettings()
+        db.session.add(settings)
+    originals = {field: getattr(settings, field) for field in overrides}
+    for field, value in overrides.items():
+        setattr(settings, field, value)
+
+    groups = [ReleaseGroup(filter_pattern=name, case_sensitive='no') for name in release_groups]
+    db.session.add_all(groups)
+    existing_types = set(db.session.execute(select(AllowedFileType.value)).scalars().all())
+    added_types = [AllowedFileType(value=value) for value in ('bin', 'zip') if value not in existing_types]
+    db.session.add_all(added_types)
+    db.session.commit()
+    group_ids = [group.id for group in groups]
+    type_ids = [file_type.id for file_type in added_types]
+    settings_id = settings.id
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        if group_ids:
+            db.session.execute(delete(ReleaseGroup).where(ReleaseGroup.id.in_(group_ids)))
+        if type_ids:
+            db.session.execute(delete(AllowedFileType).where(AllowedFileType.id.in_(type_ids)))
+        settings = db.session.get(GlobalSettings, settings_id)
+        if created_settings:
+            db.session.delete(settings)
+        else:
+            for field, value in originals.items():
+                setattr(settings, field, value)
+        db.session.commit()
+
+
+def remove_library(library_uuid):
+    """Delete the benchmark library with everything the scans stored for it."""
+    from sqlalchemy import select, delete
+    from sharewarez import db
+    from sharewarez.models import Game, Library, ScanJob, UnmatchedFolder, LibrarySnapshotEntry
+    from sharewarez.utils.missing_games import delete_games
+
+    db.session.rollback()
+    delete_games(db.session.execute(select(Game.uuid).filter_by(library_uuid=library_uuid)).scalars().all())
+    db.session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library_uuid))
+    db.session.execute(delete(LibrarySnapshotEntry).filter_by(library_uuid=library_uuid))
+    db.session.execute(delete(ScanJob).filter_by(library_uuid=library_uuid))
+    db.session.execute(delete(Library).filter_by(uuid=library_uuid))
+    db.session.commit()
+
+
+def run_scan_pass(fake, library_uuid, library_root, folders, verbose=False):
+    """Run one scan of the library and measure it."""
+    from sqlalchemy import select, func
+    from sharewarez import db
+    from sharewarez.models import Game, ScanJob, UnmatchedFolder
+    from sharewarez.utilities import scan_and_add_games
+    from monitor_memory import PeakRSSMonitor
+
+    requests_before = len(fake.requests)
+    rate_limited_before = fake.rate_limited
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            # The scan logs every folder; keep the report readable
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        statements = stack.enter_context(StatementCounter(db.engine))
+        memory = stack.enter_context(PeakRSSMonitor())
+        start = time.perf_counter()
+        scan_and_add_games(library_root, 'folders', library_uuid)
+        elapsed = time.perf_counter() - start
+
+    with fake._lock:
+        api_requests = fake.requests[requests_before:]
+    token_calls = sum(1 for request in api_requests if request['path'].startswith('/oauth2'))
+    job = db.session.execute(
+        select(ScanJob).filter_by(library_uuid=library_uuid).order_by(ScanJob.last_run.desc())
+    ).scalars().first()
+    matched = db.session.execute(select(func.count()).select_from(Game).filter_by(library_uuid=library_uuid)).scalar()
+    unmatched = db.session.execute(
+        select(func.count()).select_from(UnmatchedFolder).filter_by(library_uuid=library_uuid)).scalar()
+    metrics = job.pipeline_metrics if job and job.pipeline_metrics else {}
+    return {
+        'seconds': round(elapsed, 2),
+        'games_per_second': round(folders / elapsed, 2) if elapsed else 0,
+        'api_calls': len(api_requests) - token_calls,
+        'token_calls': token_calls,
+        'rate_limited': fake.rate_limited - rate_limited_before,
+        'api_calls_per_game': round((len(api_requests) - token_calls) / folders, 2),
+        'db_statements': statements.count,
+        'db_statements_per_game': round(statements.count / folders, 2),
+        'peak_rss_growth_mb': round(memory.growth / 1024 / 1024, 1),
+        'matched': matched,
+        'unmatched': unmatched,
+        'status': job.status if job else None,
+        'bottleneck': metrics.get('bottleneck'),
+    }
+
+
+def run_benchmark(app, options):
+    """
+    Generate the library, serve its catalog from a fake IGDB server and scan it twice.
+    Must be called inside an app context.
+
+    Returns:
+        dict: The run's shape and the metrics of the 'initial' scan and the incremental 'rescan'
+    """
+    from unittest.mock import patch
+    from sharewarez import db
+    from sharewarez.models import Library, LibraryPlatform
+    from sharewarez.utils.scan_coordinator import IGDBQuotaShare
+    from tests.fake_igdb_server import FakeIGDBServer
+
+    release_groups = build_release_groups(options.release_groups, options.seed)
+    with tempfile.TemporaryDirectory(prefix='sharewarez_bench_') as library_root:
+        start = time.perf_counter()
+        catalog, folders, without_entry = build_library(library_root, options, release_groups)
+        print(f"📦 Generated {folders} game folders ({options.files} files each, depth {options.depth}, "
+              f"{without_entry} not in the catalog) in {time.perf_counter() - start:.1f} s")
+
+        fake = FakeIGDBServer(catalog, latency=options.latency, rate_limit=options.rate_limit).start()
+        library = Library(uuid=str(uuid4()), name=f'Benchmark Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+        db.session.add(library)
+        db.session.commit()
+        library_uuid = library.uuid
+        try:
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(benchmark_settings(release_groups))
+                stack.enter_context(redirect_igdb(fake, app))
+                if options.igdb_rate:
+                    # Lift or lower the rate the scan allows itself, e.g. to measure everything but the IGDB wait
+                    stack.enter_context(patch('sharewarez.utilities.IGDBQuotaShare',
+                                              functools.partial(IGDBQuotaShare, total_rate=options.igdb_rate)))
+                results = {'initial': run_scan_pass(fake, library_uuid, library_root, folders, options.verbose)}
+                results['rescan'] = run_scan_pass(fake, library_uuid, library_root, folders, options.verbose)
+        finally:
+            fake.stop()
+            remove_library(library_uuid)
+
+    return {
+        'shape': {'games': folders, 'files': options.files, 'depth': options.depth, 'file_size': options.file_size,
+                  'release_groups': options.release_groups, 'unmatched_rate': options.unmatched_rate,
+                  'latency': options.latency, 'rate_limit': options.rate_limit, 'igdb_rate': options.igdb_rate,
+                  'seed': options.seed},
+        **results
+    }
+
+
+def compare_to_baseline(result, baseline, tolerance):
+    """Return a line per metric of the initial scan that is more than `tolerance` worse than the baseline."""
+    regressions = []
+    current, previous = result['initial'], baseline['initial']
+    for metric in LOWER_IS_BETTER + ('games_per_second',):
+        if not previous.get(metric):
+            continue
+        change = (current[metric] - previous[metric]) / previous[metric]
+        worse = change > tolerance if metric in LOWER_IS_BETTER else change < -tolerance
+        if worse:
+            regressions.append(f"{metric}: {previous[metric]} -> {current[metric]} ({change:+.0%})")
+    return regressions
+
+
+def print_results(result):
+    for name in ('initial', 'rescan'):
+        scan = result[name]
+        print(f"⏱️  {name:<8} {scan['seconds']:.2f} s, {scan['games_per_second']:.1f} games/s, "
+              f"status {scan['status']}, bottleneck {scan['bottleneck']}")
+        print(f"   IGDB: {scan['api_calls']} calls ({scan['api_calls_per_game']}/game), "
+              f"{scan['token_calls']} token requests, {scan['rate_limited']} rate limited")
+        print(f"   DB: {scan['db_statements']} statements ({scan['db_statements_per_game']}/game); "
+              f"peak RSS growth {scan['peak_rss_growth_mb']} MB; "
+              f"{scan['matched']} matched, {scan['unmatched']} unmatched")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a SharewareZ library scan end to end')
+    parser.add_argument('--games', type=int, default=200, help='Number of game folders (default: 200)')
+    parser.add_argument('--files', type=int, default=4, help='Files per game folder (default: 4)')
+    parser.add_argument('--depth', type=int, default=1, help='Nesting depth of the game files (default: 1)')
+    parser.add_argument('--file-size', type=int, default=1024 * 1024,
+                        help='Size of each (sparse) file in bytes (default: 1 MiB)')
+    parser.add_argument('--release-groups', type=int, default=200,
+                        help='Number of release group filters (default: 200)')
+    parser.add_argument('--unmatched-rate', type=float, default=0.1,
+                        help='Share of folders missing from the catalog (default: 0.1)')
+    parser.add_argument('--updates-rate', type=float, default=0.2,
+                        help='Share of folders with an updates folder (default: 0.2)')
+    parser.add_argument('--extras-rate', type=float, default=0.2,
+                        help='Share of folders with an extras folder (default: 0.2)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Fake IGDB latency per request in seconds (default: 0.05)')
+    parser.add_argument('--rate-limit', type=int, default=4,
+                        help='Fake IGDB requests per second before 429s, 0 for none (default: 4)')
+    parser.add_argument('--igdb-rate', type=float, default=None,
+                        help='Override the requests per second the scan allows itself (default: the IGDB limit)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the library (default: 0)')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against the results JSON of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative regression against the baseline (default: 0.2)')
+    parser.add_argument('--verbose', action='store_true', help='Show the scan output')
+    options = parser.parse_args()
+
+    database_url = os.getenv('BENCHMARK_DATABASE_URL') or os.getenv('TEST_DATABASE_URL')
+    if not database_url:
+        sys.exit("Set BENCHMARK_DATABASE_URL (or TEST_DATABASE_URL) to a disposable database")
+    database_name = database_url.rsplit('/', 1)[-1].lower()
+    if 'test' not in database_name and 'bench' not in database_name:
+        sys.exit(f"Refusing to benchmark against '{database_name}': the database name must contain 'test' or 'bench'")
+    # Config reads DATABASE_URL on import
+    os.environ['DATABASE_URL'] = database_url
+
+    from sharewarez import create_app, db
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        result = run_benchmark(app, options)
+
+    print_results(result)
+    if options.json:
+        with open(options.json, 'w') as handle:
+            json.dump(result, handle, indent=2)
+        print(f"💾 Results written to {options.json}")
+    if options.baseline:
+        with open(options.baseline) as handle:
+            baseline = json.load(handle)
+        if baseline.get('shape') != result['shape']:
+            print(f"⚠️  {options.baseline} was run with a different library shape: {baseline.get('shape')}")
+        regressions = compare_to_baseline(result, baseline, options.tolerance)
+        if regressions:
+            print(f"❌ Regressions against {options.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ Within {options.tolerance:.0%} of {options.baseline}")
+
+
+if __name__ == "__main__":
+    main()
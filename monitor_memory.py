@@ -9,6 +9,7 @@ import time
 import csv
 import os
 import sys
+import threading
 from datetime import datetime
 import argparse
 
@@ -48,6 +49,55 @@ def format_bytes(bytes_value):
         bytes_value /= 1024.0
     return f"{bytes_value:.2f} TB"
 
+def get_process_rss(pid=None):
+    """Resident memory of a process in bytes, the current process by default"""
+    return psutil.Process(pid or os.getpid()).memory_info().rss
+
+class PeakRSSMonitor:
+    """
+    Samples the resident memory of a process on a background thread and keeps the peak.
+    Used as a context manager around the code being measured:
+
+        with PeakRSSMonitor() as monitor:
+            run_scan()
+        print(format_bytes(monitor.growth))
+    """
+    def __init__(self, pid=None, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        rss = get_process_rss(self.pid)
+        self.peak = max(self.peak, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.baseline = get_process_rss(self.pid)
+        self.peak = self.baseline
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='rss-monitor')
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return False
+
+    @property
+    def growth(self):
+        """Peak resident memory above the baseline taken on entry, in bytes"""
+        return self.peak - self.baseline
+
 def log_memory_usage(log_file, csv_file):
     """Log current memory usage to files"""
     timestamp = datetime.now()
@@ -373,7 +373,11 @@ class InitializationManager:
             print("ℹ️  Theme already exists")
 
     def _cleanup_orphaned_scan_jobs(self, session):
-        """Clean up scan jobs left in 'Running' or 'Stopping' state after server restart."""
+        """
+        Clean up scan jobs left in 'Running' or 'Stopping' state after server restart.
+        Running library scans are flagged so the scan scheduler resumes them from their checkpoints;
+        re-match jobs of unmatched folders are not resumed.
+        """
         from sharewarez.models import ScanJob
         from sqlalchemy import or_
 
@@ -385,13 +389,19 @@ class InitializationManager:
         ).scalars().all()
 
         if orphaned_jobs:
+            resumable = 0
             for job in orphaned_jobs:
+                if job.status == 'Running' and job.library_uuid and job.scan_folder and job.job_type not in ('rematch', 'relink'):
+                    job.error_message = 'Scan job interrupted by server restart, it resumes from its last checkpoint'
+                    job.resume_pending = True
+                    resumable += 1
+                else:
+                    job.error_message = 'Scan job interrupted by server restart'
+                    job.is_enabled = False
                 job.status = 'Failed'
-                job.error_message = 'Scan job interrupted by server restart'
-                job.is_enabled = False
                 job.current_processing = None
 
-            print(f"🧹 Cleaned up {len(orphaned_jobs)} orphaned scan jobs")
+            print(f"🧹 Cleaned up {len(orphaned_jobs)} orphaned scan jobs, {resumable} will resume")
         else:
             print("ℹ️  No orphaned scan jobs found")
 
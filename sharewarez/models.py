@@ -162,9 +162,12 @@ class Game(db.Model):
     full_disk_path = db.Column(db.String, nullable=True)
     date_created = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     date_identified = db.Column(db.DateTime, nullable=True)
+    match_confidence = db.Column(db.Float, nullable=True)
+    missing_since = db.Column(db.DateTime, nullable=True)  # set while the game's path is missing during the removal grace period
     steam_url = db.Column(db.String, nullable=True)
     times_downloaded = db.Column(db.Integer, default=0)
     nfo_content = db.Column(db.Text, nullable=True)
+    nfo_fingerprint = db.Column(db.String(300), nullable=True)  # name, mtime and size of the NFO file nfo_content was read from, see utils/nfo.py
     # HowLongToBeat integration fields
     hltb_id = db.Column(db.Integer, nullable=True)
     hltb_main_story = db.Column(db.Float, nullable=True)
@@ -195,6 +198,7 @@ class Game(db.Model):
 
 class GameUpdate(db.Model):
     __tablename__ = 'game_updates'
+    __table_args__ = (db.Index('ix_game_updates_game_uuid', 'game_uuid'),)
 
     id = db.Column(db.Integer, primary_key=True)
     uuid = db.Column(db.String(36), default=lambda: str(uuid4()), unique=True, nullable=False)
@@ -203,6 +207,11 @@ class GameUpdate(db.Model):
     nfo_content = db.Column(db.Text, nullable=True)
     file_path = db.Column(db.String, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Indexed during scans so game pages don't walk the disk, see utils/scanning.py
+    file_size = db.Column(db.BigInteger, nullable=True)
+    file_count = db.Column(db.Integer, nullable=True)
+    mtime = db.Column(db.Float, nullable=True)  # Newest mtime of the path and its direct children
+    indexed_at = db.Column(db.DateTime, nullable=True)
 
     game = db.relationship('Game', back_populates='updates')
 
@@ -211,6 +220,7 @@ class GameUpdate(db.Model):
     
 class GameExtra(db.Model):
     __tablename__ = 'game_extras'
+    __table_args__ = (db.Index('ix_game_extras_game_uuid', 'game_uuid'),)
 
     id = db.Column(db.Integer, primary_key=True)
     uuid = db.Column(db.String(36), default=lambda: str(uuid4()), unique=True, nullable=False)
@@ -219,6 +229,11 @@ class GameExtra(db.Model):
     nfo_content = db.Column(db.Text, nullable=True)
     file_path = db.Column(db.String, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Indexed during scans so game pages don't walk the disk, see utils/scanning.py
+    file_size = db.Column(db.BigInteger, nullable=True)
+    file_count = db.Column(db.Integer, nullable=True)
+    mtime = db.Column(db.Float, nullable=True)  # Newest mtime of the path and its direct children
+    indexed_at = db.Column(db.DateTime, nullable=True)
 
     game = db.relationship('Game', back_populates='extras')
 
@@ -250,6 +265,18 @@ class Image(db.Model):
     download_url = db.Column(db.String, nullable=True)  # Full IGDB URL to download from
     is_downloaded = db.Column(db.Boolean, default=False, nullable=False)  # Download status
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Download queue state, see utils/image_queue.py
+    download_attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)  # Backoff after a failed download
+    lease_token = db.Column(db.String(32), nullable=True)  # Claim of the worker downloading the image
+    leased_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+    dead_lettered_at = db.Column(db.DateTime, nullable=True)  # Given up on, until queued again
+
+    __table_args__ = (
+        db.Index('ix_images_download_queue', 'id',
+                 postgresql_where=db.text('NOT is_downloaded AND dead_lettered_at IS NULL')),
+    )
 
     def __repr__(self):
         return f"<Image id={self.id}, game_uuid={self.game_uuid}, image_type={self.image_type}, url={self.url}, downloaded={self.is_downloaded}>"
@@ -462,9 +489,30 @@ class ScanJob(db.Model):
     setting_force_updates_extras = db.Column(db.Boolean, default=False)
     current_processing = db.Column(db.String(255), nullable=True)  # "Processing: Game Name (450/1000)"
     last_progress_update = db.Column(db.DateTime, nullable=True)
+    igdb_api_cost = db.Column(JSONEncodedDict, nullable=True)  # IGDB calls, 429s, cache hits and latency for this scan
+    pipeline_metrics = db.Column(JSONEncodedDict, nullable=True)  # Per-stage workers, throughput and queue depth of the scan pipeline
+    resume_pending = db.Column(db.Boolean, default=False)  # interrupted by a restart or shutdown, resumed from its checkpoints
+    device_group = db.Column(db.String(512), nullable=True)  # storage device of the scan folder, see utils/scan_coordinator.py
+    io_workers = db.Column(db.Integer, nullable=True)  # disk-bound pipeline workers granted from the device's I/O budget
+    job_type = db.Column(db.String(20), default='scan')  # 'scan' of a folder, 'rematch' of unmatched folders (utils/unmatched_rematch.py) or 'relink' of moved games (utils/path_relinker.py)
+
+
+class ScanCheckpoint(db.Model):
+    """A folder or file a scan job has finished, so an interrupted scan can resume after it."""
+    __tablename__ = 'scan_checkpoints'
+
+    job_id = db.Column(db.String(36), db.ForeignKey('scan_jobs.id', ondelete='CASCADE'), primary_key=True)
+    path = db.Column(db.String, primary_key=True)
+    succeeded = db.Column(db.Boolean, nullable=False, default=True)  # counted as success or failure in the job totals
+    completed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
 class UnmatchedFolder(db.Model):
     __tablename__ = 'unmatched_folders'
+    __table_args__ = (
+        db.Index('ix_unmatched_folders_status_path', 'status', 'folder_path'),  # paginated listing
+        db.Index('ix_unmatched_folders_library', 'library_uuid'),
+        db.Index('ix_unmatched_folders_folder_path', 'folder_path'),
+    )
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     library_uuid = db.Column(db.String(36), ForeignKey('libraries.uuid', ondelete="CASCADE"), nullable=True)
     scan_job_id = db.Column(db.String(36), db.ForeignKey('scan_jobs.id'))
@@ -545,6 +593,23 @@ class GlobalSettings(db.Model):
     write_local_metadata = db.Column(db.Boolean, default=False)
     use_local_images = db.Column(db.Boolean, default=False)
     local_metadata_filename = db.Column(db.String(50), default='sharewarez.json')
+    # Offline IGDB catalog
+    use_igdb_catalog = db.Column(db.Boolean, default=False)
+    # Library watcher
+    enable_library_watcher = db.Column(db.Boolean, default=False)
+    library_watcher_debounce = db.Column(db.Integer, default=30)  # seconds an entry must be quiet before processing
+    # Scheduled scans
+    scan_window_start = db.Column(db.Integer, default=1)  # hour of day scheduled scans may start
+    scan_window_end = db.Column(db.Integer, default=6)  # hour of day the scan window closes, same as start for no window
+    scan_stagger_minutes = db.Column(db.Integer, default=20)  # minutes between the scheduled starts of each library
+    # Scan pipeline workers per stage; matching uses scan_thread_count
+    scan_discovery_workers = db.Column(db.Integer, default=4)
+    scan_persistence_workers = db.Column(db.Integer, default=1)
+    scan_postprocess_workers = db.Column(db.Integer, default=4)
+    missing_game_grace_hours = db.Column(db.Integer, default=0)  # hours a missing game is kept before "remove missing" deletes it
+    # Concurrent scans
+    max_concurrent_scans = db.Column(db.Integer, default=2)  # library scans that may run at the same time
+    scan_device_io_budget = db.Column(db.Integer, default=8)  # discovery + post-processing workers shared by the scans of one storage device
 
     def __repr__(self):
         return f'<GlobalSettings id={self.id}, last_updated={self.last_updated}>'
@@ -633,6 +698,168 @@ class SystemEvents(db.Model):
         return f"<SystemEvent {self.event_type}: {self.event_text}>"
 
 
+igdb_catalog_game_platforms = db.Table('igdb_catalog_game_platforms',
+    db.Column('game_id', db.Integer, db.ForeignKey('igdb_catalog_games.igdb_id', ondelete='CASCADE'), primary_key=True),
+    db.Column('platform_id', db.Integer, primary_key=True, index=True)
+)
+
+class IGDBCatalogGame(db.Model):
+    """Local mirror of an IGDB game record, used to match folders without live API calls."""
+    __tablename__ = 'igdb_catalog_games'
+
+    igdb_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String, nullable=False)
+    slug = db.Column(db.String, nullable=True)
+    first_release_date = db.Column(db.Integer, nullable=True)  # Unix timestamp as returned by IGDB
+    data = db.Column(JSONEncodedDict)  # Game payload in the shape of a live search response
+    updated_at = db.Column(db.Integer, nullable=True, index=True)  # IGDB updated_at (Unix timestamp)
+    synced_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    alternative_names = db.relationship('IGDBCatalogAlternativeName', back_populates='game',
+                                        cascade='all, delete-orphan', passive_deletes=True)
+
+    def __repr__(self):
+        return f'<IGDBCatalogGame {self.igdb_id}: {self.name}>'
+
+class IGDBCatalogAlternativeName(db.Model):
+    __tablename__ = 'igdb_catalog_alternative_names'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # IGDB alternative name ID
+    game_id = db.Column(db.Integer, db.ForeignKey('igdb_catalog_games.igdb_id', ondelete='CASCADE'), nullable=False, index=True)
+    name = db.Column(db.String, nullable=False)
+
+    game = db.relationship('IGDBCatalogGame', back_populates='alternative_names')
+
+    def __repr__(self):
+        return f'<IGDBCatalogAlternativeName {self.name}>'
+
+class IGDBCatalogPlatform(db.Model):
+    __tablename__ = 'igdb_catalog_platforms'
+
+    igdb_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String, nullable=False)
+    abbreviation = db.Column(db.String, nullable=True)
+    updated_at = db.Column(db.Integer, nullable=True)
+
+    def __repr__(self):
+        return f'<IGDBCatalogPlatform {self.igdb_id}: {self.name}>'
+
+class IGDBCatalogSyncState(db.Model):
+    """Incremental sync watermark per IGDB endpoint."""
+    __tablename__ = 'igdb_catalog_sync_state'
+
+    endpoint = db.Column(db.String(32), primary_key=True)
+    last_updated_at = db.Column(db.Integer, default=0, nullable=False)  # Highest IGDB updated_at fully synced
+    last_synced_at = db.Column(db.DateTime, nullable=True)
+    records_synced = db.Column(db.Integer, default=0)
+    status = db.Column(db.String(20), default='Idle')  # Idle, Running, Completed, Failed
+    error_message = db.Column(db.String(512), nullable=True)
+
+    def __repr__(self):
+        return f'<IGDBCatalogSyncState {self.endpoint}: {self.status}>'
+
+class IGDBUsageStat(db.Model):
+    """Hourly IGDB API usage per endpoint and caller, kept for a rolling window."""
+    __tablename__ = 'igdb_usage_stats'
+    __table_args__ = (
+        db.UniqueConstraint('bucket_start', 'endpoint', 'caller', name='uq_igdb_usage_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    bucket_start = db.Column(db.DateTime, nullable=False, index=True)  # Start of the hour (UTC)
+    endpoint = db.Column(db.String(64), nullable=False)  # e.g. 'games', 'covers'
+    caller = db.Column(db.String(128), nullable=False)  # Feature or route that made the calls
+    calls = db.Column(db.Integer, default=0, nullable=False)
+    errors = db.Column(db.Integer, default=0, nullable=False)
+    rate_limited = db.Column(db.Integer, default=0, nullable=False)  # 429 responses
+    cache_hits = db.Column(db.Integer, default=0, nullable=False)  # Lookups answered without calling IGDB
+    total_latency_ms = db.Column(db.Float, default=0, nullable=False)
+    max_latency_ms = db.Column(db.Float, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<IGDBUsageStat {self.bucket_start} {self.endpoint} {self.caller}: {self.calls}>'
+
+class LibrarySnapshotEntry(db.Model):
+    """Filesystem fingerprint of a scanned game folder or file, used to skip unchanged entries on the next scan."""
+    __tablename__ = 'library_snapshot_entries'
+    __table_args__ = (
+        db.UniqueConstraint('library_uuid', 'path', name='uq_library_snapshot_path'),
+        db.Index('ix_library_snapshot_scan_folder', 'library_uuid', 'scan_folder'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    library_uuid = db.Column(db.String(36), db.ForeignKey('libraries.uuid', ondelete='CASCADE'), nullable=False)
+    scan_folder = db.Column(db.String, nullable=False)  # Folder the entry was listed from
+    path = db.Column(db.String, nullable=False)
+    inode = db.Column(db.BigInteger, nullable=True)
+    mtime = db.Column(db.Float, nullable=True)  # Newest mtime of the entry and its direct children
+    size = db.Column(db.BigInteger, default=0)  # Bytes in the file, or in the folder's direct files
+    file_count = db.Column(db.Integer, default=0)  # Direct children of a folder, 1 for a file
+    scanned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<LibrarySnapshotEntry {self.path}>'
+
+
+class LocalMetadataIndexEntry(db.Model):
+    """Local metadata file and local images of a game folder, read during scans so pages don't touch the disk."""
+    __tablename__ = 'local_metadata_index'
+    __table_args__ = (
+        db.UniqueConstraint('library_uuid', 'folder_path', name='uq_local_metadata_index_path'),
+        db.Index('ix_local_metadata_index_scan_folder', 'library_uuid', 'scan_folder'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    library_uuid = db.Column(db.String(36), db.ForeignKey('libraries.uuid', ondelete='CASCADE'), nullable=False)
+    scan_folder = db.Column(db.String, nullable=False)  # Folder the entry was listed from
+    folder_path = db.Column(db.String, nullable=False)
+    mtime = db.Column(db.Float, nullable=True)  # Snapshot fingerprint the entry was read at, None to re-read
+    file_count = db.Column(db.Integer, nullable=True)
+    metadata_filename = db.Column(db.String(50), nullable=True)
+    local_metadata = db.Column(db.JSON, nullable=True)  # Parsed metadata file, None if missing or invalid
+    igdb_id = db.Column(db.Integer, nullable=True)
+    cover_file = db.Column(db.String(255), nullable=True)  # File names relative to the folder
+    screenshot_files = db.Column(db.JSON, nullable=True)
+    indexed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<LocalMetadataIndexEntry {self.folder_path}>'
+
+
+class PathRelinkProposal(db.Model):
+    """A new path proposed by a relink job for a game whose folder or file is gone."""
+    __tablename__ = 'path_relink_proposals'
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'game_uuid', name='uq_path_relink_proposals_job_game'),
+        db.Index('ix_path_relink_proposals_job_confidence', 'job_id', 'confidence'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(36), db.ForeignKey('scan_jobs.id', ondelete='CASCADE'), nullable=False)
+    game_uuid = db.Column(db.String(36), db.ForeignKey('games.uuid', ondelete='CASCADE'), nullable=False)
+    old_path = db.Column(db.String, nullable=False)
+    new_path = db.Column(db.String, nullable=False)
+    confidence = db.Column(db.Float, nullable=False)  # 0-1, see utils/path_relinker.py
+    applied_at = db.Column(db.DateTime, nullable=True)  # None until the game was moved to new_path
+
+    def __repr__(self):
+        return f'<PathRelinkProposal {self.old_path} -> {self.new_path}>'
+
+
+class FolderSizeCache(db.Model):
+    """Size of a folder tree with the mtime of every directory in it, so unchanged directories aren't listed again."""
+    __tablename__ = 'folder_size_cache'
+
+    path = db.Column(db.String, primary_key=True)
+    excluded = db.Column(db.String(255), primary_key=True, default='')  # Excluded folder names the size was computed without
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    tree = db.Column(JSONEncodedDict, nullable=True)  # {relative dir: [mtime_ns, bytes in its files, [subdir names]]}
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f'<FolderSizeCache {self.path}: {self.size}>'
+
+
 # Helper function for game completion status
 def get_status_info(status):
     """
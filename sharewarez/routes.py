@@ -12,7 +12,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy import func, select, delete, and_
 from werkzeug.utils import secure_filename
 from sharewarez import db, cache
-from datetime import datetime, timezone
+from datetime import datetime
 from PIL import Image as PILImage
 from itsdangerous import URLSafeTimedSerializer
 
@@ -27,11 +27,16 @@ from sharewarez.models import (
     Category, Library,
     ReleaseGroup, AllowedFileType
 )
-from sharewarez.utils.functions import load_scanning_filter_patterns, format_size, PLATFORM_IDS
+from sharewarez.utils.functions import load_scanning_filter_patterns, format_size
 from sharewarez.utilities import handle_auto_scan, handle_manual_scan, scan_and_add_games
 from sharewarez.utils.auth import admin_required
 from sharewarez.utils.gamenames import get_game_names_from_folder, get_game_name_by_uuid
 from sharewarez.utils.scanning import refresh_images_in_background, is_scan_job_running
+from sharewarez.utils.scan_scheduler import reset_scan_job
+from sharewarez.utils.scan_coordinator import admit_scan
+from sharewarez.utils.unmatched_rematch import REMATCH_JOB_TYPE
+from sharewarez.utils.path_relinker import RELINK_JOB_TYPE
+from sharewarez.utils.scan_progress import notify_scan_cancel
 from sharewarez.utils.game_core import delete_game
 from sharewarez.utils.security import is_safe_path, get_allowed_base_directories
 from sharewarez.utils.unmatched import handle_delete_unmatched
@@ -243,21 +248,8 @@ def scan_management():
 
     jobs = db.session.execute(select(ScanJob).order_by(ScanJob.last_run.desc())).scalars().all()
     csrf_form = CsrfProtectForm()
-    unmatched_folders = UnmatchedFolder.query\
-                        .join(Library)\
-                        .with_entities(UnmatchedFolder, Library.name, Library.platform)\
-                        .order_by(UnmatchedFolder.status.desc()).all()
+    # The unmatched folders tab loads its rows page by page from /api/unmatched_folders
     unmatched_form = UpdateUnmatchedFolderForm()
-    # Packaging data with platform details
-    unmatched_folders_with_platform = []
-    for unmatched, lib_name, lib_platform in unmatched_folders:
-        platform_id = PLATFORM_IDS.get(lib_platform.name) if lib_platform else None
-        unmatched_folders_with_platform.append({
-            "folder": unmatched,
-            "library_name": lib_name,
-            "platform_name": lib_platform.name if lib_platform else '',
-            "platform_id": platform_id
-        })
 
     game_count = db.session.scalar(select(func.count(Game.id)))  # Fetch the game count here
 
@@ -313,7 +305,6 @@ def scan_management():
                            jobs=jobs,
                            csrf_form=csrf_form,
                            active_tab=active_tab,
-                           unmatched_folders=unmatched_folders_with_platform,
                            unmatched_form=unmatched_form,
                            game_count=game_count,
                            libraries=libraries,
@@ -333,6 +324,7 @@ def cancel_scan_job(job_id):
         job.is_enabled = False
         job.status = 'Stopping'
         job.error_message = 'Scan is stopping, waiting for threads to complete'
+        notify_scan_cancel(job.id)
         db.session.commit()
         flash(f"Scan job {job_id} is stopping. Waiting for threads to complete...")
         print(f"Scan job {job_id} is stopping. Waiting for threads to complete...")
@@ -349,24 +341,30 @@ def restart_scan_job(job_id):
     if job.status == 'Running':
         flash('Cannot restart a running scan.', 'error')
         return redirect(url_for('main.scan_management'))
+    if job.job_type == REMATCH_JOB_TYPE:
+        flash('Re-match jobs cannot be restarted. Start a new re-match from the unmatched folders list.', 'error')
+        return redirect(url_for('main.scan_management'))
+    if job.job_type == RELINK_JOB_TYPE:
+        flash('Relink jobs cannot be restarted. Start a new relink from the Relink Paths tab.', 'error')
+        return redirect(url_for('main.scan_management'))
+
+    base_dir = current_app.config.get('BASE_FOLDER_WINDOWS') if os.name == 'nt' else current_app.config.get('BASE_FOLDER_POSIX')
+    full_path = os.path.join(base_dir, job.scan_folder)
+
+    # Other libraries may be scanning; wait if the limit or this folder's device budget is used up
+    reason = admit_scan(job, full_path)
+    if reason:
+        db.session.rollback()
+        flash(reason, 'error')
+        return redirect(url_for('main.scan_management'))
 
     # Reset the existing job's counters instead of creating a new job
-    job.status = 'Running'
-    job.total_folders = 0
-    job.folders_success = 0
-    job.folders_failed = 0
-    job.removed_count = 0
-    job.last_run = datetime.now(timezone.utc)
-    job.error_message = None
-    job.is_enabled = True
+    reset_scan_job(job)
     db.session.commit()
 
     # Start scan using the existing job
     @copy_current_request_context
     def start_scan():
-        base_dir = current_app.config.get('BASE_FOLDER_WINDOWS') if os.name == 'nt' else current_app.config.get('BASE_FOLDER_POSIX')
-        full_path = os.path.join(base_dir, job.scan_folder)
-        
         if not os.path.exists(full_path) or not os.access(full_path, os.R_OK):
             job.status = 'Failed'
             job.error_message = f"Cannot access folder: {full_path}"
@@ -881,6 +879,7 @@ def delete_library_background(library_uuid, job_id):
                 running_job.status = 'Failed'
                 running_job.error_message = 'Scan cancelled due to library deletion'
                 running_job.is_enabled = False
+                notify_scan_cancel(running_job.id)
                 print(f"Cancelled running scan job: {running_job.id}")
             
             if running_scan_jobs:
@@ -1,5 +1,5 @@
 # /sharewarez/routes_admin_ext/igdb.py
-from flask import render_template, request, jsonify
+from flask import render_template, request, jsonify, current_app
 from flask_login import login_required
 from sharewarez.models import GlobalSettings
 from sharewarez import db
@@ -7,6 +7,8 @@ from sqlalchemy import select
 from datetime import datetime, timezone
 from . import admin2_bp
 from sharewarez.utils.igdb_api import make_igdb_api_request
+from sharewarez.utils.igdb_catalog import get_catalog_stats, start_catalog_sync_in_background
+from sharewarez.utils.igdb_usage import get_igdb_usage_summary, USAGE_RETENTION_HOURS
 from sharewarez.utils.auth import admin_required
 
 @admin2_bp.route('/admin/igdb_settings', methods=['GET', 'POST'])
@@ -54,3 +56,44 @@ def test_igdb():
             return jsonify({'status': 'error', 'message': 'Invalid API response'}), 500
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@admin2_bp.route('/admin/igdb_catalog', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def igdb_catalog():
+    if request.method == 'POST':
+        settings = db.session.execute(select(GlobalSettings)).scalars().first()
+        if not settings:
+            settings = GlobalSettings()
+            db.session.add(settings)
+
+        settings.use_igdb_catalog = bool(request.json.get('use_igdb_catalog'))
+
+        try:
+            db.session.commit()
+            return jsonify({'status': 'success', 'message': 'IGDB catalog setting updated successfully'})
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    return jsonify({'status': 'success', 'catalog': get_catalog_stats()})
+
+@admin2_bp.route('/admin/igdb_catalog/sync', methods=['POST'])
+@login_required
+@admin_required
+def igdb_catalog_sync():
+    settings = db.session.execute(select(GlobalSettings)).scalars().first()
+    if not settings or not settings.igdb_client_id or not settings.igdb_client_secret:
+        return jsonify({'status': 'error', 'message': 'IGDB settings not configured'}), 400
+
+    if not start_catalog_sync_in_background(current_app._get_current_object()):
+        return jsonify({'status': 'error', 'message': 'An IGDB catalog sync is already running'}), 409
+    return jsonify({'status': 'success', 'message': 'IGDB catalog sync started'})
+
+@admin2_bp.route('/admin/igdb_usage', methods=['GET'])
+@login_required
+@admin_required
+def igdb_usage():
+    hours = min(max(request.args.get('hours', default=24, type=int), 1), USAGE_RETENTION_HOURS)
+    summary = get_igdb_usage_summary(hours)
+    return render_template('admin/admin_igdb_usage.html', summary=summary, hours=hours)
@@ -5,6 +5,7 @@ from sharewarez.models import Image, Game
 from sharewarez import db
 from . import admin2_bp
 from sharewarez.utils.auth import admin_required
+from sharewarez.utils.image_queue import process_image_queue, requeue_images
 from sqlalchemy import select, func, delete
 
 @admin2_bp.route('/admin/image_queue')
@@ -22,16 +23,18 @@ def image_queue_list():
     """Get paginated list of images in queue."""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
-    status_filter = request.args.get('status', 'all')  # all, pending, downloaded
+    status_filter = request.args.get('status', 'all')  # all, pending, downloaded, failed
     type_filter = request.args.get('type', 'all')  # all, cover, screenshot
     
     query = select(Image).join(Game)
     
     # Apply filters
     if status_filter == 'pending':
-        query = query.filter(Image.is_downloaded == False)
+        query = query.filter(Image.is_downloaded == False, Image.dead_lettered_at.is_(None))
     elif status_filter == 'downloaded':
         query = query.filter(Image.is_downloaded == True)
+    elif status_filter == 'failed':
+        query = query.filter(Image.is_downloaded == False, Image.dead_lettered_at.isnot(None))
     
     if type_filter != 'all':
         query = query.filter(Image.image_type == type_filter)
@@ -52,7 +55,10 @@ def image_queue_list():
             'download_url': img.download_url,
             'is_downloaded': img.is_downloaded,
             'created_at': img.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'local_url': img.url if img.is_downloaded else None
+            'local_url': img.url if img.is_downloaded else None,
+            'is_failed': img.dead_lettered_at is not None,
+            'download_attempts': img.download_attempts,
+            'last_error': img.last_error
         })
     
     return jsonify({
@@ -77,28 +83,17 @@ def download_images():
 
     try:
         if 'image_ids' in data:
-            # Download specific images
+            # Download specific images, trying failed ones again from their first attempt
             image_ids = data['image_ids']
-            downloaded = 0
-
-            for image_id in image_ids:
-                image = db.session.get(Image, image_id)
-                if image and not image.is_downloaded and image.download_url:
-                    try:
-                        import os
-                        from sharewarez.utils.functions import download_image
-                        save_path = os.path.join(current_app.config['IMAGE_SAVE_PATH'], image.url)
-                        download_image(image.download_url, save_path)
-                        image.is_downloaded = True
-                        downloaded += 1
-                    except Exception as e:
-                        print(f"Failed to download image {image_id}: {e}")
-
+            requeue_images(image_ids)
             db.session.commit()
+            result = process_image_queue(batch_size=max(len(image_ids), 1), image_ids=image_ids)
+
             return jsonify({
                 'success': True,
-                'downloaded': downloaded,
-                'message': f'Downloaded {downloaded} images'
+                'downloaded': result['downloaded'],
+                'failed': result['failed'],
+                'message': f"Downloaded {result['downloaded']} images" + (f", {result['failed']} failed" if result['failed'] else '')
             })
 
         elif 'batch_size' in data:
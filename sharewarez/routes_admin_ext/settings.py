@@ -14,6 +14,8 @@ import logging
 # Configuration constants
 MIN_SCAN_THREADS = 1
 MAX_SCAN_THREADS = 4
+MIN_STAGE_WORKERS = 1
+MAX_STAGE_WORKERS = 16
 MIN_DOWNLOAD_THREADS = 1
 MAX_DOWNLOAD_THREADS = 20
 MIN_BATCH_SIZE = 10
@@ -53,7 +55,18 @@ DEFAULT_SETTINGS = {
     'useLocalMetadata': False,
     'writeLocalMetadata': False,
     'useLocalImages': False,
-    'localMetadataFilename': 'sharewarez.json'
+    'localMetadataFilename': 'sharewarez.json',
+    'enableLibraryWatcher': False,
+    'libraryWatcherDebounce': 30,
+    'scanWindowStart': 1,
+    'scanWindowEnd': 6,
+    'scanStaggerMinutes': 20,
+    'scanDiscoveryWorkers': 4,
+    'scanPersistenceWorkers': 1,
+    'scanPostprocessWorkers': 4,
+    'missingGameGraceHours': 0,
+    'maxConcurrentScans': 2,
+    'scanDeviceIoBudget': 8
 }
 
 # Field mappings for database columns
@@ -78,7 +91,18 @@ FIELD_MAPPINGS = {
     'useLocalMetadata': 'use_local_metadata',
     'writeLocalMetadata': 'write_local_metadata',
     'useLocalImages': 'use_local_images',
-    'localMetadataFilename': 'local_metadata_filename'
+    'localMetadataFilename': 'local_metadata_filename',
+    'enableLibraryWatcher': 'enable_library_watcher',
+    'libraryWatcherDebounce': 'library_watcher_debounce',
+    'scanWindowStart': 'scan_window_start',
+    'scanWindowEnd': 'scan_window_end',
+    'scanStaggerMinutes': 'scan_stagger_minutes',
+    'scanDiscoveryWorkers': 'scan_discovery_workers',
+    'scanPersistenceWorkers': 'scan_persistence_workers',
+    'scanPostprocessWorkers': 'scan_postprocess_workers',
+    'missingGameGraceHours': 'missing_game_grace_hours',
+    'maxConcurrentScans': 'max_concurrent_scans',
+    'scanDeviceIoBudget': 'scan_device_io_budget'
 }
 
 
@@ -95,6 +119,13 @@ def validate_settings_data(settings_data):
     if scan_threads is not None:
         if not isinstance(scan_threads, int) or not (MIN_SCAN_THREADS <= scan_threads <= MAX_SCAN_THREADS):
             errors.append(f"Scan thread count must be between {MIN_SCAN_THREADS} and {MAX_SCAN_THREADS}")
+
+    # Validate scan pipeline stage workers
+    for workers_field in ['scanDiscoveryWorkers', 'scanPersistenceWorkers', 'scanPostprocessWorkers']:
+        stage_workers = settings_data.get(workers_field)
+        if stage_workers is not None:
+            if not isinstance(stage_workers, int) or not (MIN_STAGE_WORKERS <= stage_workers <= MAX_STAGE_WORKERS):
+                errors.append(f"{workers_field} must be between {MIN_STAGE_WORKERS} and {MAX_STAGE_WORKERS}")
     
     # Validate download threads
     download_threads = settings_data.get('turboDownloadThreads')
@@ -131,6 +162,39 @@ def validate_settings_data(settings_data):
         if not isinstance(hltb_delay, (int, float)) or not (0.5 <= hltb_delay <= 10.0):
             errors.append("HLTB rate limit delay must be between 0.5 and 10.0 seconds")
 
+    # Validate library watcher debounce
+    watcher_debounce = settings_data.get('libraryWatcherDebounce')
+    if watcher_debounce is not None:
+        if not isinstance(watcher_debounce, int) or not (5 <= watcher_debounce <= 600):
+            errors.append("Library watcher debounce must be between 5 and 600 seconds")
+
+    # Validate scheduled scan window
+    for window_field in ['scanWindowStart', 'scanWindowEnd']:
+        window_hour = settings_data.get(window_field)
+        if window_hour is not None:
+            if not isinstance(window_hour, int) or not (0 <= window_hour <= 23):
+                errors.append(f"{window_field} must be an hour between 0 and 23")
+    stagger_minutes = settings_data.get('scanStaggerMinutes')
+    if stagger_minutes is not None:
+        if not isinstance(stagger_minutes, int) or not (0 <= stagger_minutes <= 240):
+            errors.append("Scan stagger must be between 0 and 240 minutes")
+
+    # Validate missing game grace period
+    grace_hours = settings_data.get('missingGameGraceHours')
+    if grace_hours is not None:
+        if not isinstance(grace_hours, int) or not (0 <= grace_hours <= 720):
+            errors.append("Missing game grace period must be between 0 and 720 hours")
+
+    # Validate concurrent scan limits
+    max_scans = settings_data.get('maxConcurrentScans')
+    if max_scans is not None:
+        if not isinstance(max_scans, int) or not (1 <= max_scans <= 16):
+            errors.append("Concurrent scans must be between 1 and 16")
+    io_budget = settings_data.get('scanDeviceIoBudget')
+    if io_budget is not None:
+        if not isinstance(io_budget, int) or not (2 <= io_budget <= 64):
+            errors.append("Device I/O budget must be between 2 and 64 workers")
+
     # Validate local metadata filename
     metadata_filename = settings_data.get('localMetadataFilename')
     if metadata_filename is not None:
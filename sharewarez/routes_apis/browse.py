@@ -3,6 +3,9 @@ from flask import jsonify, request, current_app
 import os, sys
 from flask_login import login_required
 from sharewarez.utils.auth import admin_required
+from sharewarez.utils.folder_browser import (
+    list_folder, folder_page, decode_cursor, BROWSE_PAGE_SIZE, MAX_BROWSE_PAGE_SIZE
+)
 from . import apis_bp
 
 @apis_bp.route('/browse_folders_ss')
@@ -29,14 +32,27 @@ def browse_folders_ss():
             print(f'SS folder browser: Access denied: {folder_path} outside of base directory: {base_directory}', file=sys.stderr)
             return jsonify({'error': 'Access denied'}), 403
 
-    if os.path.isdir(folder_path):
-        # List directory contents; distinguish between files and directories
-        contents = [{'name': item, 
-                     'isDir': os.path.isdir(os.path.join(folder_path, item)),
-                     'ext': os.path.splitext(item)[1][1:].lower() if not os.path.isdir(os.path.join(folder_path, item)) else None,
-                     'size': os.path.getsize(os.path.join(folder_path, item)) if not os.path.isdir(os.path.join(folder_path, item)) else None
-                     } 
-                    for item in sorted(os.listdir(folder_path))]
-        return jsonify(sorted(contents, key=lambda x: (not x['isDir'], x['name'].lower())))
-    else:
+    cursor = request.args.get('cursor') or None
+    after = decode_cursor(cursor) if cursor else None
+    if cursor and after is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    limit = max(1, min(request.args.get('limit', BROWSE_PAGE_SIZE, type=int), MAX_BROWSE_PAGE_SIZE))
+    sizes = request.args.get('sizes', '').lower() in ('1', 'true', 'yes')
+
+    try:
+        listing = list_folder(folder_path)
+    except (FileNotFoundError, NotADirectoryError):
         return jsonify({'error': 'SS folder browser: Folder not found'}), 404
+    except OSError as e:
+        print(f'SS folder browser: Cannot list {folder_path}: {e}', file=sys.stderr)
+        return jsonify({'error': 'SS folder browser: Folder cannot be read'}), 500
+
+    # Directories first, then files, both alphabetically; one page after the cursor
+    items, next_cursor = folder_page(listing, after, limit, sizes)
+    return jsonify({
+        'items': items,
+        'next_cursor': next_cursor,
+        'total': len(listing.entries),
+        'hasErrors': listing.skipped > 0,
+        'skippedItems': listing.skipped
+    })
@@ -1,7 +1,11 @@
 # /sharewarez/routes_apis/igdb.py
 from flask import jsonify, request
 from flask_login import login_required
-from sharewarez.utils.igdb_api import make_igdb_api_request, get_cover_thumbnail_url
+from sharewarez import cache
+from sharewarez.utils.igdb_api import (
+    make_igdb_api_request, get_cover_thumbnail_url, cached_igdb_api_request,
+    build_admin_search_query, add_cover_thumbnails, IGDB_SEARCH_CACHE_TIMEOUT
+)
 from sharewarez.utils.game_core import check_existing_game_by_igdb_id
 from . import apis_bp
 
@@ -60,7 +64,12 @@ def get_cover_thumbnail():
     igdb_id = request.args.get('igdb_id', default=None, type=str)
     if igdb_id is None or not igdb_id.isdigit():
         return jsonify({'error': 'Invalid input. The ID must be numeric.'}), 400
-    cover_url = get_cover_thumbnail_url(int(igdb_id))
+    cache_key = f'igdb_cover_thumbnail_{igdb_id}'
+    cover_url = cache.get(cache_key)
+    if cover_url is None:
+        cover_url = get_cover_thumbnail_url(int(igdb_id))
+        if cover_url:
+            cache.set(cache_key, cover_url, timeout=IGDB_SEARCH_CACHE_TIMEOUT)
     if cover_url:
         return jsonify({'cover_url': cover_url}), 200
     else:
@@ -73,21 +82,15 @@ def search_igdb_by_id():
     igdb_id = request.args.get('igdb_id')
     if not igdb_id:
         return jsonify({"error": "IGDB ID is required"}), 400
-    endpoint_url = "https://api.igdb.com/v4/games"
-    # Use the same field format as working scanning code
-    query_params = f"""
-        fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-               screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-               aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-               total_rating_count, storyline;
-        where id = {igdb_id};
-    """
-    response = make_igdb_api_request(endpoint_url, query_params)
+    if not igdb_id.isdigit():
+        return jsonify({"error": "IGDB ID must be numeric"}), 400
+
+    response = cached_igdb_api_request("https://api.igdb.com/v4/games", build_admin_search_query(igdb_id=int(igdb_id)))
     if "error" in response:
         return jsonify({"error": response["error"]}), 500
 
     if response:
-        game_data = response[0] if response else {}
+        game_data = add_cover_thumbnails([dict(response[0])])[0]
         return jsonify(game_data)
     else:
         return jsonify({"error": "Game not found"}), 404
@@ -96,29 +99,19 @@ def search_igdb_by_id():
 @apis_bp.route('/search_igdb_by_name')
 @login_required
 def search_igdb_by_name():
-    game_name = request.args.get('name')
+    game_name = ' '.join((request.args.get('name') or '').split())
     platform_id = request.args.get('platform_id')
 
     if game_name:
-        # Use the same field format as working scanning code  
-        query_fields = """fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-                          screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-                          aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-                          total_rating_count, storyline;"""
-        
-        query_filter = f'search "{game_name}";'
-        
-        # Check if a platform_id was provided and is valid
-        if platform_id and platform_id.isdigit():
-            query_filter += f' where platforms = ({platform_id});'
-
-        query_filter += " limit 10;"  # limit results
-        query = query_fields + query_filter
-        
-        results = make_igdb_api_request('https://api.igdb.com/v4/games', query)
+        # One query returns the results together with their cover thumbnails
+        query = build_admin_search_query(
+            search_name=game_name,
+            platform_id=int(platform_id) if platform_id and platform_id.isdigit() else None
+        )
+        results = cached_igdb_api_request('https://api.igdb.com/v4/games', query)
 
         if 'error' not in results:
-            return jsonify({'results': results})
+            return jsonify({'results': add_cover_thumbnails([dict(game) for game in results])})
         else:
             return jsonify({'error': results['error']})
     return jsonify({'error': 'No game name provided'})
@@ -1,11 +1,25 @@
 # /sharewarez/routes_apis/scan.py
-from flask import jsonify
+import os
+from functools import partial
+from flask import jsonify, request, current_app
 from flask_login import login_required
 from sharewarez import db
-from sharewarez.models import ScanJob, UnmatchedFolder, Library
+from sharewarez.models import ScanJob, Library
 from sqlalchemy import select
 from sharewarez.utils.auth import admin_required
-from sharewarez.utils.functions import PLATFORM_IDS
+from sharewarez.utils.scan_scheduler import SCHEDULE_INTERVALS, schedule_next_run, start_job_thread
+from sharewarez.utils.unmatched import (
+    list_unmatched_folders, unmatched_folder_conditions, set_unmatched_status,
+    UNMATCHED_PAGE_SIZE, BULK_UNMATCHED_STATUSES
+)
+from sharewarez.utils.unmatched_rematch import (
+    get_rematch_folders, create_rematch_job, run_rematch_job, REMATCH_JOB_TYPE
+)
+from sharewarez.utils.path_relinker import (
+    create_relink_job, run_relink_job, default_search_roots, list_relink_proposals, apply_relink_proposals,
+    RELINK_JOB_TYPE, RELINK_MIN_CONFIDENCE, RELINK_APPLY_CONFIDENCE, RELINK_PAGE_SIZE
+)
+from sharewarez.utils.security import is_safe_path, get_allowed_base_directories
 from . import apis_bp
 
 @apis_bp.route('/scan_jobs_status', methods=['GET'])
@@ -31,28 +45,194 @@ def scan_jobs_status():
         'error_message': job.error_message or '',
         'last_run': job.last_run.strftime('%Y-%m-%d %H:%M:%S') if job.last_run else 'Not Available',
         'last_update': job.last_progress_update.isoformat() if job.last_progress_update else None,
+        'schedule': job.schedule,
         'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else 'Not Scheduled',
+        'igdb_api_cost': job.igdb_api_cost,
+        'pipeline_metrics': job.pipeline_metrics,
+        'job_type': job.job_type or 'scan',
         'progress_percentage': round((job.folders_success + job.folders_failed) / job.total_folders * 100, 1) if job.total_folders > 0 else 0
     } for job in jobs]
     return jsonify(jobs_data)
 
+@apis_bp.route('/scan_jobs/<job_id>/schedule', methods=['POST'])
+@login_required
+@admin_required
+def set_scan_job_schedule(job_id):
+    """Set or clear the schedule of a scan job. An empty schedule stops scheduled runs."""
+    job = db.session.get(ScanJob, job_id)
+    if not job:
+        return jsonify({'error': 'Scan job not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    schedule = data.get('schedule') or None
+    if schedule is not None and schedule not in SCHEDULE_INTERVALS:
+        return jsonify({'error': f"Schedule must be one of: {', '.join(SCHEDULE_INTERVALS)}"}), 400
+    if schedule and not job.scan_folder:
+        return jsonify({'error': 'Scan job has no folder to scan'}), 400
+    if schedule and job.job_type == REMATCH_JOB_TYPE:
+        return jsonify({'error': 'Re-match jobs cannot be scheduled'}), 400
+    if schedule and job.job_type == RELINK_JOB_TYPE:
+        return jsonify({'error': 'Relink jobs cannot be scheduled'}), 400
+
+    job.schedule = schedule
+    schedule_next_run(job)
+    db.session.commit()
+    return jsonify({
+        'schedule': job.schedule,
+        'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else 'Not Scheduled'
+    })
+
 @apis_bp.route('/unmatched_folders', methods=['GET'])
 @login_required
 @admin_required
 def unmatched_folders():
-    unmatched = db.session.execute(
-        select(UnmatchedFolder, Library.name.label('library_name'), Library.platform)
-        .join(Library)
-        .order_by(UnmatchedFolder.status.desc())
-    ).all()
-    
-    unmatched_data = [{
-        'id': folder.id,
-        'folder_path': folder.folder_path,
-        'status': folder.status,
-        'library_name': library_name,
-        'platform_name': platform.name if platform else '',
-        'platform_id': PLATFORM_IDS.get(platform.name) if platform else None
-    } for folder, library_name, platform in unmatched]
-    
-    return jsonify(unmatched_data)
+    """One page of unmatched folders, filtered by status, library and a search of the path or library name."""
+    listing = list_unmatched_folders(
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', UNMATCHED_PAGE_SIZE, type=int),
+        status=request.args.get('status') or None,
+        library_uuid=request.args.get('library_uuid') or None,
+        search=(request.args.get('search') or '').strip() or None
+    )
+    return jsonify(listing)
+
+def _unmatched_selection(data):
+    """Folders a bulk request applies to: a list of 'ids', or a 'filter' with status, library_uuid and search."""
+    if isinstance(data.get('ids'), list):
+        return {'ids': [str(folder_id) for folder_id in data['ids']]}
+    selection = data.get('filter')
+    if isinstance(selection, dict):
+        return {key: selection.get(key) or None for key in ('status', 'library_uuid', 'search')}
+    return None
+
+@apis_bp.route('/unmatched_folders/status', methods=['POST'])
+@login_required
+@admin_required
+def set_unmatched_folders_status():
+    """Ignore or un-ignore the selected unmatched folders in one update."""
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    if status not in BULK_UNMATCHED_STATUSES:
+        return jsonify({'error': f"Status must be one of: {', '.join(BULK_UNMATCHED_STATUSES)}"}), 400
+    selection = _unmatched_selection(data)
+    if selection is None:
+        return jsonify({'error': 'Select the folders by ids or filter'}), 400
+
+    updated = set_unmatched_status(status, unmatched_folder_conditions(**selection))
+    db.session.commit()
+    print(f"Set {updated} unmatched folders to '{status}'")
+    return jsonify({'updated': updated, 'status': status})
+
+@apis_bp.route('/unmatched_folders/rematch', methods=['POST'])
+@login_required
+@admin_required
+def rematch_unmatched_folders():
+    """Start a background re-match job per library for the selected unmatched folders."""
+    data = request.get_json(silent=True) or {}
+    selection = _unmatched_selection(data)
+    if selection is None:
+        return jsonify({'error': 'Select the folders by ids or filter'}), 400
+    folders_by_library = get_rematch_folders(**selection)
+    if not folders_by_library:
+        return jsonify({'error': 'No unmatched folders selected'}), 400
+
+    started, skipped = [], []
+    for library_uuid, folders in folders_by_library.items():
+        library = db.session.get(Library, library_uuid)
+        job, reason = create_rematch_job(library_uuid, [folder_path for _, folder_path in folders])
+        if reason:
+            skipped.append({'library_name': library.name, 'folders': len(folders), 'reason': reason})
+            continue
+        start_job_thread(partial(run_rematch_job, folder_ids=[folder_id for folder_id, _ in folders]), job)
+        started.append({'job_id': job.id, 'library_name': library.name, 'folders': len(folders)})
+
+    if not started:
+        return jsonify({'error': skipped[0]['reason'], 'skipped': skipped}), 409
+    return jsonify({'jobs': started, 'skipped': skipped}), 202
+
+def _confidence(value, default):
+    """A confidence from a request, or None when it isn't a number between 0 and 1."""
+    if value is None or value == '':
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0.0 <= value <= 1.0 else None
+
+@apis_bp.route('/relink_paths', methods=['POST'])
+@login_required
+@admin_required
+def start_relink_paths():
+    """Start a background job finding new paths for the missing games of a library."""
+    data = request.get_json(silent=True) or {}
+    library = db.session.get(Library, data.get('library_uuid') or '')
+    if not library:
+        return jsonify({'error': 'Library not found'}), 404
+    min_confidence = _confidence(data.get('min_confidence'), RELINK_MIN_CONFIDENCE)
+    apply_confidence = _confidence(data.get('apply_confidence'), RELINK_APPLY_CONFIDENCE)
+    if min_confidence is None or apply_confidence is None:
+        return jsonify({'error': 'Confidence must be a number between 0 and 1'}), 400
+
+    search_root = (data.get('search_root') or '').strip()
+    if search_root:
+        base_dir = current_app.config.get('BASE_FOLDER_WINDOWS') if os.name == 'nt' else current_app.config.get('BASE_FOLDER_POSIX')
+        search_root = os.path.normpath(os.path.join(base_dir or '', search_root))
+        is_safe, error_message = is_safe_path(search_root, get_allowed_base_directories(current_app))
+        if not is_safe:
+            return jsonify({'error': error_message}), 403
+        if not os.path.isdir(search_root):
+            return jsonify({'error': 'Search folder does not exist'}), 400
+        search_roots = [search_root]
+    else:
+        search_roots = default_search_roots(library.uuid)
+        if not search_roots:
+            return jsonify({'error': 'No folder to search, choose one for the moved games'}), 400
+
+    job, reason = create_relink_job(library.uuid, search_roots, dry_run=data.get('dry_run', True) is not False,
+                                    min_confidence=min_confidence, apply_confidence=apply_confidence)
+    if reason:
+        return jsonify({'error': reason}), 409
+    start_job_thread(run_relink_job, job)
+    return jsonify({'job_id': job.id, 'search_roots': search_roots}), 202
+
+@apis_bp.route('/relink_paths/<job_id>', methods=['GET'])
+@login_required
+@admin_required
+def relink_path_proposals(job_id):
+    """One page of the new paths a relink job proposes, least confident first."""
+    job = db.session.get(ScanJob, job_id)
+    if not job or job.job_type != RELINK_JOB_TYPE:
+        return jsonify({'error': 'Relink job not found'}), 404
+    listing = list_relink_proposals(
+        job.id,
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', RELINK_PAGE_SIZE, type=int)
+    )
+    listing.update(status=job.status, dry_run=(job.folders or {}).get('dry_run', True))
+    return jsonify(listing)
+
+@apis_bp.route('/relink_paths/<job_id>/apply', methods=['POST'])
+@login_required
+@admin_required
+def apply_relink_paths(job_id):
+    """Move the selected games, or all games above a confidence, to their proposed paths in one transaction."""
+    job = db.session.get(ScanJob, job_id)
+    if not job or job.job_type != RELINK_JOB_TYPE:
+        return jsonify({'error': 'Relink job not found'}), 404
+    if job.status != 'Completed':
+        return jsonify({'error': 'Proposals can be applied once the relink job has completed'}), 409
+
+    data = request.get_json(silent=True) or {}
+    game_uuids = data.get('game_uuids')
+    if game_uuids is not None and not isinstance(game_uuids, list):
+        return jsonify({'error': 'game_uuids must be a list'}), 400
+    min_confidence = _confidence(data.get('min_confidence'), None)
+    if data.get('min_confidence') not in (None, '') and min_confidence is None:
+        return jsonify({'error': 'Confidence must be a number between 0 and 1'}), 400
+
+    applied, skipped = apply_relink_proposals(
+        job.id, game_uuids=[str(game_uuid) for game_uuid in game_uuids] if game_uuids is not None else None,
+        min_confidence=min_confidence
+    )
+    return jsonify({'applied': applied, 'skipped': skipped})
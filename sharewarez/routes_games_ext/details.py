@@ -8,6 +8,7 @@ from sharewarez import db
 from sqlalchemy import select, and_
 from sharewarez.utils.functions import format_size, sanitize_string_input, get_url_icon
 from sharewarez.utils.game_core import get_game_by_uuid
+from sharewarez.utils.scanning import index_update_records
 from sharewarez.utils.security import sanitize_path_for_logging
 from sharewarez.utils.event_logging import log_system_event
 
@@ -60,7 +61,12 @@ def game_details(game_uuid):
         # Explicitly load updates and extras
         updates = db.session.execute(select(GameUpdate).filter_by(game_uuid=game.uuid)).scalars().all()
         extras = db.session.execute(select(GameExtra).filter_by(game_uuid=game.uuid)).scalars().all()
-        
+
+        # Sizes are indexed during scans; records from before that are measured once here
+        unindexed = [record for record in updates + extras if record.indexed_at is None]
+        if unindexed:
+            index_update_records(unindexed)
+
         # Log successful access for audit trail
         log_system_event(
             f"User {current_user.name} accessed game '{game.name}' with {len(updates)} updates and {len(extras)} extras",
@@ -83,16 +89,16 @@ def game_details(game_uuid):
                 "times_downloaded": update.times_downloaded,
                 "created_at": update.created_at.strftime('%Y-%m-%d %H:%M:%S'),
                 "nfo_content": update.nfo_content,
-                "file_size": format_size(get_path_size(update.file_path))
-            } for update in game.updates],
+                "file_size": format_size(update.file_size)
+            } for update in updates],
             "extras": [{
                 "id": extra.id,
                 "file_path": extra.file_path,
                 "times_downloaded": extra.times_downloaded,
                 "created_at": extra.created_at.strftime('%Y-%m-%d %H:%M:%S'),
                 "nfo_content": extra.nfo_content,
-                "file_size": format_size(get_path_size(extra.file_path))
-            } for extra in game.extras],
+                "file_size": format_size(extra.file_size)
+            } for extra in extras],
             "cover": game.cover,
             "first_release_date": game.first_release_date.strftime('%Y-%m-%d') if game.first_release_date else 'Not available',
             "rating": game.rating,
@@ -203,6 +209,7 @@ def serve_local_image(game_uuid, image_type):
     from flask import send_file, current_app, request
     from sharewarez.models import Game
     from sharewarez.utils.local_metadata import get_local_cover_path, get_local_screenshots
+    from sharewarez.utils.local_index import get_local_index_entry
     from sharewarez.utils.security import is_safe_path, get_allowed_base_directories
     import mimetypes
 
@@ -246,13 +253,20 @@ def serve_local_image(game_uuid, image_type):
         )
         abort(403, "Access denied")
 
-    # Get local image path
+    # Get local image path, from the scan's sidecar index when the folder is indexed
     image_path = None
+    index_entry = get_local_index_entry(game.library_uuid, game.full_disk_path)
     if image_type == 'cover':
-        image_path = get_local_cover_path(game.full_disk_path)
+        if index_entry:
+            image_path = os.path.join(game.full_disk_path, index_entry['cover_file']) if index_entry['cover_file'] else None
+        else:
+            image_path = get_local_cover_path(game.full_disk_path)
     elif image_type == 'screenshot':
         index = request.args.get('index', 0, type=int)
-        screenshots = get_local_screenshots(game.full_disk_path)
+        if index_entry:
+            screenshots = [os.path.join(game.full_disk_path, name) for name in index_entry['screenshot_files'] or []]
+        else:
+            screenshots = get_local_screenshots(game.full_disk_path)
         if 0 <= index < len(screenshots):
             image_path = screenshots[index]
     else:
@@ -187,6 +187,19 @@ def get_games(page=1, per_page=20, sort_by='name', sort_order='asc', **filters):
         ).all()
         user_statuses = {row[0]: row[1] for row in status_results}
 
+    # Local metadata and images come from the scan's sidecar index, one query for the page
+    from sharewarez.utils.local_metadata import has_local_metadata, has_local_images
+    from sharewarez.utils.local_index import get_local_index_entries, has_local_override as indexed_local_override
+    from sharewarez.models import GlobalSettings
+    settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
+    local_index = {}
+    metadata_filename = 'sharewarez.json'
+    if settings and (settings.use_local_metadata or settings.use_local_images):
+        metadata_filename = settings.local_metadata_filename or 'sharewarez.json'
+        local_index = get_local_index_entries(
+            (game.library_uuid, game.full_disk_path) for game in games if game.full_disk_path
+        )
+
     game_data = []
     for game in games:
         cover_image = db.session.execute(select(Image).filter_by(game_uuid=game.uuid, image_type='cover')).scalars().first()
@@ -195,12 +208,12 @@ def get_games(page=1, per_page=20, sort_by='name', sort_order='asc', **filters):
         game_size_formatted = format_size(game.size)
         first_release_date_formatted = game.first_release_date.strftime('%Y-%m-%d') if game.first_release_date else 'Not available'
 
-        # Check if game has local metadata or images
-        from sharewarez.utils.local_metadata import has_local_metadata, has_local_images
-        from sharewarez.models import GlobalSettings
+        # Check if game has local metadata or images, on disk only for folders the index doesn't know
         has_local_override = False
-        settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
-        if settings:
+        index_entry = local_index.get((game.library_uuid, game.full_disk_path))
+        if index_entry and index_entry['metadata_filename'] == metadata_filename:
+            has_local_override = indexed_local_override(index_entry, settings)
+        elif settings:
             if (settings.use_local_metadata and has_local_metadata(game.full_disk_path, settings.local_metadata_filename or 'sharewarez.json')) or \
                (settings.use_local_images and has_local_images(game.full_disk_path)):
                 has_local_override = True
@@ -294,87 +294,121 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    document.querySelector('#search-igdb').addEventListener('click', function() {
-        const gameName = nameInput.value;
-        const platformId = document.querySelector('#platform_id').textContent; // Retrieve the platform ID from the HTML
+    // IGDB name search: typing is debounced, a newer search aborts the one in flight,
+    // and results already fetched on this page are reused
+    const SEARCH_DEBOUNCE_MS = 400;
+    const SEARCH_MIN_LENGTH = 3;
+    const searchResultsCache = new Map();
+    let searchDebounceTimer = null;
+    let searchController = null;
+
+    function renderSearchResults(results) {
+        const resultsContainer = document.querySelector('#search-results');
+        resultsContainer.innerHTML = '';
+        if (!results || results.length === 0) {
+            resultsContainer.textContent = 'No results found';
+            return;
+        }
+
+        results.forEach(game => {
+            const resultItem = document.createElement('div');
+            resultItem.className = 'search-result-item';
+
+            // Cover thumbnails come back with the search results
+            const img = document.createElement('img');
+            img.alt = 'Cover Image';
+            img.style.width = '50px'; // Adjust size as needed
+            img.style.height = 'auto';
+            img.style.marginRight = '10px'; // Spacing between image and text
+            img.src = game.cover_url || '/static/newstyle/nocoverfound.png';
+            img.onerror = function() {
+                this.onerror = null;
+                this.src = '/static/newstyle/nocoverfound.png';
+            };
+            resultItem.appendChild(img);
+
+            // Append game name text
+            const textNode = document.createTextNode(game.name);
+            resultItem.appendChild(textNode);
+
+            resultItem.addEventListener('click', function() {
+                // Update form with game data upon selection
+                updateFormWithGameData(game);
+
+                // Ensure the collapsible section is expanded
+                const gameDetailsCollapse = document.querySelector('#gameDetails');
+                if (gameDetailsCollapse) {
+                    const bootstrapCollapse = new bootstrap.Collapse(gameDetailsCollapse, {
+                        show: true
+                    });
+                }
+
+                // Update essential fields
+                igdbIdInput.value = game.id;
+                nameInput.value = game.name;
+                document.querySelector('#summary').value = game.summary || '';
+                document.querySelector('#storyline').value = game.storyline || '';
+                document.querySelector('#url').value = game.url || '';
+                checkFieldsAndToggleSubmit();
+                clearTimeout(searchDebounceTimer);
+                resultsContainer.innerHTML = ''; // Clear results after selection
+            });
+
+            resultsContainer.appendChild(resultItem);
+        });
+    }
+
+    function searchIgdbByName(gameName) {
+        const cacheKey = gameName.trim().toLowerCase();
+        if (searchResultsCache.has(cacheKey)) {
+            renderSearchResults(searchResultsCache.get(cacheKey));
+            return;
+        }
+
+        if (searchController) {
+            searchController.abort();
+        }
+        searchController = new AbortController();
 
         console.log(`Initiating IGDB search for name: ${gameName}`);
-        if (gameName) {
-            fetch(`/api/search_igdb_by_name?name=${encodeURIComponent(gameName)}&platform_id=${encodeURIComponent(platformId)}`)
-                .then(response => response.json())
-                .then(data => {
-                    console.log("API Response (IGDB name Search):", data);
-                    const resultsContainer = document.querySelector('#search-results');
-                    resultsContainer.innerHTML = '';
-                    if (data.results && data.results.length > 0) {
-                        data.results.forEach(game => {
-                            const resultItem = document.createElement('div');
-                            resultItem.className = 'search-result-item';
-                            
-                            // Initialize the img element early to ensure order
-                            const img = document.createElement('img');
-                            img.alt = 'Cover Image';
-                            img.style.width = '50px'; // Adjust size as needed
-                            img.style.height = 'auto';
-                            img.style.marginRight = '10px'; // Spacing between image and text
-    
-                            // Fetch the cover thumbnail URL
-                            fetch(`/api/get_cover_thumbnail?igdb_id=${game.id}`)
-                            .then(response => response.json())
-                            .then(coverData => {
-                                if (!coverData.error && coverData.cover_url) {
-                                    img.src = coverData.cover_url;
-                                } else {
-                                    // Use a fallback image if cover URL not found
-                                    img.src = '/static/newstyle/nocoverfound.png';
-                                }
-                                // Prepend the img element regardless of fetch outcome
-                                resultItem.prepend(img);
-                            })
-                            .catch(error => {
-                                console.error('Error fetching cover thumbnail:', error);
-                                img.src = '/static/newstyle/nocoverfound.png'; // Fallback if fetch fails
-                                resultItem.prepend(img);
-                            });
-                            
-                            // Append game name text
-                            const textNode = document.createTextNode(game.name);
-                            resultItem.appendChild(textNode);
-    
-                            resultItem.addEventListener('click', function() {
-                                // Update form with game data upon selection
-                                updateFormWithGameData(game);
-    
-                                // Ensure the collapsible section is expanded
-                                const gameDetailsCollapse = document.querySelector('#gameDetails');
-                                if (gameDetailsCollapse) {
-                                    const bootstrapCollapse = new bootstrap.Collapse(gameDetailsCollapse, {
-                                        show: true
-                                    });
-                                }
-                                
-                                // Update essential fields
-                                igdbIdInput.value = game.id;
-                                nameInput.value = game.name;
-                                document.querySelector('#summary').value = game.summary || '';
-                                document.querySelector('#storyline').value = game.storyline || '';
-                                document.querySelector('#url').value = game.url || '';
-                                checkFieldsAndToggleSubmit();
-                                resultsContainer.innerHTML = ''; // Clear results after selection
-                            });
-    
-                            resultsContainer.appendChild(resultItem);
-                        });
-                    } else {
-                        resultsContainer.textContent = 'No results found';
-                    }
-                })
-                .catch(error => {
+        fetch(`/api/search_igdb_by_name?name=${encodeURIComponent(gameName)}&platform_id=${encodeURIComponent(platformId)}`, {
+            signal: searchController.signal
+        })
+            .then(response => response.json())
+            .then(data => {
+                console.log("API Response (IGDB name Search):", data);
+                if (data.error) {
+                    console.error('Error:', data.error);
+                    renderSearchResults([]);
+                    return;
+                }
+                searchResultsCache.set(cacheKey, data.results);
+                renderSearchResults(data.results);
+            })
+            .catch(error => {
+                if (error.name !== 'AbortError') {
                     console.error('Error:', error);
-                });
+                }
+            });
+    }
+
+    document.querySelector('#search-igdb').addEventListener('click', function() {
+        const gameName = nameInput.value;
+        clearTimeout(searchDebounceTimer);
+        if (gameName) {
+            searchIgdbByName(gameName);
         }
     });
-    
+
+    nameInput.addEventListener('input', function() {
+        clearTimeout(searchDebounceTimer);
+        const gameName = this.value.trim();
+        if (gameName.length < SEARCH_MIN_LENGTH || document.querySelector('#search-igdb').disabled) {
+            return;
+        }
+        searchDebounceTimer = setTimeout(() => searchIgdbByName(gameName), SEARCH_DEBOUNCE_MS);
+    });
+
     igdbIdInput.addEventListener('input', function() {
         this.value = this.value.replace(/\D/g, '');
         checkFieldsAndToggleSubmit();
@@ -84,4 +84,78 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     };
 
+    // Offline IGDB catalog
+    function renderCatalog(catalog) {
+        const games = catalog.sync_state.games || {};
+        document.getElementById('catalogGames').textContent = catalog.games;
+        document.getElementById('catalogPlatforms').textContent = catalog.platforms;
+        document.getElementById('catalogAlternativeNames').textContent = catalog.alternative_names;
+        document.getElementById('catalogLastSync').textContent = games.last_synced_at ? new Date(games.last_synced_at).toLocaleString() : 'Never';
+
+        let status = catalog.running ? 'Running (' + (games.records_synced || 0) + ' games synced)' : (games.status || 'Idle');
+        if (games.status === 'Failed' && !catalog.running) {
+            status += ': ' + games.error_message;
+        }
+        document.getElementById('catalogStatus').textContent = status;
+        document.getElementById('syncCatalogButton').disabled = catalog.running;
+        return catalog.running;
+    }
+
+    function refreshCatalog() {
+        fetch('/admin/igdb_catalog')
+            .then(response => response.json())
+            .then(data => {
+                if (data.status === 'success' && renderCatalog(data.catalog)) {
+                    setTimeout(refreshCatalog, 3000);
+                }
+            })
+            .catch(error => console.error('Error loading IGDB catalog status:', error));
+    }
+
+    const catalogToggle = document.getElementById('use_igdb_catalog');
+    if (catalogToggle) {
+        catalogToggle.addEventListener('change', function() {
+            fetch('/admin/igdb_catalog', {
+                method: 'POST',
+                headers: CSRFUtils.getHeaders({
+                    'Content-Type': 'application/json'
+                }),
+                body: JSON.stringify({ use_igdb_catalog: catalogToggle.checked })
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.status === 'success') {
+                    $.notify(data.message, "success");
+                } else {
+                    $.notify("Error saving catalog setting: " + data.message, "error");
+                }
+            })
+            .catch(error => {
+                $.notify("Error saving catalog setting: " + error, "error");
+            });
+        });
+        refreshCatalog();
+    }
+
+    window.syncCatalog = function() {
+        fetch('/admin/igdb_catalog/sync', {
+            method: 'POST',
+            headers: CSRFUtils.getHeaders({
+                'Content-Type': 'application/json'
+            })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                $.notify(data.message, "success");
+                setTimeout(refreshCatalog, 500);
+            } else {
+                $.notify("Error starting catalog sync: " + data.message, "error");
+            }
+        })
+        .catch(error => {
+            $.notify("Error starting catalog sync: " + error, "error");
+        });
+    };
+
 });
@@ -198,10 +198,22 @@ document.addEventListener('DOMContentLoaded', function() {
         return job.status;
     }
 
+    const scheduleOptions = [
+        ['', 'Not scheduled'],
+        ['8_hours', 'Every 8 hours'],
+        ['24_hours', 'Daily'],
+        ['48_hours', 'Every 2 days']
+    ];
+
     const updateScanJobs = () => {
         fetch('/api/scan_jobs_status', {cache: 'no-store'})
             .then(response => response.json())
             .then(data => {
+                // Don't rebuild the rows while a schedule dropdown is in use
+                if (document.activeElement && document.activeElement.classList.contains('scan-schedule-select')) {
+                    return;
+                }
+
                 // Sort the data array to ensure the latest scan is at the top
                 data.sort((a, b) => new Date(b.last_run) - new Date(a.last_run));
                 
@@ -252,6 +264,23 @@ document.addEventListener('DOMContentLoaded', function() {
                         progressColumn = '-';
                     }
 
+                    // IGDB API cost of finished scans
+                    if (job.igdb_api_cost && job.status !== 'Running' && job.status !== 'Stopping') {
+                        const cost = job.igdb_api_cost;
+                        progressColumn += `<br><small class="text-muted" title="${cost.rate_limited} rate limited, ${cost.cache_hits} cache hits, avg ${cost.avg_latency_ms} ms">
+                            <i class="fas fa-cloud"></i> ${cost.calls} IGDB calls</small>`;
+                    }
+
+                    // Scan pipeline stage metrics of finished scans
+                    if (job.pipeline_metrics && job.pipeline_metrics.stages && job.status !== 'Running' && job.status !== 'Stopping') {
+                        const metrics = job.pipeline_metrics;
+                        const stageLines = Object.entries(metrics.stages).map(([name, stage]) =>
+                            `${name}: ${stage.processed} items, ${stage.workers} workers, avg ${stage.avg_ms} ms, max queue ${stage.max_queue}`
+                        ).join('&#10;');
+                        progressColumn += `<br><small class="text-muted" title="${stageLines}">
+                            <i class="fas fa-stream"></i> ${metrics.wall_seconds}s, slowest: ${metrics.bottleneck}</small>`;
+                    }
+
                     // Create actions column content
                     const actionsColumn = `
                         ${job.status === 'Running' ?
@@ -263,6 +292,10 @@ document.addEventListener('DOMContentLoaded', function() {
                             `<button class="btn btn-warning btn-sm" disabled title="Scan is stopping, please wait...">
                                 <i class="fas fa-spinner fa-spin"></i>
                             </button>` :
+                        job.job_type === 'rematch' ?
+                            '' :
+                        job.job_type === 'relink' ?
+                            `<button class="btn btn-info btn-sm" onclick="window.reviewRelinkJob('${job.id}')" title="Review the proposed paths"><i class="fas fa-eye"></i></button>` :
                             `${isAnyJobRunning ?
                                 `<button class="btn btn-info btn-sm" disabled title="Cannot restart while another scan is running"><i class="fas fa-sync"></i></button>` :
                                 `<form action="/restart_scan_job/${job.id}" method="post" style="display: inline-block;">
@@ -273,30 +306,67 @@ document.addEventListener('DOMContentLoaded', function() {
                         }
                     `;
                     
+                    // Schedule dropdown with the next scheduled run, re-match and relink jobs run once
+                    const scheduleColumn = job.job_type === 'rematch' || job.job_type === 'relink' ? '-' : `
+                        <select class="form-select form-select-sm scan-schedule-select" onchange="window.setScanSchedule('${job.id}', this)" title="Run this scan automatically in the scan window">
+                            ${scheduleOptions.map(([value, label]) =>
+                                `<option value="${value}" ${(job.schedule || '') === value ? 'selected' : ''}>${label}</option>`
+                            ).join('')}
+                        </select>
+                        ${job.schedule ? `<small class="text-muted"><i class="fas fa-clock"></i> ${job.next_run}</small>` : ''}
+                    `;
+
                     const row = document.createElement('tr');
                     row.innerHTML = `
                         <td>${job.id.substring(0, 8)}</td>
                         <td>${job.library_name || 'N/A'}</td>
-                        <td>${job.scan_folder || 'N/A'}</td>
+                        <td>${job.job_type === 'rematch' ? '<span class="badge bg-info" title="Re-match of unmatched folders">Re-match</span> ' : ''}${job.job_type === 'relink' ? '<span class="badge bg-secondary" title="Relink of moved games">Relink</span> ' : ''}${job.scan_folder || 'N/A'}</td>
                         <td>${getDisplayStatus(job)}</td>
                         <td>${progressColumn}</td>
+                        <td>${scheduleColumn}</td>
                         <td>${actionsColumn}</td>
                     `;
                     scanJobsTableBody.appendChild(row);
+
+                    // Show the proposals of the relink under review once its job finishes
+                    if (job.id === currentRelinkJobId && job.status !== currentRelinkStatus) {
+                        currentRelinkStatus = job.status;
+                        updateRelinkProposals();
+                    }
                 });
             })
             .catch(error => console.error('Error fetching scan jobs status:', error));
     };
 
+    // Unmatched folders are filtered, searched and paged on the server
+    let currentFilter = 'all';
+    let currentSearch = '';
+    let currentPage = 1;
+    const unmatchedPerPage = 100;
+    const selectedFolderIds = new Set();
+
     const updateUnmatchedFolders = () => {
         showSpinner();
-        return fetch('/api/unmatched_folders', {cache: 'no-store'})
+        const params = new URLSearchParams({page: currentPage, per_page: unmatchedPerPage});
+        if (currentFilter !== 'all') {
+            params.set('status', currentFilter);
+        }
+        if (currentSearch) {
+            params.set('search', currentSearch);
+        }
+        return fetch(`/api/unmatched_folders?${params}`, {cache: 'no-store'})
             .then(response => response.json())
             .then(data => {
+                // A refresh after folders left the list may land past the last page
+                if (data.page > data.pages && data.pages > 0) {
+                    currentPage = data.pages;
+                    return updateUnmatchedFolders();
+                }
+
                 // Clear the table body
                 unmatchedTableBody.innerHTML = '';
                 
-                data.forEach(folder => {
+                data.folders.forEach(folder => {
                     const actionsColumn = `
                         <button 
                             onclick="window.toggleIgnoreStatus('${folder.id}', this)" 
@@ -322,10 +392,9 @@ document.addEventListener('DOMContentLoaded', function() {
                     
                     const row = document.createElement('tr');
                     row.setAttribute('data-status', folder.status);
-                    row.setAttribute('data-folder-path', folder.folder_path.toLowerCase());
-                    row.setAttribute('data-library-name', folder.library_name.toLowerCase());
-                    row.setAttribute('data-platform-name', folder.platform_name.toLowerCase());
+                    row.setAttribute('data-folder-id', folder.id);
                     row.innerHTML = `
+                        <td><input type="checkbox" class="unmatched-select" value="${folder.id}" ${selectedFolderIds.has(String(folder.id)) ? 'checked' : ''}></td>
                         <td><i class="fas fa-folder"></i> ${folder.folder_path}</td>
                         <td><span class="status-${folder.status.toLowerCase()}">${folder.status}</span></td>
                         <td>${folder.library_name}</td>
@@ -337,8 +406,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Attach event listeners to the new forms
                 attachDeleteFolderFormListeners();
 
-                // Update results counter after data load
-                updateResultsCounter();
+                updateResultsCounter(data);
+                renderUnmatchedPagination(data);
+                updateSelectionButtons();
             })
             .catch(error => {
                 console.error('Error fetching unmatched folders:', error);
@@ -348,10 +418,6 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     };
 
-    // Filtering functionality
-    let currentFilter = 'all';
-    let currentSearch = '';
-
     // Notification system
     function showSuccessNotification(message) {
         // Remove any existing notification
@@ -380,62 +446,121 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 3000);
     }
 
-    function filterUnmatchedRows() {
-        const unmatchedRows = document.querySelectorAll('#unmatchedFoldersTableBody tr');
-        let visibleCount = 0;
-
-        unmatchedRows.forEach(row => {
-            const status = row.getAttribute('data-status');
-            const folderPath = row.getAttribute('data-folder-path') || '';
-            const libraryName = row.getAttribute('data-library-name') || '';
-            const platformName = row.getAttribute('data-platform-name') || '';
-
-            // Check status filter
-            const statusMatch = currentFilter === 'all' || status === currentFilter;
-
-            // Check search filter
-            const searchMatch = currentSearch === '' ||
-                folderPath.includes(currentSearch) ||
-                libraryName.includes(currentSearch) ||
-                platformName.includes(currentSearch);
+    function updateResultsCounter(data = null) {
+        const resultsInfo = document.getElementById('resultsInfo');
+        if (!resultsInfo) return;
 
-            // Special handling for ignored items
-            let shouldShow = statusMatch && searchMatch;
+        if (data === null) {
+            // Rows hidden since the last load
+            const visible = Array.from(document.querySelectorAll('#unmatchedFoldersTableBody tr'))
+                .filter(row => row.style.display !== 'none').length;
+            resultsInfo.textContent = `Showing ${visible} entries on this page`;
+            return;
+        }
 
-            // For Option 2 behavior: Hide ignored items unless viewing "All" or "Ignored"
-            if (status === 'Ignore' && currentFilter !== 'all' && currentFilter !== 'Ignore') {
-                shouldShow = false;
-            }
+        const first = data.total ? (data.page - 1) * data.per_page + 1 : 0;
+        const last = (data.page - 1) * data.per_page + data.folders.length;
+        const counts = Object.entries(data.status_counts || {})
+            .map(([status, count]) => `${count} ${status}`).join(', ');
+        const filterText = currentFilter !== 'all' ? ` (${currentFilter})` : '';
+        const searchText = currentSearch ? ` matching "${currentSearch}"` : '';
+        resultsInfo.textContent = `Showing ${first}-${last} of ${data.total} entries${filterText}${searchText}` +
+            (counts ? ` · ${counts}` : '');
+    }
 
-            if (shouldShow) {
-                row.style.display = '';
-                row.classList.remove('row-fade-out'); // Remove fade-out class if present
-                visibleCount++;
-            } else {
-                row.style.display = 'none';
+    function renderUnmatchedPagination(data) {
+        const pagination = document.getElementById('unmatchedPagination');
+        if (!pagination) return;
+
+        pagination.innerHTML = '';
+        if (data.pages <= 1) return;
+
+        const list = document.createElement('ul');
+        list.className = 'pagination pagination-sm justify-content-center';
+        const addPage = (label, page, disabled = false, active = false) => {
+            const item = document.createElement('li');
+            item.className = `page-item${disabled ? ' disabled' : ''}${active ? ' active' : ''}`;
+            item.innerHTML = `<a class="page-link" href="#">${label}</a>`;
+            if (!disabled && !active) {
+                item.querySelector('a').addEventListener('click', event => {
+                    event.preventDefault();
+                    currentPage = page;
+                    updateUnmatchedFolders();
+                });
             }
-        });
-
-        updateResultsCounter(visibleCount, unmatchedRows.length);
+            list.appendChild(item);
+        };
+
+        addPage('&laquo;', data.page - 1, data.page <= 1);
+        const start = Math.max(1, data.page - 2);
+        const end = Math.min(data.pages, data.page + 2);
+        if (start > 1) addPage('1', 1);
+        if (start > 2) addPage('&hellip;', null, true);
+        for (let page = start; page <= end; page++) {
+            addPage(String(page), page, false, page === data.page);
+        }
+        if (end < data.pages - 1) addPage('&hellip;', null, true);
+        if (end < data.pages) addPage(String(data.pages), data.pages);
+        addPage('&raquo;', data.page + 1, data.page >= data.pages);
+        pagination.appendChild(list);
     }
 
-    function updateResultsCounter(visible = null, total = null) {
-        const resultsInfo = document.getElementById('resultsInfo');
-        if (!resultsInfo) return;
-
-        if (visible === null || total === null) {
-            const unmatchedRows = document.querySelectorAll('#unmatchedFoldersTableBody tr');
-            total = unmatchedRows.length;
-            visible = Array.from(unmatchedRows).filter(row => row.style.display !== 'none').length;
+    function updateSelectionButtons() {
+        const rematchSelectedBtn = document.getElementById('rematchSelectedBtn');
+        const ignoreSelectedBtn = document.getElementById('ignoreSelectedBtn');
+        if (rematchSelectedBtn) {
+            rematchSelectedBtn.disabled = selectedFolderIds.size === 0;
+        }
+        if (ignoreSelectedBtn) {
+            ignoreSelectedBtn.disabled = selectedFolderIds.size === 0;
+        }
+        const selectAll = document.getElementById('unmatchedSelectAll');
+        if (selectAll) {
+            const boxes = document.querySelectorAll('#unmatchedFoldersTableBody .unmatched-select');
+            selectAll.checked = boxes.length > 0 && Array.from(boxes).every(box => box.checked);
         }
+    }
 
-        if (currentFilter === 'all' && currentSearch === '') {
-            resultsInfo.textContent = `Showing all ${total} entries`;
-        } else {
-            const filterText = currentFilter !== 'all' ? ` (${currentFilter})` : '';
-            const searchText = currentSearch ? ` matching "${currentSearch}"` : '';
-            resultsInfo.textContent = `Showing ${visible} of ${total} entries${filterText}${searchText}`;
+    // Selection of the folders a filter or search currently shows, on all pages
+    function currentUnmatchedFilter() {
+        const filter = {};
+        if (currentFilter !== 'all') {
+            filter.status = currentFilter;
+        }
+        if (currentSearch) {
+            filter.search = currentSearch;
         }
+        return filter;
+    }
+
+    function postUnmatchedAction(url, body) {
+        return fetch(url, {
+            method: 'POST',
+            headers: CSRFUtils.getHeaders({
+                'Content-Type': 'application/json',
+                'X-Requested-With': 'XMLHttpRequest'
+            }),
+            body: JSON.stringify(body)
+        }).then(response => response.json());
+    }
+
+    function startRematch(selection) {
+        postUnmatchedAction('/api/unmatched_folders/rematch', selection)
+            .then(data => {
+                if (data.error) {
+                    alert(data.error);
+                    return;
+                }
+                const folders = data.jobs.reduce((sum, job) => sum + job.folders, 0);
+                showSuccessNotification(`Re-matching ${folders} folders in ${data.jobs.length} job(s), follow them in the scan jobs list`);
+                if (data.skipped && data.skipped.length) {
+                    alert('Some libraries were not re-matched:\n' + data.skipped.map(item => `${item.library_name}: ${item.reason}`).join('\n'));
+                }
+                selectedFolderIds.clear();
+                updateScanJobs();
+                updateUnmatchedFolders();
+            })
+            .catch(error => console.error('Error starting re-match:', error));
     }
 
     function setupUnmatchedFilters() {
@@ -448,26 +573,262 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Add active class to clicked button
                 this.classList.add('active');
 
-                // Update current filter
+                // Update current filter and reload from the first page
                 currentFilter = this.getAttribute('data-filter');
-
-                // Apply filtering
-                filterUnmatchedRows();
+                currentPage = 1;
+                updateUnmatchedFolders();
             });
         });
 
-        // Search input event listener
+        // Search input event listener, waiting for typing to pause before asking the server
         const searchInput = document.getElementById('unmatchedSearch');
+        let searchTimer = null;
         if (searchInput) {
             searchInput.addEventListener('input', function() {
-                currentSearch = this.value.toLowerCase();
-                filterUnmatchedRows();
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => {
+                    currentSearch = this.value.trim().toLowerCase();
+                    currentPage = 1;
+                    updateUnmatchedFolders();
+                }, 300);
+            });
+        }
+
+        unmatchedTableBody.addEventListener('change', event => {
+            if (!event.target.classList.contains('unmatched-select')) return;
+            if (event.target.checked) {
+                selectedFolderIds.add(event.target.value);
+            } else {
+                selectedFolderIds.delete(event.target.value);
+            }
+            updateSelectionButtons();
+        });
+
+        const selectAll = document.getElementById('unmatchedSelectAll');
+        if (selectAll) {
+            selectAll.addEventListener('change', function() {
+                document.querySelectorAll('#unmatchedFoldersTableBody .unmatched-select').forEach(box => {
+                    box.checked = this.checked;
+                    if (this.checked) {
+                        selectedFolderIds.add(box.value);
+                    } else {
+                        selectedFolderIds.delete(box.value);
+                    }
+                });
+                updateSelectionButtons();
+            });
+        }
+
+        const rematchSelectedBtn = document.getElementById('rematchSelectedBtn');
+        if (rematchSelectedBtn) {
+            rematchSelectedBtn.addEventListener('click', () => {
+                startRematch({ids: Array.from(selectedFolderIds)});
+            });
+        }
+
+        const rematchFilteredBtn = document.getElementById('rematchFilteredBtn');
+        if (rematchFilteredBtn) {
+            rematchFilteredBtn.addEventListener('click', () => {
+                const total = document.getElementById('resultsInfo').textContent;
+                if (confirm(`Re-match every folder of the current filter and search? (${total})`)) {
+                    startRematch({filter: currentUnmatchedFilter()});
+                }
+            });
+        }
+
+        const ignoreSelectedBtn = document.getElementById('ignoreSelectedBtn');
+        if (ignoreSelectedBtn) {
+            ignoreSelectedBtn.addEventListener('click', () => {
+                postUnmatchedAction('/api/unmatched_folders/status', {ids: Array.from(selectedFolderIds), status: 'Ignore'})
+                    .then(data => {
+                        if (data.error) {
+                            alert(data.error);
+                            return;
+                        }
+                        showSuccessNotification(`${data.updated} folders ignored`);
+                        selectedFolderIds.clear();
+                        updateUnmatchedFolders();
+                    })
+                    .catch(error => console.error('Error ignoring folders:', error));
             });
         }
     }
 
+    // Proposals of one relink job, reviewed and applied page by page
+    let currentRelinkJobId = null;
+    let currentRelinkStatus = null;
+    let currentRelinkPage = 1;
+    const relinkPerPage = 100;
+    const selectedRelinkGames = new Set();
+    const relinkTableBody = document.getElementById('relinkTableBody');
+
+    function updateRelinkButtons(data = null) {
+        const applySelectedBtn = document.getElementById('relinkApplySelectedBtn');
+        const applyAllBtn = document.getElementById('relinkApplyAllBtn');
+        const completed = currentRelinkStatus === 'Completed';
+        if (applySelectedBtn) {
+            applySelectedBtn.disabled = !completed || selectedRelinkGames.size === 0;
+        }
+        if (applyAllBtn && data !== null) {
+            applyAllBtn.disabled = !completed || data.total === 0;
+        }
+    }
+
+    function updateRelinkProposals() {
+        const resultsInfo = document.getElementById('relinkResultsInfo');
+        if (!currentRelinkJobId || !relinkTableBody) return;
+        const params = new URLSearchParams({page: currentRelinkPage, per_page: relinkPerPage});
+        return fetch(`/api/relink_paths/${currentRelinkJobId}?${params}`, {cache: 'no-store'})
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    resultsInfo.textContent = data.error;
+                    return;
+                }
+                currentRelinkStatus = data.status;
+                relinkTableBody.innerHTML = '';
+                data.proposals.forEach(proposal => {
+                    const row = document.createElement('tr');
+                    row.innerHTML = `
+                        <td>${proposal.applied ? '<i class="fas fa-check text-success" title="Applied"></i>' :
+                            `<input type="checkbox" class="relink-select" value="${proposal.game_uuid}" ${selectedRelinkGames.has(proposal.game_uuid) ? 'checked' : ''}>`}</td>
+                        <td>${proposal.game_name}</td>
+                        <td><small class="text-danger">${proposal.old_path}</small></td>
+                        <td><small class="text-success">${proposal.new_path}</small></td>
+                        <td>${Math.round(proposal.confidence * 100)}%</td>
+                    `;
+                    relinkTableBody.appendChild(row);
+                });
+
+                const job = `Relink job ${currentRelinkJobId.substring(0, 8)}${data.dry_run ? ' (dry run)' : ''}`;
+                if (data.status === 'Running' || data.status === 'Stopping') {
+                    resultsInfo.textContent = `${job} is running, follow its progress in the scan jobs list`;
+                } else {
+                    const first = data.total ? (data.page - 1) * data.per_page + 1 : 0;
+                    const last = (data.page - 1) * data.per_page + data.proposals.length;
+                    resultsInfo.textContent = `${job} ${data.status.toLowerCase()}: showing ${first}-${last} of ${data.total} proposed paths, least confident first`;
+                }
+                renderRelinkPagination(data);
+                updateRelinkButtons(data);
+            })
+            .catch(error => console.error('Error fetching relink proposals:', error));
+    }
+
+    function renderRelinkPagination(data) {
+        const pagination = document.getElementById('relinkPagination');
+        if (!pagination) return;
+
+        pagination.innerHTML = '';
+        if (data.pages <= 1) return;
+
+        const list = document.createElement('ul');
+        list.className = 'pagination pagination-sm justify-content-center';
+        const addPage = (label, page, disabled = false) => {
+            const item = document.createElement('li');
+            item.className = `page-item${disabled ? ' disabled' : ''}`;
+            item.innerHTML = `<a class="page-link" href="#">${label}</a>`;
+            if (!disabled) {
+                item.querySelector('a').addEventListener('click', event => {
+                    event.preventDefault();
+                    currentRelinkPage = page;
+                    updateRelinkProposals();
+                });
+            }
+            list.appendChild(item);
+        };
+        addPage('&laquo;', data.page - 1, data.page <= 1);
+        addPage(`${data.page} / ${data.pages}`, data.page, true);
+        addPage('&raquo;', data.page + 1, data.page >= data.pages);
+        pagination.appendChild(list);
+    }
+
+    function applyRelink(body) {
+        postUnmatchedAction(`/api/relink_paths/${currentRelinkJobId}/apply`, body)
+            .then(data => {
+                if (data.error) {
+                    alert(data.error);
+                    return;
+                }
+                showSuccessNotification(`${data.applied} games moved to their new paths` +
+                    (data.skipped ? `, ${data.skipped} skipped because the game or path changed` : ''));
+                selectedRelinkGames.clear();
+                updateRelinkProposals();
+            })
+            .catch(error => console.error('Error applying relink proposals:', error));
+    }
+
+    function setupRelink() {
+        const startBtn = document.getElementById('relinkStartBtn');
+        if (!startBtn) return;
+
+        startBtn.addEventListener('click', () => {
+            const minConfidence = document.getElementById('relinkMinConfidence').value;
+            postUnmatchedAction('/api/relink_paths', {
+                library_uuid: document.getElementById('relinkLibrary').value,
+                search_root: document.getElementById('relinkSearchRoot').value.trim(),
+                min_confidence: minConfidence === '' ? null : Number(minConfidence),
+                dry_run: document.getElementById('relinkDryRun').checked
+            })
+                .then(data => {
+                    if (data.error) {
+                        alert(data.error);
+                        return;
+                    }
+                    showSuccessNotification(`Searching ${data.search_roots.length} folder(s) for moved games`);
+                    window.reviewRelinkJob(data.job_id);
+                    updateScanJobs();
+                })
+                .catch(error => console.error('Error starting relink:', error));
+        });
+
+        relinkTableBody.addEventListener('change', event => {
+            if (!event.target.classList.contains('relink-select')) return;
+            if (event.target.checked) {
+                selectedRelinkGames.add(event.target.value);
+            } else {
+                selectedRelinkGames.delete(event.target.value);
+            }
+            updateRelinkButtons();
+        });
+
+        document.getElementById('relinkSelectAll').addEventListener('change', function() {
+            document.querySelectorAll('#relinkTableBody .relink-select').forEach(box => {
+                box.checked = this.checked;
+                if (this.checked) {
+                    selectedRelinkGames.add(box.value);
+                } else {
+                    selectedRelinkGames.delete(box.value);
+                }
+            });
+            updateRelinkButtons();
+        });
+
+        document.getElementById('relinkApplySelectedBtn').addEventListener('click', () => {
+            applyRelink({game_uuids: Array.from(selectedRelinkGames)});
+        });
+
+        document.getElementById('relinkApplyAllBtn').addEventListener('click', () => {
+            if (confirm('Move every game of this relink job to its proposed path?')) {
+                applyRelink({});
+            }
+        });
+    }
+
+    window.reviewRelinkJob = function(jobId) {
+        currentRelinkJobId = jobId;
+        currentRelinkStatus = null;
+        currentRelinkPage = 1;
+        selectedRelinkGames.clear();
+        const tab = document.getElementById('relinkPaths-tab');
+        if (tab && window.bootstrap) {
+            bootstrap.Tab.getOrCreateInstance(tab).show();
+        }
+        updateRelinkProposals();
+    };
+
     // Set up filter controls
     setupUnmatchedFilters();
+    setupRelink();
 
     // Run immediately on load
     updateScanJobs();
@@ -475,12 +836,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Set up periodic updates
     setInterval(updateScanJobs, 3000);  // Update every 3 seconds
-    setInterval(() => {
-        updateUnmatchedFolders().then(() => {
-            // Reapply current filters after periodic refresh
-            filterUnmatchedRows();
-        });
-    }, 30000);  // Update every 30 seconds
+    setInterval(updateUnmatchedFolders, 30000);  // Update every 30 seconds
 
     // Global functions for table interactions
     window.toggleIgnoreStatus = function(folderId, button) {
@@ -515,10 +871,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 showSuccessNotification(`Folder ${action} successfully`);
 
                 // Update table data in background
-                updateUnmatchedFolders().then(() => {
-                    // Reapply current filters after data refresh
-                    filterUnmatchedRows();
-                });
+                updateUnmatchedFolders();
             } else {
                 // If there was an error, restore the row if it was hidden
                 if (isBeingIgnored && currentFilter !== 'all' && currentFilter !== 'Ignore') {
@@ -538,6 +891,28 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     };
 
+    window.setScanSchedule = function(jobId, select) {
+        fetch(`/api/scan_jobs/${jobId}/schedule`, {
+            method: 'POST',
+            headers: CSRFUtils.getHeaders({
+                'Content-Type': 'application/json'
+            }),
+            body: JSON.stringify({schedule: select.value})
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                console.error('Error setting scan schedule:', data.error);
+                alert(data.error);
+            } else {
+                showSuccessNotification(data.schedule ? `Scan scheduled, next run: ${data.next_run}` : 'Scan schedule removed');
+            }
+            select.blur();
+            updateScanJobs();
+        })
+        .catch(error => console.error('Error setting scan schedule:', error));
+    };
+
     window.clearEntry = function(folderId) {
         if (confirm('Remove this entry from the unmatched list?')) {
             const button = event.target.closest('button');
@@ -563,10 +938,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     showSuccessNotification('Entry removed successfully');
 
                     // Update table data in background
-                    updateUnmatchedFolders().then(() => {
-                        // Reapply current filters after data refresh
-                        filterUnmatchedRows();
-                    });
+                    updateUnmatchedFolders();
                 } else {
                     // If there was an error, restore the row
                     row.classList.remove('row-fade-out');
@@ -627,21 +999,30 @@ function setupFolderBrowse(browseButtonId, folderContentsId, spinnerId, upButton
     });
 }
 
-function fetchFolders(path, folderContentsId, spinnerId, upButtonId, inputFieldId, currentPathVar) {
+function fetchFolders(path, folderContentsId, spinnerId, upButtonId, inputFieldId, currentPathVar, cursor) {
     console.log("Fetching folders for path:", path);
     $(spinnerId).show();
+    var request = { path: path, sizes: 1 };
+    if (cursor) {
+        request.cursor = cursor;
+    }
     $.ajax({
         url: '/api/browse_folders_ss',
-        data: { path: path },
+        data: request,
         success: function(data) {
             $(spinnerId).hide();
-            $(folderContentsId).empty();
+            // Further pages of a large folder are added below the entries already shown
+            if (cursor) {
+                $(folderContentsId).find('.load-more-folders').remove();
+            } else {
+                $(folderContentsId).empty();
+            }
             
             // Check if we're using the new response format or the old one
             const items = data.items || data;
             
             // Display warning if there were errors
-            if (data.hasErrors) {
+            if (data.hasErrors && !cursor) {
                 $(folderContentsId).append(
                     $('<div class="alert alert-warning">').html(
                         `<i class="fas fa-exclamation-triangle"></i> Some items (${data.skippedItems}) could not be accessed and were skipped.`
@@ -661,24 +1042,34 @@ function fetchFolders(path, folderContentsId, spinnerId, upButtonId, inputFieldI
                     var iconClass = fileIcons[ext] || fileIcons['default'];
                     
                     // Format file size
-                    var sizeText = formatFileSize(item.size);
+                    var sizeText = item.size === null || item.size === undefined ? '' : formatFileSize(item.size);
                     
                     // Create file element with icon, name, and size
                     itemElement = $('<div>').html(
                         '<i class="fas ' + iconClass + '"></i> ' + 
                         item.name + 
-                        '<span class="file-size">(' + sizeText + ')</span>'
+                        (sizeText ? '<span class="file-size">(' + sizeText + ')</span>' : '')
                     );
                     $(itemElement)
                         .addClass('file-item')
-                        .attr('title', item.name + ' - ' + sizeText)
+                        .attr('title', sizeText ? item.name + ' - ' + sizeText : item.name)
                         .css('cursor', 'default');
                 }
                 $(folderContentsId).append(itemElement);
             });
 
+            if (data.next_cursor) {
+                var shown = $(folderContentsId).find('.folder-item, .file-item').length;
+                var loadMore = $('<button type="button" class="btn btn-secondary btn-sm load-more-folders">')
+                    .text('Load more (' + shown + ' of ' + data.total + ')');
+                loadMore.click(function() {
+                    fetchFolders(path, folderContentsId, spinnerId, upButtonId, inputFieldId, currentPathVar, data.next_cursor);
+                });
+                $(folderContentsId).append(loadMore);
+            }
+
             // Only attach click handlers to folders
-            $('.folder-item').click(function() {
+            $(folderContentsId).find('.folder-item').off('click').click(function() {
                 var newPath = $(this).data('path');
                 window[currentPathVar] = newPath; 
                 fetchFolders(newPath, folderContentsId, spinnerId, upButtonId, inputFieldId, currentPathVar);
@@ -48,12 +48,23 @@ document.addEventListener('DOMContentLoaded', function() {
             turboDownloadThreads: parseInt(document.getElementById('turboDownloadThreads').value),
             turboDownloadBatchSize: parseInt(document.getElementById('turboDownloadBatchSize').value),
             scanThreadCount: parseInt(document.getElementById('scanThreadCount').value),
+            scanDiscoveryWorkers: parseInt(document.getElementById('scanDiscoveryWorkers').value),
+            scanPersistenceWorkers: parseInt(document.getElementById('scanPersistenceWorkers').value),
+            scanPostprocessWorkers: parseInt(document.getElementById('scanPostprocessWorkers').value),
+            missingGameGraceHours: parseInt(document.getElementById('missingGameGraceHours').value),
+            maxConcurrentScans: parseInt(document.getElementById('maxConcurrentScans').value),
+            scanDeviceIoBudget: parseInt(document.getElementById('scanDeviceIoBudget').value),
             enableHltbIntegration: document.getElementById('enableHltbIntegration').checked,
             hltbRateLimitDelay: parseFloat(document.getElementById('hltbRateLimitDelay').value),
             useLocalMetadata: document.getElementById('useLocalMetadata').checked,
             writeLocalMetadata: document.getElementById('writeLocalMetadata').checked,
             useLocalImages: document.getElementById('useLocalImages').checked,
-            localMetadataFilename: document.getElementById('localMetadataFilename').value
+            localMetadataFilename: document.getElementById('localMetadataFilename').value,
+            enableLibraryWatcher: document.getElementById('enableLibraryWatcher').checked,
+            libraryWatcherDebounce: parseInt(document.getElementById('libraryWatcherDebounce').value),
+            scanWindowStart: parseInt(document.getElementById('scanWindowStart').value),
+            scanWindowEnd: parseInt(document.getElementById('scanWindowEnd').value),
+            scanStaggerMinutes: parseInt(document.getElementById('scanStaggerMinutes').value)
         };
         console.log("Settings to be saved:", settings);
 
@@ -310,6 +310,110 @@ class DatabaseManager:
             END IF;
         END $$;
 
+        -- Add IGDB match confidence score to games table
+        ALTER TABLE games
+        ADD COLUMN IF NOT EXISTS match_confidence FLOAT;
+
+        -- Add offline IGDB catalog setting to global_settings table
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS use_igdb_catalog BOOLEAN DEFAULT FALSE;
+
+        -- Trigram indexes for fuzzy name lookups in the offline IGDB catalog (needs pg_trgm)
+        DO $$
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            CREATE INDEX IF NOT EXISTS ix_igdb_catalog_games_name_trgm
+                ON igdb_catalog_games USING gin (lower(name) gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS ix_igdb_catalog_alternative_names_name_trgm
+                ON igdb_catalog_alternative_names USING gin (lower(name) gin_trgm_ops);
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'pg_trgm not available, IGDB catalog will use plain name matching: %', SQLERRM;
+        END $$;
+
+        -- Add IGDB API cost summary to scan_jobs table
+        ALTER TABLE scan_jobs
+        ADD COLUMN IF NOT EXISTS igdb_api_cost TEXT;
+
+        -- Add library watcher settings to global_settings table
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS enable_library_watcher BOOLEAN DEFAULT FALSE,
+        ADD COLUMN IF NOT EXISTS library_watcher_debounce INTEGER DEFAULT 30;
+
+        -- Add scheduled scan window settings to global_settings table
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS scan_window_start INTEGER DEFAULT 1,
+        ADD COLUMN IF NOT EXISTS scan_window_end INTEGER DEFAULT 6,
+        ADD COLUMN IF NOT EXISTS scan_stagger_minutes INTEGER DEFAULT 20;
+
+        -- Add scan pipeline stage workers to global_settings table
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS scan_discovery_workers INTEGER DEFAULT 4,
+        ADD COLUMN IF NOT EXISTS scan_persistence_workers INTEGER DEFAULT 1,
+        ADD COLUMN IF NOT EXISTS scan_postprocess_workers INTEGER DEFAULT 4;
+
+        -- Add scan pipeline metrics to scan_jobs table
+        ALTER TABLE scan_jobs
+        ADD COLUMN IF NOT EXISTS pipeline_metrics TEXT;
+
+        -- Add missing game grace period to global_settings and games tables
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS missing_game_grace_hours INTEGER DEFAULT 0;
+
+        ALTER TABLE games
+        ADD COLUMN IF NOT EXISTS missing_since TIMESTAMP;
+
+        -- Add resumable scan flag to scan_jobs table
+        ALTER TABLE scan_jobs
+        ADD COLUMN IF NOT EXISTS resume_pending BOOLEAN DEFAULT FALSE;
+
+        -- Add concurrent scan settings to global_settings and scan_jobs tables
+        ALTER TABLE global_settings
+        ADD COLUMN IF NOT EXISTS max_concurrent_scans INTEGER DEFAULT 2,
+        ADD COLUMN IF NOT EXISTS scan_device_io_budget INTEGER DEFAULT 8;
+
+        ALTER TABLE scan_jobs
+        ADD COLUMN IF NOT EXISTS device_group VARCHAR(512),
+        ADD COLUMN IF NOT EXISTS io_workers INTEGER;
+
+        -- Add the job type to scan_jobs and listing indexes to unmatched_folders for bulk re-matching
+        ALTER TABLE scan_jobs
+        ADD COLUMN IF NOT EXISTS job_type VARCHAR(20) DEFAULT 'scan';
+
+        CREATE INDEX IF NOT EXISTS ix_unmatched_folders_status_path ON unmatched_folders(status, folder_path);
+        CREATE INDEX IF NOT EXISTS ix_unmatched_folders_library ON unmatched_folders(library_uuid);
+        CREATE INDEX IF NOT EXISTS ix_unmatched_folders_folder_path ON unmatched_folders(folder_path);
+
+        -- Add the sizes indexed during scans to game_updates and game_extras
+        ALTER TABLE game_updates
+        ADD COLUMN IF NOT EXISTS file_size BIGINT,
+        ADD COLUMN IF NOT EXISTS file_count INTEGER,
+        ADD COLUMN IF NOT EXISTS mtime DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS indexed_at TIMESTAMP;
+
+        ALTER TABLE game_extras
+        ADD COLUMN IF NOT EXISTS file_size BIGINT,
+        ADD COLUMN IF NOT EXISTS file_count INTEGER,
+        ADD COLUMN IF NOT EXISTS mtime DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS indexed_at TIMESTAMP;
+
+        CREATE INDEX IF NOT EXISTS ix_game_updates_game_uuid ON game_updates(game_uuid);
+        CREATE INDEX IF NOT EXISTS ix_game_extras_game_uuid ON game_extras(game_uuid);
+
+        ALTER TABLE games
+        ADD COLUMN IF NOT EXISTS nfo_fingerprint VARCHAR(300);
+
+        -- Add the download queue state to images
+        ALTER TABLE images
+        ADD COLUMN IF NOT EXISTS download_attempts INTEGER DEFAULT 0 NOT NULL,
+        ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP,
+        ADD COLUMN IF NOT EXISTS lease_token VARCHAR(32),
+        ADD COLUMN IF NOT EXISTS leased_until TIMESTAMP,
+        ADD COLUMN IF NOT EXISTS last_error VARCHAR(500),
+        ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMP;
+
+        CREATE INDEX IF NOT EXISTS ix_images_download_queue ON images(id)
+        WHERE NOT is_downloaded AND dead_lettered_at IS NULL;
+
         """
         print("Upgrading database to the latest schema")
         try:
@@ -1,30 +1,42 @@
 #/sharewarez/utilities.py
 import os
 from datetime import datetime
+import threading
 from threading import Thread
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import select
 from flask import current_app, flash, redirect, url_for, session, copy_current_request_context
 from sharewarez.utils.functions import (
-    load_scanning_filter_patterns,
+    load_scanning_filter_patterns, PLATFORM_IDS
 )
 from sharewarez.models import (
     Game, Library, AllowedFileType, ScanJob, GlobalSettings, UnmatchedFolder
 )
 from sharewarez import db
-from sharewarez.utils.game_core import remove_from_lib
+from sharewarez.utils.missing_games import remove_missing_games
 from sharewarez.utils.gamenames import get_game_names_from_folder, get_game_names_from_files
-from sharewarez.utils.scanning import process_game_with_fallback, process_game_updates, process_game_extras, is_scan_job_running
+from sharewarez.utils.scanning import build_scan_settings
 from sharewarez.utils.igdb_api import IGDBRateLimiter
+from sharewarez.utils.igdb_async import start_scan_search_prefetch, AsyncIGDBRateLimiter
+from sharewarez.utils.igdb_usage import save_scan_api_cost
+from sharewarez.utils.scan_snapshot import take_snapshot, load_snapshot, diff_snapshots, apply_renames, save_snapshot
+from sharewarez.utils.local_index import local_index_enabled, refresh_local_index
+from sharewarez.utils.scan_pipeline import GameScanStages, build_scan_pipeline, get_stage_concurrency, format_pipeline_metrics
+from sharewarez.utils.scan_progress import ScanProgressWriter, ScanCancelListener, load_checkpoints, clear_checkpoints
+from sharewarez.utils.scan_coordinator import (
+    check_scan_admission, admit_scan, is_library_scan_running, split_io_workers, IGDBQuotaShare
+)
+from sharewarez.utils.shutdown import should_continue_processing
 from sharewarez.utils.security import is_safe_path, get_allowed_base_directories
 
 
-def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remove_missing=False, existing_job=None, download_missing_images=False, force_updates_extras_scan=False, fetch_hltb=False, force_hltb_refetch=False):
-    # Only check for running jobs if we're not restarting an existing job
-    if not existing_job and is_scan_job_running():
-        print("A scan is already in progress. Please wait for it to complete.")
-        return
+def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remove_missing=False, existing_job=None, download_missing_images=False, force_updates_extras_scan=False, fetch_hltb=False, force_hltb_refetch=False, resume=False):
+    # Existing jobs were admitted by whoever restarted them
+    if not existing_job:
+        _, reason = check_scan_admission(library_uuid, folder_path)
+        if reason:
+            print(f"Scan of {folder_path} not started: {reason}")
+            return
         
     # Cache settings once at the start of scan
     settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
@@ -32,23 +44,18 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
     extras_folder_name = settings_obj.extras_folder_name if settings_obj else 'extras'
     enable_game_updates = settings_obj.enable_game_updates if settings_obj else False
     enable_game_extras = settings_obj.enable_game_extras if settings_obj else False
-    scan_thread_count = settings_obj.scan_thread_count if settings_obj else 1
 
     # Extract local metadata settings into a plain dict (thread-safe)
-    # We can't pass SQLAlchemy objects across threads, so extract values now
-    settings_dict = {
-        'use_local_metadata': settings_obj.use_local_metadata if settings_obj else False,
-        'write_local_metadata': settings_obj.write_local_metadata if settings_obj else False,
-        'use_local_images': settings_obj.use_local_images if settings_obj else False,
-        'local_metadata_filename': settings_obj.local_metadata_filename if settings_obj else 'sharewarez.json'
-    }
+    settings_dict = build_scan_settings(settings_obj)
 
     # Log local metadata settings once at scan start
     if settings_obj:
         print(f"📋 [LOCAL METADATA] Settings: use_local_metadata={settings_dict['use_local_metadata']}, write_local_metadata={settings_dict['write_local_metadata']}, use_local_images={settings_dict['use_local_images']}")
     
-    # Initialize IGDB rate limiter for scanning operations
+    # Initialize IGDB rate limiters for scanning operations; running scans share the IGDB quota
     igdb_rate_limiter = IGDBRateLimiter()
+    prefetch_rate_limiter = AsyncIGDBRateLimiter(shared_limiter=igdb_rate_limiter)
+    igdb_share = IGDBQuotaShare([igdb_rate_limiter])
     
     # Bulk prefetch existing games and unmatched folders for performance
     print("Prefetching existing games and unmatched folders...")
@@ -104,13 +111,22 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
             setting_force_updates_extras=force_updates_extras_scan
         )
         
-        db.session.add(scan_job_entry)
         try:
+            # Another worker may have started a scan on the same library or device since the check above
+            reason = admit_scan(scan_job_entry, folder_path, settings_obj)
+            if reason:
+                db.session.rollback()
+                print(f"Scan of {folder_path} not started: {reason}")
+                return
+            db.session.add(scan_job_entry)
             db.session.commit()
         except SQLAlchemyError as e:
+            db.session.rollback()
             print(f"Database error when adding ScanJob: {str(e)}")
             return  # cannot proceed without ScanJob
 
+    igdb_share.refresh(force=True)
+
     # Check access perm
     if not os.path.exists(folder_path) or not os.access(folder_path, os.R_OK):
         error_message = f"Cannot access folder at path {folder_path}. Check permissions."
@@ -134,8 +150,18 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
             game_names_with_paths = get_game_names_from_files(folder_path, allowed_extensions, insensitive_patterns, sensitive_patterns)
 
         scan_job_entry.total_folders = len(game_names_with_paths)
+        checkpoints = {}
+        if resume:
+            # Resumed scan: count the entries the interrupted run finished; they are skipped
+            # once the snapshot and local index have been taken from the full listing
+            checkpoints = load_checkpoints(scan_job_entry.id)
+            scan_job_entry.folders_success = sum(1 for succeeded in checkpoints.values() if succeeded)
+            scan_job_entry.folders_failed = len(checkpoints) - scan_job_entry.folders_success
+            scan_job_entry.removed_count = 0
+        elif existing_job:
+            clear_checkpoints(scan_job_entry.id)
         db.session.commit()
-        if not game_names_with_paths:
+        if not game_names_with_paths and not resume:
             print(f"No games found in folder: {folder_path}")
             scan_job_entry.status = 'Completed'
             scan_job_entry.error_message = "No games found."
@@ -148,285 +174,179 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
         print(f"Error during pattern loading or game name extraction: {str(e)}")
         return
 
-    def process_single_game(game_info, scan_job_id, library_uuid, update_folder_name, extras_folder_name, enable_game_updates, enable_game_extras, existing_game_paths, existing_unmatched_paths, igdb_rate_limiter, app, force_updates_extras_scan=False, fetch_hltb=False, force_hltb_refetch=False, settings=None):
-        """Process a single game with rate limiting and thread-safe database operations."""
-        game_name = game_info['name']
-        full_disk_path = game_info['full_path']
-        result = {'game_name': game_name, 'success': False, 'error': None}
-        
-        # Fast path - check cached sets BEFORE rate limiting
-        # But if force_updates_extras_scan or force_hltb_refetch is enabled, we need to process existing games
-        if existing_game_paths and full_disk_path in existing_game_paths:
-            print(f"Game already exists (cached): {game_name} at {full_disk_path}")
-            # Continue processing if:
-            # 1. force_updates_extras_scan is enabled AND (updates OR extras scanning is enabled), OR
-            # 2. force_hltb_refetch is enabled
-            should_process_existing = False
-            if force_updates_extras_scan and (enable_game_updates or enable_game_extras):
-                should_process_existing = True
-                print(f"Force mode enabled, checking updates/extras for existing game: {game_name}")
-            if force_hltb_refetch:
-                should_process_existing = True
-                print(f"Force HLTB refetch enabled, will update HLTB data for existing game: {game_name}")
-
-            if not should_process_existing:
-                return {'game_name': game_name, 'success': True, 'already_exists': True}
-
-            game_already_exists = True
-        else:
-            game_already_exists = False
-        
-        if existing_unmatched_paths and full_disk_path in existing_unmatched_paths:
-            print(f"Folder already logged as unmatched (cached): {full_disk_path}")
-            return {'game_name': game_name, 'success': False, 'already_unmatched': True}
-        
-        # Ensure we have a Flask app context for database operations
-        with app.app_context():
-            try:
-                # Use rate limiter for IGDB API calls
-                igdb_rate_limiter.acquire()
-                try:
-                    # If game already exists and we're in force mode, skip game processing and go directly to updates/extras
-                    if game_already_exists:
-                        success = True
-                        print(f"Skipping game processing for existing game in force mode: {game_name}")
-                    else:
-                        success = process_game_with_fallback(game_name, full_disk_path, scan_job_id, library_uuid, fetch_hltb=fetch_hltb, settings=settings)
-                    
-                    result['success'] = success
-                    
-                    if success:
-                        # Check for updates folder using the cached setting
-                        if enable_game_updates:
-                            updates_folder = os.path.join(full_disk_path, update_folder_name)
-                            if os.path.exists(updates_folder) and os.path.isdir(updates_folder):
-                                print(f"Updates folder found for game: {game_name}")
-                                process_game_updates(game_name, full_disk_path, updates_folder, library_uuid, update_folder_name)
-                            else:
-                                print(f"No updates folder found for game: {game_name}")
-                        else:
-                            print(f"Updates scanning disabled, skipping for game: {game_name}")
-
-                        # Check for extras folder
-                        if enable_game_extras:
-                            extras_folder = os.path.join(full_disk_path, extras_folder_name)
-                            if os.path.exists(extras_folder) and os.path.isdir(extras_folder):
-                                print(f"Extras folder found for game: {game_name}")
-                                process_game_extras(game_name, full_disk_path, extras_folder, library_uuid, extras_folder_name)
-                            else:
-                                print(f"No extras folder found for game: {game_name}")
-                        else:
-                            print(f"Extras scanning disabled, skipping for game: {game_name}")
-
-                        # Fetch HLTB data for existing games if force_hltb_refetch is enabled
-                        if game_already_exists and force_hltb_refetch:
-                            try:
-                                from sharewarez.models import GlobalSettings
-                                settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
-                                if settings and settings.enable_hltb_integration:
-                                    from sharewarez.utils.hltb import update_game_hltb_sync
-                                    # Get the game UUID from database
-                                    from sharewarez.models import Game
-                                    game_obj = db.session.execute(
-                                        select(Game).where(Game.full_disk_path == full_disk_path)
-                                    ).scalars().first()
-                                    if game_obj:
-                                        print(f"Refetching HLTB data for existing game '{game_name}'...")
-                                        update_game_hltb_sync(game_obj.uuid, game_obj.name)
-                                    else:
-                                        print(f"Could not find game in database to refetch HLTB: {game_name}")
-                            except Exception as e:
-                                print(f"Failed to refetch HLTB data for '{game_name}': {e}")
-                                # Don't fail the scan if HLTB fetch fails
-                    else:
-                        result['unmatched'] = True
-                        print(f"[PROCESS INFO] Game '{game_name}' could not be matched to IGDB database or was already unmatched.")
-                        print(f"[PROCESS INFO] Game path: {full_disk_path}")
-                        print("[PROCESS INFO] This is informational, not an error")
-                        
-                finally:
-                    igdb_rate_limiter.release()
-                    
-            except Exception as e:
-                result['error'] = str(e)
-                print(f"[PROCESS EXCEPTION] Exception in process_single_game for '{game_name}': {str(e)}")
-                print(f"[PROCESS EXCEPTION] Game path: {full_disk_path}")
-                print(f"[PROCESS EXCEPTION] Full exception: {repr(e)}")
-                import traceback
-                print(f"[PROCESS EXCEPTION] Traceback: {traceback.format_exc()}")
-                
-        return result
-    
-    # Process games either sequentially or in parallel based on thread count
-    if scan_thread_count > 1:
-        # Multithreaded processing
-        print(f"Using multithreaded scanning with {scan_thread_count} threads")
-        with ThreadPoolExecutor(max_workers=scan_thread_count) as executor:
-            # Submit all game processing tasks
-            future_to_game = {
-                executor.submit(process_single_game, game_info, scan_job_entry.id, library_uuid,
-                              update_folder_name, extras_folder_name, enable_game_updates, enable_game_extras,
-                              existing_game_paths, existing_unmatched_paths, igdb_rate_limiter, current_app._get_current_object(),
-                              force_updates_extras_scan, fetch_hltb, force_hltb_refetch, settings_dict): game_info
-                for game_info in game_names_with_paths
-            }
-            
-            # Process completed futures
-            for future in as_completed(future_to_game):
-                # Check for shutdown request
-                from sharewarez.utils.shutdown import should_continue_processing
-                if not should_continue_processing():
-                    print("🛑 Shutdown requested during scan, cancelling remaining tasks...")
-                    # Cancel remaining tasks
-                    for f in future_to_game:
-                        f.cancel()
-                    scan_job_entry.status = 'Cancelled'
-                    scan_job_entry.error_message = 'Scan cancelled due to application shutdown'
-                    db.session.commit()
-                    return
-                
-                # Check if the job is still enabled
-                db.session.refresh(scan_job_entry)
-                if not scan_job_entry.is_enabled:
-                    # Cancel remaining tasks
-                    for f in future_to_game:
-                        f.cancel()
-                    scan_job_entry.status = 'Cancelled'
-                    scan_job_entry.error_message = 'Scan cancelled by user'
-                    scan_job_entry.current_processing = None
-                    db.session.commit()
-                    return
-                
-                game_info = future_to_game[future]
-                try:
-                    result = future.result()
-                    if result['success']:
-                        scan_job_entry.folders_success += 1
-                    elif result.get('unmatched'):
-                        # Unmatched games are not errors, just increment failed count for tracking
-                        scan_job_entry.folders_failed += 1
-                        print(f"[SCAN INFO] Game '{result['game_name']}' was unmatched (not an error)")
-                    else:
-                        scan_job_entry.folders_failed += 1
-                        
-                    # Only add actual errors to error_message, not unmatched games
-                    if result.get('error') and not result.get('unmatched'):
-                        error_line = f"Failed to process '{result['game_name']}': {result['error']}"
-                        scan_job_entry.error_message = (scan_job_entry.error_message or "") + f"{error_line}\n"
-                        print(f"[SCAN ERROR] {error_line}")
-                        print(f"[SCAN ERROR] Game path: {future_to_game[future]['full_path']}")
-                        print(f"[SCAN ERROR] Full result: {result}")
-                        
-                except Exception as e:
-                    scan_job_entry.folders_failed += 1
-                    error_line = f"Exception processing '{game_info['name']}': {str(e)}"
-                    scan_job_entry.error_message = (scan_job_entry.error_message or "") + f"{error_line}\n"
-                    print(f"[SCAN EXCEPTION] {error_line}")
-                    print(f"[SCAN EXCEPTION] Game path: {game_info.get('full_path', 'unknown')}")
-                    print(f"[SCAN EXCEPTION] Full exception: {repr(e)}")
-                    import traceback
-                    print(f"[SCAN EXCEPTION] Traceback: {traceback.format_exc()}")
-                    
-                db.session.commit()
-    else:
-        # Sequential processing (original behavior)
-        print("Using single-threaded sequential scanning")
-        
-        # Progress tracking variables
-        processed_count = 0
-        already_exist_count = 0
-        new_games_count = 0
-        already_unmatched_count = 0
-        scan_start_time = datetime.now()
-        
-        for game_info in game_names_with_paths:
-            db.session.refresh(scan_job_entry)  # Check if the job is still enabled
-            if not scan_job_entry.is_enabled:
-                scan_job_entry.status = 'Cancelled'
-                scan_job_entry.error_message = 'Scan cancelled by user'
-                scan_job_entry.current_processing = None
-                db.session.commit()
-                return  # Stop processing if cancelled
-            
-            game_name = game_info['name']
-            full_disk_path = game_info['full_path']
+    # Incremental scan: diff the listing against the snapshot from the last scan and
+    # skip known entries that have not changed. Force modes always process everything.
+    current_snapshot = take_snapshot((game_info['full_path'] for game_info in game_names_with_paths), scan_mode)
+
+    # Read the local metadata files and images of changed folders in parallel; unchanged ones come from the index
+    local_index = None
+    if scan_mode == 'folders' and local_index_enabled(settings_dict):
+        try:
+            local_index = refresh_local_index(library_uuid, folder_path, current_snapshot,
+                                              settings_dict['local_metadata_filename'] or 'sharewarez.json')
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Database error when indexing local metadata, reading it per folder instead: {str(e)}")
+
+    if resume:
+        game_names_with_paths = [
+            game_info for game_info in game_names_with_paths if game_info['full_path'] not in checkpoints
+        ]
+        print(f"Resuming scan job {scan_job_entry.id}: {len(checkpoints)} entries already done, "
+              f"{len(game_names_with_paths)} left")
+
+    modified_game_paths = set()
+    if not force_updates_extras_scan and not force_hltb_refetch:
+        previous_snapshot = load_snapshot(library_uuid, folder_path)
+        if previous_snapshot:
+            changes = diff_snapshots(previous_snapshot, current_snapshot)
+            relinked_games, relinked_unmatched = apply_renames(changes['renamed'], library_uuid)
+            existing_game_paths |= relinked_games
+            existing_unmatched_paths |= relinked_unmatched
+
+            # Entries finished before a resume are already counted
+            unchanged = changes['unchanged'] - checkpoints.keys()
+            unchanged_games = unchanged & existing_game_paths
+            unchanged_unmatched = (unchanged & existing_unmatched_paths) - unchanged_games
+            if enable_game_updates or enable_game_extras:
+                modified_game_paths = changes['modified'] & existing_game_paths
+            game_names_with_paths = [
+                game_info for game_info in game_names_with_paths
+                if game_info['full_path'] not in unchanged_games and game_info['full_path'] not in unchanged_unmatched
+            ]
+            scan_job_entry.folders_success += len(unchanged_games)
+            scan_job_entry.folders_failed += len(unchanged_unmatched)
+            db.session.commit()
+            print(f"Incremental scan: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+                  f"{len(changes['renamed'])} renamed, {len(changes['removed'])} removed, "
+                  f"{len(unchanged_games) + len(unchanged_unmatched)} unchanged and skipped")
+
+    # Resolve the IGDB searches for new folders concurrently, as discovery hands them to matching
+    new_folder_count = sum(
+        1 for game_info in game_names_with_paths
+        if game_info['full_path'] not in existing_game_paths and game_info['full_path'] not in existing_unmatched_paths
+    )
+    search_prefetcher = start_scan_search_prefetch(
+        new_folder_count,
+        current_app.config['IGDB_API_ENDPOINT'],
+        scan_job_id=scan_job_entry.id,
+        rate_limiter=prefetch_rate_limiter
+    )
+
+    # Run the folders through the staged pipeline: discovery, IGDB matching, persistence
+    # and post-processing each have their own workers and bounded queues
+    scan_stages = GameScanStages(
+        scan_job_entry.id,
+        library_uuid,
+        PLATFORM_IDS.get(library.platform.name),
+        settings_dict,
+        {
+            'update_folder_name': update_folder_name,
+            'extras_folder_name': extras_folder_name,
+            'enable_game_updates': enable_game_updates,
+            'enable_game_extras': enable_game_extras,
+            'force_updates_extras_scan': force_updates_extras_scan,
+            'fetch_hltb': fetch_hltb,
+            'force_hltb_refetch': force_hltb_refetch
+        },
+        existing_game_paths,
+        existing_unmatched_paths,
+        modified_game_paths,
+        igdb_rate_limiter,
+        local_index=local_index,
+        search_prefetcher=search_prefetcher
+    )
+    # Disk-bound stages only get the workers granted from the device's I/O budget
+    concurrency = split_io_workers(get_stage_concurrency(settings_obj), scan_job_entry.io_workers)
+    print(f"Scan pipeline workers per stage: {concurrency} (device {scan_job_entry.device_group}, "
+          f"{scan_job_entry.io_workers or 'unbudgeted'} I/O workers)")
+    pipeline = build_scan_pipeline(scan_stages, concurrency, current_app._get_current_object())
+
+    # Progress is kept in memory and flushed periodically; cancel requests arrive as notifications
+    progress = ScanProgressWriter(scan_job_entry.id)
+    cancelled_by_user = threading.Event()
+
+    def on_cancel():
+        cancelled_by_user.set()
+        pipeline.cancel()
+
+    cancel_listener = ScanCancelListener(current_app._get_current_object(), scan_job_entry.id, on_cancel).start()
+
+    total_count = len(game_names_with_paths)
+    processed_count = 0
+    interrupted_by_shutdown = False
+    try:
+        for item in pipeline.run(game_names_with_paths):
+            if item['result'] == 'cancelled':
+                continue
             processed_count += 1
-            
-            # Fast path - check cached sets BEFORE database queries
-            if existing_game_paths and full_disk_path in existing_game_paths:
-                print(f"Game already exists (cached): {game_name} at {full_disk_path}")
-                already_exist_count += 1
-                scan_job_entry.folders_success += 1
-            elif existing_unmatched_paths and full_disk_path in existing_unmatched_paths:
-                print(f"Folder already logged as unmatched (cached): {full_disk_path}")
-                already_unmatched_count += 1
-                scan_job_entry.folders_failed += 1
-            else:
-                try:
-                    success = process_game_with_fallback(game_name, full_disk_path, scan_job_entry.id, library_uuid, existing_game_paths, existing_unmatched_paths, fetch_hltb=fetch_hltb, settings=settings_dict)
-                    if success:
-                        new_games_count += 1
-                        scan_job_entry.folders_success += 1
-                        # Use cached settings instead of querying database again
-                        # Check for updates folder using the cached setting
-                        if enable_game_updates:
-                            updates_folder = os.path.join(full_disk_path, update_folder_name)
-                            if os.path.exists(updates_folder) and os.path.isdir(updates_folder):
-                                print(f"Updates folder found for game: {game_name}")
-                                process_game_updates(game_name, full_disk_path, updates_folder, library_uuid, update_folder_name)
-                            else:
-                                print(f"No updates folder found for game: {game_name}")
-                        else:
-                            print(f"Updates scanning disabled, skipping for game: {game_name}")
-                            
-                        # Check for extras folder
-                        if enable_game_extras:
-                            extras_folder = os.path.join(full_disk_path, extras_folder_name)
-                            if os.path.exists(extras_folder) and os.path.isdir(extras_folder):
-                                print(f"Extras folder found for game: {game_name}")
-                                process_game_extras(game_name, full_disk_path, extras_folder, library_uuid, extras_folder_name)
-                            else:
-                                print(f"No extras folder found for game: {game_name}")
-                        else:
-                            print(f"Extras scanning disabled, skipping for game: {game_name}")
-                    else:
-                        scan_job_entry.folders_failed += 1
-                        print(f"[SCAN INFO] Game '{game_name}' could not be matched to IGDB database or was already unmatched.")
-                        print(f"[SCAN INFO] Game path: {full_disk_path}")
-                        print("[SCAN INFO] This is informational, not an error")
-
-                except Exception as e:
-                    print(f"[SCAN EXCEPTION] Exception processing game '{game_name}': {str(e)}")
-                    print(f"[SCAN EXCEPTION] Game path: {full_disk_path}")
-                    print(f"[SCAN EXCEPTION] Full exception: {repr(e)}")
-                    import traceback
-                    print(f"[SCAN EXCEPTION] Traceback: {traceback.format_exc()}")
-                    scan_job_entry.folders_failed += 1
-                    scan_job_entry.status = 'Failed'
-                    error_line = f"Exception processing '{game_name}': {str(e)}"
-                    scan_job_entry.error_message = (scan_job_entry.error_message or "") + f"{error_line}\n"
-            
-            # Commit after each game and update progress
-            scan_job_entry.current_processing = f"Processing: {game_name} ({processed_count}/{len(game_names_with_paths)})"
-            scan_job_entry.last_progress_update = datetime.now()
-            
+            error_line = None
+            if item['result'] == 'error':
+                error_line = f"Failed to process '{item['name']}': {item.get('error')}"
+                print(f"[SCAN ERROR] {error_line}")
+                print(f"[SCAN ERROR] Game path: {item['full_path']}")
+            # Unmatched folders are not errors, but count as failed for tracking
+            progress.record(item['result'] in ('added', 'exists'), error_line,
+                            f"Processing: {item['name']} ({processed_count}/{total_count})", path=item['full_path'])
+            igdb_share.refresh()
+
+            if pipeline.cancelled:
+                continue
+            if not should_continue_processing():
+                print("🛑 Shutdown requested during scan, cancelling remaining tasks...")
+                interrupted_by_shutdown = True
+                pipeline.cancel()
+                continue
+            # The flush also tells whether the job was disabled without a notification
+            if not progress.maybe_flush():
+                cancelled_by_user.set()
+                pipeline.cancel()
+    finally:
+        cancel_listener.stop()
+    if not progress.flush():
+        cancelled_by_user.set()
+    print(f"Scan progress written in {progress.flushes} updates for {processed_count} folders")
+
+    pipeline_metrics = pipeline.metrics_summary()
+    scan_job_entry.pipeline_metrics = pipeline_metrics
+    print(format_pipeline_metrics(pipeline_metrics))
+
+    if interrupted_by_shutdown and not cancelled_by_user.is_set():
+        # Keep the checkpoints; the scan scheduler resumes the job after the restart
+        scan_job_entry.status = 'Failed'
+        scan_job_entry.error_message = 'Scan interrupted by application shutdown, it resumes after the restart'
+        scan_job_entry.resume_pending = True
+        scan_job_entry.current_processing = None
+        if search_prefetcher:
+            search_prefetcher.stop()
+        save_scan_api_cost(scan_job_entry)
+        db.session.commit()
+        return
+
+    if cancelled_by_user.is_set():
+        scan_job_entry.status = 'Cancelled'
+        scan_job_entry.error_message = 'Scan cancelled by user'
+        scan_job_entry.current_processing = None
+        clear_checkpoints(scan_job_entry.id)
+        if search_prefetcher:
+            search_prefetcher.stop()
+        save_scan_api_cost(scan_job_entry)
+        db.session.commit()
+        return
+
+    if search_prefetcher:
+        search_prefetcher.stop()
+
+    # Store the listing so the next scan of this folder can be incremental
+    if scan_job_entry.status != 'Failed':
+        try:
+            save_snapshot(library_uuid, folder_path, current_snapshot)
             db.session.commit()
-            
-            # Log detailed progress every 10 games
-            if processed_count % 10 == 0 or processed_count == len(game_names_with_paths):
-                print(f"Committed: {processed_count}/{len(game_names_with_paths)} games processed")
-                
-                elapsed_time = (datetime.now() - scan_start_time).total_seconds()
-                games_per_second = processed_count / elapsed_time if elapsed_time > 0 else 0
-                estimated_remaining = (len(game_names_with_paths) - processed_count) / games_per_second if games_per_second > 0 else 0
-                
-                print(f"Progress: {processed_count}/{len(game_names_with_paths)} games processed")
-                print(f"Speed: {games_per_second:.1f} games/sec")
-                if estimated_remaining > 0:
-                    print(f"Estimated time remaining: {estimated_remaining:.0f} seconds")
-                print(f"Skipped (already exist): {already_exist_count}")
-                print(f"New games found: {new_games_count}")
-                print(f"Already unmatched: {already_unmatched_count}")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Database error when saving library snapshot: {str(e)}")
+
+    save_scan_api_cost(scan_job_entry)
 
     if scan_job_entry.status != 'Failed':
         scan_job_entry.status = 'Completed'
@@ -434,16 +354,16 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
     # If remove_missing is enabled, check for games that no longer exist
     if remove_missing:
         print("Checking for missing games...")
-        games_in_library = db.session.execute(select(Game).filter_by(library_uuid=library_uuid)).scalars().all()
-        for game in games_in_library:
-            if not os.path.exists(game.full_disk_path):
-                print(f"Game no longer found at path: {game.full_disk_path}")
-                try:
-                    remove_from_lib(game.uuid)
-                    scan_job_entry.removed_count += 1
-                    print(f"Removed game {game.name} as it no longer exists at {game.full_disk_path}")
-                except Exception as e:
-                    print(f"Error removing game {game.name}: {e}")
+        grace_hours = settings_obj.missing_game_grace_hours if settings_obj and settings_obj.missing_game_grace_hours else 0
+        try:
+            removal = remove_missing_games(library_uuid, grace_hours=grace_hours)
+            scan_job_entry.removed_count += removal['removed']
+            print(f"Removed {removal['removed']} of {removal['missing']} missing games")
+            if removal['unchecked']:
+                message = f"{removal['unchecked']} games not checked for removal, their folders could not be listed"
+                scan_job_entry.error_message = f"{scan_job_entry.error_message} | {message}" if scan_job_entry.error_message else message
+        except Exception as e:
+            print(f"Error removing missing games: {e}")
 
     # If download_missing_images is enabled, check for and queue missing images
     if download_missing_images:
@@ -476,7 +396,8 @@ def scan_and_add_games(folder_path, scan_mode='folders', library_uuid=None, remo
         # Truncate error message if it's too long
         if scan_job_entry.error_message and len(scan_job_entry.error_message) > 500:
             scan_job_entry.error_message = scan_job_entry.error_message[:497] + "..."
-        
+
+        clear_checkpoints(scan_job_entry.id)
         db.session.commit()
         print(f"Scan completed for folder: {folder_path} with ScanJob ID: {scan_job_entry.id}")
     except SQLAlchemyError as e:
@@ -496,10 +417,9 @@ def handle_auto_scan(auto_form):
         fetch_hltb = auto_form.fetch_hltb.data
         force_hltb_refetch = auto_form.force_hltb_refetch.data
         
-        running_job = db.session.execute(select(ScanJob).filter_by(status='Running')).scalars().first()
-        if running_job:
-            print("A scan is already in progress. Please wait until the current scan completes.")
-            flash('A scan is already in progress. Please wait until the current scan completes.', 'error')
+        if is_library_scan_running(library_uuid):
+            print("A scan of this library is already in progress. Please wait until it completes.")
+            flash('A scan of this library is already in progress. Please wait until it completes.', 'error')
             session['active_tab'] = 'auto'
             return redirect(url_for('main.scan_management', library_uuid=library_uuid, active_tab='auto'))
 
@@ -537,6 +457,14 @@ def handle_auto_scan(auto_form):
             session['active_tab'] = 'auto'
             return redirect(url_for('library.library'))
 
+        # Other libraries may be scanning; wait if the limit or this folder's device budget is used up
+        _, reason = check_scan_admission(library_uuid, full_path)
+        if reason:
+            print(f"Auto-scan of {full_path} not started: {reason}")
+            flash(reason, 'error')
+            session['active_tab'] = 'auto'
+            return redirect(url_for('main.scan_management', library_uuid=library_uuid, active_tab='auto'))
+
         @copy_current_request_context
         def start_scan():
             scan_and_add_games(full_path, scan_mode, library_uuid, remove_missing, download_missing_images=download_missing_images, force_updates_extras_scan=force_updates_extras_scan, fetch_hltb=fetch_hltb, force_hltb_refetch=force_hltb_refetch)
@@ -558,9 +486,8 @@ def handle_manual_scan(manual_form):
     library_uuid = manual_form.library_uuid.data
     if manual_form.validate_on_submit():
         # check job status
-        running_job = db.session.execute(select(ScanJob).filter_by(status='Running')).scalars().first()
-        if running_job:
-            flash('A scan is already in progress. Please wait until the current scan completes.', 'error')
+        if is_library_scan_running(library_uuid):
+            flash('A scan of this library is already in progress. Please wait until it completes.', 'error')
             session['active_tab'] = 'manual'
             return redirect(url_for('main.scan_management', active_tab='manual'))
         
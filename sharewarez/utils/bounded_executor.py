@@ -0,0 +1,42 @@
+# File: /sharewarez/utils/bounded_executor.py
+# Bounded parallel map.
+# ThreadPoolExecutor.map submits a future for every item before the first
+# result comes back, so mapping over a 100k-entry library listing holds 100k
+# futures, arguments and results in memory at once. bounded_map keeps a
+# sliding window of tasks in flight instead: the next item is only submitted
+# once the oldest one has been handed to the caller, and results stream out in
+# input order. Input may be a generator and is consumed lazily.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Tasks in flight per worker, so workers don't idle while the caller handles a result
+WINDOW_FACTOR = 4
+
+
+def bounded_map(func, items, max_workers, window=None):
+    """
+    Run func over items on a thread pool with at most `window` tasks in flight.
+
+    Yields:
+        tuple: (item, func(item)) in input order. An exception raised by func is
+        re-raised when its result is reached, like ThreadPoolExecutor.map.
+    """
+    max_workers = max(1, max_workers)
+    window = max(1, window or max_workers * WINDOW_FACTOR)
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                if len(in_flight) >= window:
+                    done_item, future = in_flight.popleft()
+                    yield done_item, future.result()
+                in_flight.append((item, executor.submit(func, item)))
+            while in_flight:
+                done_item, future = in_flight.popleft()
+                yield done_item, future.result()
+        finally:
+            # The caller stopped early or func failed: drop the tasks that haven't started
+            for _, future in in_flight:
+                future.cancel()
@@ -0,0 +1,195 @@
+# File: /sharewarez/utils/bulk_persistence.py
+# Batched database writes for scans.
+# Scans save matched games in batches: one multi-row INSERT ... ON CONFLICT DO
+# NOTHING for the games, one for each association table and one for their
+# links, all committed together. Genres, themes, modes, platforms, perspectives
+# and companies are resolved from a name -> id map loaded once per scan; names
+# the map doesn't know yet are upserted in bulk, in the same transaction. A
+# batch of N games takes one transaction instead of several per game and entity.
+
+import threading
+from uuid import uuid4
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sharewarez import db
+from sharewarez.models import (
+    Game, GameURL, Genre, Theme, GameMode, Platform, PlayerPerspective, Developer, Publisher,
+    game_genre_association, game_theme_association, game_game_mode_association,
+    game_platform_association, game_player_perspective_association
+)
+from sharewarez.utils.scanning import log_unmatched_folders
+
+
+# IGDB field -> (lookup model, association table, association column)
+ASSOCIATION_FIELDS = {
+    'genres': (Genre, game_genre_association, 'genre_id'),
+    'themes': (Theme, game_theme_association, 'theme_id'),
+    'game_modes': (GameMode, game_game_mode_association, 'game_mode_id'),
+    'platforms': (Platform, game_platform_association, 'platform_id'),
+    'player_perspectives': (PlayerPerspective, game_player_perspective_association, 'player_perspective_id'),
+}
+
+LOOKUP_MODELS = (Genre, Theme, GameMode, Platform, PlayerPerspective, Developer, Publisher)
+
+
+class LookupCache:
+    """
+    Name -> id maps of the lookup tables, shared by the threads of one scan.
+    Missing names are inserted in the caller's transaction. Their ids are only
+    shared with the other threads once that transaction is committed through
+    commit(), so an id in the shared map always belongs to a committed row.
+    """
+    def __init__(self):
+        self._ids = {model: {} for model in LOOKUP_MODELS}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._uncommitted = threading.local()
+
+    def _created(self):
+        if getattr(self._uncommitted, 'ids', None) is None:
+            self._uncommitted.ids = {model: {} for model in LOOKUP_MODELS}
+        return self._uncommitted.ids
+
+    def load(self):
+        """Read every lookup table once."""
+        with self._lock:
+            for model in LOOKUP_MODELS:
+                self._ids[model].update(dict(db.session.execute(select(model.name, model.id)).all()))
+            self._loaded = True
+        return self
+
+    def resolve(self, model, names):
+        """Return {name: id} for `names`, inserting the ones that don't exist yet. The caller commits."""
+        if not self._loaded:
+            self.load()
+        names = {name for name in names if name}
+        created = self._created()[model]
+        with self._lock:
+            known = {name: self._ids[model][name] for name in names if name in self._ids[model]}
+        known.update({name: created[name] for name in names - known.keys() if name in created})
+        missing = names - known.keys()
+        if missing:
+            # Concurrent scans may insert the same names; the losing insert waits for the
+            # other transaction and then does nothing
+            db.session.execute(insert(model).values([{'name': name} for name in sorted(missing)])
+                               .on_conflict_do_nothing(index_elements=['name']))
+            inserted = dict(db.session.execute(select(model.name, model.id).where(model.name.in_(missing))).all())
+            created.update(inserted)
+            known.update(inserted)
+        return known
+
+    def commit(self):
+        """Commit the session and share the ids this thread inserted."""
+        db.session.commit()
+        created = self._created()
+        with self._lock:
+            for model, ids in created.items():
+                self._ids[model].update(ids)
+        self.discard()
+
+    def discard(self):
+        """Forget the ids this thread inserted, after its transaction was rolled back."""
+        self._uncommitted.ids = None
+
+
+def build_game_record(match, full_disk_path, library_uuid):
+    """
+    Prepare the rows for one matched game. The match may carry the 'companies' and
+    'websites' fetched during matching.
+    """
+    from sharewarez.utils.game_core import game_column_values, embed_video_urls
+
+    game_data = match['game']
+    values = game_column_values(game_data, full_disk_path, 0, library_uuid)
+    values['uuid'] = str(uuid4())
+    values['match_confidence'] = match['confidence']
+    if 'videos' in game_data:
+        values['video_urls'] = embed_video_urls(game_data)
+    return {
+        'values': values,
+        'associations': {field: [entity['name'] for entity in game_data.get(field) or []]
+                         for field in ASSOCIATION_FIELDS},
+        'companies': match.get('companies') or {},
+        'websites': match.get('websites') or [],
+    }
+
+
+def write_game_records(records, lookups, scan_job_id, library_uuid):
+    """
+    Save a batch of prepared game records in one transaction. Records whose IGDB game
+    is already in the database, or twice in the batch, under another path are logged
+    as duplicates.
+
+    Returns:
+        list: For each record, in order: the new game's UUID, 'duplicate' or 'exists'
+    """
+    if not records:
+        return []
+    try:
+        return _write_game_records(records, lookups, scan_job_id, library_uuid)
+    except Exception:
+        lookups.discard()
+        raise
+
+
+def _write_game_records(records, lookups, scan_job_id, library_uuid):
+    lookup_ids = {
+        field: lookups.resolve(model, {name for record in records for name in record['associations'][field]})
+        for field, (model, _table, _column) in ASSOCIATION_FIELDS.items()
+    }
+    developer_ids = lookups.resolve(Developer, {record['companies'].get('developer') for record in records})
+    publisher_ids = lookups.resolve(Publisher, {record['companies'].get('publisher') for record in records})
+
+    existing_paths = dict(db.session.execute(
+        select(Game.igdb_id, Game.full_disk_path)
+        .where(Game.igdb_id.in_([record['values']['igdb_id'] for record in records]))
+    ).all())
+
+    outcomes = []
+    rows = []
+    for record in records:
+        values = record['values']
+        igdb_id = values['igdb_id']
+        if igdb_id in existing_paths:
+            outcomes.append('exists' if existing_paths[igdb_id] == values['full_disk_path'] else 'duplicate')
+            continue
+        existing_paths[igdb_id] = values['full_disk_path']
+        values['developer_id'] = developer_ids.get(record['companies'].get('developer'))
+        values['publisher_id'] = publisher_ids.get(record['companies'].get('publisher'))
+        rows.append(values)
+        outcomes.append(values['uuid'])
+
+    inserted = {}
+    if rows:
+        # Unique slugs and IGDB IDs taken in the meantime make a row a no-op instead of failing the batch
+        inserted = dict(db.session.execute(
+            insert(Game).values(rows).on_conflict_do_nothing().returning(Game.uuid, Game.id)
+        ).all())
+
+    association_rows = {field: [] for field in ASSOCIATION_FIELDS}
+    url_rows = []
+    for record, outcome in zip(records, outcomes):
+        if outcome not in inserted:
+            continue
+        game_id = inserted[outcome]
+        for field, (_model, _table, column) in ASSOCIATION_FIELDS.items():
+            entity_ids = {lookup_ids[field][name] for name in record['associations'][field] if name in lookup_ids[field]}
+            association_rows[field].extend({'game_id': game_id, column: entity_id} for entity_id in entity_ids)
+        url_rows.extend({'game_uuid': outcome, 'url_type': website['url_type'], 'url': website['url']}
+                        for website in record['websites'] if website.get('url'))
+
+    for field, (_model, table, _column) in ASSOCIATION_FIELDS.items():
+        if association_rows[field]:
+            db.session.execute(insert(table).values(association_rows[field]).on_conflict_do_nothing())
+    if url_rows:
+        db.session.execute(insert(GameURL), url_rows)
+
+    outcomes = [outcome if outcome in inserted or outcome == 'exists' else 'duplicate' for outcome in outcomes]
+    duplicates = [record['values']['full_disk_path'] for record, outcome in zip(records, outcomes) if outcome == 'duplicate']
+    if duplicates:
+        print(f"{len(duplicates)} games already in the library under another path. Logging as duplicates.")
+        log_unmatched_folders(scan_job_id, duplicates, 'Duplicate', library_uuid)
+
+    lookups.commit()
+    print(f"[BULK] Saved {len(inserted)} games in one batch ({len(records)} matched)")
+    return outcomes
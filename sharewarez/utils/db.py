@@ -1,5 +1,7 @@
 import socket
 import time
+import zlib
+from sqlalchemy import text
 
 def check_postgres_port_open(host, port, retries=5, delay=2):
     """
@@ -21,3 +23,35 @@ def check_postgres_port_open(host, port, retries=5, delay=2):
             print(f"Connection to PostgreSQL on port {port} failed. Attempt {attempt + 1} of {retries}.")
             time.sleep(delay)
     return False
+
+
+def advisory_lock_key(name):
+    """Map a lock name to the 32-bit key used for Postgres advisory locks."""
+    return zlib.crc32(name.encode('utf-8'))
+
+
+def try_advisory_lock(connection, name):
+    """
+    Try to take a session-level Postgres advisory lock without waiting.
+    The lock is held by `connection` until release_advisory_lock is called, so
+    only one process across all workers runs the guarded service.
+
+    :param connection: A dedicated SQLAlchemy connection that stays open while the lock is needed.
+    :param name: Lock name, e.g. 'sharewarez.library_watcher'.
+    :return: True if the lock was acquired, False if another session holds it.
+    """
+    return bool(connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': advisory_lock_key(name)}).scalar())
+
+
+def release_advisory_lock(connection, name):
+    """Release a lock taken with try_advisory_lock, before the connection goes back to the pool."""
+    connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': advisory_lock_key(name)})
+
+
+def advisory_xact_lock(session, name):
+    """
+    Take a transaction-level Postgres advisory lock, waiting for it if needed.
+    The lock is released by the commit or rollback that ends the transaction, so
+    checks and writes made in between are serialized across all workers.
+    """
+    session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': advisory_lock_key(name)})
@@ -4,18 +4,10 @@ from sqlalchemy import select
 import os
 from sharewarez.utils.igdb_api import get_cover_url
 from sharewarez.utils.functions import format_size
+from sharewarez.utils.folder_size import compute_folder_size
 
 def get_folder_size_in_bytes(folder_path):
-    if os.path.isfile(folder_path):
-        return os.path.getsize(folder_path)
-    
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(folder_path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            if os.path.exists(fp):
-                total_size += os.path.getsize(fp)
-    return max(total_size, 1)  # Ensure the size is at least 1 byte
+    return max(compute_folder_size(folder_path), 1)  # Ensure the size is at least 1 byte
 
 
 def discord_webhook(game_uuid, manual_trigger=False):
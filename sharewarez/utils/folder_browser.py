@@ -0,0 +1,129 @@
+# File: /sharewarez/utils/folder_browser.py
+# Listings for the server-side folder browser of the scan pages.
+# A folder is listed with one os.scandir pass: the entry types come with the
+# listing on every platform, so no stat call is made per entry. The sorted
+# entries are kept for BROWSE_CACHE_TTL seconds per folder, so the pages of a
+# large folder on a network mount, and a user going up and down the tree, don't
+# list it again. Pages continue after a cursor, the sort key of the last entry
+# sent, so they stay consistent when the folder is listed again in between.
+# File sizes cost a stat call each on POSIX and are only read when asked for,
+# for the entries of the page being sent.
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+
+# Seconds a folder listing is reused
+BROWSE_CACHE_TTL = 10.0
+
+# Folder listings kept at once
+BROWSE_CACHE_SIZE = 64
+
+# Entries per page
+BROWSE_PAGE_SIZE = 500
+MAX_BROWSE_PAGE_SIZE = 5000
+
+_listings = OrderedDict()
+_listings_lock = threading.Lock()
+
+
+def _sort_key(is_dir, name):
+    # Folders first, then case-insensitive by name
+    return (not is_dir, name.lower(), name)
+
+
+class FolderListing:
+    """The entries of a folder in browser order, with how many could not be read."""
+
+    def __init__(self, entries, skipped):
+        self.entries = entries  # [(sort key, DirEntry)]
+        self.keys = [key for key, _ in entries]
+        self.skipped = skipped
+
+
+def list_folder(folder_path, ttl=BROWSE_CACHE_TTL):
+    """
+    List a folder, reusing a listing made less than `ttl` seconds ago.
+
+    Raises:
+        OSError: the folder cannot be listed
+    """
+    now = time.monotonic()
+    with _listings_lock:
+        cached = _listings.get(folder_path)
+        if cached and now - cached[0] < ttl:
+            _listings.move_to_end(folder_path)
+            return cached[1]
+
+    entries = []
+    skipped = 0
+    with os.scandir(folder_path) as scanned:
+        for entry in scanned:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                skipped += 1
+                continue
+            entries.append((_sort_key(is_dir, entry.name), entry))
+    entries.sort(key=lambda item: item[0])
+    listing = FolderListing(entries, skipped)
+
+    with _listings_lock:
+        _listings[folder_path] = (now, listing)
+        _listings.move_to_end(folder_path)
+        while len(_listings) > BROWSE_CACHE_SIZE:
+            _listings.popitem(last=False)
+    return listing
+
+
+def clear_folder_listings():
+    with _listings_lock:
+        _listings.clear()
+
+
+def encode_cursor(key):
+    return ('1' if key[0] else '0') + key[2]
+
+
+def decode_cursor(cursor):
+    """Sort key of a cursor, or None when it is not one."""
+    if not cursor or cursor[0] not in '01' or len(cursor) < 2:
+        return None
+    name = cursor[1:]
+    return (cursor[0] == '1', name.lower(), name)
+
+
+def _file_size(entry):
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return None
+
+
+def folder_page(listing, after=None, limit=BROWSE_PAGE_SIZE, sizes=False):
+    """
+    One page of a folder listing.
+
+    Args:
+        after: sort key of the last entry of the previous page
+        sizes: read the size of the files on the page
+
+    Returns:
+        tuple: (list of entry dicts, cursor of the next page or None)
+    """
+    start = bisect_right(listing.keys, after) if after is not None else 0
+    page = listing.entries[start:start + limit]
+    items = []
+    for key, entry in page:
+        is_dir = not key[0]
+        items.append({
+            'name': entry.name,
+            'isDir': is_dir,
+            'ext': None if is_dir else os.path.splitext(entry.name)[1][1:].lower(),
+            'size': _file_size(entry) if sizes and not is_dir else None
+        })
+    next_cursor = encode_cursor(page[-1][0]) if page and start + limit < len(listing.entries) else None
+    return items, next_cursor
@@ -0,0 +1,207 @@
+# File: /sharewarez/utils/folder_size.py
+# Folder size engine.
+# Sizes are computed with os.scandir, which returns the file type with each
+# entry, so every file costs at most one stat call. The subtrees below the top
+# folder are walked in parallel. The result is cached per folder together with
+# the mtime of every directory in the tree: on the next call a directory whose
+# mtime is unchanged reuses its cached file total and is not listed again, and
+# only its subdirectories are stat'ed. Directory mtimes change when entries are
+# added, removed or renamed, not when a file is rewritten in place.
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sharewarez import db
+from sharewarez.models import FolderSizeCache
+
+
+# Threads walking the subtrees of one folder
+FOLDER_SIZE_WORKERS = 8
+
+
+def _list_directory(path):
+    """One scandir pass: bytes in the regular files of `path` and {subdir name: mtime_ns}. Symlinks are skipped."""
+    files_size = 0
+    subdirs = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_symlink():
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    files_size += entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirs[entry.name] = entry.stat(follow_symlinks=False).st_mtime_ns
+            except OSError as e:
+                print(f"Error processing file {entry.name}: {e}")
+    return files_size, subdirs
+
+
+def _is_excluded(relative_path, excluded):
+    lowered = relative_path.lower()
+    return any(name in lowered for name in excluded)
+
+
+def _size_directory(root, relative, mtime_ns, previous_tree):
+    """
+    Size one directory, from the cache when its mtime is unchanged.
+    Returns (files_size, {subdir name: mtime_ns}, listed) or None if it can't be read.
+    """
+    full_path = os.path.join(root, relative) if relative else root
+    cached = previous_tree.get(relative)
+    if cached and cached[0] == mtime_ns:
+        subdirs = {}
+        for name in cached[2]:
+            try:
+                subdirs[name] = os.stat(os.path.join(full_path, name), follow_symlinks=False).st_mtime_ns
+            except OSError:
+                continue
+        return cached[1], subdirs, False
+    try:
+        files_size, subdirs = _list_directory(full_path)
+    except OSError as e:
+        print(f"Warning: Skipping inaccessible directory: {full_path} ({e})")
+        return None
+    return files_size, subdirs, True
+
+
+def _walk_subtree(root, relative, mtime_ns, previous_tree, excluded):
+    """Walk the subtree at `relative` depth-first. Returns (tree, directories listed)."""
+    tree = {}
+    listed = 0
+    stack = [(relative, mtime_ns)]
+    while stack:
+        current, current_mtime = stack.pop()
+        sized = _size_directory(root, current, current_mtime, previous_tree)
+        if sized is None:
+            continue
+        files_size, subdirs, was_listed = sized
+        listed += int(was_listed)
+        kept = {name: mtime for name, mtime in subdirs.items()
+                if not _is_excluded(os.path.join(current, name), excluded)}
+        tree[current] = [current_mtime, files_size, sorted(kept)]
+        stack.extend((os.path.join(current, name), mtime) for name, mtime in kept.items())
+    return tree, listed
+
+
+def size_tree(folder_path, excluded=(), previous_tree=None, workers=FOLDER_SIZE_WORKERS):
+    """
+    Walk a folder, reusing `previous_tree` entries of directories whose mtime is unchanged.
+    Subdirectories whose relative path contains an excluded name (lowercase) are skipped.
+
+    Returns:
+        tuple: (tree, directories listed) where tree maps relative dirs to [mtime_ns, files_size, subdir names]
+    """
+    previous_tree = previous_tree or {}
+    root_mtime = os.stat(folder_path).st_mtime_ns
+    sized = _size_directory(folder_path, '', root_mtime, previous_tree)
+    if sized is None:
+        return {}, 0
+    files_size, subdirs, was_listed = sized
+    kept = {name: mtime for name, mtime in subdirs.items() if not _is_excluded(name, excluded)}
+    tree = {'': [root_mtime, files_size, sorted(kept)]}
+    listed = int(was_listed)
+
+    if len(kept) > 1 and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(kept))) as executor:
+            results = list(executor.map(
+                lambda child: _walk_subtree(folder_path, child[0], child[1], previous_tree, excluded), kept.items()
+            ))
+    else:
+        results = [_walk_subtree(folder_path, name, mtime, previous_tree, excluded) for name, mtime in kept.items()]
+    for subtree, subtree_listed in results:
+        tree.update(subtree)
+        listed += subtree_listed
+    return tree, listed
+
+
+def _load_cached_tree(folder_path, excluded_key):
+    try:
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(FolderSizeCache.tree).where(FolderSizeCache.path == folder_path,
+                                                   FolderSizeCache.excluded == excluded_key)
+            ).scalar() or {}
+    except (RuntimeError, SQLAlchemyError):
+        # No application context (standalone use) or no cache table yet
+        return {}
+
+
+def _store_cached_tree(folder_path, excluded_key, size, tree):
+    values = {'path': folder_path, 'excluded': excluded_key, 'size': size, 'tree': tree,
+              'updated_at': datetime.now(timezone.utc)}
+    try:
+        with db.engine.begin() as connection:
+            stmt = insert(FolderSizeCache).values(**values)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=['path', 'excluded'],
+                set_={'size': stmt.excluded.size, 'tree': stmt.excluded.tree, 'updated_at': stmt.excluded.updated_at}
+            ))
+    except (RuntimeError, SQLAlchemyError) as e:
+        print(f"Could not cache folder size for {folder_path}: {e}")
+
+
+def compute_folder_size(folder_path, excluded_names=(), use_cache=True):
+    """
+    Total bytes of the regular files under `folder_path`, without symlinks and without
+    subdirectories whose relative path contains one of `excluded_names` (case-insensitive).
+    Returns 0 when the folder can't be read.
+    """
+    if os.path.isfile(folder_path):
+        return os.path.getsize(folder_path)
+
+    excluded = sorted({name.lower() for name in excluded_names if name})
+    excluded_key = ','.join(excluded)
+    previous_tree = _load_cached_tree(folder_path, excluded_key) if use_cache else {}
+    try:
+        tree, listed = size_tree(folder_path, excluded, previous_tree)
+    except OSError as e:
+        print(f"Error accessing directory {folder_path}: {e}")
+        return 0
+
+    size = sum(entry[1] for entry in tree.values())
+    if use_cache and tree and tree != previous_tree:
+        _store_cached_tree(folder_path, excluded_key, size, tree)
+    return size
+
+
+def measure_path(path):
+    """
+    Bytes and number of regular files in a file, or under a folder without following
+    symlinks, in one uncached scandir walk.
+
+    Returns:
+        tuple: (size, file_count), or None when the path can't be read
+    """
+    try:
+        if os.path.isfile(path):
+            return os.path.getsize(path), 1
+        size = 0
+        file_count = 0
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_symlink():
+                                continue
+                            if entry.is_file(follow_symlinks=False):
+                                size += entry.stat(follow_symlinks=False).st_size
+                                file_count += 1
+                            elif entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                        except OSError as e:
+                            print(f"Error processing file {entry.name}: {e}")
+            except OSError as e:
+                if current == path:
+                    raise
+                print(f"Warning: Skipping inaccessible directory: {current} ({e})")
+        return size, file_count
+    except OSError as e:
+        print(f"Error accessing {path}: {e}")
+        return None
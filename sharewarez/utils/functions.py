@@ -12,6 +12,8 @@ from sqlalchemy import select
 from sharewarez.models import GlobalSettings
 from flask import url_for, current_app
 from sharewarez.utils.security import is_safe_path, get_allowed_base_directories
+from sharewarez.utils.folder_size import compute_folder_size
+from sharewarez.utils.nfo import read_first_nfo
 
 def format_size(size_in_bytes):
     """Format file size from bytes to human-readable format."""
@@ -80,38 +82,21 @@ def get_folder_size_in_bytes(folder_path, timeout=300):
             print(f"Error: No read permission for path: {folder_path}")
             return 0
 
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            try:
-                # Skip if we can't access the directory
-                if not os.access(dirpath, os.R_OK):
-                    print(f"Warning: Skipping inaccessible directory: {dirpath}")
-                    continue
-
-                for f in filenames:
-                    try:
-                        fp = os.path.join(dirpath, f)
-                        # Skip symlinks unless they point to regular files
-                        if os.path.islink(fp):
-                            continue
-                        if os.path.exists(fp):
-                            total_size += os.path.getsize(fp)
-                    except (OSError, IOError) as e:
-                        print(f"Error processing file {f}: {e}")
-                        continue
-            except (OSError, IOError) as e:
-                print(f"Error accessing directory {dirpath}: {e}")
-                continue
-
-        return max(total_size, 1)
+        return max(compute_folder_size(folder_path), 1)
 
     except Exception as e:
         print(f"Unexpected error calculating folder size: {e}")
         return 0
 
 
-def get_folder_size_in_bytes_updates(folder_path, timeout=300):
-    """Calculate folder size excluding update and extras folders."""
+def get_folder_size_in_bytes_updates(folder_path, timeout=300, exclude_folders=None):
+    """Calculate folder size excluding update and extras folders.
+
+    Args:
+        folder_path (str): Path to the folder
+        timeout (int): Maximum time in seconds to spend calculating size
+        exclude_folders (list): Update and extras folder names; read from the settings when not given
+    """
     try:
         # Validate folder path security (only if we're in an application context)
         try:
@@ -141,40 +126,10 @@ def get_folder_size_in_bytes_updates(folder_path, timeout=300):
             print(f"Error: No read permission for path: {folder_path}")
             return 0
 
-        settings = db.session.execute(select(GlobalSettings)).scalars().first()
-        total_size = 0
-        
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            try:
-                # Skip if we can't access the directory
-                if not os.access(dirpath, os.R_OK):
-                    print(f"Warning: Skipping inaccessible directory: {dirpath}")
-                    continue
-
-                # Check if current directory should be excluded
-                should_process = True
-                if settings:
-                    if (settings.update_folder_name and settings.update_folder_name.lower() in dirpath.lower()) or \
-                       (settings.extras_folder_name and settings.extras_folder_name.lower() in dirpath.lower()):
-                        should_process = False
-
-                if should_process:
-                    for f in filenames:
-                        try:
-                            fp = os.path.join(dirpath, f)
-                            if os.path.islink(fp):
-                                continue
-                            if os.path.exists(fp):
-                                total_size += os.path.getsize(fp)
-                        except (OSError, IOError) as e:
-                            print(f"Error processing file {f}: {e}")
-                            continue
-
-            except (OSError, IOError) as e:
-                print(f"Error accessing directory {dirpath}: {e}")
-                continue
-
-        return max(total_size, 1)
+        if exclude_folders is None:
+            settings = db.session.execute(select(GlobalSettings)).scalars().first()
+            exclude_folders = [settings.update_folder_name, settings.extras_folder_name] if settings else []
+        return max(compute_folder_size(folder_path, exclude_folders), 1)
 
     except Exception as e:
         print(f"Unexpected error calculating folder size: {e}")
@@ -182,7 +137,7 @@ def get_folder_size_in_bytes_updates(folder_path, timeout=300):
 
 
 def read_first_nfo_content(full_disk_path):
-    """Read the content of the first NFO file found in the given path."""
+    """Read the content of the first NFO file found in the given path, size capped and decoded by utils/nfo.py."""
     
     # Validate folder path security (only if we're in an application context)
     try:
@@ -204,26 +159,16 @@ def read_first_nfo_content(full_disk_path):
     if os.path.isfile(full_disk_path):
         print("Path is a file, not a directory. Skipping NFO scan.")
         return None
-        
+
     try:
-        for file in os.listdir(full_disk_path):
-            if file.lower().endswith('.nfo'):
-                nfo_path = os.path.join(full_disk_path, file)
-                
-                try:
-                    with open(nfo_path, 'r', encoding='utf-8', errors='ignore') as nfo_file:
-                        content = nfo_file.read()
-                        sanitized_content = content.replace('\x00', '')
-                        return sanitized_content
-                except Exception as e:
-                    print(f"Error reading NFO file {nfo_path}: {str(e)}")
-                    continue
-                    
-    except Exception as e:
+        found = read_first_nfo(full_disk_path)
+    except OSError as e:
         print(f"Error accessing directory {full_disk_path}: {str(e)}")
-    
-    print("No NFO file found")
-    return None
+        return None
+    if found is None:
+        print("No NFO file found")
+        return None
+    return found[0]
 
 def download_image(url, save_path):
     """Download an image from a URL and save it to the specified path."""
@@ -9,22 +9,30 @@ from sharewarez import db
 from sharewarez.models import (
     Game, Image, Library, GlobalSettings,
     Developer, Publisher, Genre, Theme, GameMode, Platform, 
-    PlayerPerspective, GameURL, ScanJob, Category, Status
+    PlayerPerspective, GameURL, Category, Status
 )
 from sharewarez.utils.functions import (
-    read_first_nfo_content, delete_associations_for_game,
+    delete_associations_for_game,
     website_category_to_string,
     PLATFORM_IDS, format_size, download_image,
     get_folder_size_in_bytes_updates
 )
-from sharewarez.utils.igdb_api import make_igdb_api_request
-from sharewarez.utils.gamenames import generate_goty_variants
+from sharewarez.utils.igdb_api import (
+    make_igdb_api_request, build_game_search_query, build_game_candidates_query, build_game_by_id_query
+)
+from sharewarez.utils.igdb_catalog import is_catalog_enabled, search_catalog, fetch_catalog_game
+from sharewarez.utils.igdb_usage import record_igdb_cache_hit
+from sharewarez.utils.matching import (
+    rank_candidates, fallback_search_names, MATCH_CANDIDATE_LIMIT, MATCH_CONFIDENCE_THRESHOLD
+)
+from sharewarez.utils.nfo import refresh_game_nfo
 from sharewarez.utils.discord import discord_webhook
-from sharewarez.utils.scanning import log_unmatched_folder, delete_game_images
+from sharewarez.utils.scanning import log_unmatched_folder, delete_game_images, build_scan_settings
 from sharewarez.utils.event_logging import log_system_event
+from sharewarez.utils.image_queue import (
+    process_image_queue, fetch_image, requeue_images, GAME_IMAGE_BATCH_SIZE
+)
 import threading
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # IGDB API mapping dictionaries for category, status, and player perspective
 category_mapping = {
@@ -95,6 +103,50 @@ def get_or_create_entity(model_class, name_field="name", **kwargs):
             # This should not happen, but raise an error if it does
             raise RuntimeError(f"Failed to create or retrieve {model_class.__name__} with {name_field}='{filter_value}'")
 
+def game_column_values(game_data, full_disk_path, folder_size_bytes, library_uuid):
+    """Column values for a new Game from its IGDB data."""
+    category_enum = category_mapping.get(game_data.get('category'), None)
+    status_enum = status_mapping.get(game_data.get('status'), None)
+    if 'videos' in game_data:
+        video_urls = [f"https://www.youtube.com/watch?v={video['video_id']}" for video in game_data['videos']]
+        videos_comma_separated = ','.join(video_urls)
+    else:
+        videos_comma_separated = ""
+
+    return dict(
+        library_uuid=library_uuid,
+        igdb_id=game_data['id'],
+        name=game_data['name'],
+        summary=game_data.get('summary'),
+        storyline=game_data.get('storyline'),
+        url=game_data.get('url'),
+        first_release_date=datetime.fromtimestamp(game_data.get('first_release_date', 0), UTC) if game_data.get('first_release_date') else None,
+        aggregated_rating=game_data.get('aggregated_rating'),
+        aggregated_rating_count=game_data.get('aggregated_rating_count'),
+        rating=game_data.get('rating'),
+        rating_count=game_data.get('rating_count'),
+        slug=game_data.get('slug'),
+        status=status_enum,
+        category=category_enum,
+        total_rating=game_data.get('total_rating'),
+        total_rating_count=game_data.get('total_rating_count'),
+        video_urls=videos_comma_separated,
+        full_disk_path=full_disk_path,
+        size=folder_size_bytes,
+        date_created=datetime.now(UTC),
+        date_identified=datetime.now(UTC),
+        steam_url='',
+        times_downloaded=0
+    )
+
+
+def embed_video_urls(game_data):
+    """Comma separated YouTube embed URLs of a game's IGDB videos, or None without videos."""
+    if 'videos' not in game_data:
+        return None
+    return ','.join(f"https://www.youtube.com/embed/{video['video_id']}" for video in game_data['videos'])
+
+
 def create_game_instance(game_data, full_disk_path, folder_size_bytes, library_uuid):
     global settings
     settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
@@ -110,42 +162,8 @@ def create_game_instance(game_data, full_disk_path, folder_size_bytes, library_u
             print(f"Library with UUID {library_uuid} not found.")
             return None
 
-        category_id = game_data.get('category')
-        category_enum = category_mapping.get(category_id, None)
-        status_id = game_data.get('status')
-        status_enum = status_mapping.get(status_id, None)
-        if 'videos' in game_data:
-            video_urls = [f"https://www.youtube.com/watch?v={video['video_id']}" for video in game_data['videos']]
-            videos_comma_separated = ','.join(video_urls)
-        else:
-            videos_comma_separated = ""
-            
         print(f"create_game_instance Creating game instance for '{game_data.get('name')}' with UUID: {game_data.get('id')} in library '{library.name}' on platform '{library.platform.name}'.")
-        new_game = Game(
-            library_uuid=library_uuid,
-            igdb_id=game_data['id'],
-            name=game_data['name'],
-            summary=game_data.get('summary'),
-            storyline=game_data.get('storyline'),
-            url=game_data.get('url'),
-            first_release_date=datetime.fromtimestamp(game_data.get('first_release_date', 0), UTC) if game_data.get('first_release_date') else None,
-            aggregated_rating=game_data.get('aggregated_rating'),
-            aggregated_rating_count=game_data.get('aggregated_rating_count'),
-            rating=game_data.get('rating'),
-            rating_count=game_data.get('rating_count'),
-            slug=game_data.get('slug'),
-            status=status_enum,
-            category=category_enum,
-            total_rating=game_data.get('total_rating'),
-            total_rating_count=game_data.get('total_rating_count'),
-            video_urls=videos_comma_separated,
-            full_disk_path=full_disk_path,
-            size=folder_size_bytes,
-            date_created=datetime.now(UTC),
-            date_identified=datetime.now(UTC),
-            steam_url='',
-            times_downloaded=0
-        )
+        new_game = Game(**game_column_values(game_data, full_disk_path, folder_size_bytes, library_uuid))
 
         db.session.add(new_game)
         db.session.flush()
@@ -160,11 +178,54 @@ def create_game_instance(game_data, full_disk_path, folder_size_bytes, library_u
 
 
 
-def store_image_url_for_download(game_uuid, image_data, image_type='cover'):
-    """Store image URL in database for later async download."""
+def original_image_url(url):
+    """Full size https URL of an IGDB image URL."""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https:' + url
+    return url.replace('/t_thumb/', '/t_original/')
+
+
+def match_image_ids(match):
+    """IGDB cover ID and screenshot IDs of a match from match_game_metadata."""
+    game_data = match['game']
+    if match['source'] == 'local_metadata':
+        cover_data = game_data.get('cover', {}).get('id') if game_data.get('cover') else None
+        screenshots_data = [s['id'] for s in game_data.get('screenshots', [])]
+    else:
+        cover_data = game_data.get('cover')
+        screenshots_data = game_data.get('screenshots', [])
+    return cover_data, screenshots_data
+
+
+def fetch_image_urls(cover_id=None, screenshot_ids=None):
+    """
+    Download URLs of a cover and screenshots, with one IGDB request per image type.
+
+    Returns:
+        dict: (image_type, IGDB image ID) -> URL, without the images IGDB returned no URL for
+    """
+    urls = {}
+    lookups = [('cover', 'https://api.igdb.com/v4/covers', [cover_id] if cover_id else []),
+               ('screenshot', 'https://api.igdb.com/v4/screenshots', list(screenshot_ids or []))]
+    for image_type, endpoint, image_ids in lookups:
+        if not image_ids:
+            continue
+        ids = ','.join(str(image_id) for image_id in image_ids)
+        response = make_igdb_api_request(endpoint, f'fields url; where id=({ids}); limit {len(image_ids)};')
+        if not isinstance(response, list):
+            print(f"Failed to retrieve URLs for {image_type} IDs {ids}.")
+            continue
+        for entry in response:
+            if entry.get('url'):
+                urls[(image_type, entry['id'])] = original_image_url(entry['url'])
+    return urls
+
+
+def store_image_url_for_download(game_uuid, image_data, image_type='cover', download_url=None):
+    """Store image URL in database for later async download. The URL is looked up on IGDB unless it is given."""
     try:
         # Get the image URL from IGDB API
-        if image_type == 'cover':
+        if download_url is None and image_type == 'cover':
             cover_query = f'fields url; where id={image_data};'
             cover_response = make_igdb_api_request('https://api.igdb.com/v4/covers', cover_query)
             if cover_response and 'error' not in cover_response:
@@ -176,7 +237,7 @@ def store_image_url_for_download(game_uuid, image_data, image_type='cover'):
                 print(f"Failed to retrieve URL for cover ID {image_data}.")
                 return
         
-        elif image_type == 'screenshot':
+        elif download_url is None and image_type == 'screenshot':
             screenshot_query = f'fields url; where id={image_data};'
             response = make_igdb_api_request('https://api.igdb.com/v4/screenshots', screenshot_query)
             if response and 'error' not in response:
@@ -206,8 +267,11 @@ def store_image_url_for_download(game_uuid, image_data, image_type='cover'):
         print(f"Error storing image URL for {image_type} {image_data}: {e}")
 
 
-def smart_process_images_for_game(game_uuid, cover_data=None, screenshots_data=None, app=None):
-    """Smart image processing that uses settings to determine single-thread vs turbo mode."""
+def smart_process_images_for_game(game_uuid, cover_data=None, screenshots_data=None, app=None, image_urls=None):
+    """
+    Smart image processing that uses settings to determine single-thread vs turbo mode.
+    image_urls from fetch_image_urls saves looking up the URL of every image on IGDB.
+    """
     if app is None:
         app = current_app._get_current_object()
     
@@ -218,11 +282,16 @@ def smart_process_images_for_game(game_uuid, cover_data=None, screenshots_data=N
             settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
             
             # Store image URLs first (always)
-            if cover_data:
-                store_image_url_for_download(game_uuid, cover_data, 'cover')
-            if screenshots_data:
-                for screenshot_id in screenshots_data:
-                    store_image_url_for_download(game_uuid, screenshot_id, 'screenshot')
+            images = ([('cover', cover_data)] if cover_data else []) + \
+                [('screenshot', screenshot_id) for screenshot_id in screenshots_data or []]
+            for image_type, image_id in images:
+                if image_urls is None:
+                    store_image_url_for_download(game_uuid, image_id, image_type)
+                elif (image_type, image_id) in image_urls:
+                    store_image_url_for_download(game_uuid, image_id, image_type,
+                                                 download_url=image_urls[(image_type, image_id)])
+                else:
+                    print(f"No URL for {image_type} ID {image_id}, skipping.")
             db.session.commit()
             
             # Decide processing mode based on settings
@@ -247,41 +316,13 @@ def download_images_for_game_turbo(game_uuid, app=None, max_workers=5):
         
     try:
         with app.app_context():
-            pending_images = db.session.execute(select(Image).filter_by(game_uuid=game_uuid, is_downloaded=False)).scalars().all()
-            
-            if not pending_images:
+            result = process_image_queue(batch_size=GAME_IMAGE_BATCH_SIZE, max_workers=max_workers, game_uuid=game_uuid)
+            if not result['claimed']:
                 print(f"No pending images for game {game_uuid}.")
                 return 0
             
-            downloaded_count = 0
-            successful_images = []
-            
-            # Use ThreadPoolExecutor for parallel downloads
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_image = {
-                    executor.submit(download_single_image_worker, image, app): image 
-                    for image in pending_images
-                }
-                
-                for future in as_completed(future_to_image):
-                    image = future_to_image[future]
-                    try:
-                        result = future.result()
-                        if result['success']:
-                            successful_images.append(image.id)
-                            downloaded_count += 1
-                    except Exception as e:
-                        print(f"❌ Failed downloading image {image.id}: {e}")
-            
-            # Update database
-            if successful_images:
-                db.session.execute(
-                    update(Image).filter(Image.id.in_(successful_images)).values(is_downloaded=True)
-                )
-                db.session.commit()
-            
-            print(f"🚀 Downloaded {downloaded_count} images for game {game_uuid[:8]}...")
-            return downloaded_count
+            print(f"🚀 Downloaded {result['downloaded']} images for game {game_uuid[:8]}...")
+            return result['downloaded']
             
     except Exception as e:
         print(f"Error in turbo download for game {game_uuid}: {e}")
@@ -343,22 +384,29 @@ def process_and_save_image(game_uuid, image_data, image_type='cover'):
         db.session.add(image)
     
     
+def fetch_game_websites(igdb_id):
+    """
+    Fetch the website links of an IGDB game.
+
+    Returns:
+        list: [{'url_type', 'url'}], empty when IGDB has none or the request failed
+    """
+    website_query = f'fields url, category; where game={igdb_id};'
+    websites_response = make_igdb_api_request('https://api.igdb.com/v4/websites', website_query)
+
+    if not websites_response or 'error' in websites_response:
+        print(f"No URLs found or failed to retrieve URLs for game IGDB ID {igdb_id}.")
+        return []
+    return [
+        {'url_type': website_category_to_string(website.get('category'), website.get('url')), 'url': website.get('url')}
+        for website in websites_response
+    ]
+
+
 def fetch_and_store_game_urls(game_uuid, igdb_id):
     try:
-        website_query = f'fields url, category; where game={igdb_id};'        
-        websites_response = make_igdb_api_request('https://api.igdb.com/v4/websites', website_query)
-        
-        if websites_response and 'error' not in websites_response:
-            for website in websites_response:
-                
-                new_url = GameURL(
-                    game_uuid=game_uuid,
-                    url_type=website_category_to_string(website.get('category'), website.get('url')),
-                    url=website.get('url')
-                )
-                db.session.add(new_url)
-        else:
-            print(f"No URLs found or failed to retrieve URLs for game IGDB ID {igdb_id}.")
+        for website in fetch_game_websites(igdb_id):
+            db.session.add(GameURL(game_uuid=game_uuid, url_type=website['url_type'], url=website['url']))
     except Exception as e:
         print(f"Exception while fetching/storing URLs for game UUID {game_uuid}, IGDB ID {igdb_id}: {e}")
         
@@ -369,21 +417,85 @@ def search_igdb_for_game(search_name, platform_id):
     Helper function to search IGDB for a game with the given name and platform.
     Returns the API response or None if no match found.
     """
-    query_fields = """fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-                      screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-                      aggregated_rating_count, rating, rating_count, slug, status, category, total_rating,
-                      total_rating_count;"""
-    query_filter = f'search "{search_name}"; limit 1;'
-    if platform_id is not None:
-        query_filter += f' where platforms = ({platform_id});'
+    if is_catalog_enabled():
+        catalog_results = search_catalog(search_name, platform_id, limit=1)
+        if catalog_results:
+            record_igdb_cache_hit(current_app.config['IGDB_API_ENDPOINT'])
+            return catalog_results
 
-    response_json = make_igdb_api_request(current_app.config['IGDB_API_ENDPOINT'], query_fields + query_filter)
+    response_json = make_igdb_api_request(current_app.config['IGDB_API_ENDPOINT'], build_game_search_query(search_name, platform_id))
 
     if 'error' not in response_json and response_json:
         return response_json
     return None
 
 
+def search_igdb_candidates(search_name, platform_id, search_prefetcher=None):
+    """
+    Search IGDB for up to MATCH_CANDIDATE_LIMIT candidate games, including
+    their alternative names and release years, for local ranking.
+    Returns the list of candidates (possibly empty) or None on API error.
+    A scan passes its IGDBSearchPrefetcher, which may already have resolved the search.
+    """
+    if search_prefetcher is not None:
+        found, prefetched = search_prefetcher.get(search_name, platform_id)
+        if found:
+            record_igdb_cache_hit(current_app.config['IGDB_API_ENDPOINT'])
+            return prefetched or []
+
+    # The offline catalog answers most searches without an API call; misses still go live
+    if is_catalog_enabled():
+        catalog_results = search_catalog(search_name, platform_id, limit=MATCH_CANDIDATE_LIMIT)
+        if catalog_results:
+            record_igdb_cache_hit(current_app.config['IGDB_API_ENDPOINT'])
+            return catalog_results
+
+    response_json = make_igdb_api_request(
+        current_app.config['IGDB_API_ENDPOINT'],
+        build_game_candidates_query(search_name, platform_id, limit=MATCH_CANDIDATE_LIMIT)
+    )
+    if isinstance(response_json, dict) and 'error' in response_json:
+        print(f"IGDB candidate search failed for '{search_name}': {response_json['error']}")
+        return None
+    return response_json or []
+
+
+def find_igdb_match(game_name, platform_id, search_prefetcher=None):
+    """
+    Find the best IGDB match for a folder name.
+
+    Runs one wide candidate search and ranks the candidates locally against
+    the name, its GOTY variants and its shorter fallback names. Only when no
+    candidate reaches MATCH_CONFIDENCE_THRESHOLD are a few extra searches made
+    with shorter names, and their candidates are ranked together with the first set.
+
+    Returns:
+        dict: {'game', 'confidence', 'matched_name'} or None if no acceptable match was found
+    """
+    candidates = []
+    best = None
+    for search_name in [game_name] + fallback_search_names(game_name):
+        print(f"Trying IGDB search with: '{search_name}'")
+        results = search_igdb_candidates(search_name, platform_id, search_prefetcher)
+        if results:
+            known_ids = {candidate.get('id') for candidate in candidates}
+            candidates.extend(candidate for candidate in results if candidate.get('id') not in known_ids)
+
+        ranked = rank_candidates(candidates, game_name, platform_id)
+        best = ranked[0] if ranked else None
+        if best and best['confidence'] >= MATCH_CONFIDENCE_THRESHOLD:
+            print(f"Matched '{game_name}' to '{best['game'].get('name')}' (IGDB ID {best['game'].get('id')}) "
+                  f"with confidence {best['confidence']:.2f} via '{best['matched_name']}'")
+            return best
+
+    if best:
+        print(f"No confident match for '{game_name}': best candidate '{best['game'].get('name')}' "
+              f"scored {best['confidence']:.2f} (threshold {MATCH_CONFIDENCE_THRESHOLD})")
+    else:
+        print(f"No IGDB candidates found for '{game_name}'")
+    return None
+
+
 def fetch_game_by_igdb_id(igdb_id):
     """
     Fetch game data from IGDB API by exact IGDB ID.
@@ -397,16 +509,14 @@ def fetch_game_by_igdb_id(igdb_id):
     from sharewarez.utils.igdb_api import make_igdb_api_request
 
     try:
-        query = f"""
-            fields name, summary, storyline, url, slug, first_release_date,
-                   aggregated_rating, aggregated_rating_count, rating, rating_count,
-                   total_rating, total_rating_count, status, category,
-                   cover.url, screenshots.url, videos.video_id,
-                   genres.name, themes.name, game_modes.name, platforms.name,
-                   player_perspectives.name, involved_companies;
-            where id = {igdb_id};
-            limit 1;
-        """
+        if is_catalog_enabled():
+            catalog_game = fetch_catalog_game(igdb_id)
+            if catalog_game:
+                record_igdb_cache_hit(current_app.config['IGDB_API_ENDPOINT'])
+                print(f"Fetched game by ID {igdb_id} from the IGDB catalog: {catalog_game[0].get('name')}")
+                return catalog_game
+
+        query = build_game_by_id_query(igdb_id)
 
         response = make_igdb_api_request(current_app.config['IGDB_API_ENDPOINT'], query)
 
@@ -422,331 +532,202 @@ def fetch_game_by_igdb_id(igdb_id):
         return None
 
 
-def retrieve_and_save_game(game_name, full_disk_path, scan_job_id=None, library_uuid=None, fetch_hltb=False, settings=None):
-    # print(f"retrieve_and_save_game Retrieving and saving game: {game_name} on {full_disk_path} to library with UUID {library_uuid}.")
+def read_local_igdb_id(full_disk_path, settings):
+    """Return the IGDB ID stored in a folder's local metadata file, or None when unused or missing."""
     from sharewarez.utils.local_metadata import read_local_metadata
-    from sharewarez.utils.event_logging import log_system_event
-    from flask import flash
 
+    if not settings or not settings.get('use_local_metadata'):
+        return None
+    print(f"🔍 [LOCAL METADATA] Checking for existing metadata file in: {full_disk_path}")
+    local_metadata = read_local_metadata(full_disk_path, settings.get('local_metadata_filename', 'sharewarez.json'))
+    if local_metadata and 'igdb_id' in local_metadata:
+        print(f"✅ LOCAL METADATA: Found IGDB ID {local_metadata['igdb_id']} in {full_disk_path}")
+        return local_metadata['igdb_id']
+    print("📝 [LOCAL METADATA] No existing metadata file found, will attempt IGDB search")
+    return None
+
+
+def match_game_metadata(game_name, full_disk_path, platform_id, local_igdb_id=None, search_prefetcher=None):
+    """
+    Find the IGDB game for a folder: by the IGDB ID from its local metadata file
+    if it has one, otherwise by searching its name and ranking the candidates,
+    taking the searches the scan's search_prefetcher already resolved.
+
+    Returns:
+        dict: {'game', 'confidence', 'source'} where source is 'local_metadata' or 'search', or None
+    """
+    # PRIORITY 1: IGDB ID from the local metadata file
+    if local_igdb_id:
+        response_json = fetch_game_by_igdb_id(local_igdb_id)
+        if response_json and 'error' not in response_json and len(response_json) > 0:
+            print(f"✅ Successfully fetched game from local metadata: {response_json[0].get('name')}")
+            # The IGDB ID came from the folder itself, so the match is certain
+            return {'game': response_json[0], 'confidence': 1.0, 'source': 'local_metadata'}
+
+        # Failed to fetch from IGDB - check if it's a connectivity issue
+        print(f"⚠️ Local metadata has IGDB ID {local_igdb_id} but failed to fetch from API.")
+        log_system_event(
+            f"Failed to fetch game data for IGDB ID {local_igdb_id} from local metadata at {full_disk_path}. Check internet connection or IGDB API status.",
+            event_type='metadata',
+            event_level='warning'
+        )
+        # Fall through to normal search below
+
+    # PRIORITY 2: Search IGDB by folder name and rank the candidates locally
+    match = find_igdb_match(game_name, platform_id, search_prefetcher)
+    if match:
+        print(f"Found game {game_name} with IGDB ID {match['game'].get('id')} (confidence {match['confidence']:.2f})")
+        return {'game': match['game'], 'confidence': match['confidence'], 'source': 'search'}
+    return None
+
+
+def save_matched_game(match, full_disk_path, scan_job_id, library_uuid, folder_size_bytes=0):
+    """
+    Create the game for a matched folder with its genres, companies, themes, modes,
+    platforms and perspectives, and commit it. Folders whose IGDB game is already in
+    the library under another path are logged as duplicates.
+
+    Returns:
+        Game or None
+    """
+    game_data = match['game']
+    igdb_id = game_data.get('id')
+
+    # Check for existing game with the same IGDB ID but different folder path
+    existing_game_with_same_igdb_id = db.session.execute(
+        select(Game).filter(Game.igdb_id == igdb_id, Game.full_disk_path != full_disk_path)
+    ).scalar_one_or_none()
+    if existing_game_with_same_igdb_id:
+        print(f"Duplicate game found with same IGDB ID {igdb_id} but different folder path. Logging as duplicate.")
+        log_unmatched_folder(scan_job_id, full_disk_path, 'Duplicate', library_uuid=library_uuid)
+        return None
+
+    new_game = create_game_instance(game_data=game_data, full_disk_path=full_disk_path,
+                                    folder_size_bytes=folder_size_bytes, library_uuid=library_uuid)
+    if new_game is None:
+        print(f"Failed to create game instance for {game_data.get('name')}. Skipping further processing.")
+        return None
+    new_game.match_confidence = match['confidence']
+
+    for field, model_class, relation in (('genres', Genre, new_game.genres),
+                                         ('themes', Theme, new_game.themes),
+                                         ('game_modes', GameMode, new_game.game_modes),
+                                         ('platforms', Platform, new_game.platforms),
+                                         ('player_perspectives', PlayerPerspective, new_game.player_perspectives)):
+        for entity_data in game_data.get(field) or []:
+            relation.append(get_or_create_entity(model_class, name=entity_data['name']))
+
+    involved_company_ids = game_data.get('involved_companies')
+    if involved_company_ids:
+        enumerate_companies(new_game, new_game.igdb_id, involved_company_ids)
+    else:
+        print(f"No involved companies found for {game_data.get('name')}.")
+
+    if 'videos' in game_data:
+        new_game.video_urls = embed_video_urls(game_data)
+
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        print(f"Failed to save game due to a database error: {e}")
+        if has_request_context():
+            flash("Failed to save game due to a duplicate entry.")
+        return None
+    return new_game
+
+
+def finish_saved_game(new_game, match, full_disk_path, settings=None, fetch_hltb=False):
+    """
+    Post-process a newly saved game: queue and download its images, write its local
+    metadata file, and send the Discord and HowLongToBeat updates when enabled.
+    Matches with 'image_urls' (see fetch_image_urls) make no IGDB requests here.
+    """
+    print(f"Processing images for game: {new_game.name}")
+    cover_data, screenshots_data = match_image_ids(match)
+    # Use smart image processing that respects turbo/single-thread settings
+    smart_process_images_for_game(new_game.uuid, cover_data, screenshots_data, image_urls=match.get('image_urls'))
+    print(f"Game and its images saved successfully : {new_game.name}.")
+
+    # Write local metadata file if enabled
+    if settings and settings.get('write_local_metadata'):
+        print(f"💾 [LOCAL METADATA] Writing metadata file for '{new_game.name}'")
+        from sharewarez.utils.local_metadata import write_local_metadata
+        write_success = write_local_metadata(
+            full_disk_path=full_disk_path,
+            igdb_id=new_game.igdb_id,
+            game_title=new_game.name,
+            manually_verified=match['source'] == 'local_metadata',
+            filename=settings.get('local_metadata_filename', 'sharewarez.json')
+        )
+        if write_success:
+            print(f"✅ [LOCAL METADATA] Successfully wrote metadata file for '{new_game.name}'")
+        else:
+            print(f"⚠️ [LOCAL METADATA] Failed to write metadata file for '{new_game.name}' (already exists or permission issue)")
+
+    # Discord notification and HowLongToBeat data, after everything is saved successfully
+    global_settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
+    if global_settings and global_settings.discord_webhook_url and global_settings.discord_notify_new_games:
+        print(f"Sending Discord notification for new game '{new_game.name}'.")
+        discord_webhook(new_game.uuid)
+
+    if fetch_hltb and global_settings and global_settings.enable_hltb_integration:
+        try:
+            from sharewarez.utils.hltb import update_game_hltb_sync
+            print(f"Fetching HowLongToBeat data for '{new_game.name}'...")
+            update_game_hltb_sync(new_game.uuid, new_game.name)
+        except Exception as e:
+            print(f"Failed to fetch HLTB data for '{new_game.name}': {e}")
+            # Don't fail the scan if HLTB fetch fails
+
+
+def retrieve_and_save_game(game_name, full_disk_path, scan_job_id=None, library_uuid=None, fetch_hltb=False, settings=None):
+    """
+    Match a folder against IGDB and add it to the library with its images.
+    Scans run the same steps as separate pipeline stages (see utils/scan_pipeline.py).
+
+    Returns:
+        Game or None if the folder could not be matched or saved
+    """
     library = db.session.execute(select(Library).filter_by(uuid=library_uuid)).scalar_one_or_none()
     if not library:
         print(f"retrieve_and_save_game Library with UUID {library_uuid} not found.")
         return None
 
-
     existing_game_by_path = check_existing_game_by_path(full_disk_path)
     if existing_game_by_path:
         return existing_game_by_path
 
-    # Load settings once if not provided
     # Settings can be either a dict (from threaded scan) or a SQLAlchemy object
     if settings is None:
-        settings_obj = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
-        # Convert to dict for consistent handling
-        settings = {
-            'use_local_metadata': settings_obj.use_local_metadata if settings_obj else False,
-            'write_local_metadata': settings_obj.write_local_metadata if settings_obj else False,
-            'use_local_images': settings_obj.use_local_images if settings_obj else False,
-            'local_metadata_filename': settings_obj.local_metadata_filename if settings_obj else 'sharewarez.json'
-        }
+        settings = build_scan_settings(db.session.execute(select(GlobalSettings)).scalar_one_or_none())
     elif not isinstance(settings, dict):
-        # If it's a SQLAlchemy object, convert to dict
-        settings = {
-            'use_local_metadata': settings.use_local_metadata,
-            'write_local_metadata': settings.write_local_metadata,
-            'use_local_images': settings.use_local_images,
-            'local_metadata_filename': settings.local_metadata_filename or 'sharewarez.json'
-        }
-
-    # PRIORITY 1: Check for local metadata file (NEW!)
-    if settings and settings.get('use_local_metadata'):
-        print(f"🔍 [LOCAL METADATA] Checking for existing metadata file in: {full_disk_path}")
-        local_metadata = read_local_metadata(full_disk_path,
-                                             settings.get('local_metadata_filename', 'sharewarez.json'))
-        if local_metadata and 'igdb_id' in local_metadata:
-            igdb_id = local_metadata['igdb_id']
-            print(f"✅ LOCAL METADATA: Found IGDB ID {igdb_id} in {full_disk_path}")
-
-            # Fetch game data directly by IGDB ID
-            response_json = fetch_game_by_igdb_id(igdb_id)
-
-            if response_json and 'error' not in response_json and len(response_json) > 0:
-                print(f"✅ Successfully fetched game from local metadata: {response_json[0].get('name')}")
-
-                # Check for duplicate
-                existing_game_with_same_igdb_id = db.session.execute(
-                    select(Game).filter(Game.igdb_id == igdb_id, Game.full_disk_path != full_disk_path)
-                ).scalar_one_or_none()
-
-                if existing_game_with_same_igdb_id:
-                    print(f"Duplicate game found with same IGDB ID {igdb_id} but different folder path.")
-                    log_unmatched_folder(scan_job_id, full_disk_path, 'Duplicate', library_uuid=library_uuid)
-                    return None
-
-                # Create game from IGDB data (continue with existing logic at line 472)
-                nfo_content = read_first_nfo_content(full_disk_path)
-                folder_size_bytes = get_folder_size_in_bytes_updates(full_disk_path)
-                print(f"Folder size for {full_disk_path}: {format_size(folder_size_bytes)}")
-                new_game = create_game_instance(
-                    game_data=response_json[0],
-                    full_disk_path=full_disk_path,
-                    folder_size_bytes=folder_size_bytes,
-                    library_uuid=library.uuid
-                )
-
-                if new_game is None:
-                    print(f"Failed to create game instance from local metadata for {game_name}. Skipping further processing.")
-                    return None
-
-                # Process genres, themes, etc. (same as existing code from line 481 onward)
-                if 'genres' in response_json[0]:
-                    for genre_data in response_json[0]['genres']:
-                        genre_name = genre_data['name']
-                        genre = get_or_create_entity(Genre, name=genre_name)
-                        new_game.genres.append(genre)
-
-                if 'involved_companies' in response_json[0]:
-                    involved_company_ids = response_json[0]['involved_companies']
-                    if involved_company_ids:
-                        enumerate_companies(new_game, new_game.igdb_id, involved_company_ids)
-                    else:
-                        print("No involved companies found for game from local metadata.")
-
-                if 'themes' in response_json[0]:
-                    for theme_data in response_json[0]['themes']:
-                        theme_name = theme_data['name']
-                        theme = get_or_create_entity(Theme, name=theme_name)
-                        new_game.themes.append(theme)
-
-                if 'game_modes' in response_json[0]:
-                    for game_mode_data in response_json[0]['game_modes']:
-                        game_mode_name = game_mode_data['name']
-                        game_mode = get_or_create_entity(GameMode, name=game_mode_name)
-                        new_game.game_modes.append(game_mode)
-
-                if 'platforms' in response_json[0]:
-                    for platform_data in response_json[0]['platforms']:
-                        platform_name = platform_data['name']
-                        platform = get_or_create_entity(Platform, name=platform_name)
-                        new_game.platforms.append(platform)
-
-                if 'player_perspectives' in response_json[0]:
-                    for perspective_data in response_json[0]['player_perspectives']:
-                        perspective_name = perspective_data['name']
-                        perspective = get_or_create_entity(PlayerPerspective, name=perspective_name)
-                        new_game.player_perspectives.append(perspective)
-
-                if 'videos' in response_json[0]:
-                    video_urls = [f"https://www.youtube.com/embed/{video['video_id']}" for video in response_json[0]['videos']]
-                    videos_comma_separated = ','.join(video_urls)
-                    new_game.video_urls = videos_comma_separated
-
-                db.session.commit()
-                print(f"Processing images for game: {new_game.name}")
-                # Use smart image processing
-                cover_data = response_json[0].get('cover', {}).get('id') if response_json[0].get('cover') else None
-                screenshots_data = [s['id'] for s in response_json[0].get('screenshots', [])]
-                smart_process_images_for_game(new_game.uuid, cover_data, screenshots_data)
-
-                if fetch_hltb:
-                    # Fetch HLTB data if requested
-                    from sharewarez.utils.hltb import update_game_hltb_sync
-                    update_game_hltb_sync(new_game.uuid, new_game.name)
-
-                # Now write the metadata file if setting is enabled
-                if settings and settings.get('write_local_metadata'):
-                    print(f"💾 [LOCAL METADATA] Writing metadata file for '{new_game.name}' (from existing local metadata)")
-                    from sharewarez.utils.local_metadata import write_local_metadata
-                    write_success = write_local_metadata(
-                        full_disk_path=full_disk_path,
-                        igdb_id=igdb_id,
-                        game_title=new_game.name,
-                        manually_verified=True,
-                        filename=settings.get('local_metadata_filename', 'sharewarez.json')
-                    )
-                    if not write_success:
-                        print("⚠️ [LOCAL METADATA] Failed to write metadata file (already exists or permission issue)")
-
-                return new_game
-            else:
-                # Failed to fetch from IGDB - check if it's a connectivity issue
-                error_msg = f"⚠️ Local metadata has IGDB ID {igdb_id} but failed to fetch from API."
-                print(error_msg)
-                log_system_event(
-                    f"Failed to fetch game data for IGDB ID {igdb_id} from local metadata at {full_disk_path}. Check internet connection or IGDB API status.",
-                    event_type='metadata',
-                    event_level='warning'
-                )
-                # Fall through to normal search below
-        else:
-            print("📝 [LOCAL METADATA] No existing metadata file found, will attempt IGDB search")
+        settings = build_scan_settings(settings)
 
     platform_id = PLATFORM_IDS.get(library.platform.name)
-
-    # PRIORITY 2: Search IGDB API by folder name (existing code)
-    # Generate GOTY variants to try different search combinations
-    search_variants = generate_goty_variants(game_name)
-    print(f"Generated search variants for '{game_name}': {search_variants}")
-
-    response_json = None
-    successful_search_name = None
-
-    # Try each variant until we find a match
-    for search_name in search_variants:
-        print(f"Trying IGDB search with: '{search_name}'")
-        response_json = search_igdb_for_game(search_name, platform_id)
-        if response_json:
-            successful_search_name = search_name
-            print(f"Successfully found match with search variant: '{search_name}'")
-            break
-        else:
-            print(f"No match found for variant: '{search_name}'")
-    if response_json and 'error' not in response_json:
-        igdb_id = response_json[0].get('id')
-        if successful_search_name != game_name:
-            print(f"Found game '{game_name}' using search variant '{successful_search_name}' with IGDB ID {igdb_id}")
-        else:
-            print(f"Found game {game_name} with IGDB ID {igdb_id}")
-
-        # Check for existing game with the same IGDB ID but different folder path
-        existing_game_with_same_igdb_id = db.session.execute(select(Game).filter(Game.igdb_id == igdb_id, Game.full_disk_path != full_disk_path)).scalar_one_or_none()
-        if existing_game_with_same_igdb_id:
-            print(f"Duplicate game found with same IGDB ID {igdb_id} but different folder path. Logging as duplicate.")
-            matched_status = 'Duplicate'
-            log_unmatched_folder(scan_job_id, full_disk_path, matched_status, library_uuid=library_uuid)
-            return None
-        else:
-            nfo_content = read_first_nfo_content(full_disk_path)            
-            folder_size_bytes = get_folder_size_in_bytes_updates(full_disk_path)
-            print(f"Folder size for {full_disk_path}: {format_size(folder_size_bytes)}")
-            new_game = create_game_instance(game_data=response_json[0], full_disk_path=full_disk_path, folder_size_bytes=folder_size_bytes, library_uuid=library.uuid)
-            
-            if new_game is None:
-                print(f"Failed to create game instance for {game_name}. Skipping further processing.")
-                return None
-                    
-            if 'genres' in response_json[0]:
-                for genre_data in response_json[0]['genres']:
-                    genre_name = genre_data['name']
-                    genre = get_or_create_entity(Genre, name=genre_name)
-                    new_game.genres.append(genre)
-
-            if 'involved_companies' in response_json[0]:
-                involved_company_ids = response_json[0]['involved_companies']
-                if involved_company_ids:
-                    enumerate_companies(new_game, new_game.igdb_id, involved_company_ids)
-                else:
-                    print(f"No involved companies found for {game_name}.")
-
-            if 'themes' in response_json[0]:
-                for theme_data in response_json[0]['themes']:
-                    theme_name = theme_data['name']
-                    theme = get_or_create_entity(Theme, name=theme_name)
-                    new_game.themes.append(theme)
-
-            if 'game_modes' in response_json[0]:
-                for game_mode_data in response_json[0]['game_modes']:
-                    game_mode_name = game_mode_data['name']
-                    game_mode = get_or_create_entity(GameMode, name=game_mode_name)
-                    new_game.game_modes.append(game_mode)
-
-            if 'platforms' in response_json[0]:
-                for platform_data in response_json[0]['platforms']:
-                    platform_name = platform_data['name']
-                    platform = get_or_create_entity(Platform, name=platform_name)
-                    new_game.platforms.append(platform)
-                    
-            if 'player_perspectives' in response_json[0]:
-                for perspective_data in response_json[0]['player_perspectives']:
-                    perspective_name = perspective_data['name']
-                    perspective = get_or_create_entity(PlayerPerspective, name=perspective_name)
-                    new_game.player_perspectives.append(perspective)
-                    
-            if 'videos' in response_json[0]:
-                video_urls = [f"https://www.youtube.com/embed/{video['video_id']}" for video in response_json[0]['videos']]
-                videos_comma_separated = ','.join(video_urls)
-                new_game.video_urls = videos_comma_separated
-            
-            db.session.commit()
-            print(f"Processing images for game: {new_game.name}")
-            # Use smart image processing that respects turbo/single-thread settings
-            cover_data = response_json[0].get('cover') 
-            screenshots_data = response_json[0].get('screenshots', [])
-            smart_process_images_for_game(new_game.uuid, cover_data, screenshots_data)
-            try:
-                new_game.nfo_content = nfo_content
-                for column in new_game.__table__.columns:
-                    getattr(new_game, column.name)
-                db.session.commit()
-                print(f"Game and its images saved successfully : {new_game.name}.")
-
-                # Write local metadata file if enabled (for newly identified games)
-                # Use the settings dict we already have (no DB query needed)
-                if settings and settings.get('write_local_metadata'):
-                    print(f"💾 [LOCAL METADATA] Writing metadata file for newly identified game '{new_game.name}'")
-                    from sharewarez.utils.local_metadata import write_local_metadata
-                    write_success = write_local_metadata(
-                        full_disk_path=new_game.full_disk_path,
-                        igdb_id=new_game.igdb_id,
-                        game_title=new_game.name,
-                        manually_verified=False,  # Auto-identified during scan
-                        filename=settings.get('local_metadata_filename', 'sharewarez.json')
-                    )
-                    if write_success:
-                        print(f"✅ [LOCAL METADATA] Successfully wrote metadata file for '{new_game.name}'")
-                    else:
-                        print(f"⚠️ [LOCAL METADATA] Failed to write metadata file for '{new_game.name}'")
-
-                # Move Discord notification here, after everything is saved successfully
-                # Load settings for Discord notification (separate from local metadata settings)
-                discord_settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
-                if discord_settings and discord_settings.discord_webhook_url and discord_settings.discord_notify_new_games:
-                    print(f"Sending Discord notification for new game '{new_game.name}'.")
-                    discord_webhook(new_game.uuid)
-
-                # Fetch HowLongToBeat data if enabled
-                # Load settings for HLTB (separate from local metadata settings)
-                hltb_settings = db.session.execute(select(GlobalSettings)).scalar_one_or_none()
-                if fetch_hltb and hltb_settings and hltb_settings.enable_hltb_integration:
-                    try:
-                        from sharewarez.utils.hltb import update_game_hltb_sync
-                        print(f"Fetching HowLongToBeat data for '{new_game.name}'...")
-                        update_game_hltb_sync(new_game.uuid, new_game.name)
-                    except Exception as e:
-                        print(f"Failed to fetch HLTB data for '{new_game.name}': {e}")
-                        # Don't fail the scan if HLTB fetch fails
-
-            except IntegrityError as e: 
-                db.session.rollback()
-                print(f"Failed to save game due to a database error: {e}")
-                if has_request_context():
-                    flash("Failed to save game due to a duplicate entry.")
-                else:
-                    print("Failed to save game due to a duplicate entry.")
-            return new_game
-    else:
-        if response_json and 'error' in response_json:
-            # Check specifically for authentication error
-            if response_json.get('error') == 'Failed to retrieve access token':
-                error_msg = 'IGDB API Authentication Failed'
-                if scan_job_id:
-                    scan_job = db.session.get(ScanJob, scan_job_id)
-                    if scan_job:
-                        scan_job.error_message = error_msg
-                        scan_job.status = 'Failed'
-                        db.session.commit()
-                
-                log_system_event(f"IGDB API Authentication Failed: {response_json.get('error')}", 
-                                 event_type='scan', event_level='error')
-                return None
-            
+    local_igdb_id = read_local_igdb_id(full_disk_path, settings)
+    match = match_game_metadata(game_name, full_disk_path, platform_id, local_igdb_id)
+    if not match:
         print(f"No match found: {game_name} in library {library.name} on platform {library.platform.name}.")
         if has_request_context():
             flash("No game data found for the given name.")
         else:
             print("No game data found for the given name.")
         return None
-    
+
+    folder_size_bytes = get_folder_size_in_bytes_updates(full_disk_path)
+    print(f"Folder size for {full_disk_path}: {format_size(folder_size_bytes)}")
+    new_game = save_matched_game(match, full_disk_path, scan_job_id, library.uuid, folder_size_bytes)
+    if new_game is None:
+        return None
+    # Stored with its fingerprint, so scans only read the NFO again once it changed
+    if refresh_game_nfo(new_game, full_disk_path):
+        db.session.commit()
+
+    finish_saved_game(new_game, match, full_disk_path, settings, fetch_hltb)
+    return new_game
+
+
 def check_existing_game_by_path(full_disk_path):
     """
     Checks if a game already exists in the library by its disk path.
@@ -767,45 +748,54 @@ def check_existing_game_by_igdb_id(igdb_id):
     return db.session.execute(select(Game).filter_by(igdb_id=igdb_id)).scalar_one_or_none()
 
 
-def enumerate_companies(game_instance, igdb_game_id, involved_company_ids):
+def fetch_involved_companies(igdb_game_id, involved_company_ids):
+    """
+    Fetch the developer and publisher names of an IGDB game. When several companies
+    have a role, the last one listed wins.
+
+    Returns:
+        dict: {'developer', 'publisher'}, names or None
+    """
+    companies = {'developer': None, 'publisher': None}
     if not involved_company_ids:
-        print("No company IDs provided for enumeration.")
-        return
+        return companies
 
     company_ids_str = ','.join(map(str, involved_company_ids))
-    # print(f"Company IDs: {company_ids_str}")
-
-    try:
-        response_json = make_igdb_api_request(
-            "https://api.igdb.com/v4/involved_companies",
-            f"""fields company.name, developer, publisher, game;
-                where game={igdb_game_id} & id=({company_ids_str});"""
-        )
+    response_json = make_igdb_api_request(
+        "https://api.igdb.com/v4/involved_companies",
+        f"""fields company.name, developer, publisher, game;
+            where game={igdb_game_id} & id=({company_ids_str});"""
+    )
 
-        if not isinstance(response_json, list):
-            print(f"Unexpected response structure: {response_json}")
-            return
+    if not isinstance(response_json, list):
+        print(f"Unexpected response structure: {response_json}")
+        return companies
 
-        for company_data in response_json:
-            company_info = company_data.get('company')
-            if not isinstance(company_info, dict) or 'name' not in company_info:
-                print(f"Unexpected company data structure or missing name: {company_data}")
-                continue  # Skip to the next
+    for company_data in response_json:
+        company_info = company_data.get('company')
+        if not isinstance(company_info, dict) or 'name' not in company_info:
+            print(f"Unexpected company data structure or missing name: {company_data}")
+            continue  # Skip to the next
 
-            company_name = company_info['name'][:50] 
-            is_developer = company_data.get('developer', False)
-            is_publisher = company_data.get('publisher', False)
+        company_name = company_info['name'][:50]
+        if company_data.get('developer', False):
+            companies['developer'] = company_name
+        if company_data.get('publisher', False):
+            companies['publisher'] = company_name
+    return companies
 
-            if is_developer:
-                # print(f"Company {company_name} is a developer.")
-                developer = get_or_create_entity(Developer, name=company_name)
 
-                game_instance.developer = developer
+def enumerate_companies(game_instance, igdb_game_id, involved_company_ids):
+    if not involved_company_ids:
+        print("No company IDs provided for enumeration.")
+        return
 
-            if is_publisher:
-                # print(f"Company {company_name} is a publisher.")
-                publisher = get_or_create_entity(Publisher, name=company_name)
-                game_instance.publisher = publisher
+    try:
+        companies = fetch_involved_companies(igdb_game_id, involved_company_ids)
+        if companies['developer']:
+            game_instance.developer = get_or_create_entity(Developer, name=companies['developer'])
+        if companies['publisher']:
+            game_instance.publisher = get_or_create_entity(Publisher, name=companies['publisher'])
     except Exception as e:
         print(f"Failed to enumerate companies due to an error: {e}")
         return
@@ -909,50 +899,19 @@ def delete_game(game_identifier):
 
 
 def download_pending_images(batch_size=10, delay_between_downloads=1, app=None):
-    """Download images that are queued but not yet downloaded."""
+    """Download images that are queued but not yet downloaded, see utils/image_queue.py."""
     if app is None:
         app = current_app._get_current_object()
         
     try:
         with app.app_context():
-            # Get pending images
-            pending_images = db.session.execute(select(Image).filter_by(is_downloaded=False).limit(batch_size)).scalars().all()
-            
-            if not pending_images:
+            result = process_image_queue(batch_size=batch_size, delay_between_downloads=delay_between_downloads)
+            if not result['claimed']:
                 print("No pending images to download.")
                 return 0
             
-            downloaded_count = 0
-            for image in pending_images:
-                try:
-                    if not image.download_url:
-                        print(f"No download URL for image {image.id}, skipping.")
-                        continue
-                    
-                    # Download the image
-                    save_path = os.path.join(app.config['IMAGE_SAVE_PATH'], image.url)
-                    
-                    from sharewarez.utils.functions import download_image
-                    download_image(image.download_url, save_path)
-                    
-                    # Mark as downloaded
-                    image.is_downloaded = True
-                    downloaded_count += 1
-                    
-                    print(f"Downloaded {image.image_type} for game {image.game_uuid}: {image.url}")
-                    
-                    # Small delay to avoid overwhelming the server
-                    if delay_between_downloads > 0:
-                        time.sleep(delay_between_downloads)
-                        
-                except Exception as e:
-                    print(f"Error downloading image {image.id}: {e}")
-                    continue
-            
-            # Commit all changes
-            db.session.commit()
-            print(f"Downloaded {downloaded_count} images.")
-            return downloaded_count
+            print(result['message'])
+            return result['downloaded']
             
     except Exception as e:
         print(f"Error in batch image download: {e}")
@@ -964,7 +923,10 @@ def download_pending_images(batch_size=10, delay_between_downloads=1, app=None):
 
 
 def start_background_image_downloader(interval_seconds=60):
-    """Start a background thread that periodically downloads pending images."""
+    """
+    Start a background thread that periodically downloads pending images.
+    Images are leased to the thread that claims them, so every worker process may run one.
+    """
     # Capture the current app instance
     app = current_app._get_current_object()
     
@@ -995,33 +957,13 @@ def download_images_for_game(game_uuid, app=None):
         
     try:
         with app.app_context():
-            pending_images = db.session.execute(select(Image).filter_by(game_uuid=game_uuid, is_downloaded=False)).scalars().all()
-            
-            if not pending_images:
+            result = process_image_queue(batch_size=GAME_IMAGE_BATCH_SIZE, game_uuid=game_uuid)
+            if not result['claimed']:
                 print(f"No pending images for game {game_uuid}.")
                 return 0
             
-            downloaded_count = 0
-            for image in pending_images:
-                try:
-                    if not image.download_url:
-                        continue
-                    
-                    save_path = os.path.join(app.config['IMAGE_SAVE_PATH'], image.url)
-                    
-                    from sharewarez.utils.functions import download_image
-                    download_image(image.download_url, save_path)
-                    
-                    image.is_downloaded = True
-                    downloaded_count += 1
-                    
-                except Exception as e:
-                    print(f"Error downloading image {image.id}: {e}")
-                    continue
-            
-            db.session.commit()
-            print(f"Downloaded {downloaded_count} images for game {game_uuid}.")
-            return downloaded_count
+            print(f"Downloaded {result['downloaded']} images for game {game_uuid}.")
+            return result['downloaded']
             
     except Exception as e:
         print(f"Error downloading images for game {game_uuid}: {e}")
@@ -1039,9 +981,7 @@ def download_single_image_worker(image, app):
             return {'success': False, 'image_id': image.id, 'error': 'No download URL'}
         
         save_path = os.path.join(app.config['IMAGE_SAVE_PATH'], image.url)
-        
-        from sharewarez.utils.functions import download_image
-        download_image(image.download_url, save_path)
+        fetch_image(image.download_url, save_path)
         
         return {
             'success': True, 
@@ -1062,56 +1002,14 @@ def turbo_download_images(batch_size=100, max_workers=5, app=None):
     
     try:
         with app.app_context():
-            # Get pending images
-            pending_images = db.session.execute(select(Image).filter_by(is_downloaded=False).limit(batch_size)).scalars().all()
-            
-            if not pending_images:
-                return {'downloaded': 0, 'failed': 0, 'message': 'No pending images'}
-            
-            downloaded_count = 0
-            failed_count = 0
-            successful_images = []
-            
-            # Create thread pool and submit all download tasks
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all download jobs
-                future_to_image = {
-                    executor.submit(download_single_image_worker, image, app): image 
-                    for image in pending_images
-                }
-                
-                # Process completed downloads as they finish
-                for future in as_completed(future_to_image):
-                    image = future_to_image[future]
-                    try:
-                        result = future.result()
-                        
-                        if result['success']:
-                            successful_images.append(image.id)
-                            downloaded_count += 1
-                        else:
-                            failed_count += 1
-                            print(f"❌ Failed to download image {result['image_id']}: {result['error']}")
-                            
-                    except Exception as e:
-                        failed_count += 1
-                        print(f"❌ Exception downloading image {image.id}: {e}")
-            
-            # Update database - mark successful downloads as completed
-            if successful_images:
-                db.session.execute(
-                    update(Image).filter(Image.id.in_(successful_images)).values(is_downloaded=True)
-                )
-                db.session.commit()
-            
-            result_message = f"🚀 Downloaded {downloaded_count} images ({failed_count} failed)" if failed_count > 0 else f"🚀 Downloaded {downloaded_count} images"
-            if downloaded_count > 0:
-                print(result_message)
+            result = process_image_queue(batch_size=batch_size, max_workers=max_workers)
+            if result['downloaded'] > 0:
+                print(result['message'])
             
             return {
-                'downloaded': downloaded_count,
-                'failed': failed_count,
-                'message': result_message
+                'downloaded': result['downloaded'],
+                'failed': result['failed'],
+                'message': result['message']
             }
             
     except Exception as e:
@@ -1124,7 +1022,10 @@ def turbo_download_images(batch_size=100, max_workers=5, app=None):
 
 
 def start_turbo_background_downloader(interval_seconds=30, max_workers=4, batch_size=50):
-    """Start a HIGH SPEED background downloader with parallel processing."""
+    """
+    Start a HIGH SPEED background downloader with parallel processing.
+    Images are leased to the thread that claims them, so every worker process may run one.
+    """
     app = current_app._get_current_object()
     
     def turbo_background_worker():
@@ -1261,10 +1162,11 @@ def queue_missing_images_for_download(missing_images_list, app=None):
             queued_count = 0
             image_ids = [img['id'] for img in missing_images_list]
             
-            # Update images to mark them as not downloaded (queued for download)
+            # Update images to mark them as not downloaded (queued for download) from their first attempt
             db.session.execute(
                 update(Image).filter(Image.id.in_(image_ids)).values(is_downloaded=False)
             )
+            requeue_images(image_ids)
             updated_count = len(image_ids)
             
             db.session.commit()
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from flask import flash
 import re
 from sharewarez import db
@@ -11,11 +12,12 @@ def get_game_names_from_folder(folder_path, insensitive_patterns, sensitive_patt
         flash(f"Error: The folder '{folder_path}' does not exist or is not readable.")
         return []
     folder_contents = os.listdir(folder_path)
+    normalizer = get_name_normalizer(insensitive_patterns, sensitive_patterns)
     game_names_with_paths = []
     for item in folder_contents:
         full_path = os.path.join(folder_path, item)
         if os.path.isdir(full_path):
-            game_name = clean_game_name(item, insensitive_patterns, sensitive_patterns)
+            game_name = normalizer.clean(item)
             game_names_with_paths.append({'name': game_name, 'full_path': full_path})
     return game_names_with_paths
 
@@ -25,6 +27,7 @@ def get_game_names_from_files(folder_path, extensions, insensitive_patterns, sen
         return []
     file_contents = [f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
     # print(f"Files found in folder: {file_contents}")
+    normalizer = get_name_normalizer(insensitive_patterns, sensitive_patterns)
     game_names_with_paths = []
     for file_name in file_contents:
         print(f"Checking file: {file_name}")
@@ -34,7 +37,7 @@ def get_game_names_from_files(folder_path, extensions, insensitive_patterns, sen
             # Extract the game name without the extension
             game_name_without_extension = '.'.join(file_name.split('.')[:-1])
             # Clean the game name
-            cleaned_game_name = clean_game_name(game_name_without_extension, insensitive_patterns, sensitive_patterns)
+            cleaned_game_name = normalizer.clean(game_name_without_extension)
             # print(f"Extracted and cleaned game name: {cleaned_game_name}")
             full_path = os.path.join(folder_path, file_name)
             
@@ -56,19 +59,35 @@ def get_game_name_by_uuid(uuid):
         return None
     
     
+# Patterns used by clean_game_name, compiled once at import
+GOTY_PATTERNS = [
+    re.compile(r'\bg\.o\.t\.y\.?(?=\s|$|\.|-)', re.IGNORECASE),    # g.o.t.y or g.o.t.y. (followed by space, end, dot, or hyphen)
+    re.compile(r'(?:^|[^a-zA-Z])goty(?=\s|$|-|\.|_)', re.IGNORECASE),  # goty (not preceded by letter, followed by space, end, hyphen, dot, or underscore)
+]
+PREFIXED_VERSION_RE = re.compile(r'v\d+(\.\d+)*')                          # v1.0.3
+COMPLEX_VERSION_RE = re.compile(r'(?:^|_|\s)\d+(\.\d+){2,}(?=_|\s|$)')     # 1.9.23494.3
+STANDALONE_VERSION_RE = re.compile(r'\b\d+(\.\d+)+\b')                     # 1.0.3
+INNER_BUILD_RE = re.compile(r'_\(\d+\)_')                                   # _(51906)_
+BUILD_RE = re.compile(r'_?\(\d+\)_?')
+LETTER_DOT_RE = re.compile(r'(?<=\b[A-Z])\.(?=[A-Z]\b|\s|$)')              # A.Tale -> A Tale
+LETTER_DOT_BEFORE_GOTY_RE = re.compile(r'(?<=\b[A-Z])\.(?=[A-Z]\b|\s|$)(?!.*GOTY)')
+SEPARATOR_RE = re.compile(r'(?<!^)(?<![\d])\.|_')
+VERSION_RE = re.compile(r'\bv?\d+(\.\d+){1,3}')
+NUMERAL_RE = re.compile(r'\b([IVXLCDM]+|[0-9]+)(?:[^\w]|$)')
+# Build numbers, DLC counts and edition words, removed in one pass
+EXTRAS_RE = re.compile(r'Build\.\d+|(?i:(?:\+|\-)\d+DLCs?|Repack|Edition|Remastered|Remake|Proper|Dodi)')
+TRAILING_BRACKET_NUMBER_RE = re.compile(r'\(\d+\)$')
+WHITESPACE_RE = re.compile(r'\s+')
+GOTY_TITLE_RE = re.compile(r'\bGoty\b')
+
+
 def detect_goty_pattern(filename):
     """
     Detect if filename contains GOTY or G.O.T.Y. patterns.
     Returns tuple: (has_goty, standardized_name)
     """
-    # Check for various GOTY patterns (case-insensitive)
-    goty_patterns = [
-        r'\bg\.o\.t\.y\.?(?=\s|$|\.|-)',    # g.o.t.y or g.o.t.y. (followed by space, end, dot, or hyphen)
-        r'(?:^|[^a-zA-Z])goty(?=\s|$|-|\.|_)',  # goty (not preceded by letter, followed by space, end, hyphen, dot, or underscore)
-    ]
-
-    for i, pattern in enumerate(goty_patterns):
-        match = re.search(pattern, filename, re.IGNORECASE)
+    for i, pattern in enumerate(GOTY_PATTERNS):
+        match = pattern.search(filename)
         if match:
             start, end = match.span()
             if i == 1:  # Special handling for the second pattern that includes preceding character
@@ -107,120 +126,177 @@ def generate_goty_variants(base_name):
     # Try without GOTY as fallback
     no_goty_variant = base_name.replace('GOTY', '').strip()
     # Clean up any double spaces
-    no_goty_variant = re.sub(r'\s+', ' ', no_goty_variant).strip()
+    no_goty_variant = WHITESPACE_RE.sub(' ', no_goty_variant).strip()
     if no_goty_variant:  # Only add if not empty
         variants.append(no_goty_variant)
 
     return variants
 
 
-def clean_game_name(filename, insensitive_patterns, sensitive_patterns):
-    # print(f"Original filename: {filename}")
-
-    # Check and remove 'setup' at the start, case-insensitive
-    if filename.lower().startswith('setup'):
-        filename = filename[len('setup'):].lstrip("_").lstrip("-").lstrip()
-        # print(f"After removing 'setup': {filename}")
-
-    # Detect and preserve GOTY patterns early, before dot processing
-    has_goty, filename = detect_goty_pattern(filename)
-
-    # First handle version numbers and known patterns that should be removed
-    filename = re.sub(r'v\d+(\.\d+)*', '', filename)  # Remove version numbers like v1.0.3
-    filename = re.sub(r'(?:^|_|\s)\d+(\.\d+){2,}(?=_|\s|$)', '', filename)  # Remove complex version numbers like 1.9.23494.3
-    filename = re.sub(r'\b\d+(\.\d+)+\b', '', filename)  # Remove standalone version numbers like 1.0.3
-    filename = re.sub(r'_\(\d+\)_', '_', filename)  # Replace build numbers in parentheses like _(51906)_ with single underscore
-    filename = re.sub(r'_?\(\d+\)_?', '', filename)  # Remove any remaining build numbers in parentheses
-
-    # Handle dots between single letters (like A.Tale -> A Tale), but preserve GOTY if present
-    if not has_goty or 'GOTY' not in filename:
-        filename = re.sub(r'(?<=\b[A-Z])\.(?=[A-Z]\b|\s|$)', ' ', filename)
-    else:
-        # More careful dot handling when GOTY is present
-        filename = re.sub(r'(?<=\b[A-Z])\.(?=[A-Z]\b|\s|$)(?!.*GOTY)', ' ', filename)
-
-    # Replace remaining dots and underscores with spaces, but preserve GOTY
-    if has_goty and 'GOTY' in filename:
-        # Temporarily replace GOTY to protect it from dot processing
-        filename = filename.replace('GOTY', 'GOTYPLACEHOLDER')
-        filename = re.sub(r'(?<!^)(?<![\d])\.|_', ' ', filename)
-        filename = filename.replace('GOTYPLACEHOLDER', 'GOTY')
-    else:
-        filename = re.sub(r'(?<!^)(?<![\d])\.|_', ' ', filename)
+def _trie_regex(words):
+    """Regex matching any of `words`, built from a character trie so shared prefixes are matched once."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _trie_node_regex(trie)
+
 
-    # Define a regex pattern for version numbers
-    version_pattern = r'\bv?\d+(\.\d+){1,3}'
+def _trie_node_regex(node):
+    branches = [re.escape(char) + _trie_node_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # Continuing is tried before stopping here, so the longest word wins
+    return f"(?:{body})?" if '' in node else body
 
-    # Remove version numbers
-    filename = re.sub(version_pattern, '', filename)
 
-    # Remove known release group patterns
+def compile_release_groups(insensitive_patterns, sensitive_patterns):
+    """
+    Compile release group patterns into a single regex, or None when there are none.
+
+    Insensitive patterns match case-insensitively and get word boundaries only when they
+    start and end with a word character. Sensitive patterns are (pattern, is_case_sensitive)
+    tuples and always get word boundaries. Patterns sharing the same flags are merged into
+    one trie, which tries longer patterns first, so a group is never cut short by another
+    group that is a prefix of it.
+    """
+    # (case-insensitive, word boundaries) -> patterns
+    kinds = {(True, False): set(), (True, True): set(), (False, True): set()}
     for pattern in insensitive_patterns:
-        escaped_pattern = re.escape(pattern)
-        # Use word boundary only if pattern starts/ends with word characters
-        if pattern[0].isalnum() and pattern[-1].isalnum():
-            filename = re.sub(f"\\b{escaped_pattern}\\b", '', filename, flags=re.IGNORECASE)
-        else:
-            filename = re.sub(escaped_pattern, '', filename, flags=re.IGNORECASE)
+        if pattern:
+            bounded = pattern[0].isalnum() and pattern[-1].isalnum()
+            kinds[(True, bounded)].add(pattern.lower())
 
     for pattern, is_case_sensitive in sensitive_patterns:
-        escaped_pattern = re.escape(pattern)
-        if is_case_sensitive:
-            filename = re.sub(f"\\b{escaped_pattern}\\b", '', filename)
+        if pattern:
+            kinds[(not is_case_sensitive, True)].add(pattern if is_case_sensitive else pattern.lower())
+
+    branches = []
+    for (case_insensitive, bounded), patterns in kinds.items():
+        if not patterns:
+            continue
+        branch = _trie_regex(patterns)
+        if bounded:
+            branch = f"\\b{branch}\\b"
+        branches.append(f"(?i:{branch})" if case_insensitive else branch)
+    return re.compile('|'.join(branches)) if branches else None
+
+
+class GameNameNormalizer:
+    """Cleans folder and file names into game names for one set of release group patterns."""
+
+    def __init__(self, insensitive_patterns=(), sensitive_patterns=()):
+        self.release_groups = compile_release_groups(insensitive_patterns, sensitive_patterns)
+
+    def clean(self, filename):
+        # Check and remove 'setup' at the start, case-insensitive
+        if filename.lower().startswith('setup'):
+            filename = filename[len('setup'):].lstrip("_").lstrip("-").lstrip()
+
+        # Detect and preserve GOTY patterns early, before dot processing
+        has_goty, filename = detect_goty_pattern(filename)
+
+        # First handle version numbers and known patterns that should be removed
+        filename = PREFIXED_VERSION_RE.sub('', filename)
+        filename = COMPLEX_VERSION_RE.sub('', filename)
+        filename = STANDALONE_VERSION_RE.sub('', filename)
+        filename = INNER_BUILD_RE.sub('_', filename)
+        filename = BUILD_RE.sub('', filename)
+
+        # Handle dots between single letters (like A.Tale -> A Tale), but preserve GOTY if present
+        if not has_goty or 'GOTY' not in filename:
+            filename = LETTER_DOT_RE.sub(' ', filename)
         else:
-            filename = re.sub(f"\\b{escaped_pattern}\\b", '', filename, flags=re.IGNORECASE)
-
-    # Handle cases with numerals and versions
-    filename = re.sub(r'\b([IVXLCDM]+|[0-9]+)(?:[^\w]|$)', r' \1 ', filename)
-
-    # Cleanup for versions, DLCs, etc.
-    filename = re.sub(r'Build\.\d+', '', filename)
-    filename = re.sub(r'(\+|\-)\d+DLCs?', '', filename, flags=re.IGNORECASE)
-    filename = re.sub(r'Repack|Edition|Remastered|Remake|Proper|Dodi', '', filename, flags=re.IGNORECASE)
-
-    # Remove trailing numbers enclosed in brackets
-    filename = re.sub(r'\(\d+\)$', '', filename).strip()
-
-    # Smart cleanup of trailing numbers - keep only one meaningful number at the end
-    # Split by spaces and work backwards from the end
-    words = filename.split()
-    if len(words) > 1:
-        # Find trailing numeric/garbage words
-        trailing_numbers = []
-        clean_words = []
-
-        for word in reversed(words):
-            # Check if word is purely numeric or obvious garbage
-            if (word.isdigit() and len(word) <= 2) or word.lower() in ['win', 'gog', 'steam']:
-                trailing_numbers.append(word)
-            else:
-                # Keep this word and stop looking
-                clean_words = words[:len(words) - len(trailing_numbers)]
-                break
-
-        # If we found trailing garbage words, clean them up
-        if trailing_numbers:
-            # Look for a valid game sequel number (typically 1-20)
-            valid_sequel = None
-            for num_word in reversed(trailing_numbers):
-                if num_word.isdigit() and 1 <= int(num_word) <= 20:
-                    valid_sequel = num_word
+            # More careful dot handling when GOTY is present
+            filename = LETTER_DOT_BEFORE_GOTY_RE.sub(' ', filename)
+
+        # Replace remaining dots and underscores with spaces, but preserve GOTY
+        if has_goty and 'GOTY' in filename:
+            # Temporarily replace GOTY to protect it from dot processing
+            filename = filename.replace('GOTY', 'GOTYPLACEHOLDER')
+            filename = SEPARATOR_RE.sub(' ', filename)
+            filename = filename.replace('GOTYPLACEHOLDER', 'GOTY')
+        else:
+            filename = SEPARATOR_RE.sub(' ', filename)
+
+        # Remove version numbers
+        filename = VERSION_RE.sub('', filename)
+
+        # Remove known release group patterns
+        if self.release_groups is not None:
+            filename = self.release_groups.sub('', filename)
+
+        # Handle cases with numerals and versions
+        filename = NUMERAL_RE.sub(r' \1 ', filename)
+
+        # Cleanup for versions, DLCs, etc.
+        filename = EXTRAS_RE.sub('', filename)
+
+        # Remove trailing numbers enclosed in brackets
+        filename = TRAILING_BRACKET_NUMBER_RE.sub('', filename).strip()
+
+        # Smart cleanup of trailing numbers - keep only one meaningful number at the end
+        # Split by spaces and work backwards from the end
+        words = filename.split()
+        if len(words) > 1:
+            # Find trailing numeric/garbage words
+            trailing_numbers = []
+            clean_words = []
+
+            for word in reversed(words):
+                # Check if word is purely numeric or obvious garbage
+                if (word.isdigit() and len(word) <= 2) or word.lower() in ['win', 'gog', 'steam']:
+                    trailing_numbers.append(word)
+                else:
+                    # Keep this word and stop looking
+                    clean_words = words[:len(words) - len(trailing_numbers)]
                     break
 
-            # Rebuild filename with cleaned words plus optional valid sequel number
-            if valid_sequel:
-                filename = ' '.join(clean_words + [valid_sequel])
-            else:
-                filename = ' '.join(clean_words)
+            # If we found trailing garbage words, clean them up
+            if trailing_numbers:
+                # Look for a valid game sequel number (typically 1-20)
+                valid_sequel = None
+                for num_word in reversed(trailing_numbers):
+                    if num_word.isdigit() and 1 <= int(num_word) <= 20:
+                        valid_sequel = num_word
+                        break
+
+                # Rebuild filename with cleaned words plus optional valid sequel number
+                if valid_sequel:
+                    filename = ' '.join(clean_words + [valid_sequel])
+                else:
+                    filename = ' '.join(clean_words)
+
+        # Normalize whitespace and re-title
+        cleaned_name = ' '.join(filename.split()).title()
+
+        # Preserve GOTY in uppercase after title case conversion
+        if has_goty:
+            cleaned_name = GOTY_TITLE_RE.sub('GOTY', cleaned_name)
 
-    # Normalize whitespace and re-title
-    filename = re.sub(r'\s+', ' ', filename).strip()
-    cleaned_name = ' '.join(filename.split()).title()
+        return cleaned_name
 
-    # Preserve GOTY in uppercase after title case conversion
-    if has_goty:
-        cleaned_name = re.sub(r'\bGoty\b', 'GOTY', cleaned_name)
 
-    # print(f"Final cleaned name: {cleaned_name}")
+@lru_cache(maxsize=8)
+def _cached_normalizer(insensitive_key, sensitive_key):
+    return GameNameNormalizer(insensitive_key, sensitive_key)
 
-    return cleaned_name
\ No newline at end of file
+
+def get_name_normalizer(insensitive_patterns, sensitive_patterns):
+    """
+    The normalizer for these release group patterns, compiled on first use.
+    Normalizers are cached by their patterns, so adding, editing or removing a
+    release group yields a new one on the next scan.
+    """
+    return _cached_normalizer(tuple(insensitive_patterns), tuple(map(tuple, sensitive_patterns)))
+
+
+def clear_name_normalizer_cache():
+    _cached_normalizer.cache_clear()
+
+
+def clean_game_name(filename, insensitive_patterns, sensitive_patterns):
+    return get_name_normalizer(insensitive_patterns, sensitive_patterns).clean(filename)
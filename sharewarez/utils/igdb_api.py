@@ -4,11 +4,160 @@
 import requests
 import time
 import threading
-from sharewarez import db
+import hashlib
+from flask import current_app
+from sharewarez import db, cache
 from sharewarez.models import GlobalSettings
+from sharewarez.utils.igdb_usage import record_igdb_call, record_igdb_cache_hit
 from sqlalchemy import select
 
 
+# Field list shared by the sync and async game searches so both return the same shape
+IGDB_GAME_SEARCH_FIELDS = """fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
+                      screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
+                      aggregated_rating_count, rating, rating_count, slug, status, category, total_rating,
+                      total_rating_count;"""
+
+
+def build_game_search_query(search_name, platform_id=None, limit=1):
+    """
+    Build the IGDB games query used when matching a folder name.
+
+    Parameters:
+    search_name (str): The name to search for.
+    platform_id (int): Optional IGDB platform ID to restrict the search to.
+    limit (int): Maximum number of results to return.
+
+    Returns:
+    str: The Apicalypse query body.
+    """
+    query_filter = f'search "{search_name}"; limit {limit};'
+    if platform_id is not None:
+        query_filter += f' where platforms = ({platform_id});'
+    return IGDB_GAME_SEARCH_FIELDS + query_filter
+
+
+def build_game_candidates_query(search_name, platform_id=None, limit=15):
+    """
+    Build the wider IGDB games query used for local candidate ranking.
+    Same fields as build_game_search_query plus alternative names and release years.
+    """
+    query_filter = f'search "{search_name}"; limit {limit};'
+    if platform_id is not None:
+        query_filter += f' where platforms = ({platform_id});'
+    return IGDB_GAME_SEARCH_FIELDS[:-1] + ', alternative_names.name, release_dates.y;' + query_filter
+
+
+def build_game_by_id_query(igdb_id):
+    """Build the IGDB games query used to fetch a single game by its exact ID."""
+    return f"""
+            fields name, summary, storyline, url, slug, first_release_date,
+                   aggregated_rating, aggregated_rating_count, rating, rating_count,
+                   total_rating, total_rating_count, status, category,
+                   cover.url, screenshots.url, videos.video_id,
+                   genres.name, themes.name, game_modes.name, platforms.name,
+                   player_perspectives.name, involved_companies;
+            where id = {igdb_id};
+            limit 1;
+        """
+
+
+# Fields for the admin search endpoints: the scan fields plus storyline and the
+# cover's image_id, so thumbnails come back with the results instead of one call per cover
+IGDB_ADMIN_SEARCH_FIELDS = IGDB_GAME_SEARCH_FIELDS[:-1] + ', storyline, cover.image_id;'
+
+IGDB_THUMBNAIL_URL = 'https://images.igdb.com/igdb/image/upload/t_thumb/{image_id}.jpg'
+
+# Seconds identical admin IGDB queries are served from the cache
+IGDB_SEARCH_CACHE_TIMEOUT = 300
+
+
+def build_admin_search_query(search_name=None, igdb_id=None, platform_id=None, limit=10):
+    """
+    Build the IGDB games query used by the admin search endpoints, either by
+    name (optionally restricted to a platform) or by exact IGDB ID.
+    """
+    if igdb_id is not None:
+        return IGDB_ADMIN_SEARCH_FIELDS + f' where id = {igdb_id};'
+    search_name = search_name.replace('\\', '').replace('"', '\\"')
+    query_filter = f' search "{search_name}";'
+    if platform_id is not None:
+        query_filter += f' where platforms = ({platform_id});'
+    return IGDB_ADMIN_SEARCH_FIELDS + query_filter + f' limit {limit};'
+
+
+def add_cover_thumbnails(games):
+    """
+    Replace the expanded cover of each game from an admin search query with its
+    ID, as in the other game queries, and add a 'cover_url' thumbnail URL (or None).
+    """
+    for game in games:
+        cover = game.get('cover')
+        if isinstance(cover, dict):
+            game['cover'] = cover.get('id')
+            game['cover_url'] = IGDB_THUMBNAIL_URL.format(image_id=cover['image_id']) if cover.get('image_id') else None
+        else:
+            game['cover_url'] = None
+    return games
+
+
+class _InflightRequest:
+    """An IGDB request being made by one thread that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+_inflight_requests = {}
+_inflight_lock = threading.Lock()
+
+
+def cached_igdb_api_request(endpoint_url, query_params, timeout=IGDB_SEARCH_CACHE_TIMEOUT):
+    """
+    make_igdb_api_request for interactive lookups: successful responses are cached
+    for `timeout` seconds, and identical requests arriving while one is in flight
+    wait for its response instead of calling IGDB again.
+    """
+    cache_key = 'igdb_request_' + hashlib.sha1(f"{endpoint_url}|{query_params.lower()}".encode()).hexdigest()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        record_igdb_cache_hit(endpoint_url)
+        return cached
+
+    with _inflight_lock:
+        inflight = _inflight_requests.get(cache_key)
+        is_leader = inflight is None
+        if is_leader:
+            inflight = _InflightRequest()
+            _inflight_requests[cache_key] = inflight
+
+    if not is_leader:
+        if inflight.done.wait(timeout=30) and inflight.result is not None:
+            record_igdb_cache_hit(endpoint_url)
+            return inflight.result
+        return {"error": "cached_igdb_api_request Timed out waiting for identical IGDB request"}
+
+    try:
+        result = make_igdb_api_request(endpoint_url, query_params)
+        inflight.result = result
+        if not (isinstance(result, dict) and 'error' in result):
+            cache.set(cache_key, result, timeout=timeout)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight_requests.pop(cache_key, None)
+        inflight.done.set()
+
+
+def igdb_endpoint_url(endpoint):
+    """
+    Return the URL of another IGDB endpoint (e.g. 'platforms') next to the
+    configured IGDB_API_ENDPOINT games endpoint.
+    """
+    base_url = current_app.config['IGDB_API_ENDPOINT'].rstrip('/').rsplit('/', 1)[0]
+    return f"{base_url}/{endpoint}"
+
 
 def make_igdb_api_request(endpoint_url, query_params):
     # Get IGDB settings from database
@@ -26,9 +175,12 @@ def make_igdb_api_request(endpoint_url, query_params):
         'Authorization': f"Bearer {access_token}"
     }
 
+    request_start = time.monotonic()
+    status_code = None
     try:
         # print(f"make_igdb_api_request Attempting to make a request to {endpoint_url} with headers: {headers} and query: {query_params}")
         response = requests.post(endpoint_url, headers=headers, data=query_params)
+        status_code = response.status_code
         response.raise_for_status()
         # print(f"make_igdb_api_request Response from IGDB API: {data}")
         return response.json()
@@ -41,6 +193,9 @@ def make_igdb_api_request(endpoint_url, query_params):
 
     except Exception as e:
         return {"error": f"make_igdb_api_request An unexpected error occurred: {e}"}
+
+    finally:
+        record_igdb_call(endpoint_url, time.monotonic() - request_start, status_code)
     
 def get_access_token(client_id, client_secret):
     url = "https://id.twitch.tv/oauth2/token"
@@ -113,6 +268,8 @@ class IGDBRateLimiter:
     """
     Rate limiter for IGDB API scanning operations.
     Ensures compliance with IGDB rate limits: 4 requests/second, max 8 concurrent requests.
+    The async scan prefetcher can take its requests from the same rate (see
+    AsyncIGDBRateLimiter), so a scan stays within one rate however it sends them.
     """
     def __init__(self, max_requests_per_second=4, max_concurrent_requests=8):
         self.max_requests_per_second = max_requests_per_second
@@ -120,32 +277,53 @@ class IGDBRateLimiter:
         self.request_times = []
         self.concurrent_requests = 0
         self.lock = threading.Lock()
+        self._slot_released = threading.Condition(self.lock)
+
+    def _reserve(self):
+        # Record a request in the rate window and return how long to wait before sending it.
+        # Requests that have to wait are recorded at the time they will be sent. Caller holds the lock.
+        current_time = time.time()
+
+        # Rates below one request per second count requests over a longer window
+        window = max(1.0, 1.0 / self.max_requests_per_second)
+        limit = max(1, int(self.max_requests_per_second))
+
+        # Remove request times older than the window
+        self.request_times = [req_time for req_time in self.request_times 
+                            if current_time - req_time < window]
+
+        sleep_time = 0
+        if len(self.request_times) >= limit:
+            sleep_time = max(0, window - (current_time - self.request_times[-limit]))
+        self.request_times.append(current_time + sleep_time)
+        return sleep_time
+
+    def reserve(self):
+        """Take a request from the rate without a concurrent slot. Returns the seconds to wait before sending it."""
+        with self.lock:
+            return self._reserve()
         
     def acquire(self):
         """Acquire permission to make an IGDB API request."""
         with self.lock:
-            current_time = time.time()
-            
-            # Remove request times older than 1 second
-            self.request_times = [req_time for req_time in self.request_times 
-                                if current_time - req_time < 1.0]
-            
             # Wait if we're at the concurrent request limit
             while self.concurrent_requests >= self.max_concurrent_requests:
-                time.sleep(0.1)
-            
-            # Wait if we've exceeded the rate limit
-            if len(self.request_times) >= self.max_requests_per_second:
-                sleep_time = 1.0 - (current_time - self.request_times[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-            
-            # Record this request and increment concurrent counter
-            self.request_times.append(current_time)
+                self._slot_released.wait()
             self.concurrent_requests += 1
+            sleep_time = self._reserve()
+
+        # Wait if we've exceeded the rate limit; the slot is already taken, so others go after it
+        if sleep_time > 0:
+            time.sleep(sleep_time)
             
     def release(self):
         """Release a concurrent request slot."""
         with self.lock:
             self.concurrent_requests = max(0, self.concurrent_requests - 1)
+            self._slot_released.notify()
+
+    def set_rate(self, max_requests_per_second):
+        """Change the request rate, e.g. when the IGDB quota is shared with other scans."""
+        with self.lock:
+            self.max_requests_per_second = max(0.1, max_requests_per_second)
 
@@ -0,0 +1,434 @@
+# File: /sharewarez/utils/igdb_async.py
+# Asyncio based IGDB client. Mirrors the query surface of igdb_api.py and the
+# game_core searches so a scan can keep many IGDB requests in flight within
+# quota while the worker threads carry on with filesystem and database work.
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from sqlalchemy import select
+from sharewarez import db
+from sharewarez.models import GlobalSettings
+from sharewarez.utils.igdb_api import build_game_search_query, build_game_candidates_query, build_game_by_id_query
+from sharewarez.utils.igdb_usage import record_igdb_call
+from sharewarez.utils.matching import MATCH_CANDIDATE_LIMIT
+from sharewarez.utils.shutdown import should_continue_processing
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    print("Warning: aiohttp library not installed. Async IGDB prefetching disabled.")
+
+
+TWITCH_TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+IGDB_COVERS_URL = "https://api.igdb.com/v4/covers"
+
+# Marks a prefetched search that failed, so the caller falls back to a live request
+_PREFETCH_MISS = object()
+
+# Prefetched searches that may wait to be taken by the scan at once
+PREFETCH_MAX_PENDING = 64
+
+
+class AsyncIGDBRateLimiter:
+    """
+    Asyncio counterpart of IGDBRateLimiter.
+    Spaces requests evenly to stay under max_requests_per_second and caps the
+    number of requests in flight at max_concurrent_requests.
+    With a shared_limiter, requests are taken from the rate of that
+    IGDBRateLimiter instead, so a scan's prefetcher and its matching workers
+    use one request rate between them.
+    """
+    def __init__(self, max_requests_per_second=4, max_concurrent_requests=8, shared_limiter=None):
+        self.max_requests_per_second = max_requests_per_second
+        self.max_concurrent_requests = max_concurrent_requests
+        self.shared_limiter = shared_limiter
+        self._interval = 1.0 / max_requests_per_second
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        if self.shared_limiter is not None:
+            wait_time = self.shared_limiter.reserve()
+        else:
+            async with self._lock:
+                now = time.monotonic()
+                wait_time = self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + self._interval
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+
+    def set_rate(self, max_requests_per_second):
+        """Change the request rate; safe to call from outside the event loop thread."""
+        self.max_requests_per_second = max(0.1, max_requests_per_second)
+        self._interval = 1.0 / self.max_requests_per_second
+
+
+class AsyncIGDBClient:
+    """
+    Async IGDB client with the same queries and return values as igdb_api.py.
+
+    Use as an async context manager so the HTTP session and the Twitch access
+    token are shared by every request made through the client:
+
+        async with AsyncIGDBClient(client_id, client_secret, endpoint) as client:
+            results = await client.search_games([("Doom", 6), ("Quake", 6)])
+    """
+    def __init__(self, client_id, client_secret, games_endpoint, rate_limiter=None,
+                 max_retries=3, timeout=30, token_url=TWITCH_TOKEN_URL, covers_endpoint=IGDB_COVERS_URL,
+                 usage_caller='async_client', scan_job_id=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.games_endpoint = games_endpoint
+        self.covers_endpoint = covers_endpoint
+        self.token_url = token_url
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        # Requests run on the event loop thread, so usage attribution is fixed per client
+        self.usage_caller = usage_caller
+        self.scan_job_id = scan_job_id
+        self._session = None
+        self._access_token = None
+        self._token_lock = None
+
+    @classmethod
+    def from_settings(cls, games_endpoint, **kwargs):
+        """
+        Create a client from the IGDB credentials stored in GlobalSettings.
+        Must be called inside an app context. Returns None if IGDB is not configured.
+        """
+        settings = db.session.execute(select(GlobalSettings)).scalars().first()
+        if not settings or not settings.igdb_client_id or not settings.igdb_client_secret:
+            return None
+        return cls(settings.igdb_client_id, settings.igdb_client_secret, games_endpoint, **kwargs)
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._token_lock = asyncio.Lock()
+        if self.rate_limiter is None:
+            self.rate_limiter = AsyncIGDBRateLimiter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    async def get_access_token(self):
+        """Fetch the Twitch access token once and reuse it for the lifetime of the client."""
+        async with self._token_lock:
+            if self._access_token:
+                return self._access_token
+            params = {
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'grant_type': 'client_credentials'
+            }
+            try:
+                async with self._session.post(self.token_url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        self._access_token = data['access_token']
+                    else:
+                        print("Failed to obtain access token")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                print(f"Failed to obtain access token: {e}")
+            return self._access_token
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying a rate limited request."""
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return 0.5 * (2 ** attempt)
+
+    async def make_request(self, endpoint_url, query_params):
+        """
+        Async equivalent of make_igdb_api_request.
+        Returns the decoded JSON response, or a dict with an 'error' key on failure.
+        Requests answered with 429 are retried with backoff up to max_retries times.
+        """
+        access_token = await self.get_access_token()
+        if not access_token:
+            return {"error": "Failed to retrieve access token"}
+
+        headers = {
+            'Client-ID': self.client_id,
+            'Authorization': f"Bearer {access_token}"
+        }
+
+        for attempt in range(self.max_retries + 1):
+            request_start = time.monotonic()
+            status_code = None
+            try:
+                async with self.rate_limiter:
+                    async with self._session.post(endpoint_url, headers=headers, data=query_params) as response:
+                        status_code = response.status
+                        if response.status == 429 and attempt < self.max_retries:
+                            retry_delay = self._retry_delay(response, attempt)
+                        else:
+                            response.raise_for_status()
+                            return await response.json(content_type=None)
+            except aiohttp.ClientError as e:
+                return {"error": f"AsyncIGDBClient API Request failed: {e}"}
+            except asyncio.TimeoutError:
+                return {"error": "AsyncIGDBClient API Request timed out"}
+            except ValueError:
+                return {"error": "AsyncIGDBClient Invalid JSON in response"}
+            finally:
+                record_igdb_call(endpoint_url, time.monotonic() - request_start, status_code,
+                                 caller=self.usage_caller, scan_job_id=self.scan_job_id)
+
+            print(f"IGDB rate limit reached, retrying in {retry_delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(retry_delay)
+
+    async def search_game(self, search_name, platform_id):
+        """Async equivalent of search_igdb_for_game. Returns the API response or None if no match found."""
+        response_json = await self.make_request(self.games_endpoint, build_game_search_query(search_name, platform_id))
+        if 'error' not in response_json and response_json:
+            return response_json
+        return None
+
+    async def search_candidates(self, search_name, platform_id):
+        """
+        Async equivalent of search_igdb_candidates.
+        Returns the list of candidates (possibly empty) or None on API error.
+        """
+        response_json = await self.make_request(
+            self.games_endpoint, build_game_candidates_query(search_name, platform_id, limit=MATCH_CANDIDATE_LIMIT)
+        )
+        if isinstance(response_json, dict) and 'error' in response_json:
+            return None
+        return response_json or []
+
+    async def search_games(self, searches):
+        """
+        Run several searches concurrently.
+
+        Args:
+            searches: Iterable of (search_name, platform_id) tuples
+
+        Returns:
+            dict: Maps each (search_name, platform_id) tuple to its search_game result
+        """
+        keys = list(dict.fromkeys(searches))
+        results = await asyncio.gather(*(self.search_game(name, platform_id) for name, platform_id in keys))
+        return dict(zip(keys, results))
+
+    async def fetch_game_by_id(self, igdb_id):
+        """Async equivalent of fetch_game_by_igdb_id. Returns a list with one game dict, or None on error."""
+        response = await self.make_request(self.games_endpoint, build_game_by_id_query(igdb_id))
+        if response and 'error' not in response and len(response) > 0:
+            return response
+        print(f"Failed to fetch game by ID {igdb_id}: {response}")
+        return None
+
+    async def get_cover_thumbnail_url(self, igdb_id):
+        """Async equivalent of igdb_api.get_cover_thumbnail_url."""
+        response = await self.make_request(self.covers_endpoint, f'fields url; where game={igdb_id};')
+        if response and 'error' not in response and len(response) > 0 and response[0].get('url'):
+            return 'https:' + response[0]['url']
+        return None
+
+    async def get_cover_url(self, igdb_id):
+        """Async equivalent of igdb_api.get_cover_url."""
+        response = await self.make_request(self.covers_endpoint, f'fields image_id; where game={igdb_id};')
+        if response and 'error' not in response and len(response) > 0 and response[0].get('image_id'):
+            return 'https://images.igdb.com/igdb/image/upload/t_cover_big_2x/' + response[0]['image_id'] + '.jpg'
+        return None
+
+
+class IGDBSearchPrefetcher:
+    """
+    Resolves a scan's folder-name candidate searches ahead of the worker threads.
+
+    The searches run on a single background thread hosting an event loop, so
+    up to `concurrency` requests are in flight at once no matter how many scan
+    threads are configured. The scan submits a search as its folder heads for
+    the matching stage, so the prefetcher only runs as far ahead as the
+    pipeline's bounded queues, and at most max_pending results wait to be
+    taken. The scan's workers pick up the results by passing the prefetcher to
+    search_igdb_candidates, which blocks briefly on a search that is still in flight and falls back
+    to a live request for anything not prefetched.
+    """
+    def __init__(self, client, concurrency=8, wait_timeout=30, max_pending=PREFETCH_MAX_PENDING):
+        self.client = client
+        self.concurrency = concurrency
+        self.wait_timeout = wait_timeout
+        self.max_pending = max_pending
+        self._futures = {}
+        self._unresolved = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._ready = threading.Event()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+
+    def start(self, searches=()):
+        """
+        Start the background event loop.
+
+        Args:
+            searches: Iterable of (search_name, platform_id) tuples to submit right away
+        """
+        self._thread = threading.Thread(target=self._run, name="igdb-search-prefetch", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        for search_name, platform_id in searches:
+            self.submit(search_name, platform_id)
+        print(f"🚀 Prefetching IGDB searches with {self.concurrency} requests in flight, "
+              f"up to {self.max_pending} ahead of the scan")
+        return self
+
+    def submit(self, search_name, platform_id):
+        """
+        Queue a search the scan is about to need.
+
+        Returns:
+            bool: False when the search is already queued, the prefetcher is full
+            or stopped, and the search will be made live instead
+        """
+        key = (search_name, platform_id)
+        with self._lock:
+            if (self._loop is None or self._stop_event.is_set() or key in self._futures
+                    or len(self._futures) >= self.max_pending):
+                return False
+            future = Future()
+            self._futures[key] = future
+            self._unresolved.add(future)
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (key, future))
+        return True
+
+    def _run(self):
+        try:
+            asyncio.run(self._prefetch())
+        except Exception as e:
+            print(f"IGDB search prefetch stopped with error: {e}")
+        finally:
+            self._ready.set()
+            # Anything left unresolved is served live by the scan workers
+            with self._lock:
+                self._loop = None
+                unresolved = list(self._unresolved)
+                self._unresolved.clear()
+            for future in unresolved:
+                if not future.done():
+                    future.set_result(_PREFETCH_MISS)
+
+    def _resolve(self, future, result):
+        with self._lock:
+            self._unresolved.discard(future)
+        future.set_result(result)
+
+    async def _prefetch(self):
+        self._queue = asyncio.Queue()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+        self._ready.set()
+
+        async def worker():
+            while not self._stop_event.is_set() and should_continue_processing():
+                item = await self._queue.get()
+                if item is None:
+                    return
+                (search_name, platform_id), future = item
+                # The scan stopped waiting for this search and makes it live
+                if not future.set_running_or_notify_cancel():
+                    with self._lock:
+                        self._unresolved.discard(future)
+                    continue
+                candidates = await self.client.search_candidates(search_name, platform_id)
+                if candidates is None:
+                    print(f"Prefetch search failed for '{search_name}'")
+                    self._resolve(future, _PREFETCH_MISS)
+                else:
+                    self._resolve(future, candidates)
+
+        async with self.client:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    def _wake_workers(self):
+        for _ in range(self.concurrency):
+            self._queue.put_nowait(None)
+
+    def get(self, search_name, platform_id):
+        """
+        Take the prefetched result for a search.
+
+        Returns:
+            tuple: (found, result). found is False when the search was not
+            prefetched, failed, or did not start within wait_timeout.
+        """
+        with self._lock:
+            future = self._futures.pop((search_name, platform_id), None)
+        if future is None:
+            return False, None
+        try:
+            result = future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            # Searches still queued are dropped so they aren't made twice; one
+            # already in flight is waited for as long as its request may take
+            if future.cancel():
+                return False, None
+            try:
+                result = future.result(timeout=self.client.timeout)
+            except FutureTimeoutError:
+                return False, None
+        if result is _PREFETCH_MISS:
+            return False, None
+        return True, result
+
+    def stop(self):
+        """Stop prefetching and release any results that were not consumed."""
+        self._stop_event.set()
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._wake_workers)
+        if self._thread is not None:
+            self._thread.join(timeout=self.client.timeout)
+        with self._lock:
+            self._futures.clear()
+
+
+def start_scan_search_prefetch(folder_count, games_endpoint, scan_job_id=None, rate_limiter=None):
+    """
+    Start a prefetcher for the IGDB searches of a scan's new folders.
+    The scan's discovery stage submits each search as its folder is routed to
+    matching. Must be called inside an app context.
+
+    Args:
+        folder_count: Number of folders that are not in the library yet
+        games_endpoint: IGDB games endpoint URL
+        scan_job_id: Scan job the prefetched IGDB calls are accounted to
+        rate_limiter: AsyncIGDBRateLimiter to use, so the scan can re-rate it while it runs
+
+    Returns:
+        IGDBSearchPrefetcher or None if prefetching is unavailable, not worthwhile
+        or the offline IGDB catalog is in use
+    """
+    if not AIOHTTP_AVAILABLE or folder_count < 2:
+        return None
+
+    # Searches are answered from the local catalog instead, with only its misses going live
+    from sharewarez.utils.igdb_catalog import is_catalog_enabled
+    if is_catalog_enabled():
+        return None
+
+    client = AsyncIGDBClient.from_settings(games_endpoint, usage_caller='scan_prefetch', scan_job_id=scan_job_id,
+                                           rate_limiter=rate_limiter)
+    if client is None:
+        return None
+    return IGDBSearchPrefetcher(client).start()
@@ -0,0 +1,348 @@
+# File: /sharewarez/utils/igdb_catalog.py
+# Optional offline mirror of the IGDB catalog.
+# A sync job pages through IGDB platforms and games (with alternative names)
+# into local tables, incrementally by IGDB's updated_at. Folder matching and
+# lookups by IGDB ID query the mirror first and only go to the live API for
+# misses and media.
+
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, func, text, exists, or_
+from sqlalchemy.dialects.postgresql import insert
+from sharewarez import db
+from sharewarez.models import (
+    GlobalSettings, IGDBCatalogGame, IGDBCatalogAlternativeName, IGDBCatalogPlatform,
+    IGDBCatalogSyncState, igdb_catalog_game_platforms
+)
+from sharewarez.utils.igdb_api import make_igdb_api_request, igdb_endpoint_url, IGDB_GAME_SEARCH_FIELDS
+from sharewarez.utils.shutdown import should_continue_processing
+
+
+# IGDB returns at most 500 records per request
+CATALOG_PAGE_SIZE = 500
+
+CATALOG_GAME_FIELDS = IGDB_GAME_SEARCH_FIELDS[:-1] + ', alternative_names.name, release_dates.y, storyline, updated_at;'
+CATALOG_PLATFORM_FIELDS = 'fields id, name, abbreviation, updated_at;'
+
+# The watermark never moves past the sync start time minus this margin, so
+# records changed while a sync is paging are picked up by the next sync
+WATERMARK_SAFETY_MARGIN = 300
+
+_sync_lock = threading.Lock()
+_trigram_available = None
+
+
+def is_catalog_enabled():
+    """Return True if matching should consult the offline IGDB catalog."""
+    use_catalog = db.session.execute(select(GlobalSettings.use_igdb_catalog)).scalars().first()
+    return bool(use_catalog)
+
+
+def _has_trigram_support():
+    """Check once whether the pg_trgm extension is installed."""
+    global _trigram_available
+    if _trigram_available is None:
+        try:
+            _trigram_available = bool(db.session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar())
+        except Exception as e:
+            print(f"Could not check for pg_trgm support: {e}")
+            _trigram_available = False
+    return _trigram_available
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def _store_platforms(records):
+    rows = [{
+        'igdb_id': record['id'],
+        'name': record.get('name') or '',
+        'abbreviation': record.get('abbreviation'),
+        'updated_at': record.get('updated_at')
+    } for record in records]
+    stmt = insert(IGDBCatalogPlatform).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IGDBCatalogPlatform.igdb_id],
+        set_={column: stmt.excluded[column] for column in ('name', 'abbreviation', 'updated_at')}
+    )
+    db.session.execute(stmt)
+
+
+def _store_games(records):
+    now = datetime.now(timezone.utc)
+    game_ids = [record['id'] for record in records]
+
+    game_rows = [{
+        'igdb_id': record['id'],
+        'name': record.get('name') or '',
+        'slug': record.get('slug'),
+        'first_release_date': record.get('first_release_date'),
+        'data': record,
+        'updated_at': record.get('updated_at'),
+        'synced_at': now
+    } for record in records]
+    stmt = insert(IGDBCatalogGame).values(game_rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IGDBCatalogGame.igdb_id],
+        set_={column: stmt.excluded[column]
+              for column in ('name', 'slug', 'first_release_date', 'data', 'updated_at', 'synced_at')}
+    )
+    db.session.execute(stmt)
+
+    # Alternative names and platforms are replaced wholesale for the synced games
+    db.session.execute(delete(IGDBCatalogAlternativeName).where(IGDBCatalogAlternativeName.game_id.in_(game_ids)))
+    db.session.execute(delete(igdb_catalog_game_platforms).where(igdb_catalog_game_platforms.c.game_id.in_(game_ids)))
+
+    alternative_rows = []
+    platform_rows = []
+    for record in records:
+        for alternative in record.get('alternative_names') or []:
+            if isinstance(alternative, dict) and alternative.get('id') and alternative.get('name'):
+                alternative_rows.append({'id': alternative['id'], 'game_id': record['id'], 'name': alternative['name']})
+        for platform in record.get('platforms') or []:
+            platform_id = platform.get('id') if isinstance(platform, dict) else platform
+            if platform_id:
+                platform_rows.append({'game_id': record['id'], 'platform_id': platform_id})
+
+    if alternative_rows:
+        stmt = insert(IGDBCatalogAlternativeName).values(alternative_rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IGDBCatalogAlternativeName.id],
+            set_={'game_id': stmt.excluded.game_id, 'name': stmt.excluded.name}
+        )
+        db.session.execute(stmt)
+    if platform_rows:
+        db.session.execute(insert(igdb_catalog_game_platforms).values(platform_rows).on_conflict_do_nothing())
+
+
+def _sync_endpoint(endpoint, fields, store, page_size, progress_callback=None):
+    """
+    Page through one IGDB endpoint by ascending ID, fetching only records
+    updated since the stored watermark, and store each page in its own transaction.
+
+    Returns:
+        tuple: (records synced, error message or None)
+    """
+    state = db.session.get(IGDBCatalogSyncState, endpoint)
+    if not state:
+        state = IGDBCatalogSyncState(endpoint=endpoint, last_updated_at=0)
+        db.session.add(state)
+    state.status = 'Running'
+    state.records_synced = 0
+    state.error_message = None
+    db.session.commit()
+
+    started_at = int(time.time())
+    since = state.last_updated_at or 0
+    url = igdb_endpoint_url(endpoint)
+    last_id = 0
+    synced = 0
+    max_updated_at = None
+    print(f"🔄 Syncing IGDB {endpoint} updated since {since}...")
+
+    try:
+        while True:
+            if not should_continue_processing():
+                raise RuntimeError('Sync interrupted by application shutdown')
+
+            query = f'{fields} where updated_at > {since} & id > {last_id}; sort id asc; limit {page_size};'
+            records = make_igdb_api_request(url, query)
+            if isinstance(records, dict) and 'error' in records:
+                raise RuntimeError(records['error'])
+            if not records:
+                break
+
+            store(records)
+            synced += len(records)
+            last_id = records[-1]['id']
+            updated_values = [record['updated_at'] for record in records if record.get('updated_at')]
+            if updated_values:
+                max_updated_at = max(max_updated_at or 0, max(updated_values))
+            state.records_synced = synced
+            db.session.commit()
+
+            if progress_callback:
+                progress_callback(endpoint, synced)
+            if len(records) < page_size:
+                break
+    except Exception as e:
+        db.session.rollback()
+        error_message = f"IGDB catalog sync of {endpoint} failed after {synced} records: {e}"
+        print(error_message)
+        state.status = 'Failed'
+        state.records_synced = synced
+        state.error_message = error_message[:512]
+        db.session.commit()
+        return synced, error_message
+
+    if max_updated_at:
+        state.last_updated_at = max(since, min(max_updated_at, started_at - WATERMARK_SAFETY_MARGIN))
+    state.status = 'Completed'
+    state.last_synced_at = datetime.now(timezone.utc)
+    db.session.commit()
+    print(f"✅ Synced {synced} IGDB {endpoint} records")
+    return synced, None
+
+
+def sync_igdb_catalog(page_size=CATALOG_PAGE_SIZE, progress_callback=None):
+    """
+    Pull new and changed IGDB platforms and games into the local catalog.
+    Must be called inside an app context.
+
+    Args:
+        page_size: Records requested per IGDB call (max 500)
+        progress_callback: Optional callable(endpoint, records_synced) called after each page
+
+    Returns:
+        dict: {'success': bool, 'platforms': int, 'games': int} plus 'error' on failure
+    """
+    if not _sync_lock.acquire(blocking=False):
+        return {'success': False, 'error': 'An IGDB catalog sync is already running'}
+
+    try:
+        results = {'success': True}
+        for endpoint, fields, store in (('platforms', CATALOG_PLATFORM_FIELDS, _store_platforms),
+                                        ('games', CATALOG_GAME_FIELDS, _store_games)):
+            synced, error = _sync_endpoint(endpoint, fields, store, page_size, progress_callback)
+            results[endpoint] = synced
+            if error:
+                results['success'] = False
+                results['error'] = error
+                break
+        return results
+    finally:
+        _sync_lock.release()
+
+
+def start_catalog_sync_in_background(app):
+    """Run sync_igdb_catalog on a background thread. Returns False if a sync is already running."""
+    if _sync_lock.locked():
+        return False
+
+    def run_sync():
+        with app.app_context():
+            from sharewarez.utils.event_logging import log_system_event
+            result = sync_igdb_catalog()
+            if result['success']:
+                log_system_event(
+                    f"IGDB catalog sync completed: {result.get('games', 0)} games, {result.get('platforms', 0)} platforms updated",
+                    event_type='igdb', event_level='information'
+                )
+            else:
+                log_system_event(f"IGDB catalog sync failed: {result.get('error')}"[:256],
+                                 event_type='igdb', event_level='error')
+
+    threading.Thread(target=run_sync, name='igdb-catalog-sync', daemon=True).start()
+    return True
+
+
+def get_catalog_stats():
+    """Return catalog sizes and the sync state of each endpoint for the admin UI."""
+    states = db.session.execute(select(IGDBCatalogSyncState)).scalars().all()
+    return {
+        'enabled': is_catalog_enabled(),
+        'games': db.session.execute(select(func.count()).select_from(IGDBCatalogGame)).scalar(),
+        'alternative_names': db.session.execute(select(func.count()).select_from(IGDBCatalogAlternativeName)).scalar(),
+        'platforms': db.session.execute(select(func.count()).select_from(IGDBCatalogPlatform)).scalar(),
+        'trigram_index': _has_trigram_support(),
+        'running': _sync_lock.locked(),
+        'sync_state': {
+            state.endpoint: {
+                'status': state.status,
+                'last_updated_at': state.last_updated_at,
+                'last_synced_at': state.last_synced_at.isoformat() if state.last_synced_at else None,
+                'records_synced': state.records_synced,
+                'error_message': state.error_message
+            } for state in states
+        }
+    }
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+_TRIGRAM_SEARCH_SQL = """
+    SELECT g.data,
+           GREATEST(similarity(lower(g.name), :q), word_similarity(:q, lower(g.name)),
+                    COALESCE(MAX(GREATEST(similarity(lower(a.name), :q), word_similarity(:q, lower(a.name)))), 0)) AS score
+    FROM igdb_catalog_games g
+    LEFT JOIN igdb_catalog_alternative_names a
+           ON a.game_id = g.igdb_id AND (lower(a.name) % :q OR :q <% lower(a.name))
+    WHERE (lower(g.name) % :q OR :q <% lower(g.name) OR a.id IS NOT NULL)
+    {platform_filter}
+    GROUP BY g.igdb_id, g.data
+    ORDER BY score DESC, g.igdb_id
+    LIMIT :limit
+"""
+
+_TRIGRAM_PLATFORM_FILTER = """
+    AND EXISTS (SELECT 1 FROM igdb_catalog_game_platforms p
+                WHERE p.game_id = g.igdb_id AND p.platform_id = :platform_id)
+"""
+
+
+def _search_catalog_plain(search_name, platform_id, limit):
+    """Fallback lookup when pg_trgm is unavailable: every word must appear, in order."""
+    words = [word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+             for word in search_name.lower().split()]
+    if not words:
+        return []
+    pattern = '%' + '%'.join(words) + '%'
+
+    alternative_match = exists().where(
+        IGDBCatalogAlternativeName.game_id == IGDBCatalogGame.igdb_id,
+        func.lower(IGDBCatalogAlternativeName.name).like(pattern, escape='\\')
+    )
+    stmt = select(IGDBCatalogGame.data).where(
+        or_(func.lower(IGDBCatalogGame.name).like(pattern, escape='\\'), alternative_match)
+    )
+    if platform_id is not None:
+        stmt = stmt.where(exists().where(
+            igdb_catalog_game_platforms.c.game_id == IGDBCatalogGame.igdb_id,
+            igdb_catalog_game_platforms.c.platform_id == platform_id
+        ))
+    stmt = stmt.order_by(func.length(IGDBCatalogGame.name), IGDBCatalogGame.igdb_id).limit(limit)
+    return db.session.execute(stmt).scalars().all()
+
+
+def search_catalog(search_name, platform_id=None, limit=15):
+    """
+    Fuzzy search the offline catalog by game name and alternative names.
+
+    Returns:
+        list: Game dicts in the same shape as a live IGDB candidate search, best first
+    """
+    if _has_trigram_support():
+        sql = _TRIGRAM_SEARCH_SQL.format(platform_filter=_TRIGRAM_PLATFORM_FILTER if platform_id is not None else '')
+        params = {'q': search_name.lower(), 'limit': limit}
+        if platform_id is not None:
+            params['platform_id'] = platform_id
+        rows = db.session.execute(text(sql), params).all()
+        results = [IGDBCatalogGame.data.type.process_result_value(row.data, None) for row in rows]
+    else:
+        results = _search_catalog_plain(search_name, platform_id, limit)
+    return [game for game in results if game]
+
+
+def fetch_catalog_game(igdb_id):
+    """
+    Look up a game in the offline catalog by IGDB ID.
+
+    Returns:
+        list: One game dict shaped like fetch_game_by_igdb_id's response, or None if not mirrored
+    """
+    game = db.session.get(IGDBCatalogGame, igdb_id)
+    if not game or not game.data:
+        return None
+
+    data = dict(game.data)
+    # fetch_game_by_igdb_id expands cover and screenshots into objects
+    if data.get('cover') and not isinstance(data['cover'], dict):
+        data['cover'] = {'id': data['cover']}
+    data['screenshots'] = [{'id': s} if not isinstance(s, dict) else s for s in data.get('screenshots') or []]
+    return [data]
@@ -0,0 +1,256 @@
+# File: /sharewarez/utils/igdb_usage.py
+# IGDB API usage accounting.
+# Every IGDB call made through igdb_api.py or the async client is recorded
+# with its endpoint, caller, latency and outcome. Counts are aggregated in
+# memory and periodically added to hourly rows in igdb_usage_stats, so the
+# totals are correct across worker processes. Calls made on behalf of a scan
+# are also summed per scan job and written onto the ScanJob when it finishes.
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+from flask import has_app_context, has_request_context, request
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sharewarez import db
+from sharewarez.models import IGDBUsageStat, ScanJob
+
+
+# Seconds between writes of the in-memory counters to the database
+USAGE_FLUSH_INTERVAL = 30
+
+# Hours of usage kept in igdb_usage_stats
+USAGE_RETENTION_HOURS = 24 * 14
+
+_COUNTER_FIELDS = ('calls', 'errors', 'rate_limited', 'cache_hits', 'total_latency_ms')
+
+_usage_lock = threading.Lock()
+_pending_usage = {}  # (bucket_start, endpoint, caller) -> counters
+_scan_costs = {}  # scan_job_id -> counters, with a per-endpoint breakdown
+_last_flush = time.monotonic()
+_last_prune = 0.0
+
+_caller_context = threading.local()
+
+
+def _new_counters():
+    return {'calls': 0, 'errors': 0, 'rate_limited': 0, 'cache_hits': 0,
+            'total_latency_ms': 0.0, 'max_latency_ms': 0.0}
+
+
+def _add(counters, calls=0, errors=0, rate_limited=0, cache_hits=0, latency_ms=0.0):
+    counters['calls'] += calls
+    counters['errors'] += errors
+    counters['rate_limited'] += rate_limited
+    counters['cache_hits'] += cache_hits
+    counters['total_latency_ms'] += latency_ms
+    counters['max_latency_ms'] = max(counters['max_latency_ms'], latency_ms)
+
+
+@contextmanager
+def igdb_usage_context(caller, scan_job_id=None):
+    """
+    Attribute IGDB calls made by the current thread to a caller, and
+    optionally to a scan job, for the duration of the block.
+    """
+    previous = getattr(_caller_context, 'value', None)
+    _caller_context.value = (caller, scan_job_id)
+    try:
+        yield
+    finally:
+        _caller_context.value = previous
+
+
+def current_igdb_caller():
+    """
+    Return (caller, scan_job_id) for the current thread: the innermost
+    igdb_usage_context, else the Flask endpoint handling the request, else 'background'.
+    """
+    value = getattr(_caller_context, 'value', None)
+    if value:
+        return value
+    if has_request_context():
+        return (request.endpoint or request.path, None)
+    return ('background', None)
+
+
+def endpoint_name(endpoint_url):
+    """Reduce an IGDB endpoint URL to its name, e.g. 'https://api.igdb.com/v4/games' -> 'games'."""
+    return urlparse(endpoint_url).path.rstrip('/').rsplit('/', 1)[-1] or endpoint_url
+
+
+def record_igdb_call(endpoint_url, latency, status_code=None, caller=None, scan_job_id=None):
+    """
+    Record one IGDB API request.
+
+    Args:
+        endpoint_url: IGDB endpoint URL the request was sent to
+        latency: Request duration in seconds
+        status_code: HTTP status, or None if no response was received
+        caller, scan_job_id: Attribution; defaults to current_igdb_caller()
+
+    Never raises, so recording can't change the outcome of the request.
+    """
+    # Anything but a numeric status means no usable response was received
+    received = isinstance(status_code, int)
+    errors = 0 if received and status_code < 400 else 1
+    _record(endpoint_url, caller, scan_job_id, calls=1, errors=errors,
+            rate_limited=1 if received and status_code == 429 else 0, latency_ms=latency * 1000)
+
+
+def record_igdb_cache_hit(endpoint_url, caller=None, scan_job_id=None):
+    """Record an IGDB lookup answered from a cache, the catalog or a prefetch instead of the API. Never raises."""
+    _record(endpoint_url, caller, scan_job_id, cache_hits=1)
+
+
+def _record(endpoint_url, caller, scan_job_id, latency_ms=0.0, **counts):
+    try:
+        if caller is None:
+            caller, scan_job_id = current_igdb_caller()
+        _add_usage(endpoint_name(endpoint_url), caller, scan_job_id, latency_ms, counts)
+    except Exception as e:
+        print(f"Failed to record IGDB usage for {endpoint_url}: {e}")
+
+
+def _add_usage(endpoint, caller, scan_job_id, latency_ms, counts):
+    bucket_start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    with _usage_lock:
+        _add(_pending_usage.setdefault((bucket_start, endpoint, caller[:128]), _new_counters()),
+             latency_ms=latency_ms, **counts)
+        if scan_job_id:
+            scan_cost = _scan_costs.setdefault(scan_job_id, dict(_new_counters(), by_endpoint={}))
+            _add(scan_cost, latency_ms=latency_ms, **counts)
+            _add(scan_cost['by_endpoint'].setdefault(endpoint, _new_counters()), latency_ms=latency_ms, **counts)
+        flush_due = time.monotonic() - _last_flush >= USAGE_FLUSH_INTERVAL
+
+    # Threads without an app context (e.g. the async prefetcher) leave flushing to others
+    if flush_due and has_app_context():
+        flush_igdb_usage()
+
+
+def flush_igdb_usage():
+    """
+    Add the in-memory counters to igdb_usage_stats and prune rows past the
+    retention window. Uses its own transaction so the caller's session is untouched.
+    Must be called inside an app context.
+    """
+    global _last_flush, _last_prune
+    with _usage_lock:
+        pending = dict(_pending_usage)
+        _pending_usage.clear()
+        _last_flush = time.monotonic()
+        prune_due = _last_flush - _last_prune >= 3600
+        if prune_due:
+            _last_prune = _last_flush
+
+    if not pending and not prune_due:
+        return
+
+    try:
+        with db.engine.begin() as connection:
+            if pending:
+                rows = [dict(counters, bucket_start=bucket_start, endpoint=endpoint, caller=caller)
+                        for (bucket_start, endpoint, caller), counters in pending.items()]
+                stmt = insert(IGDBUsageStat).values(rows)
+                table = IGDBUsageStat.__table__
+                updates = {field: table.c[field] + stmt.excluded[field] for field in _COUNTER_FIELDS}
+                updates['max_latency_ms'] = func.greatest(table.c.max_latency_ms, stmt.excluded.max_latency_ms)
+                connection.execute(stmt.on_conflict_do_update(constraint='uq_igdb_usage_bucket', set_=updates))
+            if prune_due:
+                cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=USAGE_RETENTION_HOURS)
+                connection.execute(delete(IGDBUsageStat).where(IGDBUsageStat.bucket_start < cutoff))
+    except Exception as e:
+        print(f"Failed to store IGDB usage statistics: {e}")
+        # Keep the counts for the next flush
+        with _usage_lock:
+            for key, counters in pending.items():
+                merged = _pending_usage.setdefault(key, _new_counters())
+                for field in _COUNTER_FIELDS:
+                    merged[field] += counters[field]
+                merged['max_latency_ms'] = max(merged['max_latency_ms'], counters['max_latency_ms'])
+
+
+def _summarize(counters):
+    calls = counters['calls']
+    return {
+        'calls': calls,
+        'errors': counters['errors'],
+        'rate_limited': counters['rate_limited'],
+        'cache_hits': counters['cache_hits'],
+        'avg_latency_ms': round(counters['total_latency_ms'] / calls, 1) if calls else 0,
+        'max_latency_ms': round(counters['max_latency_ms'], 1)
+    }
+
+
+def pop_scan_api_cost(scan_job_id):
+    """
+    Remove and return the IGDB usage recorded for a scan job.
+
+    Returns:
+        dict: Totals plus a 'by_endpoint' breakdown, or None if the scan made no IGDB lookups
+    """
+    with _usage_lock:
+        counters = _scan_costs.pop(scan_job_id, None)
+    if not counters:
+        return None
+    cost = _summarize(counters)
+    cost['by_endpoint'] = {endpoint: _summarize(c) for endpoint, c in counters['by_endpoint'].items()}
+    return cost
+
+
+def save_scan_api_cost(scan_job):
+    """Write the IGDB usage recorded for a scan onto its ScanJob. The caller commits."""
+    cost = pop_scan_api_cost(scan_job.id)
+    if cost:
+        scan_job.igdb_api_cost = cost
+        print(f"IGDB API cost for scan {scan_job.id}: {cost['calls']} calls, "
+              f"{cost['rate_limited']} rate limited, {cost['cache_hits']} cache hits")
+
+
+def get_igdb_usage_summary(hours=24):
+    """
+    Summarize IGDB usage over the last `hours` hours for the admin dashboard.
+    Must be called inside an app context.
+    """
+    flush_igdb_usage()
+    since = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0, tzinfo=None) - timedelta(hours=hours - 1)
+
+    def grouped(*columns):
+        rows = db.session.execute(
+            select(*columns,
+                   func.sum(IGDBUsageStat.calls).label('calls'),
+                   func.sum(IGDBUsageStat.errors).label('errors'),
+                   func.sum(IGDBUsageStat.rate_limited).label('rate_limited'),
+                   func.sum(IGDBUsageStat.cache_hits).label('cache_hits'),
+                   func.sum(IGDBUsageStat.total_latency_ms).label('total_latency_ms'),
+                   func.max(IGDBUsageStat.max_latency_ms).label('max_latency_ms'))
+            .where(IGDBUsageStat.bucket_start >= since)
+            .group_by(*columns)
+            .order_by(*columns)
+        ).all()
+        return [dict({column.key: getattr(row, column.key) for column in columns},
+                     **_summarize({field: row._mapping[field] or 0 for field in _COUNTER_FIELDS + ('max_latency_ms',)}))
+                for row in rows]
+
+    recent_scans = db.session.execute(
+        select(ScanJob).where(ScanJob.igdb_api_cost.isnot(None))
+        .order_by(ScanJob.last_run.desc().nullslast()).limit(10)
+    ).scalars().all()
+
+    return {
+        'hours': hours,
+        'totals': grouped()[0],
+        'by_endpoint': grouped(IGDBUsageStat.endpoint),
+        'by_caller': grouped(IGDBUsageStat.caller),
+        'hourly': grouped(IGDBUsageStat.bucket_start),
+        'recent_scans': [{
+            'id': job.id,
+            'library': job.library.name if job.library else None,
+            'last_run': job.last_run,
+            'status': job.status,
+            'total_folders': job.total_folders,
+            'cost': job.igdb_api_cost
+        } for job in recent_scans]
+    }
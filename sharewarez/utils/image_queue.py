@@ -0,0 +1,254 @@
+# File: /sharewarez/utils/image_queue.py
+# The download queue of game covers and screenshots.
+# Pending Image rows are the queue. A worker claims a batch of them with
+# SELECT ... FOR UPDATE SKIP LOCKED and leases it: the rows get a token and a
+# leased_until time, so every other worker, in this process or in another
+# one, passes them by while they download. When a worker dies or the server
+# restarts, its leases run out and the images are claimed again. Only the
+# holder of the current lease can mark an image downloaded or failed, and
+# files are written next to their final path and moved into place, so an
+# image downloaded again after its lease ran out is never half written.
+# A failed download is tried again after a backoff that doubles per attempt.
+# Images that fail IMAGE_MAX_ATTEMPTS times, or get an answer that won't
+# change (404 and the like), are dead-lettered. They stay on the image queue
+# page as failed until they are queued again from there or by a missing
+# images scan.
+
+import math
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import requests
+from flask import current_app
+from sqlalchemy import select, update, or_, func
+
+from sharewarez import db
+from sharewarez.models import Image
+
+
+# Seconds an image is leased to a worker, on top of the time its batch may take
+IMAGE_LEASE_SECONDS = 300
+
+# Seconds to wait for the image server
+IMAGE_DOWNLOAD_TIMEOUT = 30
+
+# Failed downloads before an image is dead-lettered
+IMAGE_MAX_ATTEMPTS = 5
+
+# Backoff after the first failed download, doubled after every next one
+IMAGE_RETRY_BASE_SECONDS = 60
+IMAGE_RETRY_MAX_SECONDS = 6 * 60 * 60
+
+# Images claimed at once for a single game
+GAME_IMAGE_BATCH_SIZE = 100
+
+# Answers that trying again won't change
+_PERMANENT_STATUS_CODES = {400, 401, 403, 404, 410}
+
+
+class ImageDownloadError(Exception):
+    """A download that failed, permanently if trying again won't help."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def retry_delay(attempts):
+    """Seconds to wait before downloading an image again after `attempts` failures."""
+    return min(IMAGE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), IMAGE_RETRY_MAX_SECONDS)
+
+
+def fetch_image(download_url, save_path):
+    """
+    Download an image to save_path.
+
+    Raises:
+        ImageDownloadError: the image could not be downloaded or saved
+    """
+    url = download_url if download_url.startswith(('http://', 'https://')) else 'https:' + download_url
+    url = url.replace('/t_thumb/', '/t_original/')
+
+    try:
+        response = requests.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        raise ImageDownloadError(f"Request failed: {e}") from e
+    if response.status_code != 200:
+        raise ImageDownloadError(f"HTTP {response.status_code}",
+                                 permanent=response.status_code in _PERMANENT_STATUS_CODES)
+    if not response.content:
+        raise ImageDownloadError("Empty response")
+
+    partial_path = f"{save_path}.{uuid.uuid4().hex}.part"
+    try:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        with open(partial_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(partial_path, save_path)
+    except OSError as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise ImageDownloadError(f"Could not save {save_path}: {e}") from e
+
+
+def claim_images(limit, lease_seconds=IMAGE_LEASE_SECONDS, game_uuid=None, image_ids=None):
+    """
+    Lease up to `limit` images that are due for download to the caller.
+    Images locked or leased by another worker are skipped, not waited for.
+
+    Returns:
+        tuple: (lease token, rows with id, url, download_url, image_type, game_uuid and download_attempts)
+    """
+    now = func.now()
+    due = (
+        select(Image.id)
+        .where(
+            Image.is_downloaded.is_(False),
+            Image.dead_lettered_at.is_(None),
+            Image.download_url.isnot(None),
+            or_(Image.next_attempt_at.is_(None), Image.next_attempt_at <= now),
+            or_(Image.leased_until.is_(None), Image.leased_until < now)
+        )
+        .order_by(Image.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if game_uuid:
+        due = due.where(Image.game_uuid == game_uuid)
+    if image_ids is not None:
+        due = due.where(Image.id.in_(image_ids))
+
+    token = uuid.uuid4().hex
+    claimed = db.session.execute(
+        update(Image)
+        .where(Image.id.in_(due.scalar_subquery()))
+        .values(lease_token=token, leased_until=now + timedelta(seconds=lease_seconds))
+        .returning(Image.id, Image.url, Image.download_url, Image.image_type,
+                   Image.game_uuid, Image.download_attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return token, sorted(claimed, key=lambda image: image.id)
+
+
+def complete_images(token, image_ids):
+    """Mark images downloaded, if their lease is still `token`. The caller commits."""
+    if not image_ids:
+        return 0
+    result = db.session.execute(
+        update(Image)
+        .where(Image.id.in_(image_ids), Image.lease_token == token)
+        .values(is_downloaded=True, lease_token=None, leased_until=None, next_attempt_at=None, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def fail_image(token, image, error):
+    """
+    Record a failed download of a claimed image, backing it off or dead-lettering it.
+    The caller commits.
+
+    Returns:
+        bool: whether the image was dead-lettered
+    """
+    attempts = image.download_attempts + 1
+    dead = getattr(error, 'permanent', False) or attempts >= IMAGE_MAX_ATTEMPTS
+    values = {
+        'download_attempts': attempts,
+        'lease_token': None,
+        'leased_until': None,
+        'last_error': str(error)[:500]
+    }
+    if dead:
+        values['dead_lettered_at'] = func.now()
+    else:
+        values['next_attempt_at'] = func.now() + timedelta(seconds=retry_delay(attempts))
+    db.session.execute(
+        update(Image)
+        .where(Image.id == image.id, Image.lease_token == token)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return dead
+
+
+def requeue_images(image_ids=None):
+    """Queue images again from their first attempt, all images not downloaded when no ids are given. The caller commits."""
+    query = update(Image).where(Image.is_downloaded.is_(False))
+    if image_ids is not None:
+        query = query.where(Image.id.in_(image_ids))
+    result = db.session.execute(
+        query.values(download_attempts=0, next_attempt_at=None, last_error=None, dead_lettered_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _download_claimed(image, image_folder):
+    try:
+        fetch_image(image.download_url, os.path.join(image_folder, image.url))
+        return None
+    except Exception as e:
+        return e
+
+
+def process_image_queue(batch_size=20, max_workers=1, delay_between_downloads=0, game_uuid=None, image_ids=None):
+    """
+    Claim a batch of due images and download them, in the current app context.
+
+    Args:
+        max_workers: parallel downloads, 1 downloads one by one with delay_between_downloads in between
+        game_uuid: only download the images of this game
+        image_ids: only download these images
+
+    Returns:
+        dict: claimed, downloaded, failed and dead_lettered counts and a message
+    """
+    rounds = math.ceil(batch_size / max_workers)
+    lease_seconds = IMAGE_LEASE_SECONDS + rounds * (IMAGE_DOWNLOAD_TIMEOUT + delay_between_downloads)
+    token, claimed = claim_images(batch_size, lease_seconds, game_uuid=game_uuid, image_ids=image_ids)
+    if not claimed:
+        return {'claimed': 0, 'downloaded': 0, 'failed': 0, 'dead_lettered': 0, 'message': 'No pending images'}
+
+    image_folder = current_app.config['IMAGE_SAVE_PATH']
+    errors = {}
+    if max_workers == 1:
+        for index, image in enumerate(claimed):
+            if index and delay_between_downloads > 0:
+                time.sleep(delay_between_downloads)
+            errors[image.id] = _download_claimed(image, image_folder)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_download_claimed, image, image_folder): image for image in claimed}
+            for future in as_completed(futures):
+                errors[futures[future].id] = future.result()
+
+    failed = 0
+    dead_lettered = 0
+    for image in claimed:
+        error = errors[image.id]
+        if error is None:
+            continue
+        failed += 1
+        if fail_image(token, image, error):
+            dead_lettered += 1
+            print(f"⛔ Giving up on image {image.id} after {image.download_attempts + 1} attempts: {error}")
+        else:
+            print(f"❌ Failed to download image {image.id}: {error}")
+    downloaded = complete_images(token, [image.id for image in claimed if errors[image.id] is None])
+    db.session.commit()
+
+    message = f"🚀 Downloaded {downloaded} images"
+    if failed:
+        message += f" ({failed} failed, {dead_lettered} given up)"
+    return {
+        'claimed': len(claimed),
+        'downloaded': downloaded,
+        'failed': failed,
+        'dead_lettered': dead_lettered,
+        'message': message
+    }
@@ -0,0 +1,367 @@
+# File: /sharewarez/utils/library_watcher.py
+# Optional library watcher.
+# Watches the folders of scanned libraries and feeds new or changed game
+# folders (or files, for file-mode libraries) into the normal scan pipeline
+# as soon as they have stopped changing, so new releases show up without a
+# full scan. Local folders are watched with inotify through watchfiles; network
+# mounts, and all folders when watchfiles is not installed, are polled with the
+# shallow fingerprints used by incremental scans. One process across all
+# workers runs the watcher, guarded by a Postgres advisory lock.
+
+import os
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from sharewarez import db
+from sharewarez.models import Game, UnmatchedFolder, ScanJob, GlobalSettings, AllowedFileType
+from sharewarez.utils.db import try_advisory_lock, release_advisory_lock
+from sharewarez.utils.functions import load_scanning_filter_patterns
+from sharewarez.utils.gamenames import clean_game_name
+from sharewarez.utils.scanning import (
+    process_game_with_fallback, process_game_updates, process_game_extras, is_scan_job_running, build_scan_settings
+)
+from sharewarez.utils.scan_snapshot import take_snapshot, fingerprint_path, upsert_snapshot_entries
+from sharewarez.utils.shutdown import should_continue_processing, sleep_interruptible
+
+try:
+    import watchfiles
+    WATCHFILES_AVAILABLE = True
+except ImportError:
+    WATCHFILES_AVAILABLE = False
+
+
+WATCHER_LOCK_NAME = 'sharewarez.library_watcher'
+
+# Seconds between checks of the watcher settings, watched folders and lock while idle
+WATCHER_REFRESH_INTERVAL = 60
+
+# Seconds between polls of folders that can't be watched with inotify
+WATCHER_POLL_INTERVAL = 60
+
+# Seconds between passes over the debounced changes
+WATCHER_TICK = 2
+
+# Filesystem types where inotify doesn't see changes made by other machines
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afpfs', 'davfs', 'ncpfs',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs', 'fuse.glusterfs', 'ceph', 'glusterfs'
+}
+
+
+def is_network_mount(path, mounts_file='/proc/mounts'):
+    """Return True if `path` lives on a network filesystem. Unknown platforms count as local."""
+    try:
+        with open(mounts_file) as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+
+    path = os.path.realpath(path)
+    best_match, best_type = '', None
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best_match):
+            best_match, best_type = mount_point, fs_type
+    return best_type in NETWORK_FILESYSTEMS
+
+
+def get_watch_roots():
+    """
+    Return the folders to watch, taken from the scan jobs of each library.
+    The latest job for a folder decides its library and scan mode. Must be called inside an app context.
+
+    Returns:
+        list: dicts with 'folder', 'library_uuid' and 'scan_mode'
+    """
+    base_dir = current_app.config.get('BASE_FOLDER_WINDOWS') if os.name == 'nt' else current_app.config.get('BASE_FOLDER_POSIX')
+    jobs = db.session.execute(
+        select(ScanJob.scan_folder, ScanJob.library_uuid, ScanJob.setting_filefolder)
+        .where(ScanJob.scan_folder.isnot(None), ScanJob.library_uuid.isnot(None))
+        .order_by(ScanJob.last_run.desc().nullslast())
+    ).all()
+
+    roots = {}
+    for scan_folder, library_uuid, file_mode in jobs:
+        folder = os.path.realpath(os.path.join(base_dir or '', scan_folder))
+        if folder not in roots and os.path.isdir(folder):
+            roots[folder] = {'folder': folder, 'library_uuid': library_uuid, 'scan_mode': 'files' if file_mode else 'folders'}
+    return sorted(roots.values(), key=lambda root: root['folder'])
+
+
+def affected_entry(root_folder, changed_path):
+    """Map a changed path to the game folder or file directly under the root, or None for the root itself."""
+    relative = os.path.relpath(changed_path, root_folder)
+    if relative == '.' or relative.startswith('..'):
+        return None
+    return os.path.join(root_folder, relative.split(os.sep, 1)[0])
+
+
+def list_root_entries(root):
+    """List the game folders (or files) directly under a watched root."""
+    entries = []
+    try:
+        with os.scandir(root['folder']) as items:
+            for item in items:
+                if (root['scan_mode'] == 'files' and item.is_file()) or (root['scan_mode'] == 'folders' and item.is_dir()):
+                    entries.append(item.path)
+    except OSError as e:
+        print(f"Could not list watched folder {root['folder']}: {e}")
+    return entries
+
+
+class ChangeDebouncer:
+    """
+    Collects changed entries and releases each one only after it has been quiet
+    for `quiet_seconds`, so folders still being copied are not processed half-way.
+    """
+    def __init__(self, quiet_seconds=30):
+        self.quiet_seconds = quiet_seconds
+        self._pending = {}  # entry path -> (root, time of last change)
+        self._lock = threading.Lock()
+
+    def add(self, entry_path, root, now=None):
+        with self._lock:
+            self._pending[entry_path] = (root, time.monotonic() if now is None else now)
+
+    def pop_ready(self, now=None):
+        """Remove and return (entry_path, root) for entries quiet long enough."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            ready = [(path, root) for path, (root, changed_at) in self._pending.items()
+                     if now - changed_at >= self.quiet_seconds]
+            for path, _ in ready:
+                del self._pending[path]
+        return ready
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def process_watched_entry(entry_path, root, settings_obj=None, patterns=None, allowed_extensions=None):
+    """
+    Add or refresh a single game folder or file that changed under a watched root.
+    Must be called inside an app context.
+
+    Returns:
+        str: 'added', 'unmatched', 'updated', 'skipped' or 'removed'
+    """
+    if not os.path.exists(entry_path):
+        # Removals are left to scans with "remove missing games", which also handle renames
+        print(f"Watched entry removed: {entry_path}")
+        return 'removed'
+
+    if settings_obj is None:
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    insensitive_patterns, sensitive_patterns = patterns or load_scanning_filter_patterns()
+    library_uuid = root['library_uuid']
+    entry_name = os.path.basename(entry_path)
+
+    if root['scan_mode'] == 'files':
+        if allowed_extensions is None:
+            allowed_extensions = [ext.value.lower() for ext in db.session.execute(select(AllowedFileType)).scalars().all()]
+        if not os.path.isfile(entry_path) or entry_name.split('.')[-1].lower() not in allowed_extensions:
+            return 'skipped'
+        game_name = clean_game_name('.'.join(entry_name.split('.')[:-1]), insensitive_patterns, sensitive_patterns)
+    else:
+        if not os.path.isdir(entry_path):
+            return 'skipped'
+        game_name = clean_game_name(entry_name, insensitive_patterns, sensitive_patterns)
+
+    game = db.session.execute(select(Game).filter_by(full_disk_path=entry_path, library_uuid=library_uuid)).scalars().first()
+    if game:
+        result = 'updated'
+    elif db.session.execute(select(UnmatchedFolder.id).filter_by(folder_path=entry_path)).first():
+        print(f"Watched entry is already logged as unmatched: {entry_path}")
+        result = 'skipped'
+    else:
+        print(f"👀 Library watcher found new entry: {game_name} at {entry_path}")
+        added = process_game_with_fallback(game_name, entry_path, None, library_uuid, settings=build_scan_settings(settings_obj))
+        result = 'added' if added else 'unmatched'
+
+    if result in ('added', 'updated') and root['scan_mode'] == 'folders' and settings_obj:
+        if settings_obj.enable_game_updates:
+            updates_folder = os.path.join(entry_path, settings_obj.update_folder_name)
+            if os.path.isdir(updates_folder):
+                process_game_updates(game_name, entry_path, updates_folder, library_uuid, settings_obj.update_folder_name)
+        if settings_obj.enable_game_extras:
+            extras_folder = os.path.join(entry_path, settings_obj.extras_folder_name)
+            if os.path.isdir(extras_folder):
+                process_game_extras(game_name, entry_path, extras_folder, library_uuid, settings_obj.extras_folder_name)
+
+    # Keep the snapshot current so the next incremental scan skips this entry
+    fingerprint = fingerprint_path(entry_path, root['scan_mode'])
+    if fingerprint:
+        upsert_snapshot_entries(library_uuid, root['folder'], {entry_path: fingerprint})
+        db.session.commit()
+    return result
+
+
+class LibraryWatcher:
+    """
+    Watches library folders while enabled in the settings and this process
+    holds the watcher lock. Run with run(), normally on a daemon thread.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.debouncer = ChangeDebouncer()
+        self._roots = []
+        self._polled_roots = []
+        self._poll_state = {}  # folder -> {'snapshot': ..., 'polled_at': ...}
+        self._watch_thread = None
+        self._watch_stop = None
+        self._watch_failed = False
+
+    def _read_settings(self):
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+        enabled = bool(settings_obj and settings_obj.enable_library_watcher)
+        debounce = (settings_obj.library_watcher_debounce if settings_obj else None) or 30
+        return enabled, debounce
+
+    def run(self):
+        """Run until shutdown, watching whenever the watcher is enabled and the lock can be taken."""
+        while should_continue_processing():
+            with self.app.app_context():
+                enabled, _ = self._read_settings()
+                if not enabled:
+                    db.session.remove()
+                    sleep_interruptible(WATCHER_REFRESH_INTERVAL)
+                    continue
+
+                connection = db.engine.connect()
+                try:
+                    if not try_advisory_lock(connection, WATCHER_LOCK_NAME):
+                        # Another worker is watching; take over if it goes away
+                        connection.rollback()
+                        sleep_interruptible(WATCHER_REFRESH_INTERVAL)
+                        continue
+                    connection.commit()
+                    print("👀 Library watcher started")
+                    try:
+                        self._watch()
+                    finally:
+                        self._stop_watch_thread()
+                        release_advisory_lock(connection, WATCHER_LOCK_NAME)
+                        connection.commit()
+                        print("👀 Library watcher stopped")
+                finally:
+                    connection.close()
+                    db.session.remove()
+
+    def _watch(self):
+        last_refresh = None
+        while should_continue_processing():
+            if last_refresh is None or time.monotonic() - last_refresh >= WATCHER_REFRESH_INTERVAL:
+                last_refresh = time.monotonic()
+                enabled, debounce = self._read_settings()
+                if not enabled:
+                    return
+                self.debouncer.quiet_seconds = debounce
+                self.set_roots(get_watch_roots())
+                db.session.commit()
+
+            if self._watch_failed:
+                print("inotify watch failed, polling all library folders instead")
+                self._watch_failed = False
+                self._polled_roots = list(self._roots)
+
+            self.poll_roots()
+            self.process_ready()
+            sleep_interruptible(WATCHER_TICK)
+
+    def set_roots(self, roots):
+        """Start watching `roots`, restarting the inotify thread if the set changed."""
+        if roots == self._roots:
+            return
+        self._stop_watch_thread()
+        self._roots = roots
+        if WATCHFILES_AVAILABLE:
+            native_roots = [root for root in roots if not is_network_mount(root['folder'])]
+        else:
+            native_roots = []
+        self._polled_roots = [root for root in roots if root not in native_roots]
+        self._poll_state = {folder: state for folder, state in self._poll_state.items()
+                            if any(root['folder'] == folder for root in self._polled_roots)}
+
+        print(f"Watching {len(native_roots)} library folders with inotify and polling {len(self._polled_roots)}")
+        if native_roots:
+            self._watch_stop = threading.Event()
+            self._watch_thread = threading.Thread(target=self._watch_native, args=(native_roots, self._watch_stop), daemon=True)
+            self._watch_thread.start()
+
+    def _stop_watch_thread(self):
+        if self._watch_thread:
+            self._watch_stop.set()
+            self._watch_thread.join(timeout=10)
+            self._watch_thread = None
+
+    def _watch_native(self, roots, stop_event):
+        try:
+            for changes in watchfiles.watch(*[root['folder'] for root in roots], stop_event=stop_event,
+                                            debounce=1000, raise_interrupt=False):
+                for _change, changed_path in changes:
+                    self.record_change(changed_path, roots)
+        except Exception as e:
+            print(f"Library watcher inotify error: {e}")
+            if not stop_event.is_set():
+                self._watch_failed = True
+
+    def record_change(self, changed_path, roots=None):
+        """Queue the game entry containing `changed_path`."""
+        for root in roots or self._roots:
+            entry = affected_entry(root['folder'], changed_path)
+            if entry:
+                self.debouncer.add(entry, root)
+                return entry
+        return None
+
+    def poll_roots(self, now=None):
+        """Fingerprint polled roots that are due and queue entries that changed since the previous poll."""
+        now = time.monotonic() if now is None else now
+        for root in self._polled_roots:
+            state = self._poll_state.get(root['folder'])
+            if state and now - state['polled_at'] < WATCHER_POLL_INTERVAL:
+                continue
+            snapshot = take_snapshot(list_root_entries(root), root['scan_mode'])
+            if state:
+                for path, fingerprint in snapshot.items():
+                    if state['snapshot'].get(path) != fingerprint:
+                        self.debouncer.add(path, root, now)
+            self._poll_state[root['folder']] = {'snapshot': snapshot, 'polled_at': now}
+
+    def process_ready(self, now=None):
+        """Process debounced entries, deferring them while a scan is running. Returns the number processed."""
+        ready = self.debouncer.pop_ready(now)
+        if not ready:
+            return 0
+        if is_scan_job_running():
+            for path, root in ready:
+                self.debouncer.add(path, root)
+            return 0
+
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+        patterns = load_scanning_filter_patterns()
+        allowed_extensions = [ext.value.lower() for ext in db.session.execute(select(AllowedFileType)).scalars().all()]
+        for path, root in ready:
+            if not should_continue_processing():
+                break
+            try:
+                process_watched_entry(path, root, settings_obj, patterns, allowed_extensions)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Library watcher failed to process {path}: {e}")
+        return len(ready)
+
+
+def start_library_watcher_service():
+    """
+    Start the library watcher on a daemon thread. The thread creates its own app
+    and stays idle until the watcher is enabled in the server settings.
+    """
+    def run():
+        from sharewarez import create_app
+        LibraryWatcher(create_app()).run()
+
+    thread = threading.Thread(target=run, name='library-watcher', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,199 @@
+# File: /sharewarez/utils/local_index.py
+# Sidecar index of local metadata files and local images.
+# With use_local_metadata or use_local_images enabled, every game folder may
+# carry a metadata file (sharewarez.json) and cover/screenshot images. Looking
+# for them costs an open and parse plus up to ~200 stat calls per folder, which
+# the library browser used to pay for every game on every page. Scans now read
+# them once per folder, in parallel, and store the result in
+# local_metadata_index with the folder's snapshot fingerprint. A folder whose
+# fingerprint has not changed since it was indexed is not read again, and pages
+# and scan discovery look the entry up instead of going to the disk. Folders
+# without an entry (e.g. added by the library watcher) fall back to the
+# filesystem helpers in utils/local_metadata.py.
+
+import os
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sharewarez import db
+from sharewarez.models import LocalMetadataIndexEntry
+from sharewarez.utils.bounded_executor import bounded_map
+from sharewarez.utils.local_metadata import (
+    load_metadata_file, LOCAL_COVER_FILENAMES, LOCAL_SCREENSHOT_NUMBERS, LOCAL_SCREENSHOT_EXTENSIONS
+)
+
+
+# Folders read at once; reads on network shares are latency bound
+LOCAL_INDEX_WORKERS = 8
+
+# Rows per INSERT or lookup
+LOCAL_INDEX_BATCH_SIZE = 1000
+
+_SIDECAR_FIELDS = ('metadata_filename', 'local_metadata', 'igdb_id', 'cover_file', 'screenshot_files')
+
+
+def local_index_enabled(settings):
+    """Whether scans keep the index, from a scan settings dict."""
+    return bool(settings and (settings.get('use_local_metadata') or settings.get('use_local_images')))
+
+
+def read_folder_sidecars(folder_path, metadata_filename='sharewarez.json'):
+    """
+    Read the local metadata file and list the local images of a folder with a single directory listing.
+
+    Returns:
+        dict: metadata_filename, local_metadata, igdb_id, cover_file and screenshot_files,
+        or None if the folder cannot be read
+    """
+    try:
+        with os.scandir(folder_path) as entries:
+            file_names = {entry.name for entry in entries if entry.is_file()}
+    except OSError as e:
+        print(f"Could not index local metadata of {folder_path}: {e}")
+        return None
+
+    local_metadata = None
+    if metadata_filename in file_names:
+        try:
+            local_metadata = load_metadata_file(os.path.join(folder_path, metadata_filename))
+        except OSError as e:
+            print(f"Could not read {metadata_filename} in {folder_path}: {e}")
+
+    cover_file = next((name for name in LOCAL_COVER_FILENAMES if name in file_names), None)
+    screenshot_files = []
+    for number in LOCAL_SCREENSHOT_NUMBERS:
+        for extension in LOCAL_SCREENSHOT_EXTENSIONS:
+            name = f'screenshot-{number}{extension}'
+            if name in file_names:
+                screenshot_files.append(name)
+                break
+
+    igdb_id = local_metadata.get('igdb_id') if local_metadata else None
+    return {
+        'metadata_filename': metadata_filename,
+        'local_metadata': local_metadata,
+        'igdb_id': igdb_id if isinstance(igdb_id, int) else None,
+        'cover_file': cover_file,
+        'screenshot_files': screenshot_files
+    }
+
+
+def _entry_dict(row):
+    return {field: getattr(row, field) for field in _SIDECAR_FIELDS}
+
+
+def refresh_local_index(library_uuid, scan_folder, snapshot, metadata_filename='sharewarez.json',
+                        max_workers=LOCAL_INDEX_WORKERS):
+    """
+    Bring the index of a scanned library folder up to date with its current snapshot.
+    Folders that are new, have a different fingerprint or were indexed for another
+    metadata filename are read again; entries of folders that are gone are removed.
+    Commits.
+
+    Args:
+        snapshot: dict of folder path -> fingerprint from scan_snapshot.take_snapshot
+
+    Returns:
+        dict: folder path -> index entry dict, for every folder of the snapshot that could be read
+    """
+    stored = {
+        row.folder_path: row for row in db.session.execute(
+            select(LocalMetadataIndexEntry).filter_by(library_uuid=library_uuid, scan_folder=scan_folder)
+        ).scalars()
+    }
+    index = {}
+    stale = []
+    for path, fingerprint in snapshot.items():
+        row = stored.get(path)
+        if (row is not None and row.mtime == fingerprint['mtime'] and row.file_count == fingerprint['file_count']
+                and row.metadata_filename == metadata_filename):
+            index[path] = _entry_dict(row)
+        else:
+            stale.append(path)
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for path, sidecars in bounded_map(lambda path: read_folder_sidecars(path, metadata_filename), stale, max_workers):
+        if sidecars is None:
+            continue
+        index[path] = sidecars
+        rows.append(dict(sidecars, library_uuid=library_uuid, scan_folder=scan_folder, folder_path=path,
+                         mtime=snapshot[path]['mtime'], file_count=snapshot[path]['file_count'], indexed_at=now))
+    for start in range(0, len(rows), LOCAL_INDEX_BATCH_SIZE):
+        stmt = insert(LocalMetadataIndexEntry).values(rows[start:start + LOCAL_INDEX_BATCH_SIZE])
+        db.session.execute(stmt.on_conflict_do_update(
+            constraint='uq_local_metadata_index_path',
+            set_={column: stmt.excluded[column]
+                  for column in _SIDECAR_FIELDS + ('scan_folder', 'mtime', 'file_count', 'indexed_at')}
+        ))
+
+    removed = [path for path in stored if path not in snapshot]
+    for start in range(0, len(removed), LOCAL_INDEX_BATCH_SIZE):
+        db.session.execute(
+            delete(LocalMetadataIndexEntry)
+            .where(LocalMetadataIndexEntry.library_uuid == library_uuid,
+                   LocalMetadataIndexEntry.folder_path.in_(removed[start:start + LOCAL_INDEX_BATCH_SIZE]))
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    print(f"📇 Local metadata index: {len(rows)} folders read, {len(snapshot) - len(stale)} unchanged, "
+          f"{len(removed)} removed")
+    return index
+
+
+def get_local_index_entries(folders):
+    """
+    Look up indexed folders.
+
+    Args:
+        folders: iterable of (library_uuid, folder_path)
+
+    Returns:
+        dict: (library_uuid, folder_path) -> index entry dict, leaving out folders that are not indexed
+    """
+    folders = list(set(folders))
+    entries = {}
+    for start in range(0, len(folders), LOCAL_INDEX_BATCH_SIZE):
+        rows = db.session.execute(
+            select(LocalMetadataIndexEntry).where(
+                tuple_(LocalMetadataIndexEntry.library_uuid, LocalMetadataIndexEntry.folder_path)
+                .in_(folders[start:start + LOCAL_INDEX_BATCH_SIZE])
+            )
+        ).scalars()
+        entries.update({(row.library_uuid, row.folder_path): _entry_dict(row) for row in rows})
+    return entries
+
+
+def get_local_index_entry(library_uuid, folder_path):
+    """Index entry dict of one folder, or None if it is not indexed."""
+    return get_local_index_entries([(library_uuid, folder_path)]).get((library_uuid, folder_path))
+
+
+def has_local_override(entry, settings):
+    """Whether an indexed folder overrides IGDB data with its local metadata file or images."""
+    if settings.use_local_metadata and entry['local_metadata'] is not None:
+        return True
+    return bool(settings.use_local_images and (entry['cover_file'] or entry['screenshot_files']))
+
+
+def record_local_metadata(full_disk_path, metadata, filename):
+    """
+    Store a metadata file that was just written in the folder's index entries and mark
+    them to be read again on the next scan. Commits.
+    """
+    igdb_id = metadata.get('igdb_id')
+    try:
+        rows = db.session.execute(
+            select(LocalMetadataIndexEntry).filter_by(folder_path=full_disk_path)
+        ).scalars().all()
+        for row in rows:
+            row.metadata_filename = filename
+            row.local_metadata = metadata
+            row.igdb_id = igdb_id if isinstance(igdb_id, int) else None
+            row.mtime = None
+        if rows:
+            db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
@@ -12,6 +12,13 @@ from sharewarez.utils.functions import sanitize_string_input
 
 logger = logging.getLogger(__name__)
 
+# Local cover filenames in priority order
+LOCAL_COVER_FILENAMES = ('cover.jpg', 'cover.png', 'folder.jpg', 'folder.png')
+
+# Local screenshots are screenshot-1 to screenshot-99, .jpg preferred over .png
+LOCAL_SCREENSHOT_NUMBERS = range(1, 100)
+LOCAL_SCREENSHOT_EXTENSIONS = ('.jpg', '.png')
+
 
 def read_local_metadata(full_disk_path, filename='sharewarez.json'):
     """
@@ -59,29 +66,39 @@ def read_local_metadata(full_disk_path, filename='sharewarez.json'):
         if not os.path.exists(metadata_path):
             return None
 
-        # Read and parse JSON
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+        return load_metadata_file(metadata_path)
 
-        # Validate required fields
-        if not isinstance(metadata, dict):
-            logger.warning(f"Invalid metadata format in {metadata_path}: not a dict")
-            return None
+    except Exception as e:
+        logger.error(f"Error reading local metadata from {full_disk_path}: {e}")
+        return None
 
-        if 'igdb_id' not in metadata:
-            logger.warning(f"Invalid metadata in {metadata_path}: missing igdb_id")
-            return None
 
-        logger.info(f"✅ Found local metadata: IGDB ID {metadata['igdb_id']} in {metadata_path}")
-        return metadata
+def load_metadata_file(metadata_path):
+    """
+    Parse and validate a local metadata file, without the path checks of read_local_metadata.
 
+    Returns:
+        dict or None: Metadata dict with an 'igdb_id', or None if the file is invalid
+    """
+    try:
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON in {metadata_path}: {e}")
         return None
-    except Exception as e:
-        logger.error(f"Error reading local metadata from {full_disk_path}: {e}")
+
+    # Validate required fields
+    if not isinstance(metadata, dict):
+        logger.warning(f"Invalid metadata format in {metadata_path}: not a dict")
+        return None
+
+    if 'igdb_id' not in metadata:
+        logger.warning(f"Invalid metadata in {metadata_path}: missing igdb_id")
         return None
 
+    logger.info(f"✅ Found local metadata: IGDB ID {metadata['igdb_id']} in {metadata_path}")
+    return metadata
+
 
 def write_local_metadata(full_disk_path, igdb_id, game_title=None, manually_verified=False,
                          filename='sharewarez.json'):
@@ -155,6 +172,13 @@ def write_local_metadata(full_disk_path, igdb_id, game_title=None, manually_veri
             logger.error(f"🚫 [LOCAL METADATA] File was not created at: {metadata_path}")
             return False
 
+        # Keep the sidecar index in step, so pages see the new file before the next scan
+        try:
+            from sharewarez.utils.local_index import record_local_metadata
+            record_local_metadata(full_disk_path, metadata, filename)
+        except Exception as e:
+            logger.warning(f"⚠️ [LOCAL METADATA] Could not update the local metadata index for {full_disk_path}: {e}")
+
         return True
 
     except PermissionError as e:
@@ -228,9 +252,7 @@ def get_local_cover_path(full_disk_path):
             return None
 
         # Check each filename in priority order
-        cover_filenames = ['cover.jpg', 'cover.png', 'folder.jpg', 'folder.png']
-
-        for filename in cover_filenames:
+        for filename in LOCAL_COVER_FILENAMES:
             cover_path = os.path.join(full_disk_path, filename)
             if os.path.exists(cover_path) and os.path.isfile(cover_path):
                 logger.info(f"📷 Found local cover: {cover_path}")
@@ -264,8 +286,8 @@ def get_local_screenshots(full_disk_path):
         screenshots = []
 
         # Check for numbered screenshots (screenshot-1.jpg through screenshot-99.jpg)
-        for i in range(1, 100):
-            for ext in ['.jpg', '.png']:
+        for i in LOCAL_SCREENSHOT_NUMBERS:
+            for ext in LOCAL_SCREENSHOT_EXTENSIONS:
                 filename = f'screenshot-{i}{ext}'
                 screenshot_path = os.path.join(full_disk_path, filename)
                 if os.path.exists(screenshot_path) and os.path.isfile(screenshot_path):
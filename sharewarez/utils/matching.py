@@ -0,0 +1,261 @@
+# File: /sharewarez/utils/matching.py
+# Local ranking of IGDB search candidates for scanned folder names.
+# One wide IGDB search returns several candidates with their alternative names
+# and release years; they are scored here against the folder name, its GOTY
+# variants and its shorter fallback names instead of trusting IGDB's top hit.
+
+import re
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from sharewarez.utils.gamenames import generate_goty_variants
+
+
+# Candidates scoring below this are not accepted as a match
+MATCH_CONFIDENCE_THRESHOLD = 0.7
+
+# Number of candidates requested from IGDB per search
+MATCH_CANDIDATE_LIMIT = 15
+
+# Extra IGDB searches allowed per folder when the first candidate set has no acceptable match
+MATCH_MAX_FALLBACK_SEARCHES = 2
+
+# Score adjustments applied on top of the name similarity
+PLATFORM_MATCH_BONUS = 0.05
+PLATFORM_MISMATCH_PENALTY = 0.1
+YEAR_MATCH_BONUS = 0.05
+YEAR_MISMATCH_PENALTY = 0.05
+FALLBACK_NAME_PENALTY = 0.05  # per word dropped from the folder name
+TOP_RESULT_BONUS = 0.02  # IGDB relevance order as a tie breaker
+
+ROMAN_NUMERALS = {
+    'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8',
+    'ix': '9', 'x': '10', 'xi': '11', 'xii': '12', 'xiii': '13', 'xiv': '14', 'xv': '15'
+}
+
+YEAR_PATTERN = re.compile(r'\b(19[7-9]\d|20[0-4]\d)\b')
+
+
+def normalize_title(title):
+    """
+    Normalize a game title for comparison: lowercase, punctuation removed,
+    '&' spelled out, roman numerals as digits and a leading 'the' dropped.
+    """
+    title = title.lower().replace('&', ' and ')
+    title = re.sub(r"['’]", '', title)
+    title = re.sub(r'[^a-z0-9]+', ' ', title)
+    words = [ROMAN_NUMERALS.get(word, word) for word in title.split()]
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    return ' '.join(words)
+
+
+def title_similarity(first, second):
+    """
+    Return a similarity score between 0 and 1 for two titles.
+    Combines character level similarity with word overlap, and rates a title
+    whose words are all contained in the other (e.g. 'Witcher 3' and
+    'The Witcher 3: Wild Hunt') as a strong match.
+    """
+    first_norm = normalize_title(first)
+    second_norm = normalize_title(second)
+    if not first_norm or not second_norm:
+        return 0.0
+    if first_norm == second_norm:
+        return 1.0
+
+    ratio = SequenceMatcher(None, first_norm, second_norm).ratio()
+    first_words = set(first_norm.split())
+    second_words = set(second_norm.split())
+    common = first_words & second_words
+    dice = 2 * len(common) / (len(first_words) + len(second_words))
+    score = max(ratio, dice)
+
+    if common and (common == first_words or common == second_words):
+        score = max(score, 0.75 + 0.25 * dice)
+    return score
+
+
+def extract_year(name):
+    """
+    Split a release year out of a folder name.
+
+    Returns:
+        tuple: (name without the year, year as int or None)
+    """
+    match = YEAR_PATTERN.search(name)
+    if not match:
+        return name, None
+    stripped = (name[:match.start()] + name[match.end():]).strip()
+    stripped = re.sub(r'\(\s*\)|\[\s*\]', '', stripped)
+    stripped = re.sub(r'\s+', ' ', stripped).strip()
+    if not stripped:
+        # The year is the whole name (e.g. '1942'), so it is not a hint
+        return name, None
+    return stripped, int(match.group(1))
+
+
+def candidate_years(candidate):
+    """Collect every release year known for an IGDB candidate."""
+    years = set()
+    if candidate.get('first_release_date'):
+        years.add(datetime.fromtimestamp(candidate['first_release_date'], timezone.utc).year)
+    for release in candidate.get('release_dates') or []:
+        if release.get('y'):
+            years.add(release['y'])
+        elif release.get('date'):
+            years.add(datetime.fromtimestamp(release['date'], timezone.utc).year)
+    return years
+
+
+def candidate_names(candidate):
+    """Return the main name and all alternative names of an IGDB candidate."""
+    names = [candidate.get('name') or '']
+    for alternative in candidate.get('alternative_names') or []:
+        if isinstance(alternative, dict) and alternative.get('name'):
+            names.append(alternative['name'])
+    return names
+
+
+def build_name_variants(game_name):
+    """
+    Build the names a folder may be matched under, with the number of words
+    dropped from the original name for each.
+
+    Includes the GOTY variants from gamenames.py, 'Game of the Year Edition'
+    spelled out, and progressively shorter prefixes of the name.
+
+    Returns:
+        list: (name, dropped_words) tuples, best candidates first
+    """
+    variants = []
+    seen = set()
+
+    def add(name, dropped):
+        key = normalize_title(name)
+        if key and key not in seen:
+            seen.add(key)
+            variants.append((name, dropped))
+
+    for variant in generate_goty_variants(game_name):
+        add(variant, 0)
+    if 'GOTY' in game_name:
+        add(game_name.replace('GOTY', 'Game of the Year Edition'), 0)
+
+    parts = game_name.split()
+    for i in range(len(parts) - 1, 0, -1):
+        prefix = ' '.join(parts[:i])
+        # Very short prefixes ('The', 'Ys') match far too many titles to be meaningful
+        if len(normalize_title(prefix)) >= 4:
+            add(prefix, len(parts) - i)
+    return variants
+
+
+def score_candidate(candidate, name_variants, platform_id=None, year=None, rank=0):
+    """
+    Score one IGDB candidate against a folder's name variants.
+
+    Args:
+        candidate: IGDB game dict (name, alternative_names, platforms, release years)
+        name_variants: Output of build_name_variants
+        platform_id: IGDB platform ID of the library, used as a hint
+        year: Release year found in the folder name, used as a hint
+        rank: Position of the candidate in IGDB's own results
+
+    Returns:
+        tuple: (score, matched_name). The score is not clamped so that bonuses
+        still separate two exact name matches.
+    """
+    best_score = 0.0
+    matched_name = None
+    for variant, dropped in name_variants:
+        for name in candidate_names(candidate):
+            similarity = title_similarity(variant, name) - FALLBACK_NAME_PENALTY * dropped
+            if similarity > best_score:
+                best_score = similarity
+                matched_name = variant
+
+    platforms = candidate.get('platforms') or []
+    if platform_id is not None and platforms:
+        platform_ids = {p.get('id') for p in platforms if isinstance(p, dict)}
+        if platform_id in platform_ids:
+            best_score += PLATFORM_MATCH_BONUS
+        elif platform_ids - {None}:
+            best_score -= PLATFORM_MISMATCH_PENALTY
+
+    if year is not None:
+        years = candidate_years(candidate)
+        if year in years:
+            best_score += YEAR_MATCH_BONUS
+        elif years:
+            best_score -= YEAR_MISMATCH_PENALTY
+
+    if rank == 0:
+        best_score += TOP_RESULT_BONUS
+
+    return best_score, matched_name
+
+
+def rank_candidates(candidates, game_name, platform_id=None):
+    """
+    Rank IGDB candidates for a folder name.
+
+    Returns:
+        list: Dicts with 'game', 'confidence' and 'matched_name', best first
+    """
+    base_name, year = extract_year(game_name)
+    name_variants = build_name_variants(base_name)
+    if base_name != game_name:
+        name_variants.insert(0, (game_name, 0))
+
+    ranked = []
+    seen_ids = set()
+    for rank, candidate in enumerate(candidates or []):
+        if not isinstance(candidate, dict) or candidate.get('id') in seen_ids:
+            continue
+        seen_ids.add(candidate.get('id'))
+        score, matched_name = score_candidate(candidate, name_variants, platform_id, year, rank)
+        ranked.append((score, {
+            'game': candidate,
+            'confidence': round(max(0.0, min(score, 1.0)), 3),
+            'matched_name': matched_name
+        }))
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [match for _, match in ranked]
+
+
+def select_best_match(candidates, game_name, platform_id=None, threshold=MATCH_CONFIDENCE_THRESHOLD):
+    """
+    Pick the best scoring candidate for a folder name.
+
+    Returns:
+        dict: {'game', 'confidence', 'matched_name'} or None if nothing reaches the threshold
+    """
+    ranked = rank_candidates(candidates, game_name, platform_id)
+    if ranked and ranked[0]['confidence'] >= threshold:
+        return ranked[0]
+    return None
+
+
+def fallback_search_names(game_name, max_searches=MATCH_MAX_FALLBACK_SEARCHES):
+    """
+    Names worth a further IGDB search when the first candidate set had no
+    acceptable match: the name without GOTY first, then progressively shorter names.
+    """
+    base_name, _ = extract_year(game_name)
+    names = []
+    if 'GOTY' in base_name:
+        names.append(generate_goty_variants(base_name)[-1])
+    names.extend(name for name, dropped in build_name_variants(base_name) if dropped > 0)
+
+    searched = {normalize_title(game_name)}
+    fallbacks = []
+    for name in names:
+        key = normalize_title(name)
+        if key in searched:
+            continue
+        searched.add(key)
+        fallbacks.append(name)
+        if len(fallbacks) >= max_searches:
+            break
+    return fallbacks
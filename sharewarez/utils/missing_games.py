@@ -0,0 +1,202 @@
+# File: /sharewarez/utils/missing_games.py
+# Missing game detection and removal.
+# Stored game paths are grouped by parent directory and each parent is listed
+# once, instead of calling os.path.exists per game. Missing games are deleted
+# together with every row that references them in one transaction, and their
+# image files are removed after the commit. With a grace period, a game is only
+# marked missing on the first scan that can't find it and deleted once it has
+# been missing for longer than the grace period, so a share that is briefly
+# unmounted doesn't empty the library. Games in folders that exist but can't be
+# listed are never removed, only reported.
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, delete
+from sharewarez import db
+from sharewarez.models import (
+    Game, GameURL, GameUpdate, GameExtra, Image, DownloadRequest, user_favorites, user_game_status,
+    game_genre_association, game_game_mode_association, game_theme_association, game_platform_association,
+    game_multiplayer_mode_association, game_player_perspective_association, game_developer_association
+)
+from sharewarez.utils.event_logging import log_system_event
+
+
+# Games per DELETE ... WHERE IN statement
+MISSING_GAME_BATCH_SIZE = 500
+
+# Tables referencing games.id
+GAME_ID_TABLES = [
+    game_genre_association, game_game_mode_association, game_theme_association, game_platform_association,
+    game_multiplayer_mode_association, game_player_perspective_association, game_developer_association
+]
+
+# Tables referencing games.uuid, deleted before the games themselves
+GAME_UUID_TABLES = [
+    user_favorites, user_game_status, GameURL.__table__, GameUpdate.__table__, GameExtra.__table__,
+    Image.__table__, DownloadRequest.__table__
+]
+
+
+def _list_names(directory):
+    """
+    Entry names in a directory, or None when it no longer exists.
+
+    Raises:
+        OSError: the directory exists but can't be listed
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return None
+
+
+def find_missing_paths(paths):
+    """
+    Find the paths that no longer exist, listing each parent directory once.
+    Paths whose parent directory is gone are missing. Paths whose parent can't
+    be listed (a permission or I/O error, e.g. a network share acting up) are
+    neither missing nor present.
+
+    Returns:
+        tuple: (set of missing paths, set of parent directories that couldn't be listed)
+    """
+    by_parent = defaultdict(list)
+    for path in paths:
+        by_parent[os.path.dirname(os.path.normpath(path))].append(path)
+
+    missing = set()
+    unreadable = set()
+    for parent, children in by_parent.items():
+        try:
+            names = _list_names(parent)
+        except OSError as e:
+            print(f"Warning: Cannot list {parent} while checking for missing games: {e}")
+            unreadable.add(parent)
+            continue
+        if names is None:
+            missing.update(children)
+            continue
+        missing.update(path for path in children if os.path.basename(os.path.normpath(path)) not in names)
+    return missing, unreadable
+
+
+def _image_file_path(image_url):
+    relative_image_path = image_url.replace('/static/library/images/', '').strip("/")
+    return os.path.normpath(os.path.join(current_app.config['IMAGE_SAVE_PATH'], relative_image_path))
+
+
+def delete_image_files(image_urls):
+    """Delete the files of removed images. Returns the number of files deleted."""
+    deleted = 0
+    for image_url in image_urls:
+        if not image_url:
+            continue
+        image_file_path = _image_file_path(image_url)
+        try:
+            os.remove(image_file_path)
+            deleted += 1
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            print(f"Failed to delete image file {image_file_path}: {e}")
+    return deleted
+
+
+def delete_games(game_uuids, batch_size=MISSING_GAME_BATCH_SIZE):
+    """
+    Delete games and all rows referencing them in a single transaction, then delete their image files.
+
+    Returns:
+        int: number of games deleted
+    """
+    game_uuids = list(dict.fromkeys(game_uuids))
+    if not game_uuids:
+        return 0
+
+    image_urls = []
+    deleted = 0
+    try:
+        for start in range(0, len(game_uuids), batch_size):
+            batch = game_uuids[start:start + batch_size]
+            game_ids = select(Game.id).where(Game.uuid.in_(batch)).scalar_subquery()
+            image_urls.extend(db.session.execute(select(Image.url).where(Image.game_uuid.in_(batch))).scalars())
+            for table in GAME_ID_TABLES:
+                db.session.execute(delete(table).where(table.c.game_id.in_(game_ids)))
+            for table in GAME_UUID_TABLES:
+                db.session.execute(delete(table).where(table.c.game_uuid.in_(batch)))
+            deleted += db.session.execute(
+                delete(Game).where(Game.uuid.in_(batch)).execution_options(synchronize_session=False)
+            ).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Files go only once the rows are gone for good
+    files_deleted = delete_image_files(image_urls)
+    print(f"Deleted {deleted} games and {files_deleted} image files")
+    return deleted
+
+
+def remove_missing_games(library_uuid, grace_hours=0):
+    """
+    Detect the games of a library whose folder or file is gone and remove them.
+
+    With grace_hours > 0, missing games are first marked with missing_since and only
+    deleted once they have been missing for that long. Games that reappear are unmarked.
+
+    Returns:
+        dict: counts of 'missing', 'removed', 'quarantined', 'restored' and 'unchecked' games
+    """
+    games = db.session.execute(
+        select(Game.uuid, Game.name, Game.full_disk_path, Game.missing_since).filter_by(library_uuid=library_uuid)
+    ).all()
+    missing_paths, unreadable = find_missing_paths(game.full_disk_path for game in games)
+    # Games in folders that couldn't be listed are left as they are until a scan can check them
+    unchecked = [game for game in games if os.path.dirname(os.path.normpath(game.full_disk_path)) in unreadable]
+    if unreadable:
+        print(f"⚠️ {len(unreadable)} folders could not be listed, {len(unchecked)} games in them were not checked")
+        log_system_event(f"Missing games check skipped {len(unchecked)} games of library {library_uuid}, "
+                         f"{len(unreadable)} folders could not be listed: {', '.join(sorted(unreadable)[:5])}",
+                         event_type='game', event_level='warning')
+    unchecked_uuids = {game.uuid for game in unchecked}
+
+    missing = [game for game in games if game.full_disk_path in missing_paths]
+    restored = [game.uuid for game in games if game.missing_since and game.full_disk_path not in missing_paths
+                and game.uuid not in unchecked_uuids]
+    now = datetime.now()
+
+    if grace_hours and grace_hours > 0:
+        cutoff = now - timedelta(hours=grace_hours)
+        newly_missing = [game.uuid for game in missing if not game.missing_since]
+        to_remove = [game for game in missing if game.missing_since and game.missing_since <= cutoff]
+    else:
+        newly_missing = []
+        to_remove = missing
+
+    if restored:
+        db.session.execute(update(Game).where(Game.uuid.in_(restored)).values(missing_since=None)
+                           .execution_options(synchronize_session=False))
+    if newly_missing:
+        db.session.execute(update(Game).where(Game.uuid.in_(newly_missing)).values(missing_since=now)
+                           .execution_options(synchronize_session=False))
+    if restored or newly_missing:
+        db.session.commit()
+
+    for game in to_remove:
+        print(f"Game no longer found at path: {game.full_disk_path}")
+    removed = delete_games([game.uuid for game in to_remove])
+    if removed:
+        log_system_event(f"Removed {removed} missing games from library {library_uuid}",
+                         event_type='game', event_level='information')
+
+    quarantined = len(missing) - len(to_remove)
+    if quarantined:
+        print(f"🕒 {quarantined} missing games kept for the {grace_hours}h grace period")
+    if restored:
+        print(f"{len(restored)} games found again and no longer marked missing")
+    return {'missing': len(missing), 'removed': removed, 'quarantined': quarantined, 'restored': len(restored),
+            'unchecked': len(unchecked)}
@@ -0,0 +1,124 @@
+# File: /sharewarez/utils/nfo.py
+# Reading NFO files of games, updates and extras.
+# NFOs come from release groups and are anything from plain UTF-8 to CP437
+# ANSI art, sometimes hundreds of kilobytes of it. Only the first
+# NFO_MAX_BYTES are read, which is far more than the details page shows, and
+# the bytes are decoded by BOM, then as UTF-8, then as CP437 when the high
+# bytes look like box drawing characters or as Windows-1252 otherwise.
+# The first NFO by name is used; one that can't be read gives way to the next.
+# A game keeps the name, mtime and size of the NFO its nfo_content was read
+# from, so scans only read the file again once it changed.
+
+import codecs
+import os
+
+
+# Bytes read from an NFO file
+NFO_MAX_BYTES = 64 * 1024
+
+# CP437 box drawing, block and shade characters used by NFO art
+_CP437_ART_BYTES = range(0xB0, 0xE0)
+
+
+def decode_nfo(data):
+    """Decode the bytes of an NFO file, guessing its encoding."""
+    if data.startswith(codecs.BOM_UTF8):
+        text = data[len(codecs.BOM_UTF8):].decode('utf-8', errors='replace')
+    elif data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        text = data.decode('utf-16', errors='replace')
+    else:
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            if e.reason == 'unexpected end of data' and e.start >= len(data) - 3:
+                # The size cap cut a character in half
+                text = data[:e.start].decode('utf-8', errors='replace')
+            else:
+                high = [byte for byte in data if byte >= 0x80]
+                art = sum(1 for byte in high if byte in _CP437_ART_BYTES)
+                text = data.decode('cp437' if art * 2 >= len(high) else 'cp1252', errors='replace')
+    return text.replace('\x00', '').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def list_nfo_files(folder_path):
+    """
+    The NFO files of a folder in name order, listed once.
+
+    Returns:
+        list: (path, fingerprint) tuples
+
+    Raises:
+        OSError: the folder can't be listed
+    """
+    with os.scandir(folder_path) as entries:
+        nfo_entries = [entry for entry in entries if entry.name.lower().endswith('.nfo') and entry.is_file()]
+    nfo_entries.sort(key=lambda entry: (entry.name.lower(), entry.name))
+    return [(entry.path, _fingerprint(entry)) for entry in nfo_entries]
+
+
+def _fingerprint(entry):
+    stat = entry.stat()
+    return f"{entry.name}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_first_nfo(folder_path):
+    """
+    Content of the first NFO of a folder that can be read, trying the next one by name
+    when a file can't be read.
+
+    Returns:
+        tuple: (content, fingerprint) or None if the folder has no readable NFO
+
+    Raises:
+        OSError: the folder can't be listed
+    """
+    for nfo_path, fingerprint in list_nfo_files(folder_path):
+        content = read_nfo_file(nfo_path)
+        if content is not None:
+            return content, fingerprint
+    return None
+
+
+def read_nfo_file(nfo_path, max_bytes=NFO_MAX_BYTES):
+    """Content of an NFO file, cut at max_bytes, or None if it can't be read."""
+    try:
+        with open(nfo_path, 'rb') as nfo_file:
+            data = nfo_file.read(max_bytes)
+    except OSError as e:
+        print(f"Error reading NFO file {nfo_path}: {str(e)}")
+        return None
+    return decode_nfo(data)
+
+
+def refresh_game_nfo(game, folder_path):
+    """
+    Read the NFO of a game folder into nfo_content unless it is unchanged since
+    it was last read. An NFO that was removed clears the content. The caller commits.
+
+    Returns:
+        bool: whether the game changed
+    """
+    if not os.path.isdir(folder_path):
+        return False
+    try:
+        nfo_files = list_nfo_files(folder_path)
+    except OSError as e:
+        print(f"Error accessing directory {folder_path}: {str(e)}")
+        return False
+    if not nfo_files:
+        if game.nfo_fingerprint is None:
+            return False
+        game.nfo_content = None
+        game.nfo_fingerprint = None
+        return True
+
+    # An NFO that can't be read gives way to the next one by name
+    for nfo_path, fingerprint in nfo_files:
+        if fingerprint == game.nfo_fingerprint:
+            return False
+        content = read_nfo_file(nfo_path)
+        if content is not None:
+            game.nfo_content = content
+            game.nfo_fingerprint = fingerprint
+            return True
+    return False
@@ -0,0 +1,488 @@
+# File: /sharewarez/utils/path_relinker.py
+# Relinking games whose folder or file moved.
+# After a share is reorganized or archives are extracted, games point at paths
+# that are gone. A relink job lists the new tree once, cleans every folder and
+# file name with the release group filters and indexes it by name token. Each
+# missing game is then looked up by the tokens of its old folder name and its
+# game name: only entries sharing a selective token are scored, with a weighted
+# token overlap, and the best few are compared character by character. Every
+# entry is given to at most one game, best matches first, so the work grows
+# with the size of the tree and the number of missing games instead of their
+# product.
+# Proposals are stored per job so a dry run can be reviewed in the admin UI and
+# applied later; applying moves the games, their updates and their extras in a
+# single transaction. It is a ScanJob with job_type 'relink', so the scan
+# coordinator admits it and its progress and cancel button show in the scan
+# jobs list.
+
+import math
+import os
+import re
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from flask import current_app
+from sqlalchemy import select, update, delete, func
+from sharewarez import db
+from sharewarez.models import Game, GameUpdate, GameExtra, ScanJob, AllowedFileType, PathRelinkProposal
+from sharewarez.utils.functions import load_scanning_filter_patterns
+from sharewarez.utils.gamenames import get_name_normalizer
+from sharewarez.utils.missing_games import find_missing_paths
+from sharewarez.utils.scan_coordinator import admit_scan
+from sharewarez.utils.scan_progress import ScanProgressWriter, ScanCancelListener
+from sharewarez.utils.shutdown import should_continue_processing
+
+
+RELINK_JOB_TYPE = 'relink'
+
+# Proposals below this confidence are not stored
+RELINK_MIN_CONFIDENCE = 0.6
+
+# Without a dry run, proposals at or above this confidence are applied when the job finishes
+RELINK_APPLY_CONFIDENCE = 0.8
+
+# Folder levels below each search root that are indexed
+RELINK_MAX_DEPTH = 3
+
+# Best entries by token overlap that are compared character by character per game
+RELINK_SHORTLIST_SIZE = 5
+
+# Tokens found in more entries than this share of the index (e.g. 'the', 'edition')
+# are not used to shortlist entries, unless a name has no other tokens
+COMMON_TOKEN_SHARE = 0.05
+MIN_COMMON_TOKEN_ENTRIES = 50
+
+# Rows per INSERT, UPDATE or listing page
+RELINK_BATCH_SIZE = 500
+RELINK_PAGE_SIZE = 100
+MAX_RELINK_PAGE_SIZE = 500
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def relink_tokens(name, normalizer, extensions=()):
+    """
+    Name tokens of a folder or file name, cleaned with the release group filters.
+    A trailing extension is dropped when it is one of `extensions`.
+    """
+    base, extension = os.path.splitext(name)
+    if extension[1:].lower() in extensions:
+        name = base
+    return tuple(dict.fromkeys(_TOKEN_RE.findall(normalizer.clean(name).lower())))
+
+
+def list_relink_candidates(search_roots, normalizer, extensions, exclude_paths=(), max_depth=RELINK_MAX_DEPTH,
+                           should_stop=None):
+    """
+    List the folders, and the files with an allowed extension, below the search roots.
+    Paths in `exclude_paths` (games that exist) are skipped together with everything below them.
+
+    Returns:
+        list: (path, tokens, depth) for every entry with at least one name token
+    """
+    exclude_paths = set(exclude_paths)
+    candidates = []
+    pending = [(os.path.normpath(root), 0) for root in search_roots]
+    seen = set()
+    while pending:
+        if should_stop and should_stop():
+            break
+        directory, depth = pending.pop()
+        if directory in seen:
+            continue
+        seen.add(directory)
+        try:
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError as e:
+            print(f"Warning: Cannot list {directory} while indexing for relink: {e}")
+            continue
+        for entry in entries:
+            if entry.path in exclude_paths:
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                tokens = relink_tokens(entry.name, normalizer)
+                if depth + 1 < max_depth:
+                    pending.append((entry.path, depth + 1))
+            elif os.path.splitext(entry.name)[1][1:].lower() in extensions:
+                tokens = relink_tokens(entry.name, normalizer, extensions)
+            else:
+                continue
+            if tokens:
+                candidates.append((entry.path, tokens, depth + 1))
+    return candidates
+
+
+class RelinkIndex:
+    """Inverted index of candidate entries by name token, weighted by how rare each token is."""
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.postings = {}
+        for position, (_, tokens, _) in enumerate(candidates):
+            for token in tokens:
+                self.postings.setdefault(token, []).append(position)
+        count = len(candidates)
+        self.common_limit = max(MIN_COMMON_TOKEN_ENTRIES, int(count * COMMON_TOKEN_SHARE))
+        self._weights = {token: math.log(1 + count / len(positions)) for token, positions in self.postings.items()}
+        self._unseen_weight = math.log(1 + max(count, 1))
+        self._keys = [' '.join(tokens) for _, tokens, _ in candidates]
+        self._totals = [sum(self._weights[token] for token in tokens) for _, tokens, _ in candidates]
+
+    def weight(self, token):
+        return self._weights.get(token, self._unseen_weight)
+
+    def match(self, tokens, shortlist_size=RELINK_SHORTLIST_SIZE):
+        """
+        Best entries for a name.
+
+        Returns:
+            list: (confidence, position) of up to `shortlist_size` entries, best first
+        """
+        indexed = [token for token in tokens if token in self.postings]
+        selective = [token for token in indexed if len(self.postings[token]) <= self.common_limit] or indexed
+        shared = {}
+        for token in selective:
+            token_weight = self._weights[token]
+            for position in self.postings[token]:
+                shared[position] = shared.get(position, 0.0) + token_weight
+        if not shared:
+            return []
+
+        # Common tokens were left out of the shortlist but still count in the overlap
+        token_set = set(tokens)
+        for token in indexed:
+            if token in selective:
+                continue
+            token_weight = self._weights[token]
+            for position in shared:
+                if token in self.candidates[position][1]:
+                    shared[position] += token_weight
+
+        total = sum(self.weight(token) for token in token_set)
+        overlaps = sorted(
+            ((2 * weight / (total + self._totals[position]), position) for position, weight in shared.items()),
+            reverse=True
+        )[:shortlist_size]
+        key = ' '.join(tokens)
+        return sorted((
+            ((overlap + SequenceMatcher(None, key, self._keys[position]).ratio()) / 2, position)
+            for overlap, position in overlaps
+        ), reverse=True)
+
+
+def propose_relinks(games, index, normalizer, extensions, min_confidence=RELINK_MIN_CONFIDENCE, on_game=None):
+    """
+    Pick a new path for each missing game, giving every index entry to one game at most.
+
+    Args:
+        games: iterable of (game_uuid, game_name, old_path)
+        on_game: called with (game_name, found) after each game is looked up; returning False stops
+
+    Returns:
+        dict: game_uuid -> (new_path, confidence)
+    """
+    scored = []
+    for game_uuid, game_name, old_path in games:
+        best = {}
+        folder_name = os.path.basename(os.path.normpath(old_path))
+        for tokens in {relink_tokens(folder_name, normalizer, extensions), relink_tokens(game_name or '', normalizer)}:
+            if not tokens:
+                continue
+            for confidence, position in index.match(tokens):
+                if confidence >= min_confidence and confidence > best.get(position, 0):
+                    best[position] = confidence
+        # Shallower entries win ties, e.g. an extracted folder over the installer inside it
+        scored.extend((-confidence, index.candidates[position][2], position, game_uuid)
+                      for position, confidence in best.items())
+        if on_game and on_game(game_name, bool(best)) is False:
+            break
+
+    proposals = {}
+    used = set()
+    for negative_confidence, _, position, game_uuid in sorted(scored):
+        if game_uuid in proposals or position in used:
+            continue
+        proposals[game_uuid] = (index.candidates[position][0], round(-negative_confidence, 3))
+        used.add(position)
+    return proposals
+
+
+def get_allowed_extensions():
+    return {extension.lower().lstrip('.') for extension in db.session.execute(select(AllowedFileType.value)).scalars()}
+
+
+def create_relink_job(library_uuid, search_roots, dry_run=True, min_confidence=RELINK_MIN_CONFIDENCE,
+                      apply_confidence=RELINK_APPLY_CONFIDENCE):
+    """
+    Create a running relink job for a library if the scan coordinator admits it.
+    Commits on success and rolls back on refusal.
+
+    Returns:
+        tuple: (job, None) or (None, reason)
+    """
+    job = ScanJob(
+        folders={
+            'search_roots': list(search_roots),
+            'dry_run': bool(dry_run),
+            'min_confidence': min_confidence,
+            'apply_confidence': apply_confidence
+        },
+        content_type='Games',
+        status='Running',
+        is_enabled=True,
+        last_run=datetime.now(timezone.utc),
+        library_uuid=library_uuid,
+        error_message='',
+        total_folders=0,
+        folders_success=0,
+        folders_failed=0,
+        removed_count=0,
+        scan_folder=search_roots[0],
+        job_type=RELINK_JOB_TYPE
+    )
+    reason = admit_scan(job, search_roots[0])
+    if reason:
+        db.session.rollback()
+        return None, reason
+    db.session.add(job)
+    db.session.commit()
+    return job, None
+
+
+def default_search_roots(library_uuid):
+    """Existing parent folders of the library's missing games, where the old relink script looked."""
+    paths = db.session.execute(
+        select(Game.full_disk_path).where(Game.library_uuid == library_uuid, Game.full_disk_path.isnot(None))
+    ).scalars().all()
+    missing, _ = find_missing_paths(paths)
+    parents = {os.path.dirname(os.path.normpath(path)) for path in missing}
+    return sorted(parent for parent in parents if os.path.isdir(parent))
+
+
+def _store_proposals(job_id, games, proposals):
+    rows = [
+        {'job_id': job_id, 'game_uuid': game_uuid, 'old_path': old_path,
+         'new_path': proposals[game_uuid][0], 'confidence': proposals[game_uuid][1]}
+        for game_uuid, _, old_path in games if game_uuid in proposals
+    ]
+    db.session.execute(delete(PathRelinkProposal).where(PathRelinkProposal.job_id == job_id))
+    for start in range(0, len(rows), RELINK_BATCH_SIZE):
+        db.session.execute(PathRelinkProposal.__table__.insert(), rows[start:start + RELINK_BATCH_SIZE])
+    db.session.commit()
+
+
+def run_relink_job(job):
+    """
+    Find new paths for the missing games of the job's library and store them as
+    proposals, applying the confident ones unless it is a dry run. Runs on the
+    job's own thread inside an app context, like a library scan.
+    """
+    options = job.folders or {}
+    search_roots = options.get('search_roots') or []
+    dry_run = options.get('dry_run', True)
+    min_confidence = options.get('min_confidence', RELINK_MIN_CONFIDENCE)
+    apply_confidence = options.get('apply_confidence', RELINK_APPLY_CONFIDENCE)
+
+    insensitive_patterns, sensitive_patterns = load_scanning_filter_patterns()
+    normalizer = get_name_normalizer(insensitive_patterns, sensitive_patterns)
+    extensions = get_allowed_extensions()
+
+    library_games = db.session.execute(
+        select(Game.uuid, Game.name, Game.full_disk_path)
+        .where(Game.library_uuid == job.library_uuid, Game.full_disk_path.isnot(None))
+        .order_by(Game.name)
+    ).all()
+    missing_paths, _ = find_missing_paths(game.full_disk_path for game in library_games)
+    games = [(game.uuid, game.name, game.full_disk_path) for game in library_games
+             if game.full_disk_path in missing_paths]
+    job.total_folders = len(games)
+    job.current_processing = f"Indexing {', '.join(search_roots)}"
+    db.session.commit()
+    print(f"🔗 Relinking {len(games)} missing games of library {job.library_uuid} "
+          f"from {', '.join(search_roots)} (job {job.id}{', dry run' if dry_run else ''})")
+
+    progress = ScanProgressWriter(job.id)
+    cancelled = False
+    interrupted = False
+
+    def on_cancel():
+        nonlocal cancelled
+        cancelled = True
+
+    def should_stop():
+        nonlocal interrupted
+        if not should_continue_processing():
+            interrupted = True
+        return cancelled or interrupted
+
+    looked_up = 0
+
+    def on_game(game_name, found):
+        nonlocal cancelled, looked_up
+        looked_up += 1
+        progress.record(found, None if found else f"No new path found for '{game_name}'",
+                        f"Relinking: {game_name} ({looked_up}/{len(games)})")
+        if not progress.maybe_flush():
+            cancelled = True
+        return not should_stop()
+
+    cancel_listener = ScanCancelListener(current_app._get_current_object(), job.id, on_cancel).start()
+    proposals = {}
+    try:
+        if games:
+            # Games that still exist, in any library, are not candidates
+            existing_paths = set(db.session.execute(
+                select(Game.full_disk_path).where(Game.full_disk_path.isnot(None))
+            ).scalars()) - missing_paths
+            candidates = list_relink_candidates(search_roots, normalizer, extensions, existing_paths,
+                                                should_stop=should_stop)
+            print(f"🔗 Indexed {len(candidates)} folders and files for relinking")
+            if not should_stop():
+                index = RelinkIndex(candidates)
+                proposals = propose_relinks(games, index, normalizer, extensions, min_confidence, on_game)
+    finally:
+        cancel_listener.stop()
+    if not progress.flush():
+        cancelled = True
+
+    applied = skipped = 0
+    if not (cancelled or interrupted):
+        _store_proposals(job.id, games, proposals)
+        if not dry_run:
+            applied, skipped = apply_relink_proposals(job.id, min_confidence=apply_confidence)
+
+    db.session.refresh(job)
+    job.current_processing = None
+    if interrupted:
+        job.status = 'Failed'
+        job.error_message = 'Relink interrupted by application shutdown'
+    elif cancelled:
+        job.status = 'Cancelled'
+        job.error_message = 'Relink cancelled by user'
+    else:
+        job.status = 'Completed'
+        summary = f"Found new paths for {len(proposals)} of {len(games)} missing games"
+        if not dry_run:
+            summary += f", moved {applied}" + (f" ({skipped} skipped)" if skipped else '')
+        # Keep the lines of games without a new path below the summary
+        job.error_message = summary + "\n" + (job.error_message or '')
+    db.session.commit()
+    print(f"🔗 Relink job {job.id} {job.status.lower()}: {len(proposals)} proposals, {applied} applied")
+
+
+def list_relink_proposals(job_id, page=1, per_page=RELINK_PAGE_SIZE):
+    """One page of a relink job's proposals, least confident first so doubtful ones are reviewed."""
+    per_page = max(1, min(per_page, MAX_RELINK_PAGE_SIZE))
+    page = max(1, page)
+    total = db.session.execute(
+        select(func.count()).select_from(PathRelinkProposal).where(PathRelinkProposal.job_id == job_id)
+    ).scalar()
+    rows = db.session.execute(
+        select(PathRelinkProposal, Game.name)
+        .join(Game, Game.uuid == PathRelinkProposal.game_uuid)
+        .where(PathRelinkProposal.job_id == job_id)
+        .order_by(PathRelinkProposal.confidence, PathRelinkProposal.old_path)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    ).all()
+    return {
+        'proposals': [{
+            'game_uuid': proposal.game_uuid,
+            'game_name': game_name,
+            'old_path': proposal.old_path,
+            'new_path': proposal.new_path,
+            'confidence': proposal.confidence,
+            'applied': proposal.applied_at is not None
+        } for proposal, game_name in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page
+    }
+
+
+def _moved_children(model, moves):
+    """
+    Update or extra rows inside moved game folders, with their paths under the new folder.
+
+    Args:
+        moves: dict of game_uuid -> (old_path, new_path)
+    """
+    rows = []
+    for row_id, game_uuid, file_path in db.session.execute(
+        select(model.id, model.game_uuid, model.file_path).where(model.game_uuid.in_(list(moves)))
+    ).all():
+        old_path, new_path = (path.rstrip('/\\') for path in moves[game_uuid])
+        if file_path.startswith(old_path + os.sep):
+            rows.append({'id': row_id, 'file_path': new_path + file_path[len(old_path):]})
+    return rows
+
+
+def apply_relink_proposals(job_id, game_uuids=None, min_confidence=None):
+    """
+    Move games to their proposed paths in a single transaction. Proposals are skipped
+    when the game has moved since, or another game already uses the new path.
+
+    Args:
+        game_uuids: only apply the proposals of these games
+        min_confidence: only apply proposals at or above this confidence
+
+    Returns:
+        tuple: (applied, skipped)
+    """
+    conditions = [PathRelinkProposal.job_id == job_id, PathRelinkProposal.applied_at.is_(None)]
+    if game_uuids is not None:
+        conditions.append(PathRelinkProposal.game_uuid.in_(game_uuids))
+    if min_confidence is not None:
+        conditions.append(PathRelinkProposal.confidence >= min_confidence)
+
+    try:
+        proposals = db.session.execute(select(PathRelinkProposal).where(*conditions)).scalars().all()
+        current = {}
+        taken = set()
+        for start in range(0, len(proposals), RELINK_BATCH_SIZE):
+            batch = proposals[start:start + RELINK_BATCH_SIZE]
+            current.update((game_uuid, (game_id, path)) for game_uuid, game_id, path in db.session.execute(
+                select(Game.uuid, Game.id, Game.full_disk_path).where(Game.uuid.in_([p.game_uuid for p in batch]))
+            ).all())
+            taken.update(db.session.execute(
+                select(Game.full_disk_path).where(Game.full_disk_path.in_([p.new_path for p in batch]))
+            ).scalars())
+
+        now = datetime.now(timezone.utc)
+        applied = []
+        for proposal in proposals:
+            if proposal.game_uuid not in current or current[proposal.game_uuid][1] != proposal.old_path or proposal.new_path in taken:
+                continue
+            taken.add(proposal.new_path)
+            applied.append(proposal)
+
+        for start in range(0, len(applied), RELINK_BATCH_SIZE):
+            batch = applied[start:start + RELINK_BATCH_SIZE]
+            moves = {proposal.game_uuid: (proposal.old_path, proposal.new_path) for proposal in batch}
+            children = {model: _moved_children(model, moves) for model in (GameUpdate, GameExtra)}
+            db.session.execute(update(Game), [
+                {'id': current[proposal.game_uuid][0], 'full_disk_path': proposal.new_path, 'missing_since': None}
+                for proposal in batch
+            ])
+            for model, rows in children.items():
+                if rows:
+                    db.session.execute(update(model), rows)
+            db.session.execute(
+                update(PathRelinkProposal)
+                .where(PathRelinkProposal.id.in_([proposal.id for proposal in batch]))
+                .values(applied_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    skipped = len(proposals) - len(applied)
+    print(f"🔗 Moved {len(applied)} games to their new paths, {skipped} proposals skipped")
+    return len(applied), skipped
@@ -0,0 +1,188 @@
+# File: /sharewarez/utils/scan_coordinator.py
+# Scan coordination.
+# Several library scans may run at the same time, up to max_concurrent_scans
+# from the server settings. Each scan folder belongs to a storage device group,
+# the device its folder lives on, and the disk-bound pipeline workers
+# (discovery and post-processing) of all scans on one device share that
+# device's I/O budget. A scan is admitted when its library isn't already being
+# scanned, the concurrency limit isn't reached and its device has budget left;
+# it gets the workers that fit in what is left. Admission runs under a Postgres
+# advisory lock in the transaction that marks the job running, so workers in
+# different processes can't overbook a device.
+# The IGDB request rate is split evenly between the running scans, and each
+# scan re-rates its limiter as scans start and finish. A scan's prefetcher
+# takes its requests from that same limiter.
+
+import os
+import time
+from sqlalchemy import select, func
+from sharewarez import db
+from sharewarez.models import ScanJob, GlobalSettings
+from sharewarez.utils.db import advisory_xact_lock
+from sharewarez.utils.scan_pipeline import get_stage_concurrency, STAGE_DISCOVERY, STAGE_POST_PROCESSING
+
+
+ADMISSION_LOCK_NAME = 'sharewarez.scan_admission'
+
+# Job statuses that still have pipeline workers running
+ACTIVE_SCAN_STATUSES = ('Running', 'Stopping')
+
+# Fewest disk workers a scan can run with: one discovery and one post-processing worker
+MIN_IO_WORKERS = 2
+
+# IGDB allows 4 requests per second per client
+IGDB_REQUESTS_PER_SECOND = 4
+
+# Seconds between re-counting the running scans for the IGDB share
+IGDB_SHARE_REFRESH = 10
+
+
+def get_device_group(path):
+    """
+    Return the storage device group of a path: the device it is stored on, so
+    folders on the same disk or share land in the same group.
+    """
+    try:
+        return f"dev:{os.stat(path).st_dev}"
+    except (OSError, TypeError, ValueError):
+        # Unreachable folders get a group of their own instead of sharing one
+        return f"path:{os.path.normpath(path or '')}"
+
+
+def get_scan_limits(settings_obj=None):
+    """Return (max concurrent scans, I/O budget per device) from the server settings."""
+    if settings_obj is None:
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    max_scans = getattr(settings_obj, 'max_concurrent_scans', None) if settings_obj else None
+    io_budget = getattr(settings_obj, 'scan_device_io_budget', None) if settings_obj else None
+    return max(1, max_scans or 2), max(MIN_IO_WORKERS, io_budget or 8)
+
+
+def requested_io_workers(settings_obj=None):
+    """Disk-bound workers a scan runs with when its device has budget to spare."""
+    concurrency = get_stage_concurrency(settings_obj)
+    return concurrency[STAGE_DISCOVERY] + concurrency[STAGE_POST_PROCESSING]
+
+
+def get_active_scans(exclude_job_id=None):
+    """Return (id, library_uuid, scan_folder, device_group, io_workers) rows of the scans running now."""
+    query = select(ScanJob.id, ScanJob.library_uuid, ScanJob.scan_folder, ScanJob.device_group, ScanJob.io_workers) \
+        .where(ScanJob.status.in_(ACTIVE_SCAN_STATUSES))
+    if exclude_job_id:
+        query = query.where(ScanJob.id != exclude_job_id)
+    return db.session.execute(query).all()
+
+
+def count_running_scans():
+    """Number of scans running across all workers."""
+    return db.session.execute(
+        select(func.count()).select_from(ScanJob).where(ScanJob.status == 'Running')
+    ).scalar() or 0
+
+
+def is_library_scan_running(library_uuid):
+    """Return True if a scan of this library is running."""
+    return any(scan.library_uuid == library_uuid for scan in get_active_scans())
+
+
+def check_scan_admission(library_uuid, folder_path, settings_obj=None, exclude_job_id=None):
+    """
+    Decide whether a scan of `folder_path` for a library may start now.
+
+    Returns:
+        tuple: (io_workers, None) with the disk workers granted, or (None, reason) when it has to wait
+    """
+    if settings_obj is None:
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    max_scans, io_budget = get_scan_limits(settings_obj)
+    requested = min(requested_io_workers(settings_obj), io_budget)
+    active = get_active_scans(exclude_job_id)
+
+    if library_uuid and any(scan.library_uuid == library_uuid for scan in active):
+        return None, 'A scan of this library is already in progress. Please wait until it completes.'
+    if len(active) >= max_scans:
+        return None, f'{len(active)} scans are already running, the limit is {max_scans}. Please wait until one completes.'
+
+    device_group = get_device_group(folder_path)
+    # Scans started before the coordinator have no recorded group or grant; assume a full one
+    used = sum(
+        scan.io_workers or requested for scan in active
+        if (scan.device_group or get_device_group(scan.scan_folder)) == device_group
+    )
+    available = io_budget - used
+    if available < MIN_IO_WORKERS:
+        return None, (f'The storage device of this folder has no I/O budget left ({used} of {io_budget} workers '
+                      f'in use by other scans). Please wait until one completes.')
+    return min(requested, available), None
+
+
+def admit_scan(job, folder_path, settings_obj=None):
+    """
+    Admit a scan job under the admission lock and record its device group and disk worker grant.
+    On success the caller marks the job running and commits, which releases the lock; on refusal
+    the caller rolls back.
+
+    Returns:
+        str or None: None when admitted, otherwise the reason the scan has to wait
+    """
+    advisory_xact_lock(db.session, ADMISSION_LOCK_NAME)
+    io_workers, reason = check_scan_admission(job.library_uuid, folder_path, settings_obj, exclude_job_id=job.id)
+    if reason:
+        return reason
+    job.device_group = get_device_group(folder_path)
+    job.io_workers = io_workers
+    return None
+
+
+def split_io_workers(concurrency, io_workers):
+    """
+    Fit the discovery and post-processing workers of a stage concurrency dict into
+    `io_workers`, keeping their ratio and at least one worker each.
+    """
+    concurrency = dict(concurrency)
+    requested = concurrency[STAGE_DISCOVERY] + concurrency[STAGE_POST_PROCESSING]
+    if not io_workers or requested <= io_workers:
+        return concurrency
+    io_workers = max(MIN_IO_WORKERS, io_workers)
+    discovery = round(io_workers * concurrency[STAGE_DISCOVERY] / requested)
+    discovery = min(max(1, discovery), io_workers - 1)
+    concurrency[STAGE_DISCOVERY] = discovery
+    concurrency[STAGE_POST_PROCESSING] = io_workers - discovery
+    return concurrency
+
+
+class IGDBQuotaShare:
+    """
+    Keeps a scan's IGDB rate limiters at an even share of the IGDB request rate.
+
+    The share is the total rate divided by the number of running scans. Call
+    refresh() from the scan's thread (it needs an app context); it re-counts the
+    running scans at most every `refresh_interval` seconds.
+    """
+    def __init__(self, limiters, total_rate=IGDB_REQUESTS_PER_SECOND, refresh_interval=IGDB_SHARE_REFRESH):
+        self.limiters = [limiter for limiter in limiters if limiter is not None]
+        self.total_rate = total_rate
+        self.refresh_interval = refresh_interval
+        self.rate = total_rate
+        self.scans = 1
+        self._refreshed_at = None
+
+    def refresh(self, force=False):
+        """Re-rate the limiters if the number of running scans changed. Returns the current rate."""
+        now = time.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+            return self.rate
+        self._refreshed_at = now
+        try:
+            scans = max(1, count_running_scans())
+        except Exception as e:
+            print(f"Could not count running scans for the IGDB share: {e}")
+            return self.rate
+        if scans != self.scans or force:
+            self.scans = scans
+            self.rate = self.total_rate / scans
+            for limiter in self.limiters:
+                limiter.set_rate(self.rate)
+            if scans > 1:
+                print(f"🔀 {scans} scans running, IGDB share for this scan: {self.rate:.2f} requests/s")
+        return self.rate
@@ -0,0 +1,473 @@
+# File: /sharewarez/utils/scan_pipeline.py
+# Staged scan pipeline.
+# A scan passes every listed folder through four stages connected by bounded
+# queues: discovery (filesystem probes), matching (IGDB), persistence (database
+# writes) and post-processing (sizes, NFO, images, updates and extras). Each
+# stage has its own worker threads, so disk-bound and API-bound work overlap
+# instead of the slowest step setting the pace for a whole game. Bounded queues
+# give backpressure: a stage that falls behind makes the stages before it wait
+# rather than piling up work in memory, and the listing is fed in one item at a
+# time, so the work in flight stays the same size however large the library
+# is. Every stage records its own metrics.
+# The persistence stage takes items in batches and saves each batch in one
+# transaction (see utils/bulk_persistence.py).
+
+import os
+import queue
+import threading
+import time
+from sqlalchemy import select
+from sharewarez import db
+from sharewarez.models import Game
+from sharewarez.utils.functions import get_folder_size_in_bytes_updates, format_size
+from sharewarez.utils.nfo import refresh_game_nfo
+from sharewarez.utils.igdb_usage import igdb_usage_context
+from sharewarez.utils.scanning import log_unmatched_folders, process_game_updates, process_game_extras
+from sharewarez.utils.bulk_persistence import LookupCache, build_game_record, write_game_records
+
+
+# Queue slots per worker of the stage the queue feeds
+STAGE_QUEUE_FACTOR = 4
+
+# Seconds the result loop waits before checking for cancellation again
+RESULT_POLL_INTERVAL = 0.5
+
+# Finished items waiting for the caller; workers wait when the caller falls behind
+RESULT_QUEUE_SIZE = 256
+
+# Games saved per persistence transaction, and the longest a partial batch waits for more
+PERSISTENCE_BATCH_SIZE = 50
+PERSISTENCE_BATCH_WAIT = 2.0
+
+STAGE_DISCOVERY = 'discovery'
+STAGE_MATCHING = 'matching'
+STAGE_PERSISTENCE = 'persistence'
+STAGE_POST_PROCESSING = 'post_processing'
+
+_STOP = object()
+
+
+class StageMetrics:
+    """Thread-safe counters for one pipeline stage."""
+    def __init__(self):
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy_seconds, blocked_seconds, failed=False):
+        with self._lock:
+            self.processed += 1
+            self.errors += int(failed)
+            self.busy_seconds += busy_seconds
+            self.blocked_seconds += blocked_seconds
+
+    def record_queue_depth(self, depth):
+        with self._lock:
+            self.max_queue = max(self.max_queue, depth)
+
+    def summary(self, workers):
+        with self._lock:
+            return {
+                'workers': workers,
+                'processed': self.processed,
+                'errors': self.errors,
+                'busy_seconds': round(self.busy_seconds, 2),
+                'avg_ms': round(self.busy_seconds / self.processed * 1000, 1) if self.processed else 0,
+                'blocked_seconds': round(self.blocked_seconds, 2),
+                'max_queue': self.max_queue
+            }
+
+
+class PipelineStage:
+    """
+    A named step of a pipeline. `handler(item)` does the work for one item and
+    returns the name of the stage to pass it on to, or None when the item is done.
+
+    With a batch_size above 1, `handler(items)` gets up to batch_size items at once,
+    collected for at most batch_wait seconds, and returns a list of stage names.
+    """
+    def __init__(self, name, handler, workers=1, queue_size=None, batch_size=1, batch_wait=0):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers or 1))
+        self.batch_size = max(1, int(batch_size or 1))
+        self.batch_wait = batch_wait
+        self.queue = queue.Queue(maxsize=queue_size or max(self.workers * STAGE_QUEUE_FACTOR, self.batch_size))
+        self.metrics = StageMetrics()
+        self._finished_workers = 0
+        self._lock = threading.Lock()
+
+    def worker_finished(self):
+        """Count a stopped worker. Returns True for the last one."""
+        with self._lock:
+            self._finished_workers += 1
+            return self._finished_workers == self.workers
+
+
+class StagedPipeline:
+    """
+    Runs items through a list of stages. Items only move forward, to the next
+    stage or one further down. Stages shut down in order: once all workers of a
+    stage have stopped, every item it produced is already queued downstream.
+    """
+    def __init__(self, stages, app):
+        self.stages = stages
+        self.app = app
+        self._stage_index = {stage.name: index for index, stage in enumerate(stages)}
+        self._results = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+        self._cancel = threading.Event()
+        self._threads = []
+        self.started_at = None
+        self.finished_at = None
+
+    def cancel(self):
+        """Stop processing. Items still queued come back with result 'cancelled'."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self, items):
+        """
+        Feed `items` (dicts, any iterable) through the stages and yield each finished
+        item as it completes. Stages work on copies of the items, so what they add is
+        freed once the caller drops the yielded item. Items carry 'result' and, on
+        failure, 'error'.
+        """
+        self.started_at = time.monotonic()
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,), daemon=True,
+                                          name=f'scan-{stage.name}-{number}')
+                thread.start()
+                self._threads.append(thread)
+        feeder = threading.Thread(target=self._feed, args=(items,), daemon=True, name='scan-feeder')
+        feeder.start()
+        self._threads.append(feeder)
+
+        finished = False
+        try:
+            while True:
+                try:
+                    item = self._results.get(timeout=RESULT_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _STOP:
+                    finished = True
+                    break
+                yield item
+        finally:
+            if not finished:
+                # The caller stopped early; keep draining so no worker blocks on the full result queue
+                self.cancel()
+                threading.Thread(target=self._drain, daemon=True, name='scan-drain').start()
+
+        for thread in self._threads:
+            thread.join()
+        self.finished_at = time.monotonic()
+
+    def _drain(self):
+        while self._results.get() is not _STOP:
+            pass
+
+    def _feed(self, items):
+        first = self.stages[0]
+        for item in items:
+            if self._cancel.is_set():
+                self._results.put(dict(item, result='cancelled'))
+                continue
+            # A copy, so stage data isn't kept alive by the caller's list
+            first.queue.put(dict(item))
+            first.metrics.record_queue_depth(first.queue.qsize())
+        self._close_stage(0)
+
+    def _close_stage(self, index):
+        """Tell the workers of stage `index` that no more items are coming."""
+        if index == len(self.stages):
+            self._results.put(_STOP)
+            return
+        for _ in range(self.stages[index].workers):
+            self.stages[index].queue.put(_STOP)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        with self.app.app_context():
+            while True:
+                item = stage.queue.get()
+                stopping = item is _STOP
+                batch = [] if stopping else [item]
+                if not stopping and stage.batch_size > 1:
+                    stopping = self._collect_batch(stage, batch)
+                if batch:
+                    self._process(stage, batch)
+                if stopping:
+                    if stage.worker_finished():
+                        self._close_stage(index + 1)
+                    return
+
+    def _collect_batch(self, stage, batch):
+        """Add queued items to `batch` until it is full or batch_wait has passed. Returns True on a stop sentinel."""
+        deadline = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = stage.queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    def _process(self, stage, batch):
+        if self._cancel.is_set():
+            for item in batch:
+                self._results.put(dict(item, result='cancelled'))
+            return
+
+        started = time.monotonic()
+        failed = False
+        try:
+            targets = stage.handler(batch) if stage.batch_size > 1 else [stage.handler(batch[0])]
+        except Exception as e:
+            db.session.rollback()
+            print(f"[PIPELINE] {stage.name} failed for {', '.join(str(item.get('full_path')) for item in batch)}: {e}")
+            for item in batch:
+                item['result'] = 'error'
+                item['error'] = str(e)
+            targets = [None] * len(batch)
+            failed = True
+        busy = (time.monotonic() - started) / len(batch)
+
+        for item, target in zip(batch, targets):
+            blocked_started = time.monotonic()
+            if target:
+                next_stage = self.stages[self._stage_index[target]]
+                next_stage.queue.put(item)
+                next_stage.metrics.record_queue_depth(next_stage.queue.qsize())
+            else:
+                self._results.put(item)
+            stage.metrics.record(busy, time.monotonic() - blocked_started, failed)
+
+    def metrics_summary(self):
+        """Per-stage metrics, plus the wall time of the run and the stage that was busiest per worker."""
+        stages = {stage.name: stage.metrics.summary(stage.workers) for stage in self.stages}
+        end = self.finished_at or time.monotonic()
+        bottleneck = max(self.stages, key=lambda stage: stage.metrics.busy_seconds / stage.workers)
+        return {
+            'stages': stages,
+            'wall_seconds': round(end - self.started_at, 2) if self.started_at else 0,
+            'bottleneck': bottleneck.name
+        }
+
+
+def format_pipeline_metrics(metrics):
+    """One line per stage for the scan log."""
+    lines = [f"Scan pipeline finished in {metrics['wall_seconds']}s, bottleneck: {metrics['bottleneck']}"]
+    for name, stage in metrics['stages'].items():
+        lines.append(f"  {name:<16} workers={stage['workers']} processed={stage['processed']} errors={stage['errors']} "
+                     f"busy={stage['busy_seconds']}s avg={stage['avg_ms']}ms blocked={stage['blocked_seconds']}s "
+                     f"max_queue={stage['max_queue']}")
+    return '\n'.join(lines)
+
+
+class GameScanStages:
+    """
+    The work of each scan stage for one library scan. Items are dicts with the
+    listed 'name' and 'full_path'; stages add what later stages need.
+
+    Args:
+        scan_job_id: Scan job the work is accounted to
+        library_uuid, platform_id: Library being scanned and its IGDB platform ID
+        settings: Scan settings dict from build_scan_settings
+        options: Dict with update_folder_name, extras_folder_name, enable_game_updates,
+            enable_game_extras, force_updates_extras_scan, fetch_hltb and force_hltb_refetch
+        existing_game_paths, existing_unmatched_paths, modified_game_paths: Path sets from the scan
+        igdb_rate_limiter: Shared IGDBRateLimiter for matching
+        local_index: Folder path -> local metadata index entry from refresh_local_index, or None
+            to read local metadata files from disk
+        search_prefetcher: IGDBSearchPrefetcher that discovery submits the searches of new folders to
+    """
+    def __init__(self, scan_job_id, library_uuid, platform_id, settings, options,
+                 existing_game_paths, existing_unmatched_paths, modified_game_paths, igdb_rate_limiter,
+                 local_index=None, search_prefetcher=None):
+        self.scan_job_id = scan_job_id
+        self.library_uuid = library_uuid
+        self.platform_id = platform_id
+        self.settings = settings
+        self.options = options
+        self.existing_game_paths = existing_game_paths or set()
+        self.existing_unmatched_paths = existing_unmatched_paths or set()
+        self.modified_game_paths = modified_game_paths or set()
+        self.igdb_rate_limiter = igdb_rate_limiter
+        self.local_index = local_index
+        self.search_prefetcher = search_prefetcher
+        self.lookups = LookupCache()
+
+    def _should_process_existing(self, full_disk_path):
+        options = self.options
+        if options['force_updates_extras_scan'] and (options['enable_game_updates'] or options['enable_game_extras']):
+            return True
+        return options['force_hltb_refetch'] or full_disk_path in self.modified_game_paths
+
+    def discover(self, item):
+        """Sort out known folders and read the local metadata file of new ones."""
+        from sharewarez.utils.game_core import read_local_igdb_id
+
+        full_disk_path = item['full_path']
+        if full_disk_path in self.existing_game_paths:
+            if self._should_process_existing(full_disk_path):
+                print(f"Checking updates/extras for existing game: {item['name']}")
+                item['existing'] = True
+                return STAGE_POST_PROCESSING
+            item['result'] = 'exists'
+            return None
+        if full_disk_path in self.existing_unmatched_paths:
+            print(f"Folder already logged as unmatched (cached): {full_disk_path}")
+            item['result'] = 'already_unmatched'
+            return None
+        if not os.path.exists(full_disk_path):
+            item['result'] = 'error'
+            item['error'] = 'Path no longer exists'
+            return None
+
+        index_entry = self.local_index.get(full_disk_path) if self.local_index is not None else None
+        if index_entry is not None:
+            local_metadata = index_entry['local_metadata'] if self.settings.get('use_local_metadata') else None
+            item['local_igdb_id'] = local_metadata['igdb_id'] if local_metadata else None
+        else:
+            item['local_igdb_id'] = read_local_igdb_id(full_disk_path, self.settings)
+        if self.search_prefetcher is not None and not item['local_igdb_id']:
+            # Searched while the folder waits in the matching queue
+            self.search_prefetcher.submit(item['name'], self.platform_id)
+        return STAGE_MATCHING
+
+    def match(self, item):
+        """Look the folder up on IGDB (or the offline catalog), with the companies, websites and image URLs of a match."""
+        from sharewarez.utils.game_core import (
+            match_game_metadata, fetch_involved_companies, fetch_game_websites, match_image_ids, fetch_image_urls
+        )
+
+        self.igdb_rate_limiter.acquire()
+        try:
+            with igdb_usage_context('scan', self.scan_job_id):
+                match = match_game_metadata(item['name'], item['full_path'], self.platform_id,
+                                            item.get('local_igdb_id'), self.search_prefetcher)
+                if match:
+                    game_data = match['game']
+                    match['companies'] = fetch_involved_companies(game_data['id'], game_data.get('involved_companies'))
+                    match['websites'] = fetch_game_websites(game_data['id'])
+                    # Post-processing stores the images without going back to IGDB
+                    match['image_urls'] = fetch_image_urls(*match_image_ids(match))
+                item['match'] = match
+        finally:
+            self.igdb_rate_limiter.release()
+        return STAGE_PERSISTENCE
+
+    def persist(self, items):
+        """Save a batch of matched games and log the unmatched folders, in one transaction."""
+        unmatched = [item for item in items if not item['match']]
+        matched = [item for item in items if item['match']]
+        for item in unmatched:
+            print(f"[SCAN INFO] Game '{item['name']}' could not be matched to IGDB database.")
+            item['result'] = 'unmatched'
+        log_unmatched_folders(self.scan_job_id, [item['full_path'] for item in unmatched], 'Unmatched', self.library_uuid)
+
+        # The unmatched folders are committed together with the games
+        records = [build_game_record(item['match'], item['full_path'], self.library_uuid) for item in matched]
+        outcomes = write_game_records(records, self.lookups, self.scan_job_id, self.library_uuid)
+        if not records:
+            db.session.commit()
+        for item, outcome in zip(matched, outcomes):
+            if outcome == 'duplicate':
+                # Duplicates are logged as unmatched folders by write_game_records
+                item['result'] = 'unmatched'
+            elif outcome == 'exists':
+                item['result'] = 'exists'
+            else:
+                item['game_uuid'] = outcome
+
+        return [STAGE_POST_PROCESSING if item.get('game_uuid') else None for item in items]
+
+    def post_process(self, item):
+        """Size, NFO and images of new games, then updates, extras and HLTB data."""
+        from sharewarez.utils.game_core import finish_saved_game
+
+        full_disk_path = item['full_path']
+        options = self.options
+        game = None
+        if item.get('existing'):
+            game = db.session.execute(
+                select(Game).filter_by(full_disk_path=full_disk_path, library_uuid=self.library_uuid)
+            ).scalars().first()
+            # Read again only if the NFO file changed since it was stored
+            if game and refresh_game_nfo(game, full_disk_path):
+                db.session.commit()
+        elif item.get('game_uuid'):
+            game = db.session.execute(select(Game).filter_by(uuid=item['game_uuid'])).scalars().first()
+            if game:
+                game.size = get_folder_size_in_bytes_updates(
+                    full_disk_path, exclude_folders=[options['update_folder_name'], options['extras_folder_name']])
+                refresh_game_nfo(game, full_disk_path)
+                db.session.commit()
+                print(f"Folder size for {full_disk_path}: {format_size(game.size)}")
+                finish_saved_game(game, item.pop('match'), full_disk_path, self.settings, options['fetch_hltb'])
+
+        if options['enable_game_updates']:
+            updates_folder = os.path.join(full_disk_path, options['update_folder_name'])
+            if os.path.isdir(updates_folder):
+                print(f"Updates folder found for game: {item['name']}")
+                process_game_updates(item['name'], full_disk_path, updates_folder, self.library_uuid,
+                                     options['update_folder_name'])
+        if options['enable_game_extras']:
+            extras_folder = os.path.join(full_disk_path, options['extras_folder_name'])
+            if os.path.isdir(extras_folder):
+                print(f"Extras folder found for game: {item['name']}")
+                process_game_extras(item['name'], full_disk_path, extras_folder, self.library_uuid,
+                                    options['extras_folder_name'])
+
+        if item.get('existing') and options['force_hltb_refetch'] and game:
+            try:
+                from sharewarez.models import GlobalSettings
+                global_settings = db.session.execute(select(GlobalSettings)).scalars().first()
+                if global_settings and global_settings.enable_hltb_integration:
+                    from sharewarez.utils.hltb import update_game_hltb_sync
+                    print(f"Refetching HLTB data for existing game '{item['name']}'...")
+                    update_game_hltb_sync(game.uuid, game.name)
+            except Exception as e:
+                print(f"Failed to refetch HLTB data for '{item['name']}': {e}")
+                # Don't fail the scan if HLTB fetch fails
+
+        item['result'] = 'exists' if item.get('existing') else 'added'
+        return None
+
+
+def get_stage_concurrency(settings_obj):
+    """Workers per stage from the server settings. Matching uses the scan thread count."""
+    def setting(name, default):
+        value = getattr(settings_obj, name, None) if settings_obj else None
+        return value or default
+
+    return {
+        STAGE_DISCOVERY: setting('scan_discovery_workers', 4),
+        STAGE_MATCHING: setting('scan_thread_count', 1),
+        STAGE_PERSISTENCE: setting('scan_persistence_workers', 1),
+        STAGE_POST_PROCESSING: setting('scan_postprocess_workers', 4),
+    }
+
+
+def build_scan_pipeline(stages, concurrency, app):
+    """Connect the stages of a GameScanStages into a StagedPipeline."""
+    return StagedPipeline([
+        PipelineStage(STAGE_DISCOVERY, stages.discover, concurrency[STAGE_DISCOVERY]),
+        PipelineStage(STAGE_MATCHING, stages.match, concurrency[STAGE_MATCHING]),
+        PipelineStage(STAGE_PERSISTENCE, stages.persist, concurrency[STAGE_PERSISTENCE],
+                      batch_size=PERSISTENCE_BATCH_SIZE, batch_wait=PERSISTENCE_BATCH_WAIT),
+        PipelineStage(STAGE_POST_PROCESSING, stages.post_process, concurrency[STAGE_POST_PROCESSING]),
+    ], app)
@@ -0,0 +1,181 @@
+# File: /sharewarez/utils/scan_progress.py
+# Scan progress and cancellation.
+# A running scan keeps its counters in memory and writes them to its scan_jobs
+# row at most every PROGRESS_FLUSH_INTERVAL seconds or PROGRESS_FLUSH_ITEMS
+# results, as one UPDATE that also returns whether the job is still enabled.
+# The same transaction stores a checkpoint for every finished folder, so the
+# counters and checkpoints of an interrupted scan always agree.
+# Cancelling a scan sends a Postgres NOTIFY on the scan_job_cancel channel, so
+# the scan stops straight away from any worker process. The flush check covers
+# cancellations made without a notification.
+
+import select as io_select
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sharewarez import db
+from sharewarez.models import ScanJob, ScanCheckpoint
+
+
+CANCEL_CHANNEL = 'scan_job_cancel'
+
+# Progress is written when either limit is reached
+PROGRESS_FLUSH_INTERVAL = 1.0
+PROGRESS_FLUSH_ITEMS = 100
+
+# Seconds the cancel listener waits for a notification before checking for stop
+LISTEN_POLL_INTERVAL = 1.0
+
+
+def notify_scan_cancel(job_id):
+    """Queue a cancel notification for a scan job. Postgres delivers it when the caller commits."""
+    db.session.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': CANCEL_CHANNEL, 'payload': str(job_id)})
+
+
+def load_checkpoints(job_id):
+    """Return the checkpointed paths of a scan job as a dict of path -> succeeded."""
+    return dict(db.session.execute(
+        select(ScanCheckpoint.path, ScanCheckpoint.succeeded).where(ScanCheckpoint.job_id == job_id)
+    ).all())
+
+
+def clear_checkpoints(job_id):
+    """Forget the checkpoints of a scan job, e.g. once it finished or starts over. The caller commits."""
+    db.session.execute(delete(ScanCheckpoint).where(ScanCheckpoint.job_id == job_id))
+
+
+class ScanProgressWriter:
+    """
+    In-memory progress counters for one scan job, flushed to the database in a
+    single UPDATE ... RETURNING is_enabled.
+    """
+    def __init__(self, job_id, flush_interval=PROGRESS_FLUSH_INTERVAL, flush_items=PROGRESS_FLUSH_ITEMS):
+        self.job_id = job_id
+        self.flush_interval = flush_interval
+        self.flush_items = flush_items
+        self.flushes = 0
+        self._reset()
+        self._last_flush = time.monotonic()
+
+    def _reset(self):
+        self._success = 0
+        self._failed = 0
+        self._error_lines = []
+        self._current = None
+        self._checkpoints = []
+        self._pending = 0
+
+    def record(self, success, error_line=None, current=None, path=None):
+        """Count one finished folder, checkpointing its path when given."""
+        if success:
+            self._success += 1
+        else:
+            self._failed += 1
+        if error_line:
+            self._error_lines.append(f"{error_line}\n")
+        if current is not None:
+            self._current = current
+        if path is not None:
+            self._checkpoints.append({'job_id': self.job_id, 'path': path, 'succeeded': bool(success)})
+        self._pending += 1
+
+    def flush_due(self):
+        return self._pending >= self.flush_items or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def maybe_flush(self):
+        """Flush if a limit is reached. Returns False once the job has been disabled."""
+        if not self.flush_due():
+            return True
+        return self.flush()
+
+    def flush(self):
+        """
+        Write the pending counters and commit.
+
+        Returns:
+            bool: True while the job is still enabled
+        """
+        values = {}
+        if self._success:
+            values['folders_success'] = ScanJob.folders_success + self._success
+        if self._failed:
+            values['folders_failed'] = ScanJob.folders_failed + self._failed
+        if self._error_lines:
+            values['error_message'] = func.coalesce(ScanJob.error_message, '') + ''.join(self._error_lines)
+        if self._current is not None:
+            values['current_processing'] = self._current
+            values['last_progress_update'] = datetime.now()
+
+        if values:
+            enabled = db.session.execute(
+                update(ScanJob).where(ScanJob.id == self.job_id).values(**values).returning(ScanJob.is_enabled)
+                .execution_options(synchronize_session=False)
+            ).scalar()
+        else:
+            enabled = db.session.execute(select(ScanJob.is_enabled).where(ScanJob.id == self.job_id)).scalar()
+        if self._checkpoints:
+            db.session.execute(insert(ScanCheckpoint).values(self._checkpoints).on_conflict_do_nothing())
+        db.session.commit()
+        self._reset()
+        self._last_flush = time.monotonic()
+        self.flushes += 1
+        return bool(enabled)
+
+
+class ScanCancelListener:
+    """
+    Listens for cancel notifications of one scan job on its own connection and
+    calls `on_cancel` when one arrives. Run with start() and stop().
+    """
+    def __init__(self, app, job_id, on_cancel):
+        self.app = app
+        self.job_id = str(job_id)
+        self.on_cancel = on_cancel
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._listen, name=f'scan-cancel-{self.job_id[:8]}', daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=5):
+        """Wait until the listener is subscribed. Returns False if it couldn't subscribe in time."""
+        return self._ready.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=LISTEN_POLL_INTERVAL * 2)
+
+    def _listen(self):
+        with self.app.app_context():
+            try:
+                connection = db.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+            except Exception as e:
+                print(f"Scan cancel listener unavailable, relying on progress checks: {e}")
+                return
+            try:
+                connection.exec_driver_sql(f'LISTEN {CANCEL_CHANNEL}')
+                driver_connection = connection.connection.driver_connection
+                self._ready.set()
+                while not self._stop.is_set():
+                    if io_select.select([driver_connection], [], [], LISTEN_POLL_INTERVAL) == ([], [], []):
+                        continue
+                    driver_connection.poll()
+                    while driver_connection.notifies:
+                        notification = driver_connection.notifies.pop(0)
+                        if notification.payload == self.job_id:
+                            print(f"🛑 Cancel requested for scan job {self.job_id}")
+                            self.on_cancel()
+            except Exception as e:
+                print(f"Scan cancel listener stopped: {e}")
+            finally:
+                try:
+                    connection.exec_driver_sql(f'UNLISTEN {CANCEL_CHANNEL}')
+                except Exception:
+                    pass
+                connection.close()
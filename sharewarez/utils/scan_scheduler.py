@@ -0,0 +1,452 @@
+# File: /sharewarez/utils/scan_scheduler.py
+# Scheduled scans.
+# Scan jobs with a schedule are re-run by a background scheduler whenever
+# their next_run is due. Runs are aligned to the off-peak scan window from the
+# server settings and each library gets its own stagger offset inside that
+# window, so libraries on the same disks don't all start at once. Due jobs run
+# on their own threads as soon as the scan coordinator admits them, so
+# libraries on different devices scan concurrently, and a run is skipped when
+# the library folder is unchanged since the snapshot taken by the previous
+# scan. One process across all workers runs the scheduler, guarded by a
+# Postgres advisory lock.
+# The scheduler also resumes scans that a restart or shutdown interrupted,
+# skipping the folders their checkpoints record as finished.
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select
+from sharewarez import db
+from sharewarez.models import ScanJob, GlobalSettings, Library, AllowedFileType
+from sharewarez.utils.db import try_advisory_lock, release_advisory_lock
+from sharewarez.utils.functions import load_scanning_filter_patterns
+from sharewarez.utils.gamenames import get_game_names_from_folder, get_game_names_from_files
+from sharewarez.utils.scan_coordinator import check_scan_admission, admit_scan
+from sharewarez.utils.scan_snapshot import take_snapshot, load_snapshot, diff_snapshots
+from sharewarez.utils.scan_progress import clear_checkpoints
+from sharewarez.utils.shutdown import should_continue_processing, sleep_interruptible
+
+
+SCHEDULER_LOCK_NAME = 'sharewarez.scan_scheduler'
+
+# Seconds between checks for due scan jobs
+SCHEDULER_TICK = 60
+
+SCHEDULE_INTERVALS = {
+    '8_hours': timedelta(hours=8),
+    '24_hours': timedelta(hours=24),
+    '48_hours': timedelta(hours=48),
+}
+
+# Interrupted scans older than this start over instead of resuming
+RESUME_MAX_AGE = timedelta(days=3)
+
+# Fixed origin for schedule slots, so runs land on the same times of day
+_SLOT_EPOCH = datetime(2000, 1, 1)
+
+# Jobs running on scheduler threads in this process
+_active_job_ids = set()
+_active_jobs_lock = threading.Lock()
+
+
+def in_scan_window(moment, window_start, window_end):
+    """Return True if `moment` falls inside the scan window hours. Windows may wrap past midnight."""
+    if window_start is None or window_end is None or window_start == window_end:
+        return True
+    hour = moment.hour + moment.minute / 60
+    if window_start < window_end:
+        return window_start <= hour < window_end
+    return hour >= window_start or hour < window_end
+
+
+def compute_next_run(schedule, after, window_start=None, window_end=None, offset_minutes=0):
+    """
+    Return the first scheduled run strictly after `after`.
+
+    Runs fall on fixed slots every schedule interval, starting at the window start
+    (midnight without a window) plus the library's stagger offset. Slots outside
+    the scan window are skipped, so short intervals run at most once per window.
+    """
+    interval = SCHEDULE_INTERVALS[schedule]
+    windowed = window_start is not None and window_end is not None and window_start != window_end
+    offset = timedelta(minutes=offset_minutes)
+    first_slot = _SLOT_EPOCH + timedelta(hours=window_start if windowed else 0) + offset
+
+    slot = first_slot + interval * ((after - first_slot) // interval + 1)
+    # Slots repeat every interval and the window every day, so a fitting slot comes within two days
+    for _ in range(int(timedelta(days=2) / interval) + 1):
+        if not windowed or in_scan_window(slot - offset, window_start, window_end):
+            return slot
+        slot += interval
+    return slot
+
+
+def get_stagger_offset(library_uuid, stagger_minutes):
+    """
+    Return the stagger offset in minutes for a library: its position among the
+    libraries with scheduled jobs, in library display order, times `stagger_minutes`.
+    """
+    if not stagger_minutes or not library_uuid:
+        return 0
+    scheduled_libraries = set(db.session.execute(
+        select(ScanJob.library_uuid).where(ScanJob.schedule.isnot(None))
+    ).scalars().all())
+    scheduled_libraries.add(library_uuid)
+    ordered = db.session.execute(
+        select(Library.uuid).where(Library.uuid.in_(scheduled_libraries))
+        .order_by(Library.display_order, Library.name)
+    ).scalars().all()
+    return ordered.index(library_uuid) * stagger_minutes if library_uuid in ordered else 0
+
+
+def schedule_next_run(job, settings_obj=None, after=None):
+    """Set next_run for a job from its schedule and the scan window settings. The caller commits."""
+    if not job.schedule:
+        job.next_run = None
+        return None
+    if settings_obj is None:
+        settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    window_start = settings_obj.scan_window_start if settings_obj else None
+    window_end = settings_obj.scan_window_end if settings_obj else None
+    stagger = settings_obj.scan_stagger_minutes if settings_obj else 0
+    job.next_run = compute_next_run(
+        job.schedule, after or datetime.now(), window_start, window_end,
+        get_stagger_offset(job.library_uuid, stagger)
+    )
+    return job.next_run
+
+
+def get_scan_folder_path(job):
+    """Resolve the folder of a scan job against the configured base folder."""
+    base_dir = current_app.config.get('BASE_FOLDER_WINDOWS') if os.name == 'nt' else current_app.config.get('BASE_FOLDER_POSIX')
+    return os.path.join(base_dir or '', job.scan_folder)
+
+
+def reset_scan_job(job):
+    """Reset a job's counters and mark it running before it is re-run. The caller commits."""
+    job.status = 'Running'
+    job.total_folders = 0
+    job.folders_success = 0
+    job.folders_failed = 0
+    job.removed_count = 0
+    job.last_run = datetime.now(timezone.utc)
+    job.error_message = None
+    job.is_enabled = True
+    job.resume_pending = False
+
+
+def library_unchanged(job, folder_path):
+    """
+    Return True if the job's folder lists exactly the entries, with the same
+    fingerprints, that the previous scan stored in its snapshot.
+    """
+    if job.setting_force_updates_extras or job.setting_download_missing_images:
+        return False
+    previous_snapshot = load_snapshot(job.library_uuid, folder_path)
+    if not previous_snapshot:
+        return False
+
+    insensitive_patterns, sensitive_patterns = load_scanning_filter_patterns()
+    if job.setting_filefolder:
+        allowed_extensions = [ext.value.lower() for ext in db.session.execute(select(AllowedFileType)).scalars().all()]
+        scan_mode = 'files'
+        listing = get_game_names_from_files(folder_path, allowed_extensions, insensitive_patterns, sensitive_patterns)
+    else:
+        scan_mode = 'folders'
+        listing = get_game_names_from_folder(folder_path, insensitive_patterns, sensitive_patterns)
+
+    changes = diff_snapshots(previous_snapshot, take_snapshot((game_info['full_path'] for game_info in listing), scan_mode))
+    return not (changes['added'] or changes['removed'] or changes['modified'] or changes['renamed'])
+
+
+def get_due_jobs(now=None):
+    """Return enabled scheduled jobs whose next run has passed, oldest first."""
+    return db.session.execute(
+        select(ScanJob)
+        .where(ScanJob.schedule.isnot(None), ScanJob.next_run.isnot(None), ScanJob.next_run <= (now or datetime.now()),
+               ScanJob.is_enabled.is_(True), ScanJob.status.notin_(['Running', 'Stopping']),
+               ScanJob.resume_pending.isnot(True))
+        .order_by(ScanJob.next_run)
+    ).scalars().all()
+
+
+def run_scheduled_job(job):
+    """
+    Run one due job in the calling thread, or skip it when its folder is unchanged,
+    then schedule its next run.
+
+    Returns:
+        str: 'completed', 'skipped', 'deferred' (left for the next tick) or 'failed'
+    """
+    from sharewarez.utilities import scan_and_add_games
+
+    settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    folder_path = get_scan_folder_path(job)
+
+    if not os.path.exists(folder_path) or not os.access(folder_path, os.R_OK):
+        job.status = 'Failed'
+        job.error_message = f"Cannot access folder: {folder_path}"
+        schedule_next_run(job, settings_obj)
+        db.session.commit()
+        print(f"Scheduled scan of {folder_path} failed: folder not accessible")
+        return 'failed'
+
+    if library_unchanged(job, folder_path):
+        schedule_next_run(job, settings_obj)
+        db.session.commit()
+        print(f"⏭️ Scheduled scan of {folder_path} skipped, nothing changed. Next run: {job.next_run}")
+        return 'skipped'
+
+    reason = admit_scan(job, folder_path, settings_obj)
+    if reason:
+        db.session.rollback()
+        print(f"⏳ Scheduled scan of {folder_path} waits for the next tick: {reason}")
+        return 'deferred'
+
+    print(f"⏰ Starting scheduled scan of {folder_path} (job {job.id})")
+    job_id = job.id
+    reset_scan_job(job)
+    db.session.commit()
+    try:
+        scan_and_add_games(
+            folder_path,
+            scan_mode='files' if job.setting_filefolder else 'folders',
+            library_uuid=job.library_uuid,
+            remove_missing=job.setting_remove,
+            existing_job=job,
+            download_missing_images=bool(job.setting_download_missing_images),
+            force_updates_extras_scan=bool(job.setting_force_updates_extras)
+        )
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(ScanJob, job_id)
+        job.status = 'Failed'
+        job.error_message = f"Scheduled scan failed: {e}"
+        print(f"Scheduled scan of {folder_path} failed: {e}")
+
+    job = db.session.get(ScanJob, job_id)
+    db.session.refresh(job)
+    if job.status == 'Running':
+        # scan_and_add_games returned early without finishing the job
+        job.status = 'Failed'
+    schedule_next_run(job, settings_obj)
+    db.session.commit()
+    print(f"⏰ Scheduled scan of {folder_path} finished with status {job.status}. Next run: {job.next_run}")
+    return 'failed' if job.status == 'Failed' else 'completed'
+
+
+def _abandon_resume(job, reason):
+    job.resume_pending = False
+    job.error_message = f"Interrupted scan not resumed: {reason}"
+    clear_checkpoints(job.id)
+    db.session.commit()
+    print(f"Interrupted scan job {job.id} not resumed: {reason}")
+
+
+def resume_interrupted_job(job, now=None):
+    """
+    Resume a scan interrupted by a restart or shutdown from its checkpoints, in the calling
+    thread. Jobs whose library or folder is gone, or that are older than RESUME_MAX_AGE,
+    are cleaned up instead.
+
+    Returns:
+        str: 'resumed', 'failed', 'abandoned' or 'deferred' (left for the next tick)
+    """
+    from sharewarez.utilities import scan_and_add_games
+
+    now = now or datetime.now()
+    if not job.library_uuid or not job.scan_folder or not db.session.get(Library, job.library_uuid):
+        _abandon_resume(job, 'library no longer exists')
+        return 'abandoned'
+    if job.last_run and job.last_run.replace(tzinfo=None) < now - RESUME_MAX_AGE:
+        _abandon_resume(job, 'too old, run it again to scan from the start')
+        return 'abandoned'
+    folder_path = get_scan_folder_path(job)
+    if not os.path.exists(folder_path) or not os.access(folder_path, os.R_OK):
+        _abandon_resume(job, f"cannot access folder {folder_path}")
+        return 'abandoned'
+    reason = admit_scan(job, folder_path)
+    if reason:
+        db.session.rollback()
+        print(f"⏳ Resuming scan of {folder_path} waits for the next tick: {reason}")
+        return 'deferred'
+
+    print(f"▶️ Resuming interrupted scan of {folder_path} (job {job.id})")
+    job_id = job.id
+    job.status = 'Running'
+    job.is_enabled = True
+    job.resume_pending = False
+    job.error_message = None
+    db.session.commit()
+    try:
+        scan_and_add_games(
+            folder_path,
+            scan_mode='files' if job.setting_filefolder else 'folders',
+            library_uuid=job.library_uuid,
+            remove_missing=job.setting_remove,
+            existing_job=job,
+            download_missing_images=bool(job.setting_download_missing_images),
+            force_updates_extras_scan=bool(job.setting_force_updates_extras),
+            resume=True
+        )
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(ScanJob, job_id)
+        job.status = 'Failed'
+        job.error_message = f"Resumed scan failed: {e}"
+        print(f"Resumed scan of {folder_path} failed: {e}")
+
+    job = db.session.get(ScanJob, job_id)
+    db.session.refresh(job)
+    if job.status == 'Running':
+        job.status = 'Failed'
+    if job.schedule and not job.resume_pending:
+        schedule_next_run(job)
+    db.session.commit()
+    print(f"▶️ Resumed scan of {folder_path} finished with status {job.status}")
+    return 'failed' if job.status == 'Failed' else 'resumed'
+
+
+def is_job_active(job_id):
+    """Return True if a job is running on a scheduler thread of this process."""
+    with _active_jobs_lock:
+        return job_id in _active_job_ids
+
+
+def start_job_thread(target, job):
+    """
+    Run target(job) on a daemon thread with its own app context and session.
+    Returns the thread, or None if the job already runs on a scheduler thread.
+    """
+    app = current_app._get_current_object()
+    job_id = job.id
+    with _active_jobs_lock:
+        if job_id in _active_job_ids:
+            return None
+        _active_job_ids.add(job_id)
+
+    def run():
+        try:
+            with app.app_context():
+                try:
+                    thread_job = db.session.get(ScanJob, job_id)
+                    if thread_job:
+                        target(thread_job)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Scan scheduler thread for job {job_id} failed: {e}")
+                finally:
+                    db.session.remove()
+        finally:
+            with _active_jobs_lock:
+                _active_job_ids.discard(job_id)
+
+    thread = threading.Thread(target=run, name=f'scheduled-scan-{job_id[:8]}', daemon=True)
+    thread.start()
+    return thread
+
+
+def _dispatch(target, job, folder_path, background):
+    """Start a job if the coordinator would admit it now. Returns True if it was started."""
+    if is_job_active(job.id):
+        return False
+    _, reason = check_scan_admission(job.library_uuid, folder_path, exclude_job_id=job.id)
+    if reason:
+        return False
+    if background:
+        return start_job_thread(target, job) is not None
+    target(job)
+    return True
+
+
+def resume_interrupted_jobs(background=False):
+    """
+    Resume interrupted scans, oldest first, as the scan coordinator admits them.
+    With background=True each one runs on its own thread. Returns the number started.
+    """
+    handled = 0
+    jobs = db.session.execute(
+        select(ScanJob).where(ScanJob.resume_pending.is_(True)).order_by(ScanJob.last_run)
+    ).scalars().all()
+    for job in jobs:
+        if not should_continue_processing():
+            break
+        db.session.refresh(job)
+        if not job.resume_pending or job.status in ('Running', 'Stopping'):
+            continue
+        if _dispatch(resume_interrupted_job, job, get_scan_folder_path(job), background):
+            handled += 1
+    return handled
+
+
+def run_due_jobs(now=None, background=False):
+    """
+    Run due scheduled jobs as the scan coordinator admits them, leaving the others
+    for the next tick. With background=True each one runs on its own thread.
+    Returns the number of jobs started or skipped.
+    """
+    handled = 0
+    for job in get_due_jobs(now):
+        if not should_continue_processing():
+            break
+        db.session.refresh(job)
+        if not job.schedule or not job.is_enabled or job.status in ('Running', 'Stopping'):
+            continue
+        if _dispatch(run_scheduled_job, job, get_scan_folder_path(job), background):
+            handled += 1
+    return handled
+
+
+class ScanScheduler:
+    """
+    Runs due scheduled scan jobs while this process holds the scheduler lock.
+    Run with run(), normally on a daemon thread.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def run(self):
+        """Run until shutdown, checking for due jobs whenever the lock can be taken."""
+        while should_continue_processing():
+            with self.app.app_context():
+                connection = db.engine.connect()
+                try:
+                    if not try_advisory_lock(connection, SCHEDULER_LOCK_NAME):
+                        # Another worker is scheduling; take over if it goes away
+                        connection.rollback()
+                        sleep_interruptible(SCHEDULER_TICK)
+                        continue
+                    connection.commit()
+                    print("⏰ Scan scheduler started")
+                    try:
+                        self._schedule()
+                    finally:
+                        release_advisory_lock(connection, SCHEDULER_LOCK_NAME)
+                        connection.commit()
+                        print("⏰ Scan scheduler stopped")
+                finally:
+                    connection.close()
+                    db.session.remove()
+
+    def _schedule(self):
+        while should_continue_processing():
+            try:
+                resume_interrupted_jobs(background=True)
+                run_due_jobs(background=True)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Scan scheduler error: {e}")
+            db.session.remove()
+            sleep_interruptible(SCHEDULER_TICK)
+
+
+def start_scan_scheduler_service():
+    """Start the scan scheduler on a daemon thread. The thread creates its own app."""
+    def run():
+        from sharewarez import create_app
+        ScanScheduler(create_app()).run()
+
+    thread = threading.Thread(target=run, name='scan-scheduler', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,148 @@
+# File: /sharewarez/utils/scan_snapshot.py
+# Per-library filesystem snapshot for incremental scans.
+# After a scan, every game folder (or file, in file mode) is stored with its
+# inode, mtime, size and file count. The next scan fingerprints the current
+# listing, diffs it against the snapshot and only processes entries that were
+# added, renamed or modified. Fingerprints are shallow: a folder's mtime is the
+# newest mtime of the folder and its direct children, which changes whenever
+# something is added, removed or rewritten one level down.
+
+import os
+from datetime import datetime, timezone
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sharewarez import db
+from sharewarez.models import LibrarySnapshotEntry, Game, UnmatchedFolder
+from sharewarez.utils.bounded_executor import bounded_map
+
+
+# Rows per INSERT when saving a snapshot
+SNAPSHOT_BATCH_SIZE = 1000
+
+# Threads used to fingerprint entries; stat calls on network shares are latency bound
+SNAPSHOT_STAT_WORKERS = 8
+
+_FINGERPRINT_FIELDS = ('inode', 'mtime', 'size', 'file_count')
+
+
+def fingerprint_path(path, scan_mode='folders'):
+    """
+    Fingerprint a game folder or file.
+
+    Returns:
+        dict: inode, mtime, size and file_count, or None if the path cannot be read
+    """
+    try:
+        stat = os.stat(path)
+        if scan_mode == 'files':
+            return {'inode': stat.st_ino, 'mtime': stat.st_mtime, 'size': stat.st_size, 'file_count': 1}
+
+        mtime = stat.st_mtime
+        size = 0
+        file_count = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                file_count += 1
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                mtime = max(mtime, entry_stat.st_mtime)
+                if entry.is_file(follow_symlinks=False):
+                    size += entry_stat.st_size
+        return {'inode': stat.st_ino, 'mtime': mtime, 'size': size, 'file_count': file_count}
+    except OSError as e:
+        print(f"Could not fingerprint {path}: {e}")
+        return None
+
+
+def take_snapshot(paths, scan_mode='folders', max_workers=SNAPSHOT_STAT_WORKERS):
+    """
+    Fingerprint the given paths, any iterable, with a bounded number of stat calls in flight.
+    Returns a dict of path -> fingerprint, leaving out unreadable paths.
+    """
+    fingerprints = bounded_map(lambda path: fingerprint_path(path, scan_mode), paths, max_workers)
+    return {path: fingerprint for path, fingerprint in fingerprints if fingerprint}
+
+
+def load_snapshot(library_uuid, scan_folder):
+    """Return the stored snapshot for a library folder as a dict of path -> fingerprint."""
+    rows = db.session.execute(
+        select(LibrarySnapshotEntry.path, LibrarySnapshotEntry.inode, LibrarySnapshotEntry.mtime,
+               LibrarySnapshotEntry.size, LibrarySnapshotEntry.file_count)
+        .filter_by(library_uuid=library_uuid, scan_folder=scan_folder)
+    ).all()
+    return {row.path: {field: getattr(row, field) for field in _FINGERPRINT_FIELDS} for row in rows}
+
+
+def diff_snapshots(previous, current):
+    """
+    Compare a stored snapshot against the current one.
+
+    Returns:
+        dict: 'added', 'removed', 'modified' and 'unchanged' path sets, and
+        'renamed', a dict of old path -> new path for entries whose inode moved.
+        Renamed paths are not repeated in 'added' or 'removed'.
+    """
+    added = set(current) - set(previous)
+    removed = set(previous) - set(current)
+    modified = set()
+    unchanged = set()
+    for path in set(current) & set(previous):
+        if all(current[path][field] == previous[path][field] for field in _FINGERPRINT_FIELDS):
+            unchanged.add(path)
+        else:
+            modified.add(path)
+
+    renamed = {}
+    added_by_inode = {current[path]['inode']: path for path in added if current[path]['inode']}
+    for old_path in removed:
+        new_path = added_by_inode.pop(previous[old_path]['inode'], None)
+        if new_path:
+            renamed[old_path] = new_path
+    added -= set(renamed.values())
+    removed -= set(renamed)
+
+    return {'added': added, 'removed': removed, 'modified': modified, 'unchanged': unchanged, 'renamed': renamed}
+
+
+def apply_renames(renamed, library_uuid):
+    """
+    Point games and unmatched folders at the new path of renamed entries, so
+    they are not removed and re-matched. The caller commits.
+
+    Returns:
+        tuple: (set of new game paths, set of new unmatched folder paths)
+    """
+    relinked_games = set()
+    relinked_unmatched = set()
+    for old_path, new_path in renamed.items():
+        for model, column, relinked in ((Game, Game.full_disk_path, relinked_games),
+                                        (UnmatchedFolder, UnmatchedFolder.folder_path, relinked_unmatched)):
+            result = db.session.execute(
+                update(model).where(column == old_path, model.library_uuid == library_uuid).values({column: new_path})
+            )
+            if result.rowcount:
+                print(f"Relinked renamed {model.__tablename__} entry: {old_path} -> {new_path}")
+                relinked.add(new_path)
+    return relinked_games, relinked_unmatched
+
+
+def save_snapshot(library_uuid, scan_folder, snapshot):
+    """Replace the stored snapshot for a library folder. The caller commits."""
+    db.session.execute(delete(LibrarySnapshotEntry).filter_by(library_uuid=library_uuid, scan_folder=scan_folder))
+    upsert_snapshot_entries(library_uuid, scan_folder, snapshot)
+    print(f"Saved snapshot of {len(snapshot)} entries for {scan_folder}")
+
+
+def upsert_snapshot_entries(library_uuid, scan_folder, snapshot):
+    """Add or refresh individual snapshot entries, e.g. after the watcher processed them. The caller commits."""
+    now = datetime.now(timezone.utc)
+    rows = [dict(fingerprint, library_uuid=library_uuid, scan_folder=scan_folder, path=path, scanned_at=now)
+            for path, fingerprint in snapshot.items()]
+    for start in range(0, len(rows), SNAPSHOT_BATCH_SIZE):
+        stmt = insert(LibrarySnapshotEntry).values(rows[start:start + SNAPSHOT_BATCH_SIZE])
+        db.session.execute(stmt.on_conflict_do_update(
+            constraint='uq_library_snapshot_path',
+            set_={column: stmt.excluded[column] for column in _FINGERPRINT_FIELDS + ('scan_folder', 'scanned_at')}
+        ))
@@ -2,7 +2,7 @@ import os
 from datetime import datetime, timezone
 from flask import current_app, flash, has_request_context
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
 
 from sharewarez import db
 from sharewarez.models import (
@@ -16,10 +16,26 @@ from sharewarez.models import (
     ScanJob
 )
 from sharewarez.utils.functions import read_first_nfo_content
+from sharewarez.utils.folder_size import measure_path
+from sharewarez.utils.scan_snapshot import fingerprint_path
 from sharewarez.utils.igdb_api import make_igdb_api_request
+from sharewarez.utils.igdb_usage import igdb_usage_context
 from sharewarez.utils.event_logging import log_system_event
 
 
+def build_scan_settings(settings_obj):
+    """
+    Extract the local metadata settings used while adding games into a plain dict.
+    SQLAlchemy objects can't be passed across threads, so scans read these once up front.
+    """
+    return {
+        'use_local_metadata': settings_obj.use_local_metadata if settings_obj else False,
+        'write_local_metadata': settings_obj.write_local_metadata if settings_obj else False,
+        'use_local_images': settings_obj.use_local_images if settings_obj else False,
+        'local_metadata_filename': settings_obj.local_metadata_filename if settings_obj else 'sharewarez.json'
+    }
+
+
 def try_add_game(game_name, full_disk_path, scan_job_id, library_uuid, check_exists=True, fetch_hltb=False, settings=None):
     from sharewarez.utils.game_core import (
         retrieve_and_save_game
@@ -53,7 +69,7 @@ def process_game_with_fallback(game_name, full_disk_path, scan_job_id, library_u
     
     # Fetch library details based on library_uuid
     library = db.session.execute(select(Library).filter_by(uuid=library_uuid)).scalar_one_or_none()
-    scan_job = db.session.get(ScanJob, scan_job_id)
+    scan_job = db.session.get(ScanJob, scan_job_id) if scan_job_id else None
     if not library:
         print(f"Library with UUID {library_uuid} not found.")
         return False
@@ -64,7 +80,8 @@ def process_game_with_fallback(game_name, full_disk_path, scan_job_id, library_u
         if existing_unmatched_folder:
             print(f"Skipping processing for already logged unmatched folder: {full_disk_path}")
             # Update total count to maintain consistency even when skipping
-            scan_job.folders_failed += 1
+            if scan_job:
+                scan_job.folders_failed += 1
             return False
 
     # Check if the game already exists in the database (fallback for when cached sets not provided)
@@ -76,16 +93,12 @@ def process_game_with_fallback(game_name, full_disk_path, scan_job_id, library_u
             return True 
 
     print(f'Game does not exist in database: {game_name} at {full_disk_path}')
-    # Try to add the game, now using library_uuid
-    if not try_add_game(game_name, full_disk_path, scan_job_id, library_uuid=library_uuid, check_exists=False, fetch_hltb=fetch_hltb, settings=settings):
-        # Attempt fallback game name processing
-        parts = game_name.split()
-        for i in range(len(parts) - 1, 0, -1):
-            fallback_name = ' '.join(parts[:i])
-            if try_add_game(fallback_name, full_disk_path, scan_job_id, library_uuid=library_uuid, check_exists=False, fetch_hltb=fetch_hltb, settings=settings):
-                print(f"[GAME MATCH] Success with fallback name: '{fallback_name}'")
-                return True
-    else:
+    # Try to add the game, now using library_uuid.
+    # Shorter fallback names and GOTY variants are ranked locally by the matcher
+    # (see find_igdb_match), so a single attempt covers them.
+    with igdb_usage_context('scan', scan_job_id):
+        added = try_add_game(game_name, full_disk_path, scan_job_id, library_uuid=library_uuid, check_exists=False, fetch_hltb=fetch_hltb, settings=settings)
+    if added:
         return True
 
     # If the game does not match, log it as unmatched
@@ -119,7 +132,111 @@ def log_unmatched_folder(scan_job_id, folder_path, matched_status, library_uuid=
             print(f"[UNMATCHED ERROR] Failed to log unmatched folder due to a database error: {folder_path}")
     else:
         print(f"[UNMATCHED SKIPPED] Unmatched folder already logged for: {folder_path}. Status: {existing_unmatched_folder.status}")
-        
+
+
+def log_unmatched_folders(scan_job_id, folder_paths, matched_status, library_uuid=None):
+    """
+    Log several folders at once, skipping those already logged. The caller commits.
+
+    Returns:
+        int: Number of folders logged
+    """
+    folder_paths = list(dict.fromkeys(folder_paths))
+    if not folder_paths:
+        return 0
+    already_logged = set(db.session.execute(
+        select(UnmatchedFolder.folder_path).where(UnmatchedFolder.folder_path.in_(folder_paths))
+    ).scalars().all())
+    now = datetime.now(timezone.utc)
+    new_folders = [
+        UnmatchedFolder(folder_path=folder_path, failed_time=now, content_type='Games',
+                        library_uuid=library_uuid, status=matched_status)
+        for folder_path in folder_paths if folder_path not in already_logged
+    ]
+    db.session.add_all(new_folders)
+    print(f"[UNMATCHED] Logged {len(new_folders)} {matched_status.lower()} folders for scan job {scan_job_id}")
+    return len(new_folders)
+
+
+
+def _measure_update_path(file_path):
+    """Fingerprint mtime, size and file count of an update or extra; None values when it can't be read."""
+    fingerprint = fingerprint_path(file_path, 'folders' if os.path.isdir(file_path) else 'files')
+    measured = measure_path(file_path) if fingerprint else None
+    return {
+        'mtime': fingerprint['mtime'] if fingerprint else None,
+        'file_size': measured[0] if measured else None,
+        'file_count': measured[1] if measured else None
+    }
+
+
+def index_update_entries(model, game_uuid, entries):
+    """
+    Add or refresh the GameUpdate or GameExtra records of a game with one query and
+    bulk statements. An entry whose fingerprint mtime (newest of the path and its direct
+    children) matches its record is left alone; the others get their size, file count
+    and NFO read again. The caller commits.
+
+    Args:
+        entries: list of (file_path, folder to read the NFO from)
+
+    Returns:
+        tuple: (added, refreshed, unchanged)
+    """
+    existing = {
+        record.file_path: record
+        for record in db.session.execute(select(model).filter_by(game_uuid=game_uuid)).scalars()
+    }
+    now = datetime.now(timezone.utc)
+    nfo_contents = {}
+    new_rows = []
+    changed_rows = []
+    unchanged = 0
+    for file_path, nfo_folder in entries:
+        record = existing.get(file_path)
+        fingerprint = fingerprint_path(file_path, 'folders' if os.path.isdir(file_path) else 'files')
+        mtime = fingerprint['mtime'] if fingerprint else None
+        if record is not None and mtime is not None and record.mtime == mtime and record.file_size is not None:
+            unchanged += 1
+            continue
+
+        measured = measure_path(file_path) if fingerprint else None
+        if nfo_folder not in nfo_contents:
+            nfo_contents[nfo_folder] = read_first_nfo_content(nfo_folder)
+        fields = {
+            'nfo_content': nfo_contents[nfo_folder],
+            'file_size': measured[0] if measured else None,
+            'file_count': measured[1] if measured else None,
+            'mtime': mtime,
+            'indexed_at': now
+        }
+        if record is None:
+            new_rows.append(dict(fields, game_uuid=game_uuid, file_path=file_path))
+        else:
+            changed_rows.append(dict(fields, id=record.id))
+
+    if new_rows:
+        db.session.execute(insert(model), new_rows)
+    if changed_rows:
+        db.session.execute(update(model), changed_rows)
+    return len(new_rows), len(changed_rows), unchanged
+
+
+def index_update_records(records):
+    """
+    Measure GameUpdate or GameExtra records that were never indexed, e.g. added before
+    sizes were stored, so their next page views come from the database. Commits.
+    """
+    now = datetime.now(timezone.utc)
+    for record in records:
+        for field, value in _measure_update_path(record.file_path).items():
+            setattr(record, field, value)
+        record.indexed_at = now
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        print(f"Error storing update and extra sizes: {str(e)}")
+        db.session.rollback()
 
 
 def process_game_updates(game_name, full_disk_path, updates_folder, library_uuid, update_folder_name=None):
@@ -146,35 +263,14 @@ def process_game_updates(game_name, full_disk_path, updates_folder, library_uuid
     update_folders = [f for f in os.listdir(updates_folder) if os.path.isdir(os.path.join(updates_folder, f))]
     print(f"Update folders found: {update_folders}")
 
-    for update_folder in update_folders:
-        update_path = os.path.join(updates_folder, update_folder)
-        print(f"Processing update: {update_folder}")
-        
-        significant_files = [f for f in os.listdir(update_path) if not f.lower().endswith(('.sfv', '.nfo'))]
-        print(f"Significant files in update folder: {significant_files}")
-
-        # Always store the folder path to display the proper folder name in UI
-        file_path = update_path
-        print(f"Using update folder path: {file_path}")
-
-        # Create or update GameUpdate record
-        game_update = db.session.execute(select(GameUpdate).filter_by(game_uuid=game.uuid, file_path=file_path)).scalar_one_or_none()
-        if not game_update:
-            print(f"Creating new GameUpdate record for {file_path}")
-            game_update = GameUpdate(
-                game_uuid=game.uuid,
-                file_path=file_path,
-                nfo_content=read_first_nfo_content(update_path)
-            )
-            db.session.add(game_update)
-        else:
-            print(f"Updating existing GameUpdate record for {file_path}")
-            game_update.file_path = file_path
-            game_update.nfo_content = read_first_nfo_content(update_path)
-
+    # Always store the folder path to display the proper folder name in UI
+    update_paths = [os.path.join(updates_folder, update_folder) for update_folder in update_folders]
     try:
+        added, refreshed, unchanged = index_update_entries(
+            GameUpdate, game.uuid, [(update_path, update_path) for update_path in update_paths])
         db.session.commit()
-        print("Successfully committed GameUpdate records to database")
+        print(f"Successfully committed GameUpdate records to database: {added} added, {refreshed} refreshed, "
+              f"{unchanged} unchanged")
     except SQLAlchemyError as e:
         print(f"Error committing GameUpdate records to database: {str(e)}")
         db.session.rollback()
@@ -207,32 +303,15 @@ def process_game_extras(game_name, full_disk_path, extras_folder, library_uuid,
                   os.path.isdir(os.path.join(extras_folder, f))]
     print(f"Extra items found: {extra_items}")
 
-    for extra_item in extra_items:
-        extra_path = os.path.join(extras_folder, extra_item)
-        print(f"Processing extra: {extra_item}")
-        
-        # Skip .nfo and .sfv files
-        if extra_item.lower().endswith(('.nfo', '.sfv')):
-            continue
-
-        # Create or update GameExtra record
-        game_extra = db.session.execute(select(GameExtra).filter_by(game_uuid=game.uuid, file_path=extra_path)).scalar_one_or_none()
-        if not game_extra:
-            print(f"Creating new GameExtra record for {extra_path}")
-            game_extra = GameExtra(
-                game_uuid=game.uuid,
-                file_path=extra_path,
-                nfo_content=read_first_nfo_content(os.path.dirname(extra_path))
-            )
-            db.session.add(game_extra)
-        else:
-            print(f"Updating existing GameExtra record for {extra_path}")
-            game_extra.file_path = extra_path
-            game_extra.nfo_content = read_first_nfo_content(os.path.dirname(extra_path))
-
+    # Skip .nfo and .sfv files; an extra's NFO is the one in the extras folder
+    extra_paths = [os.path.join(extras_folder, extra_item) for extra_item in extra_items
+                   if not extra_item.lower().endswith(('.nfo', '.sfv'))]
     try:
+        added, refreshed, unchanged = index_update_entries(
+            GameExtra, game.uuid, [(extra_path, os.path.dirname(extra_path)) for extra_path in extra_paths])
         db.session.commit()
-        print(f"Successfully processed extras for game: {game_name}")
+        print(f"Successfully processed extras for game: {game_name} ({added} added, {refreshed} refreshed, "
+              f"{unchanged} unchanged)")
     except SQLAlchemyError as e:
         print(f"Error processing extras for game: {str(e)}")
         db.session.rollback()
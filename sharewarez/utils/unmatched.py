@@ -3,13 +3,107 @@ from flask import flash, redirect, url_for, session, request
 from flask_login import current_user
 from sqlalchemy.exc import SQLAlchemyError
 from sharewarez import db
-from sharewarez.models import UnmatchedFolder
+from sharewarez.models import UnmatchedFolder, Library
 from sharewarez.utils.event_logging import log_system_event
-from sqlalchemy import select, delete, func
+from sharewarez.utils.functions import PLATFORM_IDS
+from sqlalchemy import select, delete, update, func, or_
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+UNMATCHED_PAGE_SIZE = 100
+MAX_UNMATCHED_PAGE_SIZE = 500
+
+# Statuses admins can set in bulk; un-ignoring puts a folder back to 'Unmatched'
+BULK_UNMATCHED_STATUSES = ('Ignore', 'Unmatched')
+
+
+def unmatched_folder_conditions(ids=None, status=None, library_uuid=None, search=None):
+    """
+    Where clauses selecting unmatched folders by ID, status, library, and a
+    case-insensitive search of the folder path or library name.
+    """
+    conditions = []
+    if ids is not None:
+        conditions.append(UnmatchedFolder.id.in_(ids))
+    if status:
+        conditions.append(UnmatchedFolder.status == status)
+    if library_uuid:
+        conditions.append(UnmatchedFolder.library_uuid == library_uuid)
+    if search:
+        escaped = search.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        conditions.append(or_(
+            func.lower(UnmatchedFolder.folder_path).like(pattern, escape='\\'),
+            UnmatchedFolder.library_uuid.in_(
+                select(Library.uuid).where(func.lower(Library.name).like(pattern, escape='\\'))
+            )
+        ))
+    return conditions
+
+
+def list_unmatched_folders(page=1, per_page=UNMATCHED_PAGE_SIZE, status=None, library_uuid=None, search=None):
+    """
+    One page of unmatched folders, ordered by status and path, with the total
+    and the number of folders per status for the same library and search.
+    """
+    per_page = max(1, min(per_page, MAX_UNMATCHED_PAGE_SIZE))
+    page = max(1, page)
+    conditions = unmatched_folder_conditions(status=status, library_uuid=library_uuid, search=search)
+
+    total = db.session.execute(
+        select(func.count()).select_from(UnmatchedFolder).join(Library).where(*conditions)
+    ).scalar()
+    rows = db.session.execute(
+        select(UnmatchedFolder.id, UnmatchedFolder.folder_path, UnmatchedFolder.status,
+               UnmatchedFolder.library_uuid, Library.name, Library.platform)
+        .join(Library)
+        .where(*conditions)
+        .order_by(UnmatchedFolder.status.desc(), UnmatchedFolder.folder_path, UnmatchedFolder.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    ).all()
+    status_counts = dict(db.session.execute(
+        select(UnmatchedFolder.status, func.count())
+        .join(Library)
+        .where(*unmatched_folder_conditions(library_uuid=library_uuid, search=search))
+        .group_by(UnmatchedFolder.status)
+    ).all())
+
+    return {
+        'folders': [{
+            'id': folder_id,
+            'folder_path': folder_path,
+            'status': folder_status,
+            'library_uuid': folder_library_uuid,
+            'library_name': library_name,
+            'platform_name': platform.name if platform else '',
+            'platform_id': PLATFORM_IDS.get(platform.name) if platform else None
+        } for folder_id, folder_path, folder_status, folder_library_uuid, library_name, platform in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+        'status_counts': status_counts
+    }
+
+
+def set_unmatched_status(status, conditions):
+    """
+    Set the status of every unmatched folder matching `conditions` in one statement.
+    The caller commits.
+
+    Returns:
+        int: Number of folders updated
+    """
+    if status not in BULK_UNMATCHED_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(BULK_UNMATCHED_STATUSES)}")
+    result = db.session.execute(
+        update(UnmatchedFolder).where(*conditions).where(UnmatchedFolder.status != status)
+        .values(status=status).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
 def handle_delete_unmatched(all):
     """Handle deletion of unmatched folders with proper logging and audit trail.
     
@@ -0,0 +1,240 @@
+# File: /sharewarez/utils/unmatched_rematch.py
+# Bulk re-matching of unmatched folders.
+# A re-match job takes a set of unmatched folders of one library and runs them
+# through the scan pipeline again, with names cleaned by the current release
+# group filters and the candidate-ranking matcher. It is a ScanJob with
+# job_type 'rematch': the scan coordinator admits it like a library scan, it
+# takes its share of the IGDB quota, and its progress and cancel button show in
+# the scan jobs list. Folders that match become games and leave the unmatched
+# list; the others stay as they were.
+
+import os
+from datetime import datetime, timezone
+from sqlalchemy import select, delete
+from flask import current_app
+from sharewarez import db
+from sharewarez.models import Game, Library, ScanJob, GlobalSettings, UnmatchedFolder
+from sharewarez.utils.functions import load_scanning_filter_patterns, PLATFORM_IDS
+from sharewarez.utils.gamenames import get_name_normalizer
+from sharewarez.utils.scanning import build_scan_settings
+from sharewarez.utils.igdb_api import IGDBRateLimiter
+from sharewarez.utils.igdb_async import start_scan_search_prefetch, AsyncIGDBRateLimiter
+from sharewarez.utils.igdb_usage import save_scan_api_cost
+from sharewarez.utils.scan_pipeline import GameScanStages, build_scan_pipeline, get_stage_concurrency, format_pipeline_metrics
+from sharewarez.utils.scan_progress import ScanProgressWriter, ScanCancelListener
+from sharewarez.utils.scan_coordinator import admit_scan, split_io_workers, IGDBQuotaShare
+from sharewarez.utils.shutdown import should_continue_processing
+from sharewarez.utils.unmatched import unmatched_folder_conditions
+
+
+REMATCH_JOB_TYPE = 'rematch'
+
+# Matched folders are removed from the unmatched list in batches of this size
+RESOLVED_BATCH_SIZE = 500
+
+
+def get_rematch_folders(ids=None, status=None, library_uuid=None, search=None):
+    """
+    Group the unmatched folders selected like unmatched_folder_conditions by library.
+    Ignored folders are only included when they are selected by ID or status.
+
+    Returns:
+        dict: {library_uuid: [(folder_id, folder_path), ...]}
+    """
+    conditions = unmatched_folder_conditions(ids=ids, status=status, library_uuid=library_uuid, search=search)
+    if ids is None and not status:
+        conditions.append(UnmatchedFolder.status != 'Ignore')
+    query = select(UnmatchedFolder.library_uuid, UnmatchedFolder.id, UnmatchedFolder.folder_path) \
+        .where(*conditions, UnmatchedFolder.library_uuid.isnot(None)) \
+        .order_by(UnmatchedFolder.folder_path)
+    by_library = {}
+    for folder_library_uuid, folder_id, folder_path in db.session.execute(query).all():
+        by_library.setdefault(folder_library_uuid, []).append((folder_id, folder_path))
+    return by_library
+
+
+def _common_folder(paths):
+    """Deepest folder containing all paths, used as the job's scan folder and device."""
+    try:
+        return os.path.commonpath([os.path.dirname(path) for path in paths])
+    except ValueError:
+        # Paths on different drives
+        return os.path.dirname(paths[0])
+
+
+def create_rematch_job(library_uuid, folder_paths):
+    """
+    Create a running re-match job for folders of one library if the scan coordinator
+    admits it. Commits on success and rolls back on refusal.
+
+    Returns:
+        tuple: (job, None) or (None, reason)
+    """
+    scan_folder = _common_folder(folder_paths)
+    job = ScanJob(
+        folders={},
+        content_type='Games',
+        status='Running',
+        is_enabled=True,
+        last_run=datetime.now(timezone.utc),
+        library_uuid=library_uuid,
+        error_message='',
+        total_folders=len(folder_paths),
+        folders_success=0,
+        folders_failed=0,
+        removed_count=0,
+        scan_folder=scan_folder,
+        job_type=REMATCH_JOB_TYPE
+    )
+    reason = admit_scan(job, scan_folder)
+    if reason:
+        db.session.rollback()
+        return None, reason
+    db.session.add(job)
+    db.session.commit()
+    return job, None
+
+
+def rematch_name(folder_path, normalizer):
+    """Game name for an unmatched folder or file, cleaned with the current filters."""
+    name = os.path.basename(folder_path.rstrip('/\\'))
+    if os.path.isfile(folder_path):
+        name = os.path.splitext(name)[0]
+    return normalizer.clean(name)
+
+
+def _remove_resolved(library_uuid, folder_paths):
+    if folder_paths:
+        db.session.execute(
+            delete(UnmatchedFolder)
+            .where(UnmatchedFolder.library_uuid == library_uuid, UnmatchedFolder.folder_path.in_(folder_paths))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        folder_paths.clear()
+
+
+def run_rematch_job(job, folder_ids):
+    """
+    Re-match the unmatched folders `folder_ids` of the job's library. Runs on
+    the job's own thread inside an app context, like a library scan.
+    """
+    library = db.session.get(Library, job.library_uuid)
+    if not library:
+        job.status = 'Failed'
+        job.error_message = 'Library not found'
+        db.session.commit()
+        return
+
+    settings_obj = db.session.execute(select(GlobalSettings)).scalars().first()
+    settings_dict = build_scan_settings(settings_obj)
+    insensitive_patterns, sensitive_patterns = load_scanning_filter_patterns()
+    normalizer = get_name_normalizer(insensitive_patterns, sensitive_patterns)
+
+    folder_paths = db.session.execute(
+        select(UnmatchedFolder.folder_path).where(UnmatchedFolder.id.in_(folder_ids))
+    ).scalars().all()
+    items = [{'name': rematch_name(folder_path, normalizer), 'full_path': folder_path} for folder_path in folder_paths]
+    # Folders added as games since they were logged only need to leave the unmatched list
+    existing_game_paths = set(db.session.execute(
+        select(Game.full_disk_path).where(Game.library_uuid == library.uuid, Game.full_disk_path.in_(folder_paths))
+    ).scalars().all())
+    job.total_folders = len(items)
+    db.session.commit()
+    print(f"🔁 Re-matching {len(items)} unmatched folders of library '{library.name}' (job {job.id})")
+
+    platform_id = PLATFORM_IDS.get(library.platform.name)
+    igdb_rate_limiter = IGDBRateLimiter()
+    prefetch_rate_limiter = AsyncIGDBRateLimiter(shared_limiter=igdb_rate_limiter)
+    igdb_share = IGDBQuotaShare([igdb_rate_limiter])
+    igdb_share.refresh(force=True)
+
+    search_prefetcher = start_scan_search_prefetch(
+        sum(1 for item in items if item['full_path'] not in existing_game_paths),
+        current_app.config['IGDB_API_ENDPOINT'],
+        scan_job_id=job.id,
+        rate_limiter=prefetch_rate_limiter
+    )
+    stages = GameScanStages(
+        job.id,
+        library.uuid,
+        platform_id,
+        settings_dict,
+        {
+            'update_folder_name': settings_obj.update_folder_name if settings_obj else 'updates',
+            'extras_folder_name': settings_obj.extras_folder_name if settings_obj else 'extras',
+            'enable_game_updates': settings_obj.enable_game_updates if settings_obj else False,
+            'enable_game_extras': settings_obj.enable_game_extras if settings_obj else False,
+            'force_updates_extras_scan': False,
+            'fetch_hltb': False,
+            'force_hltb_refetch': False
+        },
+        existing_game_paths,
+        set(),
+        set(),
+        igdb_rate_limiter,
+        search_prefetcher=search_prefetcher
+    )
+    concurrency = split_io_workers(get_stage_concurrency(settings_obj), job.io_workers)
+    pipeline = build_scan_pipeline(stages, concurrency, current_app._get_current_object())
+
+    progress = ScanProgressWriter(job.id)
+    cancelled = False
+
+    def on_cancel():
+        nonlocal cancelled
+        cancelled = True
+        pipeline.cancel()
+
+    cancel_listener = ScanCancelListener(current_app._get_current_object(), job.id, on_cancel).start()
+    resolved = []
+    processed_count = 0
+    interrupted = False
+    try:
+        for item in pipeline.run(items):
+            if item['result'] == 'cancelled':
+                continue
+            processed_count += 1
+            matched = item['result'] in ('added', 'exists')
+            error_line = f"Failed to re-match '{item['name']}': {item.get('error')}" if item['result'] == 'error' else None
+            progress.record(matched, error_line, f"Re-matching: {item['name']} ({processed_count}/{len(items)})")
+            igdb_share.refresh()
+            if matched:
+                resolved.append(item['full_path'])
+                if len(resolved) >= RESOLVED_BATCH_SIZE:
+                    _remove_resolved(library.uuid, resolved)
+
+            if pipeline.cancelled:
+                continue
+            if not should_continue_processing():
+                interrupted = True
+                pipeline.cancel()
+                continue
+            if not progress.maybe_flush():
+                cancelled = True
+                pipeline.cancel()
+    finally:
+        cancel_listener.stop()
+        if search_prefetcher:
+            search_prefetcher.stop()
+    _remove_resolved(library.uuid, resolved)
+    if not progress.flush():
+        cancelled = True
+
+    job.pipeline_metrics = pipeline.metrics_summary()
+    print(format_pipeline_metrics(job.pipeline_metrics))
+    save_scan_api_cost(job)
+    job.current_processing = None
+    if interrupted:
+        job.status = 'Failed'
+        job.error_message = 'Re-match interrupted by application shutdown'
+    elif cancelled:
+        job.status = 'Cancelled'
+        job.error_message = 'Re-match cancelled by user'
+    else:
+        job.status = 'Completed'
+        # Keep the lines of folders that failed below the summary
+        job.error_message = f"Re-matched {job.folders_success} of {len(items)} unmatched folders\n" + (job.error_message or '')
+    db.session.commit()
+    print(f"🔁 Re-match job {job.id} {job.status.lower()}: {job.folders_success} matched, "
+          f"{job.folders_failed} still unmatched")
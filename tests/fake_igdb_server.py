@@ -0,0 +1,167 @@
+"""
+Minimal fake IGDB/Twitch HTTP server for tests.
+
+Serves the Twitch token endpoint and the IGDB endpoints used by SharewareZ from
+an in-memory list of games, recording every request it receives. A per-request
+latency and a requests-per-second limit (answered with 429s like IGDB) can be
+configured to mimic the real API, e.g. for benchmark_scan.py.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeIGDBServer:
+    """Fake IGDB server running on a background thread on a free local port."""
+
+    # Endpoints answered with an empty list; the scan asks them for every matched game
+    EMPTY_ENDPOINTS = ('/websites', '/involved_companies', '/screenshots')
+
+    def __init__(self, games=None, platforms=None, latency=0.0, rate_limit=None):
+        self.games = list(games or [])
+        self.platforms = list(platforms or [])
+        self.requests = []
+        self.rate_limit_responses = 0
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limited = 0
+        self._recent_requests = []
+        self.access_token = 'fake_access_token'
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def token_url(self):
+        return f"{self.base_url}/oauth2/token"
+
+    @property
+    def games_url(self):
+        return f"{self.base_url}/v4/games"
+
+    @property
+    def covers_url(self):
+        return f"{self.base_url}/v4/covers"
+
+    def endpoint_requests(self, endpoint):
+        with self._lock:
+            return [r for r in self.requests if r['path'].endswith(endpoint)]
+
+    def _over_rate_limit(self):
+        """Count an API request against rate_limit requests per second. Call with the lock held."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self._recent_requests = [moment for moment in self._recent_requests if now - moment < 1.0]
+        if len(self._recent_requests) >= self.rate_limit:
+            return True
+        self._recent_requests.append(now)
+        return False
+
+    def start(self):
+        handler = self._make_handler()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(timeout=5)
+
+    def _search(self, body, records=None):
+        search_match = re.search(r'search "([^"]*)"', body)
+        id_match = re.search(r'where id = (\d+)', body)
+        limit_match = re.search(r'limit (\d+)', body)
+        platform_match = re.search(r'platforms = \((\d+)\)', body)
+        updated_match = re.search(r'updated_at > (\d+)', body)
+        after_id_match = re.search(r'id > (\d+)', body)
+        limit = int(limit_match.group(1)) if limit_match else 10
+
+        results = self.games if records is None else records
+        if updated_match:
+            results = [g for g in results if g.get('updated_at', 0) > int(updated_match.group(1))]
+        if after_id_match:
+            results = [g for g in results if g['id'] > int(after_id_match.group(1))]
+        if 'sort id asc' in body:
+            results = sorted(results, key=lambda g: g['id'])
+        if id_match:
+            results = [g for g in results if g['id'] == int(id_match.group(1))]
+        if search_match:
+            term = search_match.group(1).lower()
+            results = [g for g in results if term in g['name'].lower()]
+        if platform_match:
+            platform_id = int(platform_match.group(1))
+            results = [g for g in results if platform_id in g.get('platform_ids', [platform_id])]
+        return [{k: v for k, v in g.items() if k != 'platform_ids'} for g in results[:limit]]
+
+    def _covers(self, body):
+        game_match = re.search(r'where game=(\d+)', body)
+        if not game_match:
+            return []
+        game_id = int(game_match.group(1))
+        return [{'url': f'//images.igdb.com/igdb/image/upload/t_thumb/cover{game_id}.jpg',
+                 'image_id': f'cover{game_id}'} for g in self.games if g['id'] == game_id]
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode() if length else ''
+                with fake._lock:
+                    fake.requests.append({'path': self.path, 'body': body, 'headers': dict(self.headers)})
+                    rate_limited = fake.rate_limit_responses > 0 and not self.path.startswith('/oauth2')
+                    if rate_limited:
+                        fake.rate_limit_responses -= 1
+                    elif not self.path.startswith('/oauth2'):
+                        rate_limited = fake._over_rate_limit()
+                    if rate_limited:
+                        fake.rate_limited += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                if self.path.startswith('/oauth2/token'):
+                    self._send_json(200, {'access_token': fake.access_token, 'expires_in': 3600})
+                    return
+                if rate_limited:
+                    self._send_json(429, {'message': 'Too Many Requests'})
+                    return
+                if self.headers.get('Authorization') != f'Bearer {fake.access_token}':
+                    self._send_json(401, {'message': 'Unauthorized'})
+                    return
+                if self.path.endswith('/games'):
+                    self._send_json(200, fake._search(body))
+                elif self.path.endswith('/platforms'):
+                    self._send_json(200, fake._search(body, fake.platforms))
+                elif self.path.endswith('/covers'):
+                    self._send_json(200, fake._covers(body))
+                elif self.path.endswith(fake.EMPTY_ENDPOINTS):
+                    self._send_json(200, [])
+                else:
+                    self._send_json(404, {'message': 'Not Found'})
+
+        return Handler
@@ -0,0 +1,103 @@
+import os
+import requests
+from argparse import Namespace
+from sqlalchemy import select, func
+
+from benchmark_scan import (
+    build_titles, build_release_groups, build_library, compare_to_baseline, run_benchmark
+)
+from sharewarez.models import Library, ReleaseGroup
+from sharewarez.utils.gamenames import get_game_names_from_folder
+from tests.fake_igdb_server import FakeIGDBServer
+
+
+def bench_options(**overrides):
+    options = dict(games=8, files=2, depth=1, file_size=16, release_groups=5, unmatched_rate=0.25,
+                   updates_rate=0.5, extras_rate=0.5, latency=0.0, rate_limit=0, igdb_rate=100,
+                   seed=1, verbose=False)
+    options.update(overrides)
+    return Namespace(**options)
+
+
+class TestFakeServerLimits:
+    """Test the latency and rate limit of the fake IGDB server."""
+
+    def test_requests_over_the_rate_limit_get_429(self):
+        server = FakeIGDBServer([{'id': 1, 'name': 'Doom'}], rate_limit=2).start()
+        try:
+            headers = {'Authorization': f'Bearer {server.access_token}'}
+            statuses = [requests.post(server.games_url, data='search "doom";', headers=headers).status_code
+                        for _ in range(3)]
+            # Token requests don't count against the limit
+            assert requests.post(server.token_url).status_code == 200
+        finally:
+            server.stop()
+
+        assert statuses == [200, 200, 429]
+        assert server.rate_limited == 1
+
+    def test_unused_endpoints_return_empty_lists(self):
+        server = FakeIGDBServer().start()
+        try:
+            response = requests.post(f"{server.base_url}/v4/websites", data='fields url;',
+                                     headers={'Authorization': f'Bearer {server.access_token}'})
+        finally:
+            server.stop()
+        assert response.json() == []
+
+
+class TestSyntheticLibrary:
+    """Test the generated library tree and catalog."""
+
+    def test_titles_are_unique_and_reproducible(self):
+        titles = build_titles(500, seed=3)
+        assert len(set(titles)) == 500
+        assert titles == build_titles(500, seed=3)
+        assert not any(character.isdigit() for title in titles for character in title)
+
+    def test_folder_names_clean_back_to_catalog_titles(self, tmp_path):
+        options = bench_options(games=40, unmatched_rate=0.0)
+        groups = build_release_groups(options.release_groups, options.seed)
+        catalog, folders, unmatched = build_library(str(tmp_path), options, groups)
+
+        assert (folders, unmatched, len(catalog)) == (40, 0, 40)
+        insensitive = ['-' + group for group in groups] + ['.' + group for group in groups]
+        names = {entry['name'].lower() for entry in get_game_names_from_folder(str(tmp_path), insensitive, [])}
+        assert names == {game['name'].lower() for game in catalog}
+        folder = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+        assert len([name for name in os.listdir(folder) if name.endswith('.bin')]) == 1
+
+
+class TestBaselineComparison:
+    """Test flagging regressions against a saved run."""
+
+    def test_only_changes_beyond_tolerance_are_regressions(self):
+        baseline = {'initial': {'games_per_second': 10.0, 'api_calls_per_game': 2.0,
+                                'db_statements_per_game': 10.0, 'peak_rss_growth_mb': 0}}
+        result = {'initial': {'games_per_second': 7.0, 'api_calls_per_game': 2.2,
+                              'db_statements_per_game': 15.0, 'peak_rss_growth_mb': 4.0}}
+
+        regressions = compare_to_baseline(result, baseline, tolerance=0.2)
+
+        assert [line.split(':')[0] for line in regressions] == ['db_statements_per_game', 'games_per_second']
+
+
+class TestScanBenchmark:
+    """Test a small benchmark run end to end."""
+
+    def test_scan_is_measured_and_cleaned_up(self, app, db_session):
+        libraries_before = db_session.execute(select(func.count()).select_from(Library)).scalar()
+        groups_before = db_session.execute(select(func.count()).select_from(ReleaseGroup)).scalar()
+
+        result = run_benchmark(app, bench_options())
+
+        initial, rescan = result['initial'], result['rescan']
+        assert initial['status'] == 'Completed'
+        assert initial['matched'] + initial['unmatched'] == 8
+        assert initial['matched'] > 0
+        assert initial['api_calls'] > 0 and initial['db_statements'] > 0
+        # The rescan is incremental: nothing changed, so IGDB isn't asked again
+        assert rescan['api_calls'] == 0
+        assert rescan['db_statements'] < initial['db_statements']
+        assert db_session.execute(select(func.count()).select_from(Library)).scalar() == libraries_before
+        assert db_session.execute(select(func.count()).select_from(ReleaseGroup)).scalar() == groups_before
@@ -431,4 +431,75 @@ class TestIGDBIntegration:
         # Verify settings are still in database
         settings = db.session.execute(db.select(GlobalSettings)).scalars().first()
         assert settings.igdb_client_id == 'persist_client_id'
-        assert settings.igdb_client_secret == 'persist_client_secret'
\ No newline at end of file
+        assert settings.igdb_client_secret == 'persist_client_secret'
+
+class TestIGDBCatalogRoutes:
+
+    def test_catalog_toggle_and_status(self, client, admin_user, clean_global_settings):
+        """Test enabling the offline catalog and reading its status."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        response = client.post('/admin/igdb_catalog', json={'use_igdb_catalog': True})
+        assert response.status_code == 200
+        db.session.refresh(clean_global_settings)
+        assert clean_global_settings.use_igdb_catalog is True
+
+        response = client.get('/admin/igdb_catalog')
+        data = json.loads(response.data)
+        assert data['status'] == 'success'
+        assert data['catalog']['enabled'] is True
+        assert 'games' in data['catalog']
+
+        client.post('/admin/igdb_catalog', json={'use_igdb_catalog': False})
+        db.session.refresh(clean_global_settings)
+        assert clean_global_settings.use_igdb_catalog is False
+
+    def test_catalog_sync_start(self, client, admin_user, clean_global_settings):
+        """Test starting a catalog sync, and refusing a second concurrent one."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        with patch('sharewarez.routes_admin_ext.igdb.start_catalog_sync_in_background', side_effect=[True, False]):
+            response = client.post('/admin/igdb_catalog/sync')
+            assert response.status_code == 200
+            response = client.post('/admin/igdb_catalog/sync')
+            assert response.status_code == 409
+
+    def test_catalog_sync_requires_credentials(self, client, admin_user, clean_db):
+        """Test that a sync is not started without IGDB credentials."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        response = client.post('/admin/igdb_catalog/sync')
+        assert response.status_code == 400
+
+class TestIGDBUsageRoute:
+
+    def test_igdb_usage_requires_admin(self, client, regular_user):
+        """Test that the usage dashboard is admin only."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(regular_user.id)
+            sess['_fresh'] = True
+
+        response = client.get('/admin/igdb_usage')
+        assert response.status_code == 302
+
+    def test_igdb_usage_dashboard(self, client, admin_user):
+        """Test rendering the usage dashboard, with out-of-range hours clamped."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        summary = {'hours': 336, 'totals': {'calls': 1234, 'errors': 0, 'rate_limited': 2, 'cache_hits': 5,
+                                            'avg_latency_ms': 120.0, 'max_latency_ms': 300.0},
+                   'by_endpoint': [], 'by_caller': [], 'hourly': [], 'recent_scans': []}
+        with patch('sharewarez.routes_admin_ext.igdb.get_igdb_usage_summary', return_value=summary) as mock_summary:
+            response = client.get('/admin/igdb_usage?hours=99999')
+
+        assert response.status_code == 200
+        mock_summary.assert_called_once_with(336)
+        assert b'1234' in response.data
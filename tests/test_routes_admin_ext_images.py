@@ -5,6 +5,7 @@ from flask import json
 from sharewarez.models import Image, Game, Library, LibraryPlatform, User
 from uuid import uuid4
 import os
+from datetime import datetime
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -256,6 +257,47 @@ class TestImageQueueListAPI:
         assert len(data['images']) == 1
         assert data['images'][0]['is_downloaded'] is True
 
+    def test_image_queue_list_status_filter_failed(self, client, admin_user, db_session, sample_library, sample_game):
+        """Test image queue list with status filter for failed downloads."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+        
+        # Create pending and dead-lettered images
+        pending_image = Image(
+            game_uuid=sample_game.uuid,
+            image_type='cover',
+            download_url='https://example.com/cover.jpg',
+            url='cover.jpg',
+            is_downloaded=False
+        )
+        
+        failed_image = Image(
+            game_uuid=sample_game.uuid,
+            image_type='screenshot',
+            download_url='https://example.com/screenshot.jpg',
+            url='screenshot.jpg',
+            is_downloaded=False,
+            download_attempts=1,
+            last_error='HTTP 404',
+            dead_lettered_at=datetime.now()
+        )
+        
+        db_session.add_all([pending_image, failed_image])
+        db_session.flush()
+
+        response = client.get('/admin/api/image_queue_list?status=failed')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert len(data['images']) == 1
+        assert data['images'][0]['is_failed'] is True
+        assert data['images'][0]['last_error'] == 'HTTP 404'
+
+        response = client.get('/admin/api/image_queue_list?status=pending')
+        data = json.loads(response.data)
+        assert [image['id'] for image in data['images']] == [pending_image.id]
+
     def test_image_queue_list_type_filter(self, client, admin_user, db_session, sample_library, sample_game):
         """Test image queue list with image type filter."""
         with client.session_transaction() as sess:
@@ -366,13 +408,8 @@ class TestDownloadImagesAPI:
         db_session.add(pending_image)
         db_session.flush()
 
-        with patch('sharewarez.utils.functions.download_image') as mock_download, \
-             patch('os.path.join') as mock_join, \
-             patch('sharewarez.routes_admin_ext.images.current_app') as mock_app:
-            
-            mock_app.config = {'IMAGE_SAVE_PATH': '/test/path'}
-            mock_join.return_value = '/test/path/cover.jpg'
-            mock_download.return_value = True
+        with patch('sharewarez.utils.image_queue.fetch_image') as mock_download:
+            mock_download.return_value = None
             
             response = client.post('/admin/api/download_images', 
                                  json={'image_ids': [pending_image.id]})
@@ -381,6 +418,7 @@ class TestDownloadImagesAPI:
             data = json.loads(response.data)
             assert data['success'] is True
             assert data['downloaded'] == 1
+            assert mock_download.call_args[0][0] == 'https://example.com/cover.jpg'
             
             # Check image was marked as downloaded
             db_session.refresh(pending_image)
@@ -476,7 +514,7 @@ class TestDownloadImagesAPI:
         db_session.add(pending_image)
         db_session.flush()
 
-        with patch('sharewarez.utils.functions.download_image') as mock_download:
+        with patch('sharewarez.utils.image_queue.fetch_image') as mock_download:
             mock_download.side_effect = Exception("Download failed")
             
             response = client.post('/admin/api/download_images', 
@@ -486,6 +524,13 @@ class TestDownloadImagesAPI:
             data = json.loads(response.data)
             assert data['success'] is True
             assert data['downloaded'] == 0
+            assert data['failed'] == 1
+            
+            # The failure is recorded for the next try
+            db_session.refresh(pending_image)
+            assert pending_image.is_downloaded is False
+            assert pending_image.download_attempts == 1
+            assert pending_image.last_error == 'Download failed'
 
 
 class TestDeleteImageAPI:
@@ -8,11 +8,11 @@ directory browsing, security, and error handling.
 import pytest
 import json
 import os
-import tempfile
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from uuid import uuid4
 
 from sharewarez.models import User
+from sharewarez.utils.folder_browser import clear_folder_listings, list_folder
 
 
 @pytest.fixture
@@ -54,17 +54,24 @@ def admin_user(db_session):
 
 
 @pytest.fixture
-def mock_filesystem():
-    """Create a mock filesystem structure for testing."""
-    return {
-        'base_dir': '/test/base',
-        'directories': ['subdir1', 'subdir2'],
-        'files': [
-            {'name': 'file1.txt', 'size': 100},
-            {'name': 'file2.pdf', 'size': 200},
-            {'name': 'file3', 'size': 50}  # No extension
-        ]
-    }
+def browse_base(app, tmp_path):
+    """A base folder with two directories and three files."""
+    (tmp_path / 'subdir1').mkdir()
+    (tmp_path / 'subdir2').mkdir()
+    (tmp_path / 'subdir1' / 'nested_file.txt').write_bytes(b'x' * 250)
+    (tmp_path / 'file1.txt').write_bytes(b'x' * 100)
+    (tmp_path / 'file2.pdf').write_bytes(b'x' * 200)
+    (tmp_path / 'file3').write_bytes(b'x' * 50)
+    clear_folder_listings()
+    with patch.dict(app.config, {'BASE_FOLDER_POSIX': str(tmp_path), 'BASE_FOLDER_WINDOWS': str(tmp_path)}):
+        yield tmp_path
+    clear_folder_listings()
+
+
+def login(client, user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
 
 
 class TestBrowseFoldersSS:
@@ -77,385 +84,104 @@ class TestBrowseFoldersSS:
     
     def test_browse_requires_admin(self, client, regular_user):
         """Test that browse_folders_ss requires admin privileges."""
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(regular_user.id)
-            sess['_fresh'] = True
-        
+        login(client, regular_user)
         response = client.get('/api/browse_folders_ss')
         assert response.status_code == 302  # Redirect due to admin_required decorator
     
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_browse_base_directory_posix(self, mock_current_app, mock_os, client, admin_user, mock_filesystem):
-        """Test browsing the base directory on POSIX systems."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': mock_filesystem['base_dir'],
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        # Mock filesystem operations
-        mock_os.path.abspath.return_value = mock_filesystem['base_dir']
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        mock_os.listdir.return_value = mock_filesystem['directories'] + [f['name'] for f in mock_filesystem['files']]
-        
-        def mock_isdir_side_effect(path):
-            # First check if this is the base directory itself
-            if path == mock_filesystem['base_dir']:
-                return True
-            filename = os.path.basename(path)
-            return filename in mock_filesystem['directories']
-        
-        def mock_getsize_side_effect(path):
-            filename = os.path.basename(path)
-            for file_info in mock_filesystem['files']:
-                if file_info['name'] == filename:
-                    return file_info['size']
-            return 0
-        
-        mock_os.path.isdir.side_effect = mock_isdir_side_effect
-        mock_os.path.getsize.side_effect = mock_getsize_side_effect
-        mock_os.path.splitext.side_effect = lambda name: (name.rsplit('.', 1)[0], '.' + name.rsplit('.', 1)[1]) if '.' in name else (name, '')
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
+    def test_browse_base_directory(self, client, admin_user, browse_base):
+        """Test browsing the base directory: folders first, sizes only on request."""
+        login(client, admin_user)
         response = client.get('/api/browse_folders_ss')
         assert response.status_code == 200
         
         data = json.loads(response.data)
-        assert isinstance(data, list)
-        
-        # Verify directories come first (isDir: True)
-        directories = [item for item in data if item['isDir']]
-        files = [item for item in data if not item['isDir']]
-        
-        assert len(directories) == 2
-        assert len(files) == 3
-        
-        # Verify directory structure
-        for directory in directories:
-            assert directory['name'] in mock_filesystem['directories']
-            assert directory['isDir'] is True
-            assert directory['ext'] is None
-            assert directory['size'] is None
-    
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_browse_base_directory_windows(self, mock_current_app, mock_os, client, admin_user, mock_filesystem):
-        """Test browsing the base directory on Windows systems."""
-        # Setup mocks
-        mock_os.name = 'nt'
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_WINDOWS': 'C:\\test\\base',
-            'BASE_FOLDER_POSIX': None
-        }.get(key)
-        
-        # Mock filesystem operations
-        mock_os.path.abspath.return_value = 'C:\\test\\base'
-        mock_os.path.join.side_effect = lambda *args: '\\'.join(args)
-        mock_os.listdir.return_value = ['testdir', 'testfile.txt']
-        
-        def mock_isdir_side_effect(path):
-            if path == 'C:\\test\\base':
-                return True
-            return 'testdir' in path
-        
-        mock_os.path.isdir.side_effect = mock_isdir_side_effect
-        mock_os.path.getsize.side_effect = lambda path: 150 if 'testfile.txt' in path else 0
-        mock_os.path.splitext.side_effect = lambda name: (name.rsplit('.', 1)[0], '.' + name.rsplit('.', 1)[1]) if '.' in name else (name, '')
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss')
+        assert [item['name'] for item in data['items']] == ['subdir1', 'subdir2', 'file1.txt', 'file2.pdf', 'file3']
+        assert data['total'] == 5 and data['next_cursor'] is None
+        assert data['hasErrors'] is False
+        for item in data['items']:
+            assert item['size'] is None
+            if item['isDir']:
+                assert item['ext'] is None
+
+    def test_file_metadata_accuracy(self, client, admin_user, browse_base):
+        """Test that extensions are lowercased and sizes are read when asked for."""
+        (browse_base / 'image.JPG').write_bytes(b'x' * 2048)
+        (browse_base / 'archive.tar.gz').write_bytes(b'x' * 4096)
+        login(client, admin_user)
+        response = client.get('/api/browse_folders_ss', query_string={'sizes': '1'})
         assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert isinstance(data, list)
-        assert len(data) == 2
+
+        items = {item['name']: item for item in json.loads(response.data)['items']}
+        assert (items['image.JPG']['ext'], items['image.JPG']['size']) == ('jpg', 2048)
+        assert (items['archive.tar.gz']['ext'], items['archive.tar.gz']['size']) == ('gz', 4096)
+        assert (items['file3']['ext'], items['file3']['size']) == ('', 50)
+        assert items['subdir1']['size'] is None
     
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_browse_subdirectory(self, mock_current_app, mock_os, client, admin_user):
+    def test_browse_subdirectory(self, client, admin_user, browse_base):
         """Test browsing a subdirectory with proper path handling."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        request_path = 'subdir1'
-        expected_full_path = '/test/base/subdir1'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        mock_os.path.abspath.return_value = expected_full_path
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        mock_os.path.isdir.return_value = True
-        mock_os.listdir.return_value = ['nested_file.txt']
-        
-        # Mock that the path starts with base directory (security check)
-        mock_os.path.abspath.return_value = expected_full_path
-        
-        mock_os.path.isdir.side_effect = lambda path: 'nested_file.txt' not in str(path)
-        mock_os.path.getsize.side_effect = lambda path: 250 if 'nested_file.txt' in str(path) else 0
-        mock_os.path.splitext.side_effect = lambda name: ('nested_file', '.txt') if name == 'nested_file.txt' else (name, '')
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss', query_string={'path': request_path})
+        login(client, admin_user)
+        response = client.get('/api/browse_folders_ss', query_string={'path': 'subdir1', 'sizes': 'true'})
         assert response.status_code == 200
         
         data = json.loads(response.data)
-        assert isinstance(data, list)
-        assert len(data) == 1
-        
-        file_item = data[0]
-        assert file_item['name'] == 'nested_file.txt'
-        assert file_item['isDir'] is False
-        assert file_item['ext'] == 'txt'
-        assert file_item['size'] == 250
+        assert data['items'] == [{'name': 'nested_file.txt', 'isDir': False, 'ext': 'txt', 'size': 250}]
     
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_directory_traversal_prevention(self, mock_current_app, mock_os, client, admin_user):
+    def test_pages_continue_after_the_cursor(self, client, admin_user, browse_base):
+        """Test cursor pagination in browser order, also when the folder changes in between."""
+        login(client, admin_user)
+        first = json.loads(client.get('/api/browse_folders_ss', query_string={'limit': 2}).data)
+        assert [item['name'] for item in first['items']] == ['subdir1', 'subdir2']
+        assert first['next_cursor']
+
+        clear_folder_listings()
+        (browse_base / 'a_new_dir').mkdir()
+        second = json.loads(client.get('/api/browse_folders_ss',
+                                       query_string={'limit': 2, 'cursor': first['next_cursor']}).data)
+        third = json.loads(client.get('/api/browse_folders_ss',
+                                      query_string={'limit': 2, 'cursor': second['next_cursor']}).data)
+        assert [item['name'] for item in second['items']] == ['file1.txt', 'file2.pdf']
+        assert [item['name'] for item in third['items']] == ['file3']
+        assert third['next_cursor'] is None
+
+        response = client.get('/api/browse_folders_ss', query_string={'cursor': 'x'})
+        assert response.status_code == 400
+
+    def test_listings_are_reused_for_a_short_time(self, browse_base):
+        """Test that a folder is listed once within the cache TTL."""
+        with patch('sharewarez.utils.folder_browser.os.scandir', wraps=os.scandir) as mock_scandir:
+            first = list_folder(str(browse_base))
+            assert list_folder(str(browse_base)) is first
+            assert mock_scandir.call_count == 1
+            list_folder(str(browse_base), ttl=0)
+            assert mock_scandir.call_count == 2
+    
+    def test_directory_traversal_prevention(self, client, admin_user, browse_base):
         """Test that directory traversal attacks are prevented."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        malicious_path = '../../../etc'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        # Mock that abspath resolves to a path outside base directory
-        malicious_full_path = '/etc'
-        mock_os.path.abspath.return_value = malicious_full_path
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss', query_string={'path': malicious_path})
+        login(client, admin_user)
+        response = client.get('/api/browse_folders_ss', query_string={'path': '../../../etc'})
         assert response.status_code == 403
         
         data = json.loads(response.data)
         assert 'error' in data
         assert data['error'] == 'Access denied'
     
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_nonexistent_directory(self, mock_current_app, mock_os, client, admin_user):
-        """Test handling of nonexistent directories."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        mock_os.path.abspath.return_value = '/test/base/nonexistent'
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        mock_os.path.isdir.return_value = False  # Directory doesn't exist
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss', query_string={'path': 'nonexistent'})
-        assert response.status_code == 404
-        
-        data = json.loads(response.data)
-        assert 'error' in data
-        assert 'SS folder browser: Folder not found' in data['error']
-    
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_file_metadata_accuracy(self, mock_current_app, mock_os, client, admin_user):
-        """Test that file metadata is accurate including extensions and sizes."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        mock_os.path.abspath.return_value = base_dir
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        
-        # Mock files with different extensions and sizes
-        test_files = [
-            'document.pdf',
-            'image.JPG',
-            'archive.tar.gz',
-            'noextension'
-        ]
-        mock_os.listdir.return_value = test_files
-        
-        def mock_isdir_side_effect(path):
-            if path == base_dir:
-                return True
-            return False  # All other items are files
-        
-        def mock_getsize_side_effect(path):
-            filename = os.path.basename(path)
-            sizes = {
-                'document.pdf': 1024,
-                'image.JPG': 2048,
-                'archive.tar.gz': 4096,
-                'noextension': 512
-            }
-            return sizes.get(filename, 0)
-        
-        def mock_splitext_side_effect(name):
-            if '.' in name:
-                parts = name.rsplit('.', 1)
-                return (parts[0], '.' + parts[1])
-            return (name, '')
-        
-        mock_os.path.isdir.side_effect = mock_isdir_side_effect
-        mock_os.path.getsize.side_effect = mock_getsize_side_effect
-        mock_os.path.splitext.side_effect = mock_splitext_side_effect
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert len(data) == 4
-        
-        # Verify metadata for each file
-        for item in data:
-            assert item['isDir'] is False
-            if item['name'] == 'document.pdf':
-                assert item['ext'] == 'pdf'
-                assert item['size'] == 1024
-            elif item['name'] == 'image.JPG':
-                assert item['ext'] == 'jpg'  # Should be lowercase
-                assert item['size'] == 2048
-            elif item['name'] == 'archive.tar.gz':
-                assert item['ext'] == 'gz'  # Should get last extension
-                assert item['size'] == 4096
-            elif item['name'] == 'noextension':
-                assert item['ext'] == ''  # No extension
-                assert item['size'] == 512
-    
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_response_sorting(self, mock_current_app, mock_os, client, admin_user):
-        """Test that response is properly sorted (directories first, then files alphabetically)."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        mock_os.path.abspath.return_value = base_dir
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        
-        # Mix of directories and files in non-alphabetical order
-        items = ['zebra_file.txt', 'alpha_dir', 'beta_file.txt', 'gamma_dir']
-        mock_os.listdir.return_value = items
-        
-        def mock_isdir_side_effect(path):
-            if path == base_dir:
-                return True
-            filename = os.path.basename(path)
-            return filename in ['alpha_dir', 'gamma_dir']
-        
-        def mock_getsize_side_effect(path):
-            filename = os.path.basename(path)
-            return 100 if not filename.endswith('_dir') else 0
-        
-        mock_os.path.isdir.side_effect = mock_isdir_side_effect
-        mock_os.path.getsize.side_effect = mock_getsize_side_effect
-        mock_os.path.splitext.side_effect = lambda name: (name.rsplit('.', 1)[0], '.' + name.rsplit('.', 1)[1]) if '.' in name else (name, '')
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss')
-        assert response.status_code == 200
-        
-        data = json.loads(response.data)
-        assert len(data) == 4
-        
-        # Verify directories come first
-        directories = [item for item in data if item['isDir']]
-        files = [item for item in data if not item['isDir']]
-        
-        assert len(directories) == 2
-        assert len(files) == 2
-        
-        # Verify directories are alphabetically sorted
-        dir_names = [d['name'] for d in directories]
-        assert dir_names == ['alpha_dir', 'gamma_dir']
-        
-        # Verify files are alphabetically sorted
-        file_names = [f['name'] for f in files]
-        assert file_names == ['beta_file.txt', 'zebra_file.txt']
-        
-        # Verify overall order (directories first, then files)
-        all_names = [item['name'] for item in data]
-        assert all_names == ['alpha_dir', 'gamma_dir', 'beta_file.txt', 'zebra_file.txt']
+    def test_nonexistent_directory(self, client, admin_user, browse_base):
+        """Test handling of nonexistent directories and files."""
+        login(client, admin_user)
+        for path in ('nonexistent', 'file1.txt'):
+            response = client.get('/api/browse_folders_ss', query_string={'path': path})
+            assert response.status_code == 404
+        
+            data = json.loads(response.data)
+            assert 'error' in data
+            assert 'SS folder browser: Folder not found' in data['error']
     
-    @patch('sharewarez.routes_apis.browse.os')
-    @patch('sharewarez.routes_apis.browse.current_app', new_callable=MagicMock)
-    def test_empty_directory(self, mock_current_app, mock_os, client, admin_user):
+    def test_empty_directory(self, client, admin_user, browse_base):
         """Test browsing an empty directory."""
-        # Setup mocks
-        mock_os.name = 'posix'
-        base_dir = '/test/base'
-        
-        mock_current_app.config.get.side_effect = lambda key: {
-            'BASE_FOLDER_POSIX': base_dir,
-            'BASE_FOLDER_WINDOWS': None
-        }.get(key)
-        
-        mock_os.path.abspath.return_value = base_dir
-        mock_os.path.join.side_effect = lambda *args: '/'.join(args)
-        mock_os.listdir.return_value = []  # Empty directory
-        
-        def mock_isdir_side_effect(path):
-            return path == base_dir
-        
-        mock_os.path.isdir.side_effect = mock_isdir_side_effect
-        
-        # Login as admin
-        with client.session_transaction() as sess:
-            sess['_user_id'] = str(admin_user.id)
-            sess['_fresh'] = True
-        
-        response = client.get('/api/browse_folders_ss')
+        (browse_base / 'empty').mkdir()
+        login(client, admin_user)
+        response = client.get('/api/browse_folders_ss', query_string={'path': 'empty'})
         assert response.status_code == 200
         
         data = json.loads(response.data)
-        assert isinstance(data, list)
-        assert len(data) == 0
\ No newline at end of file
+        assert data['items'] == [] and data['total'] == 0
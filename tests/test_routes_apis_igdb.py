@@ -8,6 +8,7 @@ from sharewarez import db
 from sharewarez.models import User, Game, Library
 from sharewarez.platform import LibraryPlatform
 from sharewarez.utils.game_core import check_existing_game_by_igdb_id
+from sharewarez.utils.igdb_api import build_admin_search_query
 
 
 def safe_cleanup_database(db_session):
@@ -434,7 +435,7 @@ class TestSearchIgdbById:
         data = response.get_json()
         assert data['error'] == 'IGDB ID is required'
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_id_successful(self, mock_api_request, client, admin_user, mock_game_data):
         """Test successful search_igdb_by_id."""
         mock_api_request.return_value = [mock_game_data]
@@ -452,16 +453,10 @@ class TestSearchIgdbById:
         assert data['summary'] == 'A test game'
         
         # Verify API call with correct query
-        expected_query = """
-        fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-               screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-               aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-               total_rating_count, storyline;
-        where id = 12345;
-    """
+        expected_query = build_admin_search_query(igdb_id=12345)
         mock_api_request.assert_called_once_with("https://api.igdb.com/v4/games", expected_query)
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_id_api_error(self, mock_api_request, client, admin_user):
         """Test search_igdb_by_id with API error."""
         mock_api_request.return_value = {'error': 'API connection failed'}
@@ -476,7 +471,7 @@ class TestSearchIgdbById:
         data = response.get_json()
         assert data['error'] == 'API connection failed'
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_id_not_found(self, mock_api_request, client, admin_user):
         """Test search_igdb_by_id when game not found."""
         mock_api_request.return_value = []
@@ -513,7 +508,7 @@ class TestSearchIgdbByName:
         data = response.get_json()
         assert data['error'] == 'No game name provided'
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_name_successful(self, mock_api_request, client, admin_user, mock_game_data):
         """Test successful search_igdb_by_name."""
         mock_api_request.return_value = [mock_game_data]
@@ -531,13 +526,10 @@ class TestSearchIgdbByName:
         assert data['results'][0]['name'] == 'Test Game'
         
         # Verify API call
-        expected_query = '''fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-                          screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-                          aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-                          total_rating_count, storyline;search "Test Game"; limit 10;'''
+        expected_query = build_admin_search_query(search_name='Test Game')
         mock_api_request.assert_called_once_with('https://api.igdb.com/v4/games', expected_query)
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_name_with_platform(self, mock_api_request, client, admin_user, mock_game_data):
         """Test search_igdb_by_name with platform filter."""
         mock_api_request.return_value = [mock_game_data]
@@ -553,13 +545,10 @@ class TestSearchIgdbByName:
         assert 'results' in data
         
         # Verify API call includes platform filter
-        expected_query = '''fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-                          screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-                          aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-                          total_rating_count, storyline;search "Test Game"; where platforms = (6); limit 10;'''
+        expected_query = build_admin_search_query(search_name='Test Game', platform_id=6)
         mock_api_request.assert_called_once_with('https://api.igdb.com/v4/games', expected_query)
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_name_invalid_platform(self, mock_api_request, client, admin_user, mock_game_data):
         """Test search_igdb_by_name with invalid platform_id."""
         mock_api_request.return_value = [mock_game_data]
@@ -572,13 +561,10 @@ class TestSearchIgdbByName:
         assert response.status_code == 200
         
         # Should ignore invalid platform_id and not include it in query
-        expected_query = '''fields id, name, cover, summary, url, release_dates.date, platforms.name, genres.name, themes.name, game_modes.name,
-                          screenshots, videos.video_id, first_release_date, aggregated_rating, involved_companies, player_perspectives.name,
-                          aggregated_rating_count, rating, rating_count, slug, status, category, total_rating, 
-                          total_rating_count, storyline;search "Test Game"; limit 10;'''
+        expected_query = build_admin_search_query(search_name='Test Game')
         mock_api_request.assert_called_once_with('https://api.igdb.com/v4/games', expected_query)
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_search_igdb_by_name_api_error(self, mock_api_request, client, admin_user):
         """Test search_igdb_by_name with API error."""
         mock_api_request.return_value = {'error': 'Search failed'}
@@ -709,7 +695,7 @@ class TestIgdbApiBlueprint:
 class TestIgdbApiIntegration:
     """Integration tests for IGDB API routes."""
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     def test_igdb_api_workflow_search_and_check(self, mock_api_request, client, admin_user, mock_game_data):
         """Test complete workflow: search by name, then check if ID is available."""
         mock_api_request.return_value = [mock_game_data]
@@ -751,7 +737,7 @@ class TestIgdbApiIntegration:
             data = response.get_json()
             assert 'error' in data or 'message' in data
     
-    @patch('sharewarez.routes_apis.igdb.make_igdb_api_request')
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
     @patch('sharewarez.routes_apis.igdb.get_cover_thumbnail_url')
     def test_igdb_cover_integration(self, mock_get_cover, mock_api_request, client, admin_user, mock_game_data, mock_cover_response):
         """Test integration between game search and cover retrieval."""
@@ -771,4 +757,90 @@ class TestIgdbApiIntegration:
         assert cover_response.status_code == 200
         
         cover_data = cover_response.get_json()
-        assert cover_data['cover_url'] == mock_cover_response
\ No newline at end of file
+        assert cover_data['cover_url'] == mock_cover_response
+
+class TestIgdbSearchCaching:
+    """Tests for the cached, single-query admin IGDB search."""
+
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
+    def test_search_by_name_returns_cover_thumbnails(self, mock_api_request, client, admin_user):
+        """Test that covers come back with the search results from a single IGDB call."""
+        mock_api_request.return_value = [
+            {'id': 1, 'name': 'Test Game', 'cover': {'id': 10, 'image_id': 'abc123'}},
+            {'id': 2, 'name': 'Test Game 2'}
+        ]
+
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        data = client.get('/api/search_igdb_by_name?name=Test Game').get_json()
+        assert data['results'][0]['cover'] == 10
+        assert data['results'][0]['cover_url'] == 'https://images.igdb.com/igdb/image/upload/t_thumb/abc123.jpg'
+        assert data['results'][1]['cover_url'] is None
+        assert 'cover.image_id' in mock_api_request.call_args[0][1]
+        mock_api_request.assert_called_once()
+
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
+    def test_repeated_searches_are_cached(self, mock_api_request, client, admin_user, mock_game_data):
+        """Test that identical searches within the cache window hit IGDB once."""
+        mock_api_request.return_value = [mock_game_data]
+
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        client.get('/api/search_igdb_by_name?name=Test Game')
+        response = client.get('/api/search_igdb_by_name?name=test  game')
+        assert response.get_json()['results'][0]['id'] == 12345
+        mock_api_request.assert_called_once()
+
+    @patch('sharewarez.utils.igdb_api.make_igdb_api_request')
+    def test_errors_are_not_cached(self, mock_api_request, client, admin_user, mock_game_data):
+        """Test that a failed search is retried on the next request."""
+        mock_api_request.side_effect = [{'error': 'Rate limited'}, [mock_game_data]]
+
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        assert client.get('/api/search_igdb_by_name?name=Test Game').get_json()['error'] == 'Rate limited'
+        assert client.get('/api/search_igdb_by_name?name=Test Game').get_json()['results'][0]['id'] == 12345
+
+    def test_identical_inflight_requests_are_deduplicated(self, app):
+        """Test that concurrent identical requests share one IGDB call."""
+        import threading
+        import time
+        from sharewarez.utils.igdb_api import cached_igdb_api_request
+
+        calls = []
+
+        def slow_request(endpoint_url, query_params):
+            calls.append(query_params)
+            time.sleep(0.2)
+            return [{'id': 1, 'name': 'Test Game'}]
+
+        results = []
+
+        def worker():
+            with app.app_context():
+                results.append(cached_igdb_api_request('https://api.igdb.com/v4/games', 'fields name; search "dedupe";'))
+
+        with patch('sharewarez.utils.igdb_api.make_igdb_api_request', side_effect=slow_request):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 1
+        assert results == [[{'id': 1, 'name': 'Test Game'}]] * 4
+
+    def test_search_by_id_rejects_non_numeric_id(self, client, admin_user):
+        """Test that a non-numeric IGDB ID is rejected before querying IGDB."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_user.id)
+            sess['_fresh'] = True
+
+        response = client.get('/api/search_igdb_by_id?igdb_id=1;fields%20*')
+        assert response.status_code == 400
@@ -207,6 +207,8 @@ class TestScanJobsStatus:
         assert job['scan_folder'] == '/test/scan/folder'
         assert job['setting_remove'] is True
         assert job['setting_filefolder'] is False
+        assert job['schedule'] == '24_hours'
+        assert job['schedule'] == '24_hours'
         assert 'last_run' in job
         assert 'next_run' in job
     
@@ -360,6 +362,113 @@ class TestScanJobsStatus:
         assert 'Failed' in statuses
 
 
+class TestScanJobSchedule:
+    """Tests for the set_scan_job_schedule endpoint."""
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def test_schedule_requires_admin(self, client, regular_user, sample_scan_job):
+        """Test that changing a schedule requires admin privileges."""
+        self.login(client, regular_user)
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': '8_hours'})
+        assert response.status_code == 302
+
+    def test_set_schedule(self, client, admin_user, db_session, sample_scan_job):
+        """Test that setting a schedule computes the next run."""
+        self.login(client, admin_user)
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': '48_hours'})
+        assert response.status_code == 200
+
+        data = response.get_json()
+        db_session.refresh(sample_scan_job)
+        assert data['schedule'] == '48_hours'
+        assert sample_scan_job.schedule == '48_hours'
+        assert sample_scan_job.next_run > datetime.now()
+        assert data['next_run'] == sample_scan_job.next_run.strftime('%Y-%m-%d %H:%M:%S')
+
+    def test_clear_schedule(self, client, admin_user, db_session, sample_scan_job):
+        """Test that an empty schedule clears the next run."""
+        self.login(client, admin_user)
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': ''})
+        assert response.status_code == 200
+        assert response.get_json() == {'schedule': None, 'next_run': 'Not Scheduled'}
+
+        db_session.refresh(sample_scan_job)
+        assert sample_scan_job.schedule is None
+        assert sample_scan_job.next_run is None
+
+    def test_invalid_schedule(self, client, admin_user, sample_scan_job):
+        """Test that unknown schedules and jobs are rejected."""
+        self.login(client, admin_user)
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': 'hourly'})
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+        response = client.post(f'/api/scan_jobs/{uuid4()}/schedule', json={'schedule': '8_hours'})
+        assert response.status_code == 404
+
+    def test_rematch_jobs_cannot_be_scheduled(self, client, admin_user, db_session, sample_scan_job):
+        """Test that re-match jobs of unmatched folders are not scheduled."""
+        sample_scan_job.job_type = 'rematch'
+        db_session.commit()
+        self.login(client, admin_user)
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': '8_hours'})
+        assert response.status_code == 400
+
+
+class TestRelinkPaths:
+    """Tests for starting relink jobs and applying their proposals."""
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def test_start_relink_validates_the_request(self, client, admin_user, sample_library):
+        """Test that unknown libraries, bad confidences and folders outside the base folder are rejected."""
+        self.login(client, admin_user)
+        response = client.post('/api/relink_paths', json={'library_uuid': str(uuid4())})
+        assert response.status_code == 404
+
+        response = client.post('/api/relink_paths', json={'library_uuid': sample_library.uuid, 'min_confidence': 2})
+        assert response.status_code == 400
+
+        response = client.post('/api/relink_paths', json={'library_uuid': sample_library.uuid, 'search_root': '/etc'})
+        assert response.status_code == 403
+        assert 'error' in response.get_json()
+
+    def test_start_relink_runs_a_job(self, client, admin_user, sample_library, app, tmp_path):
+        """Test that a relink job is started for a folder under the base folder."""
+        self.login(client, admin_user)
+        with patch.dict(app.config, {'BASE_FOLDER_POSIX': str(tmp_path)}), \
+             patch('sharewarez.routes_apis.scan.start_job_thread') as mock_start:
+            response = client.post('/api/relink_paths', json={'library_uuid': sample_library.uuid, 'search_root': str(tmp_path)})
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data['search_roots'] == [str(tmp_path)]
+        job = mock_start.call_args.args[1]
+        assert job.id == data['job_id'] and job.job_type == 'relink'
+        assert job.folders['dry_run'] is True
+
+    def test_relink_jobs_are_applied_once_completed(self, client, admin_user, db_session, sample_scan_job):
+        """Test that proposals of a running relink job can't be applied yet."""
+        sample_scan_job.job_type = 'relink'
+        sample_scan_job.status = 'Running'
+        db_session.commit()
+        self.login(client, admin_user)
+
+        response = client.get(f'/api/relink_paths/{sample_scan_job.id}')
+        assert response.status_code == 200
+        assert response.get_json()['total'] == 0
+        response = client.post(f'/api/relink_paths/{sample_scan_job.id}/apply', json={})
+        assert response.status_code == 409
+        response = client.post(f'/api/scan_jobs/{sample_scan_job.id}/schedule', json={'schedule': '8_hours'})
+        assert response.status_code == 400
+
+
 class TestUnmatchedFolders:
     """Tests for unmatched_folders endpoint."""
     
@@ -389,8 +498,9 @@ class TestUnmatchedFolders:
         assert response.status_code == 200
         
         data = response.get_json()
-        assert isinstance(data, list)
-        assert len(data) == 0
+        assert data['folders'] == []
+        assert data['total'] == 0
+        assert data['pages'] == 0
     
     def test_unmatched_folders_single_folder(self, client, admin_user, sample_unmatched_folder):
         """Test unmatched_folders with a single unmatched folder."""
@@ -401,7 +511,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         assert isinstance(data, list)
         assert len(data) == 1
         
@@ -422,7 +532,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         folder = data[0]
         
         # Should have platform name and ID from PCWIN platform
@@ -430,7 +540,7 @@ class TestUnmatchedFolders:
         assert folder['platform_id'] == PLATFORM_IDS.get('PCWIN')  # Should be 6
         assert folder['platform_id'] == 6
     
-    @patch('sharewarez.routes_apis.scan.PLATFORM_IDS', {})  # Mock empty PLATFORM_IDS in the route module
+    @patch('sharewarez.utils.unmatched.PLATFORM_IDS', {})  # Mock empty PLATFORM_IDS in the listing module
     def test_unmatched_folders_no_platform_mapping(self, client, admin_user, db_session):
         """Test unmatched_folders when platform exists but has no ID mapping."""
         # Create library with a platform that won't be in PLATFORM_IDS
@@ -468,7 +578,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         folder = data[0]
         
         # Platform name should still be available from the platform enum
@@ -493,24 +603,21 @@ class TestUnmatchedFolders:
             sess['_user_id'] = str(admin_user.id)
             sess['_fresh'] = True
         
-        # Mock the query to return None platform (simulating edge case)
-        with patch('sharewarez.routes_apis.scan.db.session.execute') as mock_execute:
-            # Create a mock result that simulates None platform
-            mock_result_row = Mock()
-            mock_result_row.id = unmatched.id
-            mock_result_row.folder_path = unmatched.folder_path
-            mock_result_row.status = unmatched.status
-            library_name = sample_library.name
-            platform = None  # None platform to test edge case
-            
-            mock_execute.return_value.all.return_value = [(mock_result_row, library_name, platform)]
-            
+        # Mock the queries to return None platform (simulating edge case)
+        with patch('sharewarez.utils.unmatched.db.session.execute') as mock_execute:
+            count_result, rows_result, counts_result = Mock(), Mock(), Mock()
+            count_result.scalar.return_value = 1
+            rows_result.all.return_value = [(unmatched.id, unmatched.folder_path, unmatched.status,
+                                             sample_library.uuid, sample_library.name, None)]
+            counts_result.all.return_value = [('Pending', 1)]
+            mock_execute.side_effect = [count_result, rows_result, counts_result]
+
             response = client.get('/api/unmatched_folders')
             assert response.status_code == 200
-            
-            data = response.get_json()
+
+            data = response.get_json()['folders']
             folder = data[0]
-            
+
             # Should handle None platform gracefully
             assert folder['platform_name'] == ''
             assert folder['platform_id'] is None
@@ -538,7 +645,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         assert len(data) == 4
         
         # Verify all statuses are present
@@ -571,7 +678,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         assert len(data) == 4
         
         # Verify ordering (should be by status descending)
@@ -621,7 +728,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         assert len(data) == 2
         
         # Verify different library names and platforms
@@ -670,7 +777,7 @@ class TestUnmatchedFolders:
         response = client.get('/api/unmatched_folders')
         assert response.status_code == 200
         
-        data = response.get_json()
+        data = response.get_json()['folders']
         folder = data[0]
         
         assert folder['platform_name'] == 'XBOX'
@@ -678,6 +785,143 @@ class TestUnmatchedFolders:
         assert folder['platform_id'] == 11  # Known value from PLATFORM_IDS
 
 
+def add_unmatched_folders(db_session, library, statuses, prefix='/test/bulk'):
+    folders = [
+        UnmatchedFolder(library_uuid=library.uuid, folder_path=f'{prefix}/{index:03d}_{status.lower()}',
+                        status=status, content_type='Games')
+        for index, status in enumerate(statuses)
+    ]
+    db_session.add_all(folders)
+    db_session.commit()
+    return folders
+
+
+class TestUnmatchedFolderPages:
+    """Tests for paging and filtering the unmatched folders list."""
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def test_pages_and_status_counts(self, client, admin_user, db_session, sample_library):
+        """Test that a page holds per_page folders in status and path order, with totals for the filter."""
+        add_unmatched_folders(db_session, sample_library, ['Unmatched'] * 5 + ['Ignore'] * 2)
+        self.login(client, admin_user)
+
+        response = client.get('/api/unmatched_folders?status=Unmatched&per_page=2&page=3')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['total'], data['pages'], data['page'], data['per_page']) == (5, 3, 3, 2)
+        assert [folder['folder_path'] for folder in data['folders']] == ['/test/bulk/004_unmatched']
+        assert data['folders'][0]['library_uuid'] == sample_library.uuid
+        assert data['status_counts'] == {'Unmatched': 5, 'Ignore': 2}
+
+        first_page = client.get('/api/unmatched_folders?per_page=3').get_json()
+        assert [folder['status'] for folder in first_page['folders']] == ['Unmatched'] * 3
+
+    def test_search_path_and_library_name(self, client, admin_user, db_session, sample_library):
+        """Test that the search matches folder paths and library names, with LIKE wildcards taken literally."""
+        add_unmatched_folders(db_session, sample_library, ['Unmatched', 'Unmatched'])
+        add_unmatched_folders(db_session, sample_library, ['Unmatched'], prefix='/games/100%_Orange')
+        self.login(client, admin_user)
+
+        data = client.get('/api/unmatched_folders?search=100%25_ORANGE').get_json()
+        assert data['total'] == 1
+        data = client.get('/api/unmatched_folders?search=100%25x').get_json()
+        assert data['total'] == 0
+        data = client.get(f'/api/unmatched_folders?search={sample_library.name.upper()}').get_json()
+        assert data['total'] == 3
+
+
+class TestBulkUnmatchedStatus:
+    """Tests for setting the status of unmatched folders in bulk."""
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    def test_ignore_by_ids_and_filter(self, client, admin_user, db_session, sample_library):
+        """Test that folders are ignored by ID list and un-ignored by filter."""
+        folders = add_unmatched_folders(db_session, sample_library, ['Unmatched', 'Duplicate', 'Unmatched'])
+        self.login(client, admin_user)
+
+        response = client.post('/api/unmatched_folders/status',
+                               json={'status': 'Ignore', 'ids': [folders[0].id, folders[1].id]})
+        assert response.status_code == 200
+        assert response.get_json() == {'updated': 2, 'status': 'Ignore'}
+        db_session.expire_all()
+        assert [folder.status for folder in folders] == ['Ignore', 'Ignore', 'Unmatched']
+
+        response = client.post('/api/unmatched_folders/status',
+                               json={'status': 'Unmatched', 'filter': {'status': 'Ignore'}})
+        assert response.get_json()['updated'] == 2
+        db_session.expire_all()
+        assert {folder.status for folder in folders} == {'Unmatched'}
+
+    def test_requires_admin(self, client, regular_user):
+        """Test that bulk status changes require admin privileges."""
+        self.login(client, regular_user)
+        assert client.post('/api/unmatched_folders/status', json={'status': 'Ignore', 'ids': []}).status_code == 302
+
+    def test_invalid_requests(self, client, admin_user):
+        """Test that unknown statuses and missing selections are rejected."""
+        self.login(client, admin_user)
+        response = client.post('/api/unmatched_folders/status', json={'status': 'Duplicate', 'ids': []})
+        assert response.status_code == 400
+        response = client.post('/api/unmatched_folders/status', json={'status': 'Ignore'})
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+class TestRematchUnmatchedFolders:
+    """Tests for starting bulk re-match jobs."""
+
+    def login(self, client, user):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user.id)
+            sess['_fresh'] = True
+
+    @patch('sharewarez.routes_apis.scan.start_job_thread')
+    def test_rematch_starts_a_job_without_ignored_folders(self, mock_start, client, admin_user, db_session,
+                                                          sample_library):
+        """Test that a filter re-match starts one job for the library and skips ignored folders."""
+        folders = add_unmatched_folders(db_session, sample_library, ['Unmatched', 'Ignore', 'Duplicate'])
+        self.login(client, admin_user)
+
+        response = client.post('/api/unmatched_folders/rematch', json={'filter': {}})
+        assert response.status_code == 202
+        data = response.get_json()
+        assert len(data['jobs']) == 1
+        assert data['jobs'][0]['folders'] == 2
+        assert data['skipped'] == []
+
+        job = db_session.get(ScanJob, data['jobs'][0]['job_id'])
+        assert job.job_type == 'rematch'
+        assert job.status == 'Running'
+        assert job.scan_folder == '/test/bulk'
+        target, started_job = mock_start.call_args[0]
+        assert started_job.id == job.id
+        assert sorted(target.keywords['folder_ids']) == sorted([folders[0].id, folders[2].id])
+
+    @patch('sharewarez.routes_apis.scan.start_job_thread')
+    def test_rematch_waits_for_a_running_scan(self, mock_start, client, admin_user, db_session, sample_library):
+        """Test that a library being scanned is not re-matched at the same time."""
+        folders = add_unmatched_folders(db_session, sample_library, ['Unmatched'])
+        db_session.add(ScanJob(library_uuid=sample_library.uuid, status='Running', scan_folder='/test/bulk'))
+        db_session.commit()
+        self.login(client, admin_user)
+
+        response = client.post('/api/unmatched_folders/rematch', json={'ids': [folders[0].id]})
+        assert response.status_code == 409
+        assert 'already in progress' in response.get_json()['error']
+        mock_start.assert_not_called()
+
+        response = client.post('/api/unmatched_folders/rematch', json={'ids': []})
+        assert response.status_code == 400
+
+
 class TestScanApiBlueprint:
     """Test blueprint registration and URL patterns."""
     
@@ -741,7 +985,7 @@ class TestScanApiIntegration:
         # Test unmatched folders
         folders_response = client.get('/api/unmatched_folders')
         assert folders_response.status_code == 200
-        folders_data = folders_response.get_json()
+        folders_data = folders_response.get_json()['folders']
         assert len(folders_data) == 1
         
         # Verify relationship between scan job and unmatched folder
@@ -767,7 +1011,7 @@ class TestScanApiIntegration:
         assert folders_response.status_code == 200
         
         jobs_data = jobs_response.get_json()
-        folders_data = folders_response.get_json()
+        folders_data = folders_response.get_json()['folders']
         
         assert isinstance(jobs_data, list)
         assert isinstance(folders_data, list)
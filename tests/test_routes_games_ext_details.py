@@ -567,4 +567,37 @@ class TestGameDetailsPerformance:
         
         # Verify successful response
         assert response.status_code == 200
-        assert mock_log.call_count >= 2  # At least access request and successful access
\ No newline at end of file
+        assert mock_log.call_count >= 2  # At least access request and successful access
+
+    def test_game_details_sizes_come_from_the_index(self, client, test_user, test_game, test_game_update, db_session):
+        """Test that indexed update sizes are rendered without walking the disk."""
+        test_game_update.file_size = 3 * 1024 * 1024
+        test_game_update.indexed_at = datetime.now(timezone.utc)
+        db_session.commit()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(test_user.id)
+            sess['_fresh'] = True
+
+        with patch('sharewarez.utils.scanning.measure_path') as mock_measure, \
+             patch('os.walk') as mock_walk:
+            response = client.get(f'/game_details/{test_game.uuid}')
+
+        assert response.status_code == 200
+        assert b'3.00 MB' in response.data
+        mock_measure.assert_not_called()
+        mock_walk.assert_not_called()
+
+    def test_game_details_measures_unindexed_records_once(self, client, test_user, test_game, test_game_extra, db_session):
+        """Test that records from before sizes were indexed are measured and stored."""
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(test_user.id)
+            sess['_fresh'] = True
+
+        with patch('sharewarez.utils.scanning.fingerprint_path', return_value={'mtime': 10.0}), \
+             patch('sharewarez.utils.scanning.measure_path', return_value=(2048, 2)) as mock_measure:
+            assert client.get(f'/game_details/{test_game.uuid}').status_code == 200
+            assert client.get(f'/game_details/{test_game.uuid}').status_code == 200
+
+        mock_measure.assert_called_once_with('/path/to/extra.zip')
+        db_session.refresh(test_game_extra)
+        assert (test_game_extra.file_size, test_game_extra.file_count) == (2048, 2)
@@ -64,10 +64,10 @@ def cleanup_after_each_test(db_session):
 class TestScanAndAddGamesCore:
     """Test core functionality of scan_and_add_games with comprehensive assertions."""
     
-    @patch('sharewarez.utilities.is_scan_job_running')
-    def test_early_return_when_scan_running(self, mock_is_running, app):
-        """Test that function returns early if scan is already running with no side effects."""
-        mock_is_running.return_value = True
+    @patch('sharewarez.utilities.check_scan_admission')
+    def test_early_return_when_scan_running(self, mock_admission, app):
+        """Test that function returns early if the coordinator doesn't admit the scan, with no side effects."""
+        mock_admission.return_value = (None, 'A scan of this library is already in progress.')
         
         with app.app_context():
             # Ensure clean database state before test
@@ -79,8 +79,8 @@ class TestScanAndAddGamesCore:
             # Verify function returns None
             assert result is None
             
-            # Verify running check was called exactly once
-            mock_is_running.assert_called_once()
+            # Verify admission check was called exactly once
+            mock_admission.assert_called_once()
             
             # Critical assertion: No scan job should be created when one is running
             final_scan_jobs = db.session.execute(select(ScanJob)).scalars().all()
@@ -91,7 +91,7 @@ class TestScanAndAddGamesCore:
         nonexistent_uuid = str(uuid4())
         
         with app.app_context():
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 initial_jobs = db_session.execute(select(ScanJob)).scalars().all()
                 initial_count = len(initial_jobs)
                 
@@ -173,9 +173,9 @@ class TestHandleAutoScanCore:
         mock_form.remove_missing.data = True
         mock_form.download_missing_images.data = False
         
-        # Create library for the running scan job
+        # Create library for the running scan job, the same library the form asks to scan
         running_library = Library(
-            uuid=str(uuid4()),
+            uuid=test_uuid,
             name="Running Scan Library", 
             platform=LibraryPlatform.PCWIN
         )
@@ -212,7 +212,7 @@ class TestHandleAutoScanCore:
                                 
                                 # Verify exact flash message and category
                                 mock_flash.assert_called_once_with(
-                                    'A scan is already in progress. Please wait until the current scan completes.', 
+                                    'A scan of this library is already in progress. Please wait until it completes.', 
                                     'error'
                                 )
                                 
@@ -238,7 +238,7 @@ class TestHandleAutoScanCore:
                                 new_jobs = db_session.execute(
                                     select(ScanJob).filter_by(library_uuid=test_uuid)
                                 ).scalars().all()
-                                assert len(new_jobs) == 0, "No new scan job should be created when one is running"
+                                assert [job.id for job in new_jobs] == [running_job.id], "No new scan job should be created when one is running"
                                 
                                 # Verify form data was accessed
                                 mock_form.validate_on_submit.assert_called_once()
@@ -269,27 +269,24 @@ class TestHandleManualScanCore:
                                 assert mock_session['active_tab'] == 'manual'
 
     def test_scan_already_running(self, app):
-        """Test behavior when scan is already running."""
+        """Test behavior when a scan of the library is already running."""
         mock_form = Mock()
         mock_form.validate_on_submit.return_value = True
         mock_form.library_uuid.data = str(uuid4())
         
-        mock_running_job = Mock()
-        
         with app.app_context():
             with app.test_request_context():
-                with patch('sharewarez.utilities.db.session') as mock_db_session:
+                with patch('sharewarez.utilities.is_library_scan_running', return_value=True) as mock_running:
                     mock_session = {}
                     with patch('sharewarez.utilities.session', mock_session):
                         with patch('sharewarez.utilities.flash') as mock_flash:
                             with patch('sharewarez.utilities.redirect'):
                                 with patch('sharewarez.utilities.url_for'):
-                                    mock_db_session.execute.return_value.scalars.return_value.first.return_value = mock_running_job
-                                    
                                     handle_manual_scan(mock_form)
                                     
+                                    mock_running.assert_called_once_with(mock_form.library_uuid.data)
                                     mock_flash.assert_called_with(
-                                        'A scan is already in progress. Please wait until the current scan completes.', 
+                                        'A scan of this library is already in progress. Please wait until it completes.', 
                                         'error'
                                     )
                                     assert mock_session['active_tab'] == 'manual'
@@ -325,7 +322,7 @@ class TestUtilitiesWithRealDatabase:
         db_session.commit()
         
         with app.app_context():
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 with patch('os.path.exists', return_value=False):  # Force folder access failure
                     with patch('os.access', return_value=False):
                         scan_and_add_games("/nonexistent/path", library_uuid=library.uuid)
@@ -339,7 +336,7 @@ class TestUtilitiesWithRealDatabase:
     def test_library_validation(self, app, db_session):
         """Test that function handles missing library gracefully."""
         with app.app_context():
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 result = scan_and_add_games("/fake/path", library_uuid="nonexistent-uuid")
                 assert result is None
 
@@ -469,7 +466,7 @@ class TestAdvancedScanScenarios:
         assert len(initial_games) == 3
         
         with app.app_context():
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 with patch('os.path.exists') as mock_exists:
                     with patch('os.access', return_value=True):
                         # Mock to return some dummy games so scan doesn't return early
@@ -480,7 +477,9 @@ class TestAdvancedScanScenarios:
                         with patch('sharewarez.utilities.get_game_names_from_folder', return_value=dummy_games):
                             with patch('sharewarez.utilities.load_scanning_filter_patterns', return_value=([], [])):
                                 with patch('sharewarez.utils.scanning.process_game_with_fallback', return_value=True):  # Mock successful processing
-                                    with patch('sharewarez.utilities.remove_from_lib') as mock_remove:
+                                    with patch('sharewarez.utils.missing_games.delete_games', return_value=2) as mock_delete, \
+                                            patch('sharewarez.utils.missing_games._list_names',
+                                                  side_effect=lambda directory: {'game'} if directory == '/existing' else set()):
                                         
                                         # Configure path existence - only first game exists
                                         def exists_side_effect(path):
@@ -499,11 +498,10 @@ class TestAdvancedScanScenarios:
                                             remove_missing=True
                                         )
                                         
-                                        # Verify remove_from_lib was called for missing games
-                                        assert mock_remove.call_count == 2  # Two missing games
-                                        
-                                        # Get the UUIDs that were passed to remove_from_lib
-                                        removed_uuids = [call[0][0] for call in mock_remove.call_args_list]
+                                        # Verify the missing games were deleted in one batch
+                                        mock_delete.assert_called_once()
+                                        removed_uuids = mock_delete.call_args[0][0]
+                                        assert len(removed_uuids) == 2  # Two missing games
                                         
                                         # Verify correct games were marked for removal
                                         missing_game_uuids = [
@@ -548,7 +546,7 @@ class TestAdvancedScanScenarios:
         
         with app.app_context():
             # Test 1: Database error during initial ScanJob creation
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 with patch('os.path.exists', return_value=True):
                     with patch('os.access', return_value=True):
                         with patch('sharewarez.utilities.db.session.commit') as mock_commit:
@@ -564,7 +562,7 @@ class TestAdvancedScanScenarios:
                             mock_commit.assert_called_once()
             
             # Test 2: Database error during final commit  
-            with patch('sharewarez.utilities.is_scan_job_running', return_value=False):
+            with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)):
                 with patch('os.path.exists', return_value=True):
                     with patch('os.access', return_value=True):
                         with patch('sharewarez.utilities.get_game_names_from_folder', return_value=[]):
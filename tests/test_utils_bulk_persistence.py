@@ -0,0 +1,156 @@
+import threading
+import pytest
+from uuid import uuid4
+from sqlalchemy import select, delete, event
+
+from sharewarez import db
+from sharewarez.models import (
+    Game, GameURL, Genre, Library, LibraryPlatform, UnmatchedFolder,
+    game_genre_association, game_theme_association
+)
+from sharewarez.utils.bulk_persistence import LookupCache, build_game_record, write_game_records
+
+
+def make_match(igdb_id, name, genres=(), themes=(), developer=None, websites=()):
+    return {
+        'game': {
+            'id': igdb_id, 'name': name, 'slug': f'{name.lower().replace(" ", "-")}-{uuid4().hex[:8]}',
+            'genres': [{'name': genre} for genre in genres],
+            'themes': [{'name': theme} for theme in themes],
+            'videos': [{'video_id': 'abc123'}],
+        },
+        'confidence': 0.9,
+        'source': 'search',
+        'companies': {'developer': developer, 'publisher': developer},
+        'websites': [{'url_type': 'official', 'url': url} for url in websites],
+    }
+
+
+@pytest.fixture
+def bulk_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Bulk Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    games = db_session.execute(select(Game).filter_by(library_uuid=library.uuid)).scalars().all()
+    for game in games:
+        db_session.execute(delete(GameURL).filter_by(game_uuid=game.uuid))
+        db_session.execute(delete(game_genre_association).where(game_genre_association.c.game_id == game.id))
+        db_session.execute(delete(game_theme_association).where(game_theme_association.c.game_id == game.id))
+        db_session.execute(delete(Game).filter_by(id=game.id))
+    db_session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def igdb_id():
+    return int(uuid4().int % 2_000_000_000)
+
+
+class TestLookupCache:
+    """Test resolving lookup names to ids."""
+
+    def test_resolve_creates_missing_names_once(self, app, db_session):
+        name = f'Bulk Genre {uuid4().hex[:8]}'
+        existing = Genre(name=f'Known Genre {uuid4().hex[:8]}')
+        db_session.add(existing)
+        db_session.commit()
+
+        lookups = LookupCache()
+        ids = lookups.resolve(Genre, {name, existing.name, None})
+        assert ids[existing.name] == existing.id
+        created_id = db_session.execute(select(Genre.id).filter_by(name=name)).scalar_one()
+        assert ids[name] == created_id
+        lookups.commit()
+
+        # A second resolve is served from the map
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert lookups.resolve(Genre, {name}) == {name: created_id}
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert statements == []
+
+
+    def test_uncommitted_names_are_not_shared(self, app, db_session):
+        name = f'Rolled Back Genre {uuid4().hex[:8]}'
+        lookups = LookupCache()
+        lookups.resolve(Genre, {name})
+        db_session.rollback()
+        lookups.discard()
+
+        ids = lookups.resolve(Genre, {name})
+        lookups.commit()
+        assert ids[name] == db_session.execute(select(Genre.id).filter_by(name=name)).scalar_one()
+
+        # Another thread only sees the names once they are committed
+        results = {}
+        thread = threading.Thread(target=lambda: results.update(lookups.resolve(Genre, {name})))
+        thread.start()
+        thread.join()
+        assert results == ids
+
+
+class TestWriteGameRecords:
+    """Test saving batches of matched games."""
+
+    def test_batch_saves_games_with_associations(self, app, db_session, bulk_library):
+        genre = f'Shooter {uuid4().hex[:8]}'
+        developer = f'id Software {uuid4().hex[:8]}'
+        matches = [
+            make_match(igdb_id(), 'Doom', genres=[genre], themes=['Horror'], developer=developer,
+                       websites=['https://doom.example']),
+            make_match(igdb_id(), 'Quake', genres=[genre], developer=developer),
+        ]
+        records = [build_game_record(match, f'/games/{match["game"]["name"]}', bulk_library.uuid) for match in matches]
+
+        commits = []
+        listener = lambda session: commits.append(session)
+        event.listen(db.session, 'after_commit', listener)
+        try:
+            outcomes = write_game_records(records, LookupCache(), None, bulk_library.uuid)
+        finally:
+            event.remove(db.session, 'after_commit', listener)
+
+        games = {game.uuid: game for game in db_session.execute(
+            select(Game).filter_by(library_uuid=bulk_library.uuid)).scalars().all()}
+        assert set(outcomes) == set(games)
+        doom = games[outcomes[0]]
+        assert doom.name == 'Doom'
+        assert doom.match_confidence == 0.9
+        assert doom.video_urls == 'https://www.youtube.com/embed/abc123'
+        assert [g.name for g in doom.genres] == [genre]
+        assert [t.name for t in doom.themes] == ['Horror']
+        assert doom.developer.name == developer
+        assert doom.publisher.name == developer
+        assert [url.url for url in doom.urls] == ['https://doom.example']
+        assert games[outcomes[1]].developer_id == doom.developer_id
+        # Lookups for the new genre, theme and companies, then the games themselves
+        assert len(commits) <= 5
+
+    def test_duplicates_are_logged(self, app, db_session, bulk_library):
+        shared_id = igdb_id()
+        db_session.add(Game(uuid=str(uuid4()), name='Doom', igdb_id=shared_id, full_disk_path='/games/Doom',
+                            library_uuid=bulk_library.uuid))
+        db_session.commit()
+        batch_id = igdb_id()
+        records = [
+            build_game_record(make_match(shared_id, 'Doom'), '/games/Doom', bulk_library.uuid),
+            build_game_record(make_match(shared_id, 'Doom'), '/games/Doom Copy', bulk_library.uuid),
+            build_game_record(make_match(batch_id, 'Heretic'), '/games/Heretic', bulk_library.uuid),
+            build_game_record(make_match(batch_id, 'Heretic'), '/games/Heretic Again', bulk_library.uuid),
+        ]
+
+        outcomes = write_game_records(records, LookupCache(), None, bulk_library.uuid)
+
+        assert outcomes[0] == 'exists'
+        assert outcomes[1] == 'duplicate'
+        assert outcomes[3] == 'duplicate'
+        assert db_session.execute(select(Game).filter_by(uuid=outcomes[2])).scalar_one().name == 'Heretic'
+        logged = db_session.execute(
+            select(UnmatchedFolder.folder_path, UnmatchedFolder.status).filter_by(library_uuid=bulk_library.uuid)
+        ).all()
+        assert sorted(logged) == [('/games/Doom Copy', 'Duplicate'), ('/games/Heretic Again', 'Duplicate')]
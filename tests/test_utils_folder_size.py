@@ -0,0 +1,80 @@
+import os
+import time
+from unittest.mock import patch
+from sqlalchemy import delete, select
+
+from sharewarez.models import FolderSizeCache
+from sharewarez.utils.folder_size import size_tree, compute_folder_size
+
+
+def make_game(root):
+    (root / 'Data' / 'Maps').mkdir(parents=True)
+    (root / 'Updates').mkdir()
+    (root / 'game.exe').write_bytes(b'x' * 100)
+    (root / 'Data' / 'data.pak').write_bytes(b'x' * 1000)
+    (root / 'Data' / 'Maps' / 'e1m1.map').write_bytes(b'x' * 10)
+    (root / 'Updates' / 'patch.exe').write_bytes(b'x' * 5000)
+
+
+def touch_later(path):
+    later = time.time() + 5
+    os.utime(path, (later, later))
+
+
+class TestSizeTree:
+    """Test walking and reusing directory trees."""
+
+    def test_sizes_tree_with_exclusions(self, tmp_path):
+        make_game(tmp_path)
+
+        tree, listed = size_tree(str(tmp_path))
+        assert sum(entry[1] for entry in tree.values()) == 6110
+        assert listed == 4
+
+        tree, listed = size_tree(str(tmp_path), ['updates'])
+        assert sum(entry[1] for entry in tree.values()) == 1110
+        assert os.path.join('Updates') not in tree
+
+    def test_unchanged_directories_are_not_listed_again(self, tmp_path):
+        make_game(tmp_path)
+        tree, _ = size_tree(str(tmp_path))
+
+        with patch('sharewarez.utils.folder_size._list_directory') as mock_list:
+            cached_tree, listed = size_tree(str(tmp_path), previous_tree=tree)
+        mock_list.assert_not_called()
+        assert listed == 0
+        assert cached_tree == tree
+
+        # A new file changes only its directory's mtime
+        (tmp_path / 'Data' / 'Maps' / 'e1m2.map').write_bytes(b'x' * 20)
+        touch_later(tmp_path / 'Data' / 'Maps')
+        new_tree, listed = size_tree(str(tmp_path), previous_tree=tree)
+        assert listed == 1
+        assert sum(entry[1] for entry in new_tree.values()) == 6130
+
+
+class TestComputeFolderSize:
+    """Test the cached folder size."""
+
+    def test_size_is_cached_per_exclusion_set(self, app, db_session, tmp_path):
+        make_game(tmp_path)
+        try:
+            assert compute_folder_size(str(tmp_path), ['Updates', 'Extras']) == 1110
+            cached = db_session.execute(select(FolderSizeCache).filter_by(path=str(tmp_path))).scalar_one()
+            assert cached.excluded == 'extras,updates'
+            assert cached.size == 1110
+
+            with patch('sharewarez.utils.folder_size._list_directory') as mock_list:
+                assert compute_folder_size(str(tmp_path), ['updates', 'extras']) == 1110
+            mock_list.assert_not_called()
+
+            assert compute_folder_size(str(tmp_path)) == 6110
+        finally:
+            db_session.execute(delete(FolderSizeCache).filter_by(path=str(tmp_path)))
+            db_session.commit()
+
+    def test_without_app_context_and_missing_folder(self, tmp_path):
+        (tmp_path / 'game.exe').write_bytes(b'x' * 42)
+        assert compute_folder_size(str(tmp_path)) == 42
+        assert compute_folder_size(str(tmp_path / 'game.exe')) == 42
+        assert compute_folder_size(str(tmp_path / 'missing')) == 0
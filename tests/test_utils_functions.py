@@ -17,6 +17,7 @@ from sharewarez.utils.functions import (
     delete_associations_for_game, sanitize_string_input, validate_discord_webhook_url,
     validate_discord_bot_name, validate_discord_avatar_url
 )
+from sharewarez.utils.nfo import NFO_MAX_BYTES
 
 
 def safe_cleanup_database(db_session):
@@ -232,63 +233,41 @@ class TestGetFolderSizeInBytes:
             assert result == 0
             mock_print.assert_called()
     
-    @patch('os.walk')
-    @patch('os.path.getsize')
-    @patch('os.path.exists')
-    @patch('os.path.isfile')
-    @patch('os.access')
-    @patch('os.path.islink')
-    def test_get_folder_size_normal_folder(self, mock_islink, mock_access, mock_isfile, 
-                                           mock_exists, mock_getsize, mock_walk):
+    def test_get_folder_size_normal_folder(self, tmp_path):
         """Test get_folder_size_in_bytes with normal folder structure."""
-        mock_exists.return_value = True
-        mock_isfile.return_value = False
-        mock_access.return_value = True
-        mock_islink.return_value = False
-        mock_getsize.return_value = 512
-        
-        # Mock os.walk to return test directory structure
-        mock_walk.return_value = [
-            ('/test', ['subdir'], ['file1.txt', 'file2.txt']),
-            ('/test/subdir', [], ['file3.txt'])
-        ]
-        
-        result = get_folder_size_in_bytes('/test')
+        (tmp_path / 'subdir').mkdir()
+        (tmp_path / 'file1.txt').write_bytes(b'x' * 512)
+        (tmp_path / 'file2.txt').write_bytes(b'x' * 512)
+        (tmp_path / 'subdir' / 'file3.txt').write_bytes(b'x' * 512)
+
+        result = get_folder_size_in_bytes(str(tmp_path))
         assert result == 512 * 3  # 3 files, 512 bytes each
-    
-    @patch('os.walk')
-    @patch('os.path.exists')
-    @patch('os.path.isfile')
-    @patch('os.access')
-    def test_get_folder_size_with_symlinks(self, mock_access, mock_isfile, mock_exists, mock_walk):
+
+    def test_get_folder_size_with_symlinks(self, tmp_path):
         """Test get_folder_size_in_bytes skips symlinks."""
-        mock_exists.return_value = True
-        mock_isfile.return_value = False
-        mock_access.return_value = True
-        
-        mock_walk.return_value = [
-            ('/test', [], ['file1.txt', 'symlink'])
-        ]
-        
-        def mock_islink_side_effect(path):
-            return 'symlink' in path
-        
-        with patch('os.path.islink', side_effect=mock_islink_side_effect):
-            with patch('os.path.getsize', return_value=512) as mock_getsize:
-                result = get_folder_size_in_bytes('/test')
-                # Should only count file1.txt, not the symlink
-                assert mock_getsize.call_count == 1
+        (tmp_path / 'file1.txt').write_bytes(b'x' * 512)
+        outside = tmp_path.parent / f'{tmp_path.name}-target.bin'
+        outside.write_bytes(b'x' * 4096)
+        (tmp_path / 'symlink').symlink_to(outside)
+
+        try:
+            result = get_folder_size_in_bytes(str(tmp_path))
+            # Should only count file1.txt, not the symlink
+            assert result == 512
+        finally:
+            outside.unlink()
 
 
 class TestGetFolderSizeInBytesUpdates:
     """Test cases for get_folder_size_in_bytes_updates function."""
     
-    def test_get_folder_size_updates_single_file(self, db_session):
+    def test_get_folder_size_updates_single_file(self, db_session, tmp_path):
         """Test get_folder_size_in_bytes_updates with single file."""
-        with patch('os.path.isfile', return_value=True):
-            with patch('os.path.getsize', return_value=2048):
-                result = get_folder_size_in_bytes_updates('/path/to/file.txt')
-                assert result == 2048
+        file_path = tmp_path / 'file.txt'
+        file_path.write_bytes(b'x' * 2048)
+        with patch('sharewarez.utils.functions.get_allowed_base_directories', return_value=[str(tmp_path)]):
+            result = get_folder_size_in_bytes_updates(str(file_path))
+        assert result == 2048
     
     def test_get_folder_size_updates_nonexistent_path(self, db_session):
         """Test get_folder_size_in_bytes_updates with non-existent path."""
@@ -298,24 +277,16 @@ class TestGetFolderSizeInBytesUpdates:
                 assert result == 0
                 mock_print.assert_called()
     
-    def test_get_folder_size_updates_with_exclusions(self, db_session, sample_global_settings):
+    def test_get_folder_size_updates_with_exclusions(self, db_session, sample_global_settings, tmp_path):
         """Test get_folder_size_in_bytes_updates excludes update/extra folders."""
-        mock_walk_data = [
-            ('/test', ['Updates', 'Extras', 'normal'], []),
-            ('/test/Updates', [], ['update.exe']),
-            ('/test/Extras', [], ['bonus.txt']),
-            ('/test/normal', [], ['game.exe'])
-        ]
-        
-        with patch('os.path.isfile', return_value=False):
-            with patch('os.path.exists', return_value=True):
-                with patch('os.access', return_value=True):
-                    with patch('os.walk', return_value=mock_walk_data):
-                        with patch('os.path.islink', return_value=False):
-                            with patch('os.path.getsize', return_value=1024):
-                                result = get_folder_size_in_bytes_updates('/test')
-                                # Should only count game.exe, not files in Updates/Extras
-                                assert result == 1024
+        for folder, file_name in (('Updates', 'update.exe'), ('Extras', 'bonus.txt'), ('normal', 'game.exe')):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / file_name).write_bytes(b'x' * 1024)
+
+        with patch('sharewarez.utils.functions.get_allowed_base_directories', return_value=[str(tmp_path)]):
+            result = get_folder_size_in_bytes_updates(str(tmp_path))
+        # Should only count game.exe, not files in Updates/Extras
+        assert result == 1024
 
 
 class TestReadFirstNfoContent:
@@ -329,47 +300,80 @@ class TestReadFirstNfoContent:
                 assert result is None
                 mock_print.assert_called_with("Path is a file, not a directory. Skipping NFO scan.")
     
-    def test_read_first_nfo_content_no_nfo_file(self):
+    def test_read_first_nfo_content_no_nfo_file(self, tmp_path):
         """Test read_first_nfo_content when no NFO file exists."""
-        with patch('os.path.isfile', return_value=False):
-            with patch('os.listdir', return_value=['game.exe', 'readme.txt']):
-                with patch('builtins.print') as mock_print:
-                    result = read_first_nfo_content('/path/to/game')
-                    assert result is None
-                    assert any('No NFO file found' in str(call) for call in mock_print.call_args_list)
-    
-    def test_read_first_nfo_content_success(self):
+        (tmp_path / 'game.exe').write_bytes(b'MZ')
+        (tmp_path / 'readme.txt').write_text('readme')
+        with patch('builtins.print') as mock_print:
+            result = read_first_nfo_content(str(tmp_path))
+            assert result is None
+            assert any('No NFO file found' in str(call) for call in mock_print.call_args_list)
+    
+    def test_read_first_nfo_content_success(self, tmp_path):
         """Test read_first_nfo_content successfully reading NFO file."""
         nfo_content = "Game Name: Test Game\nRelease Date: 2023\nDescription: A test game"
+        (tmp_path / 'game.nfo').write_text(nfo_content, encoding='utf-8')
+        (tmp_path / 'game.exe').write_bytes(b'MZ')
         
-        with patch('os.path.isfile', return_value=False):
-            with patch('os.listdir', return_value=['game.nfo', 'game.exe']):
-                with patch('builtins.open', mock_open(read_data=nfo_content)):
-                    with patch('builtins.print'):
-                        result = read_first_nfo_content('/path/to/game')
-                        assert result == nfo_content
+        result = read_first_nfo_content(str(tmp_path))
+        assert result == nfo_content
     
-    def test_read_first_nfo_content_with_null_bytes(self):
+    def test_read_first_nfo_content_first_by_name(self, tmp_path):
+        """Test read_first_nfo_content picks the same NFO on every platform."""
+        (tmp_path / 'b.nfo').write_text('second')
+        (tmp_path / 'A.NFO').write_text('first')
+        
+        assert read_first_nfo_content(str(tmp_path)) == 'first'
+    
+    def test_read_first_nfo_content_with_null_bytes(self, tmp_path):
         """Test read_first_nfo_content removes null bytes from content."""
-        nfo_content = "Game\x00Name: Test\x00Game"
-        expected_content = "GameName: TestGame"
+        (tmp_path / 'info.nfo').write_bytes(b"Game\x00Name: Test\x00Game\r\n")
         
-        with patch('os.path.isfile', return_value=False):
-            with patch('os.listdir', return_value=['info.nfo']):
-                with patch('builtins.open', mock_open(read_data=nfo_content)):
-                    with patch('builtins.print'):
-                        result = read_first_nfo_content('/path/to/game')
-                        assert result == expected_content
+        result = read_first_nfo_content(str(tmp_path))
+        assert result == "GameName: TestGame\n"
     
-    def test_read_first_nfo_content_read_error(self):
+    def test_read_first_nfo_content_cp437_art(self, tmp_path):
+        """Test read_first_nfo_content decodes CP437 box drawing as such."""
+        art = "╔══╗ █▓▒░ Café"
+        (tmp_path / 'release.nfo').write_bytes(art.encode('cp437'))
+        
+        assert read_first_nfo_content(str(tmp_path)) == art
+    
+    def test_read_first_nfo_content_utf16(self, tmp_path):
+        """Test read_first_nfo_content follows a UTF-16 byte order mark."""
+        (tmp_path / 'release.nfo').write_bytes('Café █'.encode('utf-16'))
+        
+        assert read_first_nfo_content(str(tmp_path)) == 'Café █'
+    
+    def test_read_first_nfo_content_size_cap(self, tmp_path):
+        """Test read_first_nfo_content reads no more than NFO_MAX_BYTES."""
+        (tmp_path / 'huge.nfo').write_bytes('é'.encode('utf-8') * NFO_MAX_BYTES)
+        
+        result = read_first_nfo_content(str(tmp_path))
+        assert result == 'é' * (NFO_MAX_BYTES // 2)
+    
+    def test_read_first_nfo_content_skips_unreadable_nfo(self, tmp_path):
+        """Test read_first_nfo_content falls back to the next NFO when the first can't be read."""
+        (tmp_path / 'a.nfo').write_text('locked')
+        (tmp_path / 'b.nfo').write_text('readable')
+        real_open = open
+
+        def fake_open(path, *args, **kwargs):
+            if str(path).endswith('a.nfo'):
+                raise IOError("Permission denied")
+            return real_open(path, *args, **kwargs)
+
+        with patch('builtins.open', side_effect=fake_open):
+            assert read_first_nfo_content(str(tmp_path)) == 'readable'
+
+    def test_read_first_nfo_content_read_error(self, tmp_path):
         """Test read_first_nfo_content handles file read errors."""
-        with patch('os.path.isfile', return_value=False):
-            with patch('os.listdir', return_value=['game.nfo']):
-                with patch('builtins.open', side_effect=IOError("Permission denied")):
-                    with patch('builtins.print') as mock_print:
-                        result = read_first_nfo_content('/path/to/game')
-                        assert result is None
-                        # Should print error and continue
+        (tmp_path / 'game.nfo').write_text('content')
+        with patch('builtins.open', side_effect=IOError("Permission denied")):
+            with patch('builtins.print') as mock_print:
+                result = read_first_nfo_content(str(tmp_path))
+                assert result is None
+                assert any('Error reading NFO file' in str(call) for call in mock_print.call_args_list)
 
 
 class TestDownloadImage:
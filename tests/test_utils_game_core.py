@@ -319,6 +319,25 @@ class TestImageProcessingFunctions:
             mock_download_turbo.assert_called_once()
         assert result == 3
     
+    @patch('sharewarez.utils.game_core.download_images_for_game_turbo')
+    @patch('sharewarez.utils.game_core.download_images_for_game')
+    @patch('sharewarez.utils.game_core.make_igdb_api_request')
+    def test_smart_process_images_for_game_with_fetched_urls(self, mock_api, mock_download, mock_download_turbo, app, db_session, sample_game, sample_global_settings):
+        """Test smart_process_images_for_game stores fetched URLs without asking IGDB again."""
+        from sqlalchemy import select
+        db_session.commit()
+        image_urls = {('cover', 98765): 'https://images.igdb.com/t_original/cover.jpg'}
+        
+        with app.app_context():
+            smart_process_images_for_game(sample_game.uuid, cover_data=98765, screenshots_data=[11111],
+                                          app=app, image_urls=image_urls)
+            images = db_session.execute(select(Image).filter_by(game_uuid=sample_game.uuid)).scalars().all()
+        
+        mock_api.assert_not_called()
+        # The screenshot IGDB returned no URL for is skipped
+        assert [(image.image_type, image.download_url) for image in images] == [
+            ('cover', 'https://images.igdb.com/t_original/cover.jpg')]
+    
     @patch('sharewarez.utils.game_core.download_images_for_game_turbo')
     @patch('sharewarez.utils.game_core.download_images_for_game')
     @patch('sharewarez.utils.game_core.store_image_url_for_download')
@@ -420,7 +439,7 @@ class TestGameDataFunctions:
     @patch('sharewarez.utils.game_core.discord_webhook')
     @patch('sharewarez.utils.game_core.smart_process_images_for_game')
     @patch('sharewarez.utils.game_core.get_folder_size_in_bytes_updates')
-    @patch('sharewarez.utils.game_core.read_first_nfo_content')
+    @patch('sharewarez.utils.game_core.refresh_game_nfo')
     @patch('sharewarez.utils.game_core.make_igdb_api_request')
     @patch('sharewarez.utils.game_core.create_game_instance')
     def test_retrieve_and_save_game_success(self, mock_create_game, mock_api, mock_nfo, mock_folder_size, mock_smart_images, mock_discord, app, db_session, sample_library, sample_global_settings):
@@ -441,7 +460,7 @@ class TestGameDataFunctions:
         mock_game.__table__ = mock_table
         
         mock_create_game.return_value = mock_game
-        mock_nfo.return_value = None
+        mock_nfo.return_value = False
         mock_folder_size.return_value = 1024000
         mock_smart_images.return_value = 0
         
@@ -455,6 +474,8 @@ class TestGameDataFunctions:
         assert result == mock_game
         mock_api.assert_called_once()
         mock_create_game.assert_called_once()
+        # The NFO is read once the game is saved, with its fingerprint
+        mock_nfo.assert_called_once_with(mock_game, '/test/path')
     
     @patch('sharewarez.utils.game_core.make_igdb_api_request')
     def test_retrieve_and_save_game_api_failure(self, mock_api, app, db_session, sample_library, sample_global_settings):
@@ -14,7 +14,10 @@ from sharewarez.utils.gamenames import (
     get_game_name_by_uuid,
     clean_game_name,
     detect_goty_pattern,
-    generate_goty_variants
+    generate_goty_variants,
+    get_name_normalizer,
+    clear_name_normalizer_cache,
+    compile_release_groups
 )
 
 
@@ -755,4 +758,38 @@ class TestNumberHandling:
 
         for input_name, expected in test_cases:
             result = clean_game_name(input_name, [], [])
-            assert result == expected, f"Input: '{input_name}' -> Expected: '{expected}' -> Got: '{result}'"
\ No newline at end of file
+            assert result == expected, f"Input: '{input_name}' -> Expected: '{expected}' -> Got: '{result}'"
+
+
+class TestNameNormalizer:
+    """Test the compiled release group matching and the normalizer cache."""
+
+    def test_release_groups_compile_to_one_pattern(self):
+        insensitive_patterns = ['-CODEX', '.CODEX', '-CODEXFIX', 'REPACK']
+        sensitive_patterns = [('-PLAZA', True), ('-Razor', False)]
+        regex = compile_release_groups(insensitive_patterns, sensitive_patterns)
+
+        assert regex.sub('', 'Game-codexfix') == 'Game'  # Longest group wins over its prefix
+        assert regex.sub('', 'Game-CODEX') == 'Game'
+        assert regex.sub('', 'Game REPACKED') == 'Game REPACKED'  # Word boundaries for word patterns
+        assert regex.sub('', 'Game-PLAZA') == 'Game'
+        assert regex.sub('', 'Game-plaza') == 'Game-plaza'
+        assert regex.sub('', 'Game-RAZOR') == 'Game'
+        assert compile_release_groups([], []) is None
+
+    def test_normalizer_is_compiled_once_per_pattern_set(self):
+        clear_name_normalizer_cache()
+        insensitive_patterns = ['-CODEX']
+        sensitive_patterns = [('-PLAZA', True)]
+        normalizer = get_name_normalizer(insensitive_patterns, sensitive_patterns)
+
+        with patch('sharewarez.utils.gamenames.compile_release_groups') as mock_compile:
+            assert get_name_normalizer(list(insensitive_patterns), list(sensitive_patterns)) is normalizer
+            assert clean_game_name('Doom-CODEX', insensitive_patterns, sensitive_patterns) == 'Doom'
+        mock_compile.assert_not_called()
+
+        # A changed release group list gets its own normalizer
+        changed = get_name_normalizer(insensitive_patterns + ['-SKIDROW'], sensitive_patterns)
+        assert changed is not normalizer
+        assert changed.clean('Doom-SKIDROW') == 'Doom'
+        assert normalizer.clean('Doom-SKIDROW') == 'Doom-Skidrow'
@@ -371,6 +371,24 @@ class TestIGDBRateLimiter:
         assert 999.5 in limiter.request_times
         assert 1000.0 in limiter.request_times
 
+    def test_acquire_waits_for_a_released_slot(self):
+        """Test a full limiter lets a waiting thread in once a slot is released."""
+        limiter = IGDBRateLimiter(max_requests_per_second=100, max_concurrent_requests=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.1)
+        limiter.release()
+        assert acquired.wait(2)
+        thread.join()
+        assert limiter.concurrent_requests == 1
+
     def test_concurrent_access_thread_safety(self):
         """Test rate limiter thread safety with concurrent access."""
         limiter = IGDBRateLimiter(max_requests_per_second=10, max_concurrent_requests=5)
@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch, AsyncMock
+from sqlalchemy import delete
+
+from sharewarez.models import GlobalSettings
+from sharewarez.utils.igdb_api import build_game_search_query, IGDBRateLimiter
+from sharewarez.utils.igdb_async import (
+    AsyncIGDBClient,
+    AsyncIGDBRateLimiter,
+    IGDBSearchPrefetcher,
+    start_scan_search_prefetch
+)
+from tests.fake_igdb_server import FakeIGDBServer
+
+
+FAKE_GAMES = [
+    {'id': 1, 'name': 'Doom', 'platform_ids': [6]},
+    {'id': 2, 'name': 'Quake', 'platform_ids': [6]},
+    {'id': 3, 'name': 'Halo', 'platform_ids': [12]},
+]
+
+
+@pytest.fixture
+def fake_igdb():
+    server = FakeIGDBServer(FAKE_GAMES).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def sample_global_settings(db_session):
+    """Create global settings with IGDB credentials for testing."""
+    db_session.execute(delete(GlobalSettings))
+    db_session.commit()
+    settings = GlobalSettings(igdb_client_id='abc', igdb_client_secret='def')
+    db_session.add(settings)
+    db_session.commit()
+    return settings
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault('rate_limiter', AsyncIGDBRateLimiter(max_requests_per_second=100, max_concurrent_requests=8))
+    return AsyncIGDBClient('client_id', 'client_secret', server.games_url,
+                           token_url=server.token_url, covers_endpoint=server.covers_url, **kwargs)
+
+
+class TestAsyncIGDBRateLimiter:
+    """Test the asyncio rate limiter."""
+
+    def test_spaces_requests(self):
+        async def run():
+            limiter = AsyncIGDBRateLimiter(max_requests_per_second=20, max_concurrent_requests=8)
+            starts = []
+
+            async def request():
+                async with limiter:
+                    starts.append(time.monotonic())
+
+            await asyncio.gather(*(request() for _ in range(5)))
+            return starts
+
+        starts = sorted(asyncio.run(run()))
+        assert starts[-1] - starts[0] >= 0.15
+
+    def test_shares_the_rate_of_a_sync_limiter(self):
+        shared = IGDBRateLimiter(max_requests_per_second=2)
+        limiter = AsyncIGDBRateLimiter(max_requests_per_second=100, shared_limiter=shared)
+
+        async def request():
+            async with limiter:
+                pass
+
+        with patch('sharewarez.utils.igdb_api.time.time', return_value=1000.0), \
+             patch('sharewarez.utils.igdb_api.time.sleep') as mock_sleep, \
+             patch('sharewarez.utils.igdb_async.asyncio.sleep', new_callable=AsyncMock) as mock_async_sleep:
+            shared.acquire()
+            asyncio.run(request())
+            mock_async_sleep.assert_not_called()
+            # The prefetcher used the second request of this second, so the worker waits
+            asyncio.run(request())
+            mock_async_sleep.assert_called_once_with(1.0)
+            shared.acquire()
+            mock_sleep.assert_called_once_with(1.0)
+
+    def test_limits_concurrency(self):
+        async def run():
+            limiter = AsyncIGDBRateLimiter(max_requests_per_second=1000, max_concurrent_requests=2)
+            in_flight = 0
+            peak = 0
+
+            async def request():
+                nonlocal in_flight, peak
+                async with limiter:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                    await asyncio.sleep(0.01)
+                    in_flight -= 1
+
+            await asyncio.gather(*(request() for _ in range(6)))
+            return peak
+
+        assert asyncio.run(run()) == 2
+
+
+class TestAsyncIGDBClient:
+    """Test the async IGDB client against the fake server."""
+
+    def test_search_game_uses_shared_query(self, fake_igdb):
+        async def run():
+            async with make_client(fake_igdb) as client:
+                return await client.search_game('Doom', 6)
+
+        result = asyncio.run(run())
+        assert result == [{'id': 1, 'name': 'Doom'}]
+        games_requests = fake_igdb.endpoint_requests('/games')
+        assert games_requests[0]['body'] == build_game_search_query('Doom', 6)
+        assert games_requests[0]['headers']['Client-ID'] == 'client_id'
+
+    def test_search_game_no_match_returns_none(self, fake_igdb):
+        async def run():
+            async with make_client(fake_igdb) as client:
+                return await client.search_game('Unknown Game', None)
+
+        assert asyncio.run(run()) is None
+
+    def test_search_games_reuses_token(self, fake_igdb):
+        async def run():
+            async with make_client(fake_igdb) as client:
+                return await client.search_games([('Doom', 6), ('Quake', 6), ('Halo', 12), ('Doom', 6)])
+
+        results = asyncio.run(run())
+        assert set(results.keys()) == {('Doom', 6), ('Quake', 6), ('Halo', 12)}
+        assert results[('Halo', 12)][0]['id'] == 3
+        assert len(fake_igdb.endpoint_requests('/games')) == 3
+        assert len([r for r in fake_igdb.requests if r['path'].startswith('/oauth2')]) == 1
+
+    def test_retries_rate_limited_requests(self, fake_igdb):
+        fake_igdb.rate_limit_responses = 2
+
+        async def run():
+            async with make_client(fake_igdb) as client:
+                return await client.search_game('Quake', None)
+
+        assert asyncio.run(run())[0]['id'] == 2
+        assert len(fake_igdb.endpoint_requests('/games')) == 3
+
+    def test_gives_up_after_max_retries(self, fake_igdb):
+        fake_igdb.rate_limit_responses = 5
+
+        async def run():
+            async with make_client(fake_igdb, max_retries=1) as client:
+                return await client.make_request(fake_igdb.games_url, build_game_search_query('Quake', None))
+
+        result = asyncio.run(run())
+        assert 'error' in result
+        assert '429' in result['error']
+
+    def test_fetch_game_by_id_and_covers(self, fake_igdb):
+        async def run():
+            async with make_client(fake_igdb) as client:
+                return (await client.fetch_game_by_id(2),
+                        await client.get_cover_thumbnail_url(2),
+                        await client.get_cover_url(2))
+
+        game, thumbnail, cover = asyncio.run(run())
+        assert game[0]['name'] == 'Quake'
+        assert thumbnail == 'https://images.igdb.com/igdb/image/upload/t_thumb/cover2.jpg'
+        assert cover == 'https://images.igdb.com/igdb/image/upload/t_cover_big_2x/cover2.jpg'
+
+    def test_from_settings(self, db_session, sample_global_settings):
+        client = AsyncIGDBClient.from_settings('https://api.igdb.com/v4/games')
+        assert client.client_id == 'abc'
+        assert client.client_secret == 'def'
+        assert client.games_endpoint == 'https://api.igdb.com/v4/games'
+
+        sample_global_settings.igdb_client_secret = None
+        db_session.commit()
+        assert AsyncIGDBClient.from_settings('https://api.igdb.com/v4/games') is None
+
+
+class TestIGDBSearchPrefetcher:
+    """Test the scan search prefetcher and its hook in search_igdb_candidates."""
+
+    def test_prefetched_results_are_served(self, fake_igdb):
+        prefetcher = IGDBSearchPrefetcher(make_client(fake_igdb)).start([('Doom', 6), ('Unknown', 6)])
+        try:
+            assert prefetcher.get('Doom', 6) == (True, [{'id': 1, 'name': 'Doom'}])
+            assert prefetcher.get('Unknown', 6) == (True, [])
+            # Results are handed out once, and unknown searches are misses
+            assert prefetcher.get('Doom', 6) == (False, None)
+            assert prefetcher.get('Quake', 6) == (False, None)
+            assert 'alternative_names.name' in fake_igdb.endpoint_requests('/games')[0]['body']
+        finally:
+            prefetcher.stop()
+        assert prefetcher.get('Doom', 6) == (False, None)
+
+    def test_failed_prefetch_falls_back_to_live_request(self, fake_igdb):
+        fake_igdb.access_token = 'rotated_token'
+        client = make_client(fake_igdb)
+        client._access_token = 'stale_token'
+        prefetcher = IGDBSearchPrefetcher(client).start([('Doom', 6)])
+        try:
+            assert prefetcher.get('Doom', 6) == (False, None)
+        finally:
+            prefetcher.stop()
+
+    def test_search_igdb_candidates_uses_prefetched_result(self, app, fake_igdb):
+        from sharewarez.utils.game_core import search_igdb_candidates
+
+        prefetcher = IGDBSearchPrefetcher(make_client(fake_igdb)).start([('Quake', 6)])
+        try:
+            with app.app_context():
+                with patch('sharewarez.utils.game_core.make_igdb_api_request') as mock_request, \
+                     patch('sharewarez.utils.game_core.record_igdb_cache_hit') as mock_cache_hit:
+                    # Searches of anyone but the owning scan leave its prefetched results alone
+                    mock_request.return_value = [{'id': 2, 'name': 'Quake (live)'}]
+                    assert search_igdb_candidates('Quake', 6) == [{'id': 2, 'name': 'Quake (live)'}]
+                    mock_request.reset_mock()
+
+                    assert search_igdb_candidates('Quake', 6, prefetcher) == [{'id': 2, 'name': 'Quake'}]
+                    mock_request.assert_not_called()
+                    # The scan's usage counts the search it got from the prefetcher
+                    mock_cache_hit.assert_called_once_with(app.config['IGDB_API_ENDPOINT'])
+
+                    mock_request.return_value = [{'id': 3, 'name': 'Halo'}]
+                    assert search_igdb_candidates('Halo', 12, prefetcher) == [{'id': 3, 'name': 'Halo'}]
+                    mock_request.assert_called_once()
+        finally:
+            prefetcher.stop()
+
+    def test_timed_out_search_is_not_made_twice(self):
+        class SlowClient:
+            timeout = 5
+
+            def __init__(self):
+                self.searched = []
+                self.release = threading.Event()
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            async def search_candidates(self, search_name, platform_id):
+                self.searched.append(search_name)
+                await asyncio.get_running_loop().run_in_executor(None, self.release.wait)
+                return [{'id': 1, 'name': search_name}]
+
+        client = SlowClient()
+        prefetcher = IGDBSearchPrefetcher(client, concurrency=1, wait_timeout=0.05).start([('Doom', 6), ('Quake', 6)])
+        try:
+            # Quake is still queued behind Doom, so the scan searches it live and the prefetch is dropped
+            assert prefetcher.get('Quake', 6) == (False, None)
+            threading.Timer(0.2, client.release.set).start()
+            # Doom is already in flight and is waited for
+            assert prefetcher.get('Doom', 6) == (True, [{'id': 1, 'name': 'Doom'}])
+            prefetcher.submit('Halo', 12)
+            assert prefetcher.get('Halo', 12) == (True, [{'id': 1, 'name': 'Halo'}])
+        finally:
+            prefetcher.stop()
+        assert client.searched == ['Doom', 'Halo']
+
+    def test_pending_results_are_capped(self, fake_igdb):
+        prefetcher = IGDBSearchPrefetcher(make_client(fake_igdb), max_pending=2).start([('Doom', 6)])
+        try:
+            assert prefetcher.submit('Doom', 6) is False
+            assert prefetcher.submit('Quake', 6) is True
+            # Full until the scan takes a result
+            assert prefetcher.submit('Halo', 12) is False
+            assert prefetcher.get('Doom', 6) == (True, [{'id': 1, 'name': 'Doom'}])
+            assert prefetcher.submit('Halo', 12) is True
+            assert prefetcher.get('Halo', 12) == (True, [{'id': 3, 'name': 'Halo'}])
+        finally:
+            prefetcher.stop()
+        assert prefetcher.submit('Doom', 6) is False
+
+    def test_start_scan_search_prefetch_needs_new_folders(self, app, sample_global_settings):
+        with app.app_context():
+            assert start_scan_search_prefetch(1, 'https://api.igdb.com/v4/games') is None
+            prefetcher = start_scan_search_prefetch(2, 'https://api.igdb.com/v4/games')
+            try:
+                assert isinstance(prefetcher, IGDBSearchPrefetcher)
+            finally:
+                prefetcher.stop()
@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import delete, select
+
+from sharewarez.models import (
+    GlobalSettings, IGDBCatalogGame, IGDBCatalogAlternativeName, IGDBCatalogPlatform,
+    IGDBCatalogSyncState, igdb_catalog_game_platforms
+)
+from sharewarez.utils.igdb_catalog import (
+    sync_igdb_catalog,
+    search_catalog,
+    fetch_catalog_game,
+    get_catalog_stats,
+    is_catalog_enabled
+)
+from tests.fake_igdb_server import FakeIGDBServer
+
+
+CATALOG_GAMES = [
+    {'id': 101, 'name': 'Doom', 'updated_at': 1000, 'platforms': [{'id': 6, 'name': 'PC'}],
+     'alternative_names': [{'id': 5001, 'name': 'DOOM 2016'}], 'cover': 77, 'screenshots': [78, 79]},
+    {'id': 102, 'name': 'Quake', 'updated_at': 1100, 'platforms': [{'id': 6, 'name': 'PC'}]},
+    {'id': 103, 'name': 'Resident Evil 4', 'updated_at': 1200, 'platforms': [{'id': 8, 'name': 'PS2'}],
+     'alternative_names': [{'id': 5002, 'name': 'Biohazard 4'}]},
+]
+
+CATALOG_PLATFORMS = [
+    {'id': 6, 'name': 'PC (Microsoft Windows)', 'abbreviation': 'PC', 'updated_at': 500},
+    {'id': 8, 'name': 'PlayStation 2', 'abbreviation': 'PS2', 'updated_at': 600},
+]
+
+
+def clear_catalog(db_session):
+    db_session.execute(delete(igdb_catalog_game_platforms))
+    db_session.execute(delete(IGDBCatalogAlternativeName))
+    db_session.execute(delete(IGDBCatalogGame))
+    db_session.execute(delete(IGDBCatalogPlatform))
+    db_session.execute(delete(IGDBCatalogSyncState))
+    db_session.commit()
+
+
+@pytest.fixture
+def fake_igdb():
+    server = FakeIGDBServer([dict(g) for g in CATALOG_GAMES], [dict(p) for p in CATALOG_PLATFORMS]).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def catalog_settings(app, db_session, fake_igdb):
+    """Global settings with IGDB credentials, the catalog enabled and the API pointed at the fake server."""
+    clear_catalog(db_session)
+    db_session.execute(delete(GlobalSettings))
+    db_session.commit()
+    settings = GlobalSettings(igdb_client_id='abc', igdb_client_secret='def', use_igdb_catalog=True)
+    db_session.add(settings)
+    db_session.commit()
+
+    original_endpoint = app.config['IGDB_API_ENDPOINT']
+    app.config['IGDB_API_ENDPOINT'] = fake_igdb.games_url
+    with patch('sharewarez.utils.igdb_api.get_access_token', return_value=fake_igdb.access_token):
+        yield settings
+
+    app.config['IGDB_API_ENDPOINT'] = original_endpoint
+    db_session.rollback()
+    settings.use_igdb_catalog = False
+    db_session.commit()
+    clear_catalog(db_session)
+
+
+class TestCatalogSync:
+    """Test syncing the IGDB catalog from the fake server."""
+
+    def test_full_sync_pages_by_id(self, catalog_settings, fake_igdb, db_session):
+        result = sync_igdb_catalog(page_size=2)
+
+        assert result == {'success': True, 'platforms': 2, 'games': 3}
+        game_requests = fake_igdb.endpoint_requests('/games')
+        assert len(game_requests) == 2
+        assert 'where updated_at > 0 & id > 0; sort id asc; limit 2;' in game_requests[0]['body']
+        assert 'id > 102' in game_requests[1]['body']
+
+        doom = db_session.get(IGDBCatalogGame, 101)
+        assert doom.name == 'Doom'
+        assert [a.name for a in doom.alternative_names] == ['DOOM 2016']
+        assert db_session.get(IGDBCatalogPlatform, 8).abbreviation == 'PS2'
+
+        state = db_session.get(IGDBCatalogSyncState, 'games')
+        assert state.status == 'Completed'
+        assert state.last_updated_at == 1200
+
+    def test_incremental_sync_only_fetches_changes(self, catalog_settings, fake_igdb, db_session):
+        sync_igdb_catalog()
+        fake_igdb.games[1] = {'id': 102, 'name': 'Quake Enhanced', 'updated_at': 1300,
+                              'alternative_names': [{'id': 5003, 'name': 'Quake Remastered'}]}
+
+        result = sync_igdb_catalog()
+
+        assert result['games'] == 1
+        assert 'updated_at > 1200' in fake_igdb.endpoint_requests('/games')[-1]['body']
+        db_session.expire_all()
+        assert db_session.get(IGDBCatalogGame, 102).name == 'Quake Enhanced'
+        assert len(db_session.execute(select(IGDBCatalogGame)).scalars().all()) == 3
+
+    def test_failed_sync_records_error(self, catalog_settings, fake_igdb, db_session):
+        fake_igdb.access_token = 'rotated_token'
+
+        result = sync_igdb_catalog()
+
+        assert result['success'] is False
+        assert 'platforms' in result['error']
+        state = db_session.get(IGDBCatalogSyncState, 'platforms')
+        assert state.status == 'Failed'
+        assert state.last_updated_at == 0
+
+
+class TestCatalogLookups:
+    """Test matching lookups against a synced catalog."""
+
+    def test_search_catalog(self, catalog_settings):
+        sync_igdb_catalog()
+
+        assert [g['id'] for g in search_catalog('doom')] == [101]
+        assert [g['id'] for g in search_catalog('Biohazard 4')] == [103]
+        assert search_catalog('doom', platform_id=8) == []
+        assert search_catalog('Half-Life') == []
+        assert search_catalog('100%_') == []
+
+    def test_fetch_catalog_game_shape(self, catalog_settings):
+        sync_igdb_catalog()
+
+        game = fetch_catalog_game(101)
+        assert game[0]['cover'] == {'id': 77}
+        assert game[0]['screenshots'] == [{'id': 78}, {'id': 79}]
+        assert fetch_catalog_game(999) is None
+
+    def test_matching_uses_catalog_before_api(self, catalog_settings, fake_igdb):
+        from sharewarez.utils.game_core import find_igdb_match, fetch_game_by_igdb_id
+
+        sync_igdb_catalog()
+        with patch('sharewarez.utils.game_core.make_igdb_api_request', return_value=[]) as mock_api:
+            match = find_igdb_match('Resident Evil 4', 8)
+            game = fetch_game_by_igdb_id(102)
+            mock_api.assert_not_called()
+
+            assert find_igdb_match('Half-Life', None) is None
+            assert mock_api.called
+
+        assert match['game']['id'] == 103
+        assert game[0]['name'] == 'Quake'
+
+    def test_catalog_disabled(self, catalog_settings, db_session):
+        catalog_settings.use_igdb_catalog = False
+        db_session.commit()
+        assert is_catalog_enabled() is False
+        assert get_catalog_stats()['enabled'] is False
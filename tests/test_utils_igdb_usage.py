@@ -0,0 +1,158 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch, Mock
+from sqlalchemy import delete, select
+
+from sharewarez.models import GlobalSettings, IGDBUsageStat
+from sharewarez.utils import igdb_usage
+from sharewarez.utils.igdb_usage import (
+    igdb_usage_context,
+    current_igdb_caller,
+    endpoint_name,
+    record_igdb_call,
+    record_igdb_cache_hit,
+    flush_igdb_usage,
+    pop_scan_api_cost,
+    get_igdb_usage_summary
+)
+from sharewarez.utils.igdb_api import make_igdb_api_request, cached_igdb_api_request
+from sharewarez.utils.igdb_async import AsyncIGDBClient, AsyncIGDBRateLimiter
+from tests.fake_igdb_server import FakeIGDBServer
+
+
+@pytest.fixture
+def usage_store(db_session, monkeypatch):
+    """Empty in-memory counters and usage table, with no periodic flush due."""
+    igdb_usage._pending_usage.clear()
+    igdb_usage._scan_costs.clear()
+    monkeypatch.setattr(igdb_usage, '_last_flush', time.monotonic())
+    db_session.execute(delete(IGDBUsageStat))
+    db_session.commit()
+    yield
+    igdb_usage._pending_usage.clear()
+    igdb_usage._scan_costs.clear()
+    db_session.execute(delete(IGDBUsageStat))
+    db_session.commit()
+
+
+@pytest.fixture
+def igdb_credentials(db_session):
+    db_session.execute(delete(GlobalSettings))
+    db_session.commit()
+    settings = GlobalSettings(igdb_client_id='abc', igdb_client_secret='def')
+    db_session.add(settings)
+    db_session.commit()
+    return settings
+
+
+def pending_counters(endpoint, caller):
+    return [counters for (bucket, e, c), counters in igdb_usage._pending_usage.items() if e == endpoint and c == caller]
+
+
+class TestUsageRecording:
+    """Test recording of IGDB calls."""
+
+    def test_endpoint_name(self):
+        assert endpoint_name('https://api.igdb.com/v4/games') == 'games'
+        assert endpoint_name('http://127.0.0.1:8000/v4/covers/') == 'covers'
+
+    def test_caller_context(self, app):
+        assert current_igdb_caller() == ('background', None)
+        with igdb_usage_context('scan', 'job-1'):
+            with igdb_usage_context('catalog_sync'):
+                assert current_igdb_caller() == ('catalog_sync', None)
+            assert current_igdb_caller() == ('scan', 'job-1')
+        with app.test_request_context('/api/search_igdb_by_name'):
+            assert current_igdb_caller()[0] == 'apis.search_igdb_by_name'
+
+    def test_make_igdb_api_request_records_calls(self, app, usage_store, igdb_credentials):
+        ok_response = Mock(status_code=200)
+        ok_response.json.return_value = [{'id': 1}]
+        limited_response = Mock(status_code=429)
+        limited_response.raise_for_status.side_effect = __import__('requests').HTTPError('429 Too Many Requests')
+
+        with patch('sharewarez.utils.igdb_api.get_access_token', return_value='token'), \
+             patch('sharewarez.utils.igdb_api.requests.post', side_effect=[ok_response, limited_response]):
+            with igdb_usage_context('scan', 'job-1'):
+                make_igdb_api_request('https://api.igdb.com/v4/games', 'fields name;')
+                assert 'error' in make_igdb_api_request('https://api.igdb.com/v4/games', 'fields name;')
+
+        counters = pending_counters('games', 'scan')[0]
+        assert counters['calls'] == 2
+        assert counters['rate_limited'] == 1
+        assert counters['errors'] == 1
+
+        cost = pop_scan_api_cost('job-1')
+        assert cost['calls'] == 2
+        assert cost['by_endpoint']['games']['rate_limited'] == 1
+        assert pop_scan_api_cost('job-1') is None
+
+    def test_recording_never_raises(self, app, usage_store):
+        with igdb_usage_context('scan'):
+            # A status that isn't a number counts as a failed request
+            record_igdb_call('https://api.igdb.com/v4/games', 0.1, Mock())
+            with patch('sharewarez.utils.igdb_usage._add_usage', side_effect=RuntimeError('boom')):
+                record_igdb_call('https://api.igdb.com/v4/games', 0.1, 200)
+                record_igdb_cache_hit('https://api.igdb.com/v4/games')
+
+        counters = pending_counters('games', 'scan')[0]
+        assert (counters['calls'], counters['errors']) == (1, 1)
+
+    def test_cache_hits_are_recorded(self, app, usage_store):
+        with app.test_request_context('/api/search_igdb_by_name'):
+            with patch('sharewarez.utils.igdb_api.make_igdb_api_request', return_value=[{'id': 1}]):
+                cached_igdb_api_request('https://api.igdb.com/v4/games', 'fields name; search "usage";')
+                cached_igdb_api_request('https://api.igdb.com/v4/games', 'fields name; search "usage";')
+
+        assert pending_counters('games', 'apis.search_igdb_by_name')[0]['cache_hits'] == 1
+
+    def test_async_client_records_with_its_attribution(self, usage_store):
+        server = FakeIGDBServer([{'id': 1, 'name': 'Doom'}]).start()
+        server.rate_limit_responses = 1
+        try:
+            async def run():
+                client = AsyncIGDBClient('id', 'secret', server.games_url, token_url=server.token_url,
+                                         rate_limiter=AsyncIGDBRateLimiter(100, 8),
+                                         usage_caller='scan_prefetch', scan_job_id='job-2')
+                async with client:
+                    return await client.search_game('Doom', None)
+
+            assert asyncio.run(run())[0]['id'] == 1
+        finally:
+            server.stop()
+
+        cost = pop_scan_api_cost('job-2')
+        assert cost['calls'] == 2
+        assert cost['rate_limited'] == 1
+
+
+class TestUsageStore:
+    """Test the rolling usage table and its summary."""
+
+    def test_flush_adds_to_existing_buckets(self, app, db_session, usage_store):
+        record_igdb_call('https://api.igdb.com/v4/games', 0.1, 200, caller='scan')
+        flush_igdb_usage()
+        record_igdb_call('https://api.igdb.com/v4/games', 0.3, 429, caller='scan')
+        record_igdb_cache_hit('https://api.igdb.com/v4/games', caller='scan')
+        flush_igdb_usage()
+
+        rows = db_session.execute(select(IGDBUsageStat)).scalars().all()
+        assert len(rows) == 1
+        assert rows[0].calls == 2
+        assert rows[0].rate_limited == 1
+        assert rows[0].cache_hits == 1
+        assert rows[0].max_latency_ms == pytest.approx(300)
+        assert igdb_usage._pending_usage == {}
+
+    def test_summary(self, app, db_session, usage_store):
+        record_igdb_call('https://api.igdb.com/v4/games', 0.2, 200, caller='scan')
+        record_igdb_call('https://api.igdb.com/v4/covers', 0.4, 200, caller='background')
+
+        summary = get_igdb_usage_summary(24)
+
+        assert summary['totals']['calls'] == 2
+        assert summary['totals']['avg_latency_ms'] == pytest.approx(300)
+        assert [row['endpoint'] for row in summary['by_endpoint']] == ['covers', 'games']
+        assert {row['caller'] for row in summary['by_caller']} == {'scan', 'background'}
+        assert len(summary['hourly']) == 1
@@ -0,0 +1,145 @@
+import pytest
+from uuid import uuid4
+from unittest.mock import patch, MagicMock
+from sqlalchemy import update, delete, text
+
+from sharewarez import db
+from sharewarez.models import Game, Image, Library, LibraryPlatform
+from sharewarez.utils.image_queue import (
+    IMAGE_MAX_ATTEMPTS, ImageDownloadError, claim_images, complete_images, fetch_image,
+    process_image_queue, requeue_images, retry_delay
+)
+
+
+@pytest.fixture
+def queued_game(app, db_session):
+    library = Library(uuid=str(uuid4()), name=f'Image Queue Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    game = Game(uuid=str(uuid4()), name='Queued Game', full_disk_path=f'/games/{uuid4()}', library_uuid=library.uuid)
+    db_session.add_all([library, game])
+    db_session.commit()
+    yield game
+    db_session.rollback()
+    db_session.execute(delete(Image).filter_by(game_uuid=game.uuid))
+    db_session.execute(delete(Game).filter_by(uuid=game.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def queue_images(db_session, game, count):
+    images = [Image(game_uuid=game.uuid, image_type='screenshot', url=f'{game.uuid}_screenshot_{i}.jpg',
+                    download_url=f'https://images.example.com/{i}.jpg', is_downloaded=False)
+              for i in range(count)]
+    db_session.add_all(images)
+    db_session.commit()
+    return [image.id for image in images]
+
+
+def image_state(db_session, image_id):
+    db_session.expire_all()
+    return db_session.get(Image, image_id)
+
+
+class TestClaimImages:
+    """Test leasing images to one worker at a time."""
+
+    def test_claimed_and_locked_images_are_skipped(self, db_session, queued_game):
+        image_ids = queue_images(db_session, queued_game, 4)
+
+        token, claimed = claim_images(2, game_uuid=queued_game.uuid)
+        assert [image.id for image in claimed] == image_ids[:2]
+
+        # Another worker holds a row lock on the third image while claiming it
+        with db.engine.connect() as other:
+            other.execute(text('SELECT id FROM images WHERE id = :id FOR UPDATE'), {'id': image_ids[2]})
+            _, second = claim_images(10, game_uuid=queued_game.uuid)
+            other.rollback()
+        assert [image.id for image in second] == [image_ids[3]]
+
+        _, third = claim_images(10, game_uuid=queued_game.uuid)
+        assert [image.id for image in third] == [image_ids[2]]
+
+    def test_expired_lease_is_claimed_again(self, db_session, queued_game):
+        image_id = queue_images(db_session, queued_game, 1)[0]
+        old_token, _ = claim_images(1, game_uuid=queued_game.uuid)
+        db_session.execute(update(Image).where(Image.id == image_id).values(leased_until=text("now() - interval '1 second'")))
+        db_session.commit()
+
+        token, claimed = claim_images(1, game_uuid=queued_game.uuid)
+        assert [image.id for image in claimed] == [image_id]
+
+        # The worker whose lease ran out can't complete the image any more
+        assert complete_images(old_token, [image_id]) == 0
+        assert complete_images(token, [image_id]) == 1
+        db_session.commit()
+        assert image_state(db_session, image_id).is_downloaded is True
+
+
+class TestProcessImageQueue:
+    """Test downloading claimed images with backoff and dead-lettering."""
+
+    def test_failures_back_off_then_dead_letter(self, app, db_session, queued_game, tmp_path):
+        ok_id, flaky_id, gone_id = queue_images(db_session, queued_game, 3)
+
+        def fake_fetch(download_url, save_path):
+            if download_url.endswith('/1.jpg'):
+                raise ImageDownloadError('Request failed: timed out')
+            if download_url.endswith('/2.jpg'):
+                raise ImageDownloadError('HTTP 404', permanent=True)
+
+        with patch.dict(app.config, {'IMAGE_SAVE_PATH': str(tmp_path)}), \
+             patch('sharewarez.utils.image_queue.fetch_image', side_effect=fake_fetch):
+            result = process_image_queue(batch_size=10, max_workers=2, game_uuid=queued_game.uuid)
+            assert (result['claimed'], result['downloaded'], result['failed'], result['dead_lettered']) == (3, 1, 2, 1)
+
+            assert image_state(db_session, ok_id).is_downloaded is True
+            flaky = image_state(db_session, flaky_id)
+            assert (flaky.download_attempts, flaky.last_error) == (1, 'Request failed: timed out')
+            assert flaky.next_attempt_at is not None and flaky.lease_token is None
+            assert image_state(db_session, gone_id).dead_lettered_at is not None
+
+            # Nothing is due until the backoff has passed
+            assert process_image_queue(batch_size=10, game_uuid=queued_game.uuid)['claimed'] == 0
+
+            db_session.execute(update(Image).where(Image.id == flaky_id).values(
+                next_attempt_at=None, download_attempts=IMAGE_MAX_ATTEMPTS - 1))
+            db_session.commit()
+            result = process_image_queue(batch_size=10, game_uuid=queued_game.uuid)
+            assert result['dead_lettered'] == 1
+            assert image_state(db_session, flaky_id).dead_lettered_at is not None
+
+        assert requeue_images([flaky_id, gone_id]) == 2
+        db_session.commit()
+        flaky = image_state(db_session, flaky_id)
+        assert (flaky.download_attempts, flaky.dead_lettered_at, flaky.last_error) == (0, None, None)
+
+    def test_retry_delay_doubles_up_to_the_maximum(self):
+        assert [retry_delay(attempts) for attempts in (1, 2, 3)] == [60, 120, 240]
+        assert retry_delay(50) == 6 * 60 * 60
+
+
+class TestFetchImage:
+    """Test downloading one image."""
+
+    @patch('sharewarez.utils.image_queue.requests.get')
+    def test_image_is_saved_whole(self, mock_get, tmp_path):
+        mock_get.return_value = MagicMock(status_code=200, content=b'jpeg')
+        save_path = tmp_path / 'covers' / 'cover.jpg'
+
+        fetch_image('//images.igdb.com/t_thumb/cover.jpg', str(save_path))
+
+        assert mock_get.call_args[0][0] == 'https://images.igdb.com/t_original/cover.jpg'
+        assert save_path.read_bytes() == b'jpeg'
+        assert [path.name for path in save_path.parent.iterdir()] == ['cover.jpg']
+
+    @patch('sharewarez.utils.image_queue.requests.get')
+    def test_missing_image_fails_permanently(self, mock_get, tmp_path):
+        mock_get.return_value = MagicMock(status_code=404, content=b'')
+
+        with pytest.raises(ImageDownloadError) as error:
+            fetch_image('https://images.example.com/gone.jpg', str(tmp_path / 'gone.jpg'))
+        assert error.value.permanent is True
+
+        mock_get.return_value = MagicMock(status_code=503, content=b'')
+        with pytest.raises(ImageDownloadError) as error:
+            fetch_image('https://images.example.com/busy.jpg', str(tmp_path / 'busy.jpg'))
+        assert error.value.permanent is False
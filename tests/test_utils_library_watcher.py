@@ -0,0 +1,193 @@
+import os
+import time
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+from sqlalchemy import delete, select
+
+from sharewarez import db
+from sharewarez.models import (
+    Game, Library, LibraryPlatform, UnmatchedFolder, ScanJob, GlobalSettings, LibrarySnapshotEntry
+)
+from sharewarez.utils.db import try_advisory_lock, release_advisory_lock
+from sharewarez.utils.library_watcher import (
+    affected_entry,
+    is_network_mount,
+    get_watch_roots,
+    process_watched_entry,
+    ChangeDebouncer,
+    LibraryWatcher,
+    WATCHFILES_AVAILABLE
+)
+
+
+@pytest.fixture
+def watched_library(db_session, tmp_path):
+    library = Library(uuid=str(uuid4()), name=f'Watched Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.add(ScanJob(library_uuid=library.uuid, scan_folder=str(tmp_path), status='Completed',
+                           setting_filefolder=False))
+    db_session.execute(delete(GlobalSettings))
+    db_session.add(GlobalSettings(enable_library_watcher=True, library_watcher_debounce=5,
+                                  enable_game_updates=True, update_folder_name='updates'))
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    db_session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Game).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(LibrarySnapshotEntry).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+class TestWatcherHelpers:
+    """Test path mapping, mount detection and debouncing."""
+
+    def test_affected_entry(self):
+        assert affected_entry('/games', '/games/Doom/data/doom.wad') == '/games/Doom'
+        assert affected_entry('/games', '/games/Doom') == '/games/Doom'
+        assert affected_entry('/games', '/games') is None
+        assert affected_entry('/games', '/other/Doom') is None
+
+    def test_is_network_mount(self, tmp_path):
+        mounts = tmp_path / 'mounts'
+        mounts.write_text('/dev/sda1 / ext4 rw 0 0\nnas:/export /mnt/nas nfs4 rw 0 0\n//srv/games /mnt/smb\\040share cifs rw 0 0\n')
+        assert is_network_mount('/mnt/nas/games', str(mounts)) is True
+        assert is_network_mount('/mnt/smb share/games', str(mounts)) is True
+        assert is_network_mount('/mnt/nasty', str(mounts)) is False
+        assert is_network_mount('/games', str(tmp_path / 'missing')) is False
+
+    def test_debouncer_waits_for_quiet_period(self):
+        debouncer = ChangeDebouncer(quiet_seconds=30)
+        root = {'folder': '/games'}
+        debouncer.add('/games/Doom', root, now=100)
+        debouncer.add('/games/Doom', root, now=120)  # still copying
+
+        assert debouncer.pop_ready(now=140) == []
+        assert debouncer.pop_ready(now=150) == [('/games/Doom', root)]
+        assert len(debouncer) == 0
+
+
+class TestWatchedEntries:
+    """Test feeding watched entries into the scan pipeline."""
+
+    def test_get_watch_roots(self, app, watched_library, tmp_path, db_session):
+        db_session.add(ScanJob(library_uuid=watched_library.uuid, scan_folder='/does/not/exist', status='Completed'))
+        db_session.commit()
+
+        roots = [root for root in get_watch_roots() if root['library_uuid'] == watched_library.uuid]
+        assert roots == [{'folder': os.path.realpath(str(tmp_path)), 'library_uuid': watched_library.uuid,
+                          'scan_mode': 'folders'}]
+
+    def test_new_folder_is_added(self, app, watched_library, tmp_path, db_session):
+        (tmp_path / 'Quake_Arena').mkdir()
+        root = {'folder': str(tmp_path), 'library_uuid': watched_library.uuid, 'scan_mode': 'folders'}
+
+        with patch('sharewarez.utils.library_watcher.process_game_with_fallback', return_value=True) as mock_process:
+            result = process_watched_entry(str(tmp_path / 'Quake_Arena'), root, patterns=([], []))
+
+        assert result == 'added'
+        assert mock_process.call_args.args[:4] == ('Quake Arena', str(tmp_path / 'Quake_Arena'), None,
+                                                   watched_library.uuid)
+        entry = db_session.execute(select(LibrarySnapshotEntry).filter_by(library_uuid=watched_library.uuid)).scalars().one()
+        assert entry.path == str(tmp_path / 'Quake_Arena')
+
+    def test_known_game_refreshes_updates(self, app, watched_library, tmp_path, db_session):
+        game_path = str(tmp_path / 'Doom')
+        (tmp_path / 'Doom' / 'updates' / 'v1.1').mkdir(parents=True)
+        db_session.add(Game(uuid=str(uuid4()), name='Doom', full_disk_path=game_path, library_uuid=watched_library.uuid))
+        db_session.commit()
+        root = {'folder': str(tmp_path), 'library_uuid': watched_library.uuid, 'scan_mode': 'folders'}
+
+        with patch('sharewarez.utils.library_watcher.process_game_with_fallback') as mock_process, \
+             patch('sharewarez.utils.library_watcher.process_game_updates') as mock_updates:
+            assert process_watched_entry(game_path, root, patterns=([], [])) == 'updated'
+
+        mock_process.assert_not_called()
+        assert mock_updates.call_args.args[2] == os.path.join(game_path, 'updates')
+
+    def test_unmatched_and_removed_entries_are_skipped(self, app, watched_library, tmp_path, db_session):
+        (tmp_path / 'Unknown').mkdir()
+        db_session.add(UnmatchedFolder(folder_path=str(tmp_path / 'Unknown'), library_uuid=watched_library.uuid,
+                                       status='Unmatched'))
+        db_session.commit()
+        root = {'folder': str(tmp_path), 'library_uuid': watched_library.uuid, 'scan_mode': 'folders'}
+
+        with patch('sharewarez.utils.library_watcher.process_game_with_fallback') as mock_process:
+            assert process_watched_entry(str(tmp_path / 'Unknown'), root, patterns=([], [])) == 'skipped'
+            assert process_watched_entry(str(tmp_path / 'Gone'), root, patterns=([], [])) == 'removed'
+        mock_process.assert_not_called()
+
+
+class TestLibraryWatcher:
+    """Test change detection and processing in the watcher service."""
+
+    def test_polling_detects_new_and_changed_entries(self, app, watched_library, tmp_path):
+        (tmp_path / 'Doom').mkdir()
+        root = {'folder': str(tmp_path), 'library_uuid': watched_library.uuid, 'scan_mode': 'folders'}
+        watcher = LibraryWatcher(app)
+        watcher._polled_roots = [root]
+
+        watcher.poll_roots(now=1000)
+        assert len(watcher.debouncer) == 0
+
+        (tmp_path / 'Quake').mkdir()
+        (tmp_path / 'Doom' / 'doom.wad').write_bytes(b'x')
+        watcher.poll_roots(now=1030)
+        assert len(watcher.debouncer) == 0  # not due yet
+        watcher.poll_roots(now=1100)
+
+        ready = sorted(path for path, _ in watcher.debouncer.pop_ready(now=2000))
+        assert ready == [str(tmp_path / 'Doom'), str(tmp_path / 'Quake')]
+
+    def test_processing_waits_for_running_scan(self, app, watched_library, tmp_path):
+        root = {'folder': str(tmp_path), 'library_uuid': watched_library.uuid, 'scan_mode': 'folders'}
+        watcher = LibraryWatcher(app)
+        watcher.debouncer.add(str(tmp_path / 'Doom'), root, now=0)
+
+        with patch('sharewarez.utils.library_watcher.is_scan_job_running', return_value=True):
+            assert watcher.process_ready(now=100) == 0
+        assert len(watcher.debouncer) == 1
+
+        watcher.debouncer = ChangeDebouncer(quiet_seconds=0)
+        watcher.debouncer.add(str(tmp_path / 'Doom'), root)
+        with patch('sharewarez.utils.library_watcher.process_watched_entry') as mock_process:
+            assert watcher.process_ready() == 1
+        assert mock_process.call_args.args[0] == str(tmp_path / 'Doom')
+
+    @pytest.mark.skipif(not WATCHFILES_AVAILABLE, reason="watchfiles not installed")
+    def test_inotify_watch_queues_game_folder(self, app, tmp_path):
+        root = {'folder': os.path.realpath(str(tmp_path)), 'library_uuid': 'lib', 'scan_mode': 'folders'}
+        watcher = LibraryWatcher(app)
+        watcher.debouncer.quiet_seconds = 0
+        with patch('sharewarez.utils.library_watcher.is_network_mount', return_value=False):
+            watcher.set_roots([root])
+        try:
+            time.sleep(0.5)
+            (tmp_path / 'Doom' / 'data').mkdir(parents=True)
+            (tmp_path / 'Doom' / 'data' / 'doom.wad').write_bytes(b'x')
+
+            deadline = time.monotonic() + 10
+            ready = []
+            while not ready and time.monotonic() < deadline:
+                time.sleep(0.2)
+                ready = watcher.debouncer.pop_ready()
+        finally:
+            watcher._stop_watch_thread()
+
+        assert [path for path, _ in ready] == [os.path.join(root['folder'], 'Doom')]
+
+    def test_advisory_lock_is_exclusive(self, app):
+        with app.app_context():
+            first = db.engine.connect()
+            second = db.engine.connect()
+            try:
+                assert try_advisory_lock(first, 'sharewarez.test_lock') is True
+                assert try_advisory_lock(second, 'sharewarez.test_lock') is False
+                release_advisory_lock(first, 'sharewarez.test_lock')
+                assert try_advisory_lock(second, 'sharewarez.test_lock') is True
+                release_advisory_lock(second, 'sharewarez.test_lock')
+            finally:
+                first.close()
+                second.close()
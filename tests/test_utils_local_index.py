@@ -0,0 +1,105 @@
+import json
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy import select, delete
+
+from sharewarez.models import Library, LibraryPlatform, LocalMetadataIndexEntry
+from sharewarez.utils.local_index import (
+    read_folder_sidecars, refresh_local_index, get_local_index_entries, get_local_index_entry
+)
+from sharewarez.utils.local_metadata import write_local_metadata
+from sharewarez.utils.scan_snapshot import take_snapshot
+
+
+@pytest.fixture
+def index_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Index Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    db_session.execute(delete(LocalMetadataIndexEntry).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def make_game_folder(root, name, igdb_id=None, images=()):
+    folder = root / name
+    folder.mkdir()
+    if igdb_id is not None:
+        (folder / 'sharewarez.json').write_text(json.dumps({'igdb_id': igdb_id, 'title': name}))
+    for image in images:
+        (folder / image).write_bytes(b'img')
+    return folder
+
+
+class TestReadFolderSidecars:
+    """Test reading a folder's metadata file and images from one listing."""
+
+    def test_metadata_and_images_are_found(self, tmp_path):
+        folder = make_game_folder(tmp_path, 'Doom', igdb_id=7331, images=(
+            'folder.jpg', 'cover.png', 'screenshot-1.jpg', 'screenshot-2.png', 'screenshot-2.jpg', 'screenshot-4.png'))
+
+        sidecars = read_folder_sidecars(str(folder))
+
+        assert sidecars['igdb_id'] == 7331
+        assert sidecars['local_metadata']['title'] == 'Doom'
+        assert sidecars['cover_file'] == 'cover.png'
+        assert sidecars['screenshot_files'] == ['screenshot-1.jpg', 'screenshot-2.jpg', 'screenshot-4.png']
+
+    def test_invalid_metadata_and_unreadable_folders(self, tmp_path):
+        folder = make_game_folder(tmp_path, 'Quake')
+        (folder / 'sharewarez.json').write_text('{"title": "Quake"}')
+
+        sidecars = read_folder_sidecars(str(folder))
+
+        assert sidecars['local_metadata'] is None and sidecars['igdb_id'] is None
+        assert sidecars['cover_file'] is None and sidecars['screenshot_files'] == []
+        assert read_folder_sidecars(str(tmp_path / 'Gone')) is None
+
+
+class TestRefreshLocalIndex:
+    """Test that only changed folders are read again."""
+
+    def test_unchanged_folders_are_not_read_again(self, app, db_session, index_library, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom', igdb_id=1, images=('cover.jpg',))
+        quake = make_game_folder(tmp_path, 'Quake')
+        hexen = make_game_folder(tmp_path, 'Hexen', igdb_id=3)
+        snapshot = take_snapshot([str(doom), str(quake), str(hexen)])
+
+        index = refresh_local_index(index_library.uuid, str(tmp_path), snapshot)
+        assert index[str(doom)]['igdb_id'] == 1
+        assert index[str(quake)]['local_metadata'] is None
+
+        with patch('sharewarez.utils.local_index.read_folder_sidecars', wraps=read_folder_sidecars) as mock_read:
+            again = refresh_local_index(index_library.uuid, str(tmp_path), snapshot)
+        assert mock_read.call_count == 0
+        assert again == index
+
+        # Quake gets a metadata file, Hexen is deleted
+        (quake / 'sharewarez.json').write_text(json.dumps({'igdb_id': 2}))
+        snapshot = take_snapshot([str(doom), str(quake)])
+        snapshot[str(quake)]['mtime'] += 1
+        with patch('sharewarez.utils.local_index.read_folder_sidecars', wraps=read_folder_sidecars) as mock_read:
+            index = refresh_local_index(index_library.uuid, str(tmp_path), snapshot)
+        assert [call.args[0] for call in mock_read.call_args_list] == [str(quake)]
+        assert index[str(quake)]['igdb_id'] == 2
+
+        entries = get_local_index_entries([(index_library.uuid, str(path)) for path in (doom, quake, hexen)])
+        assert set(entries) == {(index_library.uuid, str(doom)), (index_library.uuid, str(quake))}
+        assert entries[(index_library.uuid, str(doom))]['cover_file'] == 'cover.jpg'
+
+    def test_written_metadata_updates_the_index(self, app, db_session, index_library, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom')
+        refresh_local_index(index_library.uuid, str(tmp_path), take_snapshot([str(doom)]))
+
+        with patch('sharewarez.utils.local_metadata.get_allowed_base_directories', return_value=[str(tmp_path)]):
+            assert write_local_metadata(str(doom), 7331, game_title='DOOM')
+
+        assert get_local_index_entry(index_library.uuid, str(doom))['igdb_id'] == 7331
+        entry = db_session.execute(
+            select(LocalMetadataIndexEntry).filter_by(library_uuid=index_library.uuid, folder_path=str(doom))
+        ).scalar_one()
+        # Read from disk again on the next scan
+        assert entry.mtime is None
@@ -0,0 +1,157 @@
+from unittest.mock import patch
+
+from sharewarez.utils.matching import (
+    normalize_title,
+    title_similarity,
+    extract_year,
+    candidate_years,
+    build_name_variants,
+    rank_candidates,
+    select_best_match,
+    fallback_search_names,
+    MATCH_CONFIDENCE_THRESHOLD
+)
+
+
+DOOM_CANDIDATES = [
+    {'id': 1, 'name': 'Doom Eternal', 'first_release_date': 1584662400, 'platforms': [{'id': 6, 'name': 'PC'}]},
+    {'id': 2, 'name': 'Doom', 'first_release_date': 1463097600, 'platforms': [{'id': 6, 'name': 'PC'}]},
+    {'id': 3, 'name': 'Doom', 'first_release_date': 755827200, 'platforms': [{'id': 13, 'name': 'DOS'}]},
+]
+
+
+class TestTitleNormalization:
+    """Test title normalization and similarity."""
+
+    def test_normalize_title(self):
+        assert normalize_title('The Witcher 3: Wild Hunt') == 'witcher 3 wild hunt'
+        assert normalize_title('Final Fantasy VII') == 'final fantasy 7'
+        assert normalize_title("Baldur's Gate & Friends") == 'baldurs gate and friends'
+        assert normalize_title('The') == 'the'
+
+    def test_title_similarity(self):
+        assert title_similarity('Final Fantasy 7', 'Final Fantasy VII') == 1.0
+        assert title_similarity('Witcher 3', 'The Witcher 3: Wild Hunt') > MATCH_CONFIDENCE_THRESHOLD
+        assert title_similarity('Half-Life', 'Portal') < 0.5
+        assert title_similarity('', 'Portal') == 0.0
+
+    def test_extract_year(self):
+        assert extract_year('Doom (2016)') == ('Doom', 2016)
+        assert extract_year('Doom 1993') == ('Doom', 1993)
+        assert extract_year('Doom') == ('Doom', None)
+        assert extract_year('1942') == ('1942', None)
+
+    def test_candidate_years(self):
+        candidate = {'first_release_date': 755827200, 'release_dates': [{'y': 1995}, {'date': 1463097600}]}
+        assert candidate_years(candidate) == {1993, 1995, 2016}
+
+
+class TestNameVariants:
+    """Test GOTY and fallback name variants."""
+
+    def test_goty_variants_included(self):
+        names = [name for name, _ in build_name_variants('Fallout 3 GOTY')]
+        assert names[:4] == ['Fallout 3 GOTY', 'Fallout 3 G.O.T.Y.', 'Fallout 3', 'Fallout 3 Game of the Year Edition']
+        assert ('Fallout', 2) in build_name_variants('Fallout 3 GOTY')
+
+    def test_short_prefixes_skipped(self):
+        names = [name for name, _ in build_name_variants('The Long Dark')]
+        assert 'The' not in names
+        assert 'The Long' in names
+
+    def test_fallback_search_names(self):
+        assert fallback_search_names('Fallout 3 GOTY') == ['Fallout 3', 'Fallout']
+        assert fallback_search_names('Some Game Deluxe Edition') == ['Some Game Deluxe', 'Some Game']
+        assert fallback_search_names('Portal') == []
+
+
+class TestRankCandidates:
+    """Test local candidate ranking."""
+
+    def test_platform_hint_breaks_tie(self):
+        assert rank_candidates(DOOM_CANDIDATES, 'Doom', platform_id=13)[0]['game']['id'] == 3
+        assert rank_candidates(DOOM_CANDIDATES, 'Doom', platform_id=6)[0]['game']['id'] == 2
+
+    def test_year_hint(self):
+        ranked = rank_candidates(DOOM_CANDIDATES, 'Doom (1993)')
+        assert ranked[0]['game']['id'] == 3
+        assert ranked[0]['confidence'] == 1.0
+
+    def test_alternative_names(self):
+        candidates = [
+            {'id': 10, 'name': 'Some Other Game'},
+            {'id': 11, 'name': 'Biohazard 4', 'alternative_names': [{'name': 'Resident Evil 4'}]},
+        ]
+        best = select_best_match(candidates, 'Resident Evil 4')
+        assert best['game']['id'] == 11
+        assert best['matched_name'] == 'Resident Evil 4'
+
+    def test_goty_variant_matches(self):
+        candidates = [{'id': 20, 'name': 'Fallout 3: Game of the Year Edition'}, {'id': 21, 'name': 'Fallout 4'}]
+        assert select_best_match(candidates, 'Fallout 3 GOTY')['game']['id'] == 20
+
+    def test_fallback_name_matches_with_penalty(self):
+        best = select_best_match([{'id': 30, 'name': 'Portal 2'}], 'Portal 2 Repack Edition')
+        assert best['game']['id'] == 30
+        assert best['confidence'] < 1.0
+
+    def test_no_acceptable_match(self):
+        assert select_best_match([{'id': 40, 'name': 'Minecraft'}], 'Half-Life') is None
+        assert select_best_match([], 'Half-Life') is None
+        assert select_best_match(None, 'Half-Life') is None
+
+
+class TestFindIGDBMatch:
+    """Test the IGDB search and ranking flow in game_core."""
+
+    def test_single_search_when_first_set_matches(self, app):
+        from sharewarez.utils.game_core import find_igdb_match
+
+        with app.app_context():
+            with patch('sharewarez.utils.game_core.make_igdb_api_request', return_value=DOOM_CANDIDATES) as mock_api:
+                match = find_igdb_match('Doom', 13)
+
+        assert match['game']['id'] == 3
+        mock_api.assert_called_once()
+        query = mock_api.call_args[0][1]
+        assert 'search "Doom"' in query
+        assert 'alternative_names.name' in query
+        assert 'where platforms = (13)' in query
+
+    def test_fallback_searches_are_capped(self, app):
+        from sharewarez.utils.game_core import find_igdb_match
+
+        with app.app_context():
+            with patch('sharewarez.utils.game_core.make_igdb_api_request', return_value=[]) as mock_api:
+                match = find_igdb_match('Some Obscure Game Deluxe Edition Repack', None)
+
+        assert match is None
+        assert mock_api.call_count == 3
+
+    def test_fallback_search_finds_match(self, app):
+        from sharewarez.utils.game_core import find_igdb_match
+
+        responses = {
+            'Portal 2 Collectors Gold': [],
+            'Portal 2 Collectors': [{'id': 30, 'name': 'Portal 2'}],
+        }
+
+        def api_side_effect(endpoint, query):
+            for name, result in responses.items():
+                if f'search "{name}";' in query:
+                    return result
+            return []
+
+        with app.app_context():
+            with patch('sharewarez.utils.game_core.make_igdb_api_request', side_effect=api_side_effect) as mock_api:
+                match = find_igdb_match('Portal 2 Collectors Gold', None)
+
+        assert match['game']['id'] == 30
+        assert mock_api.call_count == 2
+
+    def test_api_error_returns_none(self, app):
+        from sharewarez.utils.game_core import find_igdb_match
+
+        with app.app_context():
+            with patch('sharewarez.utils.game_core.make_igdb_api_request', return_value={'error': 'API Error'}):
+                assert find_igdb_match('Doom', None) is None
@@ -0,0 +1,145 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy import select, delete
+
+from sharewarez.models import Game, GameURL, Genre, Image, Library, LibraryPlatform, game_genre_association
+from sharewarez.utils.missing_games import find_missing_paths, delete_games, remove_missing_games
+
+
+@pytest.fixture
+def missing_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Missing Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    game_uuids = db_session.execute(select(Game.uuid).filter_by(library_uuid=library.uuid)).scalars().all()
+    delete_games(game_uuids)
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def add_game(db_session, library, path, **fields):
+    game = Game(uuid=str(uuid4()), name=os.path.basename(path), full_disk_path=str(path),
+                library_uuid=library.uuid, **fields)
+    db_session.add(game)
+    db_session.commit()
+    return game
+
+
+class TestFindMissingPaths:
+    """Test set-based missing path detection."""
+
+    def test_each_parent_is_listed_once(self, tmp_path):
+        (tmp_path / 'Doom').mkdir()
+        (tmp_path / 'quake.iso').write_bytes(b'x')
+        paths = [str(tmp_path / 'Doom'), str(tmp_path / 'quake.iso'), str(tmp_path / 'Hexen'),
+                 str(tmp_path / 'gone' / 'Heretic')]
+
+        with patch('sharewarez.utils.missing_games.os.scandir', wraps=os.scandir) as mock_scandir:
+            missing, unreadable = find_missing_paths(paths)
+
+        assert mock_scandir.call_count == 2
+        # A parent that is gone takes its games with it
+        assert missing == {str(tmp_path / 'Hexen'), str(tmp_path / 'gone' / 'Heretic')}
+        assert unreadable == set()
+
+    def test_unreadable_parent_is_not_missing(self, tmp_path):
+        (tmp_path / 'share').mkdir()
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if path == str(tmp_path / 'share'):
+                raise OSError(5, 'Input/output error')
+            return real_scandir(path)
+
+        with patch('sharewarez.utils.missing_games.os.scandir', side_effect=scandir):
+            missing, unreadable = find_missing_paths([str(tmp_path / 'share' / 'Doom'), str(tmp_path / 'Quake')])
+
+        assert missing == {str(tmp_path / 'Quake')}
+        assert unreadable == {str(tmp_path / 'share')}
+
+
+class TestDeleteGames:
+    """Test bulk game deletion."""
+
+    def test_games_and_references_are_deleted(self, app, db_session, missing_library, tmp_path):
+        game = add_game(db_session, missing_library, tmp_path / 'Doom')
+        kept = add_game(db_session, missing_library, tmp_path / 'Quake')
+        genre = Genre(name=f'Missing Genre {uuid4().hex[:8]}')
+        game.genres.append(genre)
+        db_session.add(GameURL(game_uuid=game.uuid, url_type='official', url='https://doom.example'))
+        db_session.add(Image(game_uuid=game.uuid, image_type='cover', url='doom_cover.jpg'))
+        db_session.commit()
+        game_uuid = game.uuid
+        image_file = tmp_path / 'doom_cover.jpg'
+        image_file.write_bytes(b'jpg')
+
+        with patch.dict(app.config, {'IMAGE_SAVE_PATH': str(tmp_path)}):
+            assert delete_games([game_uuid, game_uuid]) == 1
+
+        assert db_session.execute(select(Game).filter_by(uuid=game_uuid)).first() is None
+        assert db_session.execute(select(Image).filter_by(game_uuid=game_uuid)).first() is None
+        assert db_session.execute(select(GameURL).filter_by(game_uuid=game_uuid)).first() is None
+        assert db_session.execute(
+            select(game_genre_association).where(game_genre_association.c.genre_id == genre.id)).first() is None
+        assert not image_file.exists()
+        assert db_session.execute(select(Game).filter_by(uuid=kept.uuid)).scalar_one()
+
+
+class TestRemoveMissingGames:
+    """Test removing missing games with and without a grace period."""
+
+    def test_missing_games_are_removed(self, app, db_session, missing_library, tmp_path):
+        (tmp_path / 'Doom').mkdir()
+        present = add_game(db_session, missing_library, tmp_path / 'Doom')
+        add_game(db_session, missing_library, tmp_path / 'Quake')
+
+        result = remove_missing_games(missing_library.uuid)
+
+        assert result == {'missing': 1, 'removed': 1, 'quarantined': 0, 'restored': 0, 'unchecked': 0}
+        remaining = db_session.execute(select(Game.uuid).filter_by(library_uuid=missing_library.uuid)).scalars().all()
+        assert remaining == [present.uuid]
+
+    def test_grace_period_quarantines_then_removes(self, app, db_session, missing_library, tmp_path):
+        game = add_game(db_session, missing_library, tmp_path / 'Doom')
+        game_uuid = game.uuid
+        back = add_game(db_session, missing_library, tmp_path / 'Quake', missing_since=datetime.now())
+        (tmp_path / 'Quake').mkdir()
+
+        result = remove_missing_games(missing_library.uuid, grace_hours=24)
+        assert result == {'missing': 1, 'removed': 0, 'quarantined': 1, 'restored': 1, 'unchecked': 0}
+        db_session.expire_all()
+        assert db_session.get(Game, game.id).missing_since is not None
+        assert db_session.get(Game, back.id).missing_since is None
+
+        db_session.get(Game, game.id).missing_since = datetime.now() - timedelta(hours=25)
+        db_session.commit()
+        result = remove_missing_games(missing_library.uuid, grace_hours=24)
+        assert result['removed'] == 1
+        assert db_session.execute(select(Game).filter_by(uuid=game_uuid)).first() is None
+
+    def test_games_in_unreadable_folders_are_kept(self, app, db_session, missing_library, tmp_path):
+        (tmp_path / 'share').mkdir()
+        game = add_game(db_session, missing_library, tmp_path / 'share' / 'Doom')
+        marked = add_game(db_session, missing_library, tmp_path / 'share' / 'Quake', missing_since=datetime.now())
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if path == str(tmp_path / 'share'):
+                raise PermissionError(13, 'Permission denied')
+            return real_scandir(path)
+
+        with patch('sharewarez.utils.missing_games.os.scandir', side_effect=scandir), \
+             patch('sharewarez.utils.missing_games.log_system_event') as mock_log:
+            result = remove_missing_games(missing_library.uuid)
+
+        assert result == {'missing': 0, 'removed': 0, 'quarantined': 0, 'restored': 0, 'unchecked': 2}
+        assert mock_log.call_args.kwargs['event_level'] == 'warning'
+        db_session.expire_all()
+        assert db_session.get(Game, game.id) is not None
+        # Not found again either, so it stays marked
+        assert db_session.get(Game, marked.id).missing_since is not None
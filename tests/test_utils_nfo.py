@@ -0,0 +1,73 @@
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sharewarez.utils.nfo import decode_nfo, list_nfo_files, refresh_game_nfo
+
+
+def make_game(**kwargs):
+    return SimpleNamespace(nfo_content=kwargs.get('nfo_content'), nfo_fingerprint=kwargs.get('nfo_fingerprint'))
+
+
+class TestDecodeNfo:
+    """Test guessing the encoding of NFO files."""
+
+    def test_windows_1252_text(self):
+        assert decode_nfo('Pokémon – “Deluxe”'.encode('cp1252')) == 'Pokémon – “Deluxe”'
+
+    def test_utf8_cut_by_the_size_cap(self):
+        data = 'Café'.encode('utf-8')
+        assert decode_nfo(data[:-1]) == 'Caf'
+
+
+class TestRefreshGameNfo:
+    """Test refreshing the stored NFO of a game only when the file changed."""
+
+    def test_unchanged_nfo_is_not_read_again(self, tmp_path):
+        nfo = tmp_path / 'release.nfo'
+        nfo.write_text('first')
+        game = make_game()
+
+        assert refresh_game_nfo(game, str(tmp_path)) is True
+        assert game.nfo_content == 'first'
+        assert game.nfo_fingerprint == list_nfo_files(str(tmp_path))[0][1]
+
+        with patch('sharewarez.utils.nfo.read_nfo_file') as mock_read:
+            assert refresh_game_nfo(game, str(tmp_path)) is False
+            mock_read.assert_not_called()
+
+        nfo.write_text('second version')
+        stat = nfo.stat()
+        os.utime(nfo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert refresh_game_nfo(game, str(tmp_path)) is True
+        assert game.nfo_content == 'second version'
+
+    def test_unreadable_nfo_gives_way_to_the_next(self, tmp_path):
+        (tmp_path / 'a.nfo').write_text('locked')
+        (tmp_path / 'b.nfo').write_text('readable')
+        game = make_game()
+
+        with patch('sharewarez.utils.nfo.read_nfo_file', side_effect=lambda path: None if path.endswith('a.nfo') else 'readable'):
+            assert refresh_game_nfo(game, str(tmp_path)) is True
+            assert game.nfo_content == 'readable'
+            assert game.nfo_fingerprint == list_nfo_files(str(tmp_path))[1][1]
+            # Still the NFO the content came from, so nothing changed
+            assert refresh_game_nfo(game, str(tmp_path)) is False
+
+    def test_removed_nfo_clears_content(self, tmp_path):
+        nfo = tmp_path / 'release.nfo'
+        nfo.write_text('content')
+        game = make_game()
+        refresh_game_nfo(game, str(tmp_path))
+
+        nfo.unlink()
+        assert refresh_game_nfo(game, str(tmp_path)) is True
+        assert (game.nfo_content, game.nfo_fingerprint) == (None, None)
+
+    def test_content_without_fingerprint_is_kept_without_nfo(self, tmp_path):
+        # Content entered by hand, or read before fingerprints were stored
+        game = make_game(nfo_content='typed in')
+
+        assert refresh_game_nfo(game, str(tmp_path)) is False
+        assert refresh_game_nfo(game, str(tmp_path / 'missing')) is False
+        assert game.nfo_content == 'typed in'
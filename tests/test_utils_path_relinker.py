@@ -0,0 +1,123 @@
+import pytest
+from uuid import uuid4
+from sqlalchemy import select, delete
+
+from sharewarez.models import Game, GameUpdate, Library, LibraryPlatform, ScanJob, PathRelinkProposal
+from sharewarez.utils.gamenames import get_name_normalizer
+from sharewarez.utils.path_relinker import (
+    RELINK_JOB_TYPE, RelinkIndex, relink_tokens, list_relink_candidates, propose_relinks,
+    create_relink_job, run_relink_job, list_relink_proposals, apply_relink_proposals
+)
+
+
+@pytest.fixture
+def relink_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Relink Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    game_uuids = select(Game.uuid).filter_by(library_uuid=library.uuid)
+    db_session.execute(delete(GameUpdate).where(GameUpdate.game_uuid.in_(game_uuids)))
+    db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Game).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def add_game(db_session, library, name, path):
+    game = Game(uuid=str(uuid4()), name=name, full_disk_path=str(path), library_uuid=library.uuid)
+    db_session.add(game)
+    db_session.commit()
+    return game
+
+
+class TestRelinkMatching:
+    """Test indexing a tree and picking new paths without the database."""
+
+    def test_names_are_cleaned_before_matching(self):
+        normalizer = get_name_normalizer(['-CODEX'], [])
+
+        assert relink_tokens('Half.Life.2-CODEX', normalizer) == ('half', 'life', '2')
+        assert relink_tokens('Doom.iso', normalizer, {'iso'}) == ('doom',)
+        assert relink_tokens('Doom.iso', normalizer) != ('doom',)
+
+    def test_each_entry_goes_to_the_best_game(self, tmp_path):
+        normalizer = get_name_normalizer(['-CODEX'], [])
+        (tmp_path / 'Action' / 'Doom-CODEX').mkdir(parents=True)
+        (tmp_path / 'Action' / 'Doom-CODEX' / 'Doom.iso').write_bytes(b'x')
+        (tmp_path / 'Action' / 'Doom 2').mkdir()
+        (tmp_path / 'Action' / 'Still Here').mkdir()
+        (tmp_path / 'Puzzle').mkdir()
+        (tmp_path / 'Puzzle' / 'Tetris.zip').write_bytes(b'x')
+        (tmp_path / 'Puzzle' / 'readme.txt').write_bytes(b'x')
+
+        candidates = list_relink_candidates([str(tmp_path)], normalizer, {'iso', 'zip'},
+                                            exclude_paths={str(tmp_path / 'Action' / 'Still Here')})
+        paths = {path for path, _, _ in candidates}
+        assert str(tmp_path / 'Action' / 'Still Here') not in paths
+        assert str(tmp_path / 'Puzzle' / 'readme.txt') not in paths
+
+        games = [
+            ('doom', 'DOOM', '/old/Doom.rar'),
+            ('doom2', 'Doom II', '/old/Doom 2'),
+            ('tetris', 'Tetris', '/old/Tetris'),
+            ('gone', 'Unreal', '/old/Unreal'),
+        ]
+        found = []
+        proposals = propose_relinks(games, RelinkIndex(candidates), normalizer, {'rar', 'iso', 'zip'},
+                                    on_game=lambda name, matched: found.append((name, matched)))
+
+        # The extracted folder wins over the image inside it
+        assert proposals['doom'] == (str(tmp_path / 'Action' / 'Doom-CODEX'), 1.0)
+        assert proposals['doom2'][0] == str(tmp_path / 'Action' / 'Doom 2')
+        assert proposals['tetris'][0] == str(tmp_path / 'Puzzle' / 'Tetris.zip')
+        assert 'gone' not in proposals
+        assert found[-1] == ('Unreal', False)
+
+
+class TestRelinkJob:
+    """Test a relink job run on the current thread and applying its proposals."""
+
+    def test_dry_run_proposals_are_applied_on_request(self, app, db_session, relink_library, tmp_path):
+        old = tmp_path / 'old'
+        old.mkdir()
+        (old / 'Quake').mkdir()
+        new = tmp_path / 'new'
+        (new / 'Doom').mkdir(parents=True)
+        (new / 'Hexen').mkdir()
+        doom = add_game(db_session, relink_library, 'Doom', old / 'Doom')
+        hexen = add_game(db_session, relink_library, 'Hexen', old / 'Hexen')
+        add_game(db_session, relink_library, 'Quake', old / 'Quake')
+        db_session.add(GameUpdate(game_uuid=doom.uuid, file_path=str(old / 'Doom' / 'updates' / 'v1.9')))
+        db_session.commit()
+
+        job, reason = create_relink_job(relink_library.uuid, [str(new)], dry_run=True)
+        assert reason is None and job.job_type == RELINK_JOB_TYPE
+        run_relink_job(job)
+
+        db_session.refresh(job)
+        assert job.status == 'Completed'
+        assert (job.total_folders, job.folders_success) == (2, 2)
+        assert job.error_message.startswith('Found new paths for 2 of 2 missing games')
+        listing = list_relink_proposals(job.id)
+        assert {p['game_name']: p['new_path'] for p in listing['proposals']} == {
+            'Doom': str(new / 'Doom'), 'Hexen': str(new / 'Hexen')}
+        db_session.refresh(doom)
+        assert doom.full_disk_path == str(old / 'Doom')
+
+        # Hexen's new folder was taken by another game since the dry run
+        add_game(db_session, relink_library, 'Hexen Copy', new / 'Hexen')
+        assert apply_relink_proposals(job.id) == (1, 1)
+
+        db_session.refresh(doom)
+        db_session.refresh(hexen)
+        assert doom.full_disk_path == str(new / 'Doom')
+        assert hexen.full_disk_path == str(old / 'Hexen')
+        update_path = db_session.execute(select(GameUpdate.file_path).filter_by(game_uuid=doom.uuid)).scalar_one()
+        assert update_path == str(new / 'Doom' / 'updates' / 'v1.9')
+        applied = db_session.execute(
+            select(PathRelinkProposal.applied_at).filter_by(job_id=job.id, game_uuid=doom.uuid)).scalar_one()
+        assert applied is not None
+        # Applying again changes nothing
+        assert apply_relink_proposals(job.id, game_uuids=[doom.uuid]) == (0, 0)
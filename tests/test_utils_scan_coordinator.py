@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import Mock, patch
+from uuid import uuid4
+from sqlalchemy import delete
+
+from sharewarez.models import Library, LibraryPlatform, ScanJob, GlobalSettings
+from sharewarez.utils.scan_pipeline import STAGE_DISCOVERY, STAGE_MATCHING, STAGE_POST_PROCESSING
+from sharewarez.utils.scan_coordinator import (
+    get_device_group, check_scan_admission, admit_scan, split_io_workers, IGDBQuotaShare
+)
+
+
+@pytest.fixture
+def coordinated_libraries(db_session):
+    libraries = [
+        Library(uuid=str(uuid4()), name=f'Coordinated Library {index} {uuid4()}', platform=LibraryPlatform.PCWIN)
+        for index in range(3)
+    ]
+    db_session.add_all(libraries)
+    db_session.execute(delete(GlobalSettings))
+    db_session.add(GlobalSettings(max_concurrent_scans=2, scan_device_io_budget=8,
+                                  scan_discovery_workers=4, scan_postprocess_workers=4))
+    db_session.commit()
+    yield libraries
+    db_session.rollback()
+    for library in libraries:
+        db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+        db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def start_job(db_session, library, scan_folder, **kwargs):
+    job = ScanJob(library_uuid=library.uuid, scan_folder=str(scan_folder), status='Running', **kwargs)
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+class TestDeviceGroups:
+    """Test device groups and the I/O worker split."""
+
+    def test_folders_on_one_device_share_a_group(self, tmp_path):
+        (tmp_path / 'a').mkdir()
+        (tmp_path / 'b').mkdir()
+        assert get_device_group(str(tmp_path / 'a')) == get_device_group(str(tmp_path / 'b'))
+        assert get_device_group(str(tmp_path / 'missing')).startswith('path:')
+
+    def test_split_io_workers_keeps_ratio(self):
+        concurrency = {STAGE_DISCOVERY: 4, STAGE_MATCHING: 2, STAGE_POST_PROCESSING: 4}
+        assert split_io_workers(concurrency, None) == concurrency
+        assert split_io_workers(concurrency, 8) == concurrency
+        assert split_io_workers(concurrency, 4) == {STAGE_DISCOVERY: 2, STAGE_MATCHING: 2, STAGE_POST_PROCESSING: 2}
+        assert split_io_workers({**concurrency, STAGE_DISCOVERY: 1}, 2)[STAGE_DISCOVERY] == 1
+
+
+class TestScanAdmission:
+    """Test admitting scans by library, concurrency limit and device budget."""
+
+    def test_same_library_waits(self, app, db_session, coordinated_libraries, tmp_path):
+        start_job(db_session, coordinated_libraries[0], tmp_path, device_group='dev:other', io_workers=2)
+
+        io_workers, reason = check_scan_admission(coordinated_libraries[0].uuid, str(tmp_path))
+        assert io_workers is None
+        assert 'this library' in reason
+
+    def test_device_budget_is_shared(self, app, db_session, coordinated_libraries, tmp_path):
+        device_group = get_device_group(str(tmp_path))
+        running = start_job(db_session, coordinated_libraries[0], tmp_path, device_group=device_group, io_workers=5)
+
+        assert check_scan_admission(coordinated_libraries[1].uuid, str(tmp_path)) == (3, None)
+
+        running.io_workers = 7
+        db_session.commit()
+        io_workers, reason = check_scan_admission(coordinated_libraries[1].uuid, str(tmp_path))
+        assert io_workers is None
+        assert 'I/O budget' in reason
+
+        # A scan on another device gets its full request
+        running.device_group = 'dev:other'
+        db_session.commit()
+        assert check_scan_admission(coordinated_libraries[1].uuid, str(tmp_path)) == (8, None)
+
+    def test_concurrency_limit(self, app, db_session, coordinated_libraries, tmp_path):
+        start_job(db_session, coordinated_libraries[0], tmp_path, device_group='dev:a', io_workers=2)
+        start_job(db_session, coordinated_libraries[1], tmp_path, device_group='dev:b', io_workers=2)
+
+        io_workers, reason = check_scan_admission(coordinated_libraries[2].uuid, str(tmp_path))
+        assert io_workers is None
+        assert 'limit is 2' in reason
+
+    def test_admit_scan_records_grant(self, app, db_session, coordinated_libraries, tmp_path):
+        job = ScanJob(library_uuid=coordinated_libraries[0].uuid, scan_folder=str(tmp_path), status='Completed')
+        db_session.add(job)
+        db_session.commit()
+
+        assert admit_scan(job, str(tmp_path)) is None
+        db_session.commit()
+        assert job.device_group == get_device_group(str(tmp_path))
+        assert job.io_workers == 8
+
+
+class TestIGDBQuotaShare:
+    """Test splitting the IGDB rate between running scans."""
+
+    def test_rate_follows_running_scans(self):
+        limiter = Mock()
+        share = IGDBQuotaShare([limiter, None], total_rate=4, refresh_interval=60)
+
+        with patch('sharewarez.utils.scan_coordinator.count_running_scans', return_value=2):
+            assert share.refresh(force=True) == 2
+        limiter.set_rate.assert_called_once_with(2)
+
+        # Within the refresh interval the running scans are not counted again
+        with patch('sharewarez.utils.scan_coordinator.count_running_scans', return_value=4) as mock_count:
+            assert share.refresh() == 2
+        mock_count.assert_not_called()
+
+        with patch('sharewarez.utils.scan_coordinator.count_running_scans', return_value=4):
+            assert share.refresh(force=True) == 1
+        limiter.set_rate.assert_called_with(1)
@@ -0,0 +1,145 @@
+import os
+import pytest
+
+from monitor_memory import PeakRSSMonitor, format_bytes
+from sharewarez.utils.bounded_executor import bounded_map
+from sharewarez.utils.igdb_async import IGDBSearchPrefetcher
+from sharewarez.utils.gamenames import get_game_names_from_folder
+from sharewarez.utils.scan_snapshot import fingerprint_path
+from sharewarez.utils.scan_pipeline import StagedPipeline, PipelineStage
+
+
+LIBRARY_SIZE = 100000
+
+# Peak resident memory a scan of the synthetic library may add on top of its listing
+MAX_RSS_GROWTH = 48 * 1024 * 1024
+
+
+class FakeSearchClient:
+    """Answers every candidate search at once with a full-sized IGDB payload."""
+    timeout = 5
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def search_candidates(self, search_name, platform_id):
+        return [{'id': 1, 'name': search_name, 'summary': search_name * 100}]
+
+
+@pytest.fixture(scope='module')
+def huge_library(tmp_path_factory):
+    root = tmp_path_factory.mktemp('huge_library')
+    for index in range(LIBRARY_SIZE):
+        os.mkdir(root / f'Game {index:06d}')
+    return root
+
+
+class TestBoundedMap:
+    """Test the sliding window of in-flight tasks."""
+
+    def test_results_stream_in_order_within_window(self):
+        submitted = []
+
+        def numbers():
+            for number in range(1000):
+                submitted.append(number)
+                yield number
+
+        results = bounded_map(lambda number: number * 2, numbers(), max_workers=4, window=8)
+        assert next(results) == (0, 0)
+        # Only the window, plus the item that pushed out the first result, has been taken
+        assert len(submitted) <= 9
+        assert list(results)[-1] == (999, 1998)
+
+    def test_exception_is_raised_at_its_result(self):
+        def work(number):
+            if number == 3:
+                raise ValueError('bad folder')
+            return number
+
+        results = bounded_map(work, range(10), max_workers=2)
+        assert [next(results)[1] for _ in range(3)] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            next(results)
+
+
+@pytest.mark.slow
+class TestHugeLibraryMemory:
+    """Scanning a synthetic 100k-folder library must not grow memory with the library size."""
+
+    def test_fingerprinting_keeps_memory_flat(self, huge_library):
+        listing = get_game_names_from_folder(str(huge_library), [], [])
+        assert len(listing) == LIBRARY_SIZE
+
+        with PeakRSSMonitor() as monitor:
+            fingerprinted = 0
+            for _, fingerprint in bounded_map(fingerprint_path, (entry['full_path'] for entry in listing), 8):
+                fingerprinted += fingerprint is not None
+
+        assert fingerprinted == LIBRARY_SIZE
+        assert monitor.growth < MAX_RSS_GROWTH, f"Fingerprinting grew RSS by {format_bytes(monitor.growth)}"
+
+    def test_pipeline_keeps_memory_flat(self, app, huge_library):
+        listing = get_game_names_from_folder(str(huge_library), [], [])
+
+        def discover(item):
+            return 'matching' if os.path.isdir(item['full_path']) else None
+
+        def match(item):
+            # Stand-in for the IGDB data a match adds, left on the item like a duplicate game's
+            item['match'] = {'summary': item['name'] * 100}
+            return 'persistence'
+
+        def persist(items):
+            for item in items:
+                item['result'] = 'unmatched'
+            return [None] * len(items)
+
+        pipeline = StagedPipeline([
+            PipelineStage('discovery', discover, 4),
+            PipelineStage('matching', match, 2),
+            PipelineStage('persistence', persist, 1, batch_size=50, batch_wait=0.1),
+        ], app)
+
+        with PeakRSSMonitor() as monitor:
+            finished = sum(1 for item in pipeline.run(listing) if item['result'] == 'unmatched')
+
+        assert finished == LIBRARY_SIZE
+        assert 'match' not in listing[0]
+        summary = pipeline.metrics_summary()
+        assert all(stage['max_queue'] <= 4 * stage['workers'] + 50 for stage in summary['stages'].values())
+        assert monitor.growth < MAX_RSS_GROWTH, f"Scan pipeline grew RSS by {format_bytes(monitor.growth)}"
+
+    def test_search_prefetcher_follows_the_pipeline(self, app, huge_library):
+        listing = get_game_names_from_folder(str(huge_library), [], [])
+        prefetcher = IGDBSearchPrefetcher(FakeSearchClient()).start()
+        hits = 0
+
+        def discover(item):
+            prefetcher.submit(item['name'], 6)
+            return 'matching'
+
+        def match(item):
+            nonlocal hits
+            found, candidates = prefetcher.get(item['name'], 6)
+            hits += found
+            return None
+
+        pipeline = StagedPipeline([
+            PipelineStage('discovery', discover, 4),
+            PipelineStage('matching', match, 1),
+        ], app)
+
+        try:
+            with PeakRSSMonitor() as monitor:
+                finished = sum(1 for _ in pipeline.run(listing))
+        finally:
+            prefetcher.stop()
+
+        assert finished == LIBRARY_SIZE
+        # Every search was prefetched, yet results never piled up ahead of matching
+        assert hits == LIBRARY_SIZE
+        assert monitor.growth < MAX_RSS_GROWTH, f"Search prefetching grew RSS by {format_bytes(monitor.growth)}"
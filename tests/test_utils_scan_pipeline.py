@@ -0,0 +1,275 @@
+import time
+import pytest
+from unittest.mock import patch, Mock
+from uuid import uuid4
+from sqlalchemy import delete
+
+from sharewarez.models import Game, Library, LibraryPlatform, GlobalSettings
+from sharewarez.utils.scan_pipeline import (
+    PipelineStage,
+    StagedPipeline,
+    GameScanStages,
+    get_stage_concurrency,
+    format_pipeline_metrics,
+    STAGE_DISCOVERY,
+    STAGE_MATCHING,
+    STAGE_PERSISTENCE,
+    STAGE_POST_PROCESSING
+)
+
+
+def make_items(count):
+    return [{'name': f'Game {index}', 'full_path': f'/games/Game {index}'} for index in range(count)]
+
+
+class TestStagedPipeline:
+    """Test queueing, routing, metrics and cancellation of the generic pipeline."""
+
+    def test_items_flow_through_all_stages(self, app):
+        def double(item):
+            item['value'] = 2
+            return 'add'
+
+        def add(item):
+            item['value'] += 1
+            item['result'] = 'added'
+            return None
+
+        pipeline = StagedPipeline([PipelineStage('double', double, workers=2), PipelineStage('add', add, workers=3)], app)
+        results = list(pipeline.run(make_items(20)))
+
+        assert len(results) == 20
+        assert {item['value'] for item in results} == {3}
+        metrics = pipeline.metrics_summary()
+        assert metrics['stages']['double']['processed'] == 20
+        assert metrics['stages']['add']['workers'] == 3
+        assert 'double' in format_pipeline_metrics(metrics)
+
+    def test_items_can_skip_stages_and_fail(self, app):
+        def route(item):
+            if item['name'] == 'Game 0':
+                raise ValueError('unreadable')
+            return 'last' if item['name'] == 'Game 1' else 'middle'
+
+        middle = Mock(side_effect=lambda item: 'last')
+
+        def last(item):
+            item['result'] = 'done'
+
+        pipeline = StagedPipeline([
+            PipelineStage('route', route), PipelineStage('middle', middle), PipelineStage('last', last)
+        ], app)
+        results = {item['name']: item for item in pipeline.run(make_items(3))}
+
+        assert results['Game 0']['result'] == 'error'
+        assert results['Game 0']['error'] == 'unreadable'
+        assert results['Game 1']['result'] == 'done'
+        assert middle.call_count == 1
+        assert pipeline.metrics_summary()['stages']['route']['errors'] == 1
+
+    def test_stages_overlap_and_queues_stay_bounded(self, app):
+        def disk(item):
+            time.sleep(0.05)
+            return 'api'
+
+        def api(item):
+            time.sleep(0.05)
+            item['result'] = 'added'
+
+        pipeline = StagedPipeline([
+            PipelineStage('disk', disk, workers=4, queue_size=2), PipelineStage('api', api, workers=4, queue_size=2)
+        ], app)
+        started = time.monotonic()
+        results = list(pipeline.run(make_items(16)))
+        elapsed = time.monotonic() - started
+
+        assert len(results) == 16
+        # One thread doing both steps per game would take 1.6s
+        assert elapsed < 1.0
+        assert pipeline.metrics_summary()['stages']['api']['max_queue'] <= 2
+
+    def test_batch_stage_gets_items_together(self, app):
+        batches = []
+
+        def first(item):
+            return 'batch'
+
+        def save(items):
+            batches.append(len(items))
+            for item in items:
+                item['result'] = 'added'
+            return [None] * len(items)
+
+        pipeline = StagedPipeline([
+            PipelineStage('first', first, workers=4), PipelineStage('batch', save, batch_size=10, batch_wait=1.0)
+        ], app)
+        results = list(pipeline.run(make_items(25)))
+
+        assert len(results) == 25
+        assert sum(batches) == 25
+        assert max(batches) <= 10
+        assert len(batches) < 25
+        assert pipeline.metrics_summary()['stages']['batch']['processed'] == 25
+
+    def test_cancel_returns_remaining_items(self, app):
+        def slow(item):
+            time.sleep(0.02)
+            item['result'] = 'added'
+
+        pipeline = StagedPipeline([PipelineStage('slow', slow)], app)
+        results = []
+        for item in pipeline.run(make_items(50)):
+            results.append(item)
+            pipeline.cancel()
+
+        assert len(results) == 50
+        assert sum(1 for item in results if item['result'] == 'cancelled') > 40
+
+
+class TestGameScanStages:
+    """Test the scan work done in each stage."""
+
+    @pytest.fixture
+    def stages(self):
+        options = {
+            'update_folder_name': 'updates', 'extras_folder_name': 'extras',
+            'enable_game_updates': True, 'enable_game_extras': False,
+            'force_updates_extras_scan': False, 'fetch_hltb': False, 'force_hltb_refetch': False
+        }
+        return GameScanStages('job-id', 'library-uuid', 6, {'use_local_metadata': False}, options,
+                              existing_game_paths={'/games/Doom', '/games/Quake'},
+                              existing_unmatched_paths={'/games/Unknown'},
+                              modified_game_paths={'/games/Quake'},
+                              igdb_rate_limiter=Mock())
+
+    def test_discovery_routes_items(self, app, stages, tmp_path):
+        assert stages.discover({'name': 'Doom', 'full_path': '/games/Doom'}) is None
+        assert stages.discover({'name': 'Quake', 'full_path': '/games/Quake'}) == STAGE_POST_PROCESSING
+
+        unknown = {'name': 'Unknown', 'full_path': '/games/Unknown'}
+        assert stages.discover(unknown) is None
+        assert unknown['result'] == 'already_unmatched'
+
+        (tmp_path / 'Hexen').mkdir()
+        with app.test_request_context():
+            assert stages.discover({'name': 'Hexen', 'full_path': str(tmp_path / 'Hexen')}) == STAGE_MATCHING
+
+    def test_discovery_takes_local_igdb_id_from_index(self, app, stages, tmp_path):
+        (tmp_path / 'Hexen').mkdir()
+        (tmp_path / 'Heretic').mkdir()
+        stages.settings = {'use_local_metadata': True, 'local_metadata_filename': 'sharewarez.json'}
+        stages.local_index = {str(tmp_path / 'Hexen'): {'local_metadata': {'igdb_id': 7}}}
+        hexen = {'name': 'Hexen', 'full_path': str(tmp_path / 'Hexen')}
+        heretic = {'name': 'Heretic', 'full_path': str(tmp_path / 'Heretic')}
+
+        with patch('sharewarez.utils.game_core.read_local_igdb_id', return_value=None) as mock_read:
+            assert stages.discover(hexen) == STAGE_MATCHING
+            assert stages.discover(heretic) == STAGE_MATCHING
+
+        assert hexen['local_igdb_id'] == 7
+        # Folders missing from the index are read from disk
+        mock_read.assert_called_once_with(str(tmp_path / 'Heretic'), stages.settings)
+
+    def test_discovery_submits_searches_to_prefetcher(self, app, stages, tmp_path):
+        (tmp_path / 'Hexen').mkdir()
+        (tmp_path / 'Heretic').mkdir()
+        stages.search_prefetcher = Mock()
+        stages.local_index = {
+            str(tmp_path / 'Hexen'): {'local_metadata': None},
+            str(tmp_path / 'Heretic'): {'local_metadata': {'igdb_id': 7}},
+        }
+        stages.settings = {'use_local_metadata': True}
+
+        stages.discover({'name': 'Doom', 'full_path': '/games/Doom'})
+        stages.discover({'name': 'Hexen', 'full_path': str(tmp_path / 'Hexen')})
+        stages.discover({'name': 'Heretic', 'full_path': str(tmp_path / 'Heretic')})
+
+        # Known folders and folders matched by their local metadata ID aren't searched
+        stages.search_prefetcher.submit.assert_called_once_with('Hexen', 6)
+
+    def test_matching_uses_rate_limiter(self, app, stages):
+        item = {'name': 'Hexen', 'full_path': '/games/Hexen', 'local_igdb_id': None}
+        match = {'game': {'id': 1, 'name': 'Hexen', 'cover': 10, 'screenshots': [20, 21]},
+                 'confidence': 0.9, 'source': 'search'}
+
+        stages.search_prefetcher = Mock()
+
+        def igdb_request(endpoint, query):
+            if endpoint.endswith('/covers'):
+                return [{'id': 10, 'url': '//images.igdb.com/t_thumb/cover.jpg'}]
+            return [{'id': 20, 'url': '//images.igdb.com/t_thumb/shot.jpg'}]
+
+        with patch('sharewarez.utils.game_core.match_game_metadata', return_value=match) as mock_match, \
+             patch('sharewarez.utils.game_core.fetch_involved_companies', return_value={'developer': 'Raven'}), \
+             patch('sharewarez.utils.game_core.fetch_game_websites', return_value=[]) as mock_websites, \
+             patch('sharewarez.utils.game_core.make_igdb_api_request', side_effect=igdb_request) as mock_request:
+            assert stages.match(item) == STAGE_PERSISTENCE
+
+        assert item['match']['game'] == match['game']
+        assert item['match']['companies'] == {'developer': 'Raven'}
+        mock_websites.assert_called_once_with(1)
+        # One request per image type, made while the limiter is held
+        assert [call.args[1] for call in mock_request.call_args_list] == [
+            'fields url; where id=(10); limit 1;', 'fields url; where id=(20,21); limit 2;']
+        assert item['match']['image_urls'] == {
+            ('cover', 10): 'https://images.igdb.com/t_original/cover.jpg',
+            ('screenshot', 20): 'https://images.igdb.com/t_original/shot.jpg'
+        }
+        assert mock_match.call_args.args == ('Hexen', '/games/Hexen', 6, None, stages.search_prefetcher)
+        stages.igdb_rate_limiter.acquire.assert_called_once()
+        stages.igdb_rate_limiter.release.assert_called_once()
+
+    def test_persistence_saves_batch(self, app, stages):
+        unmatched = {'name': 'Hexen', 'full_path': '/games/Hexen', 'match': None}
+        matched = [
+            {'name': name, 'full_path': f'/games/{name}', 'match': {'game': {'id': igdb_id, 'name': name}, 'confidence': 1.0}}
+            for igdb_id, name in ((1, 'Heretic'), (2, 'Strife'), (3, 'Chex Quest'))
+        ]
+        with patch('sharewarez.utils.scan_pipeline.log_unmatched_folders') as mock_log, \
+             patch('sharewarez.utils.scan_pipeline.write_game_records',
+                   return_value=['new-uuid', 'duplicate', 'exists']) as mock_write:
+            targets = stages.persist([unmatched] + matched)
+
+        assert targets == [None, STAGE_POST_PROCESSING, None, None]
+        assert unmatched['result'] == 'unmatched'
+        assert matched[0]['game_uuid'] == 'new-uuid'
+        assert matched[1]['result'] == 'unmatched'
+        assert matched[2]['result'] == 'exists'
+        mock_log.assert_called_once_with('job-id', ['/games/Hexen'], 'Unmatched', 'library-uuid')
+        records = mock_write.call_args.args[0]
+        assert [record['values']['igdb_id'] for record in records] == [1, 2, 3]
+
+    def test_post_processing_new_game(self, app, db_session, stages, tmp_path):
+        library = Library(uuid=str(uuid4()), name=f'Pipeline Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+        db_session.add(library)
+        game_path = tmp_path / 'Hexen'
+        (game_path / 'updates').mkdir(parents=True)
+        game = Game(uuid=str(uuid4()), name='Hexen', full_disk_path=str(game_path), library_uuid=library.uuid)
+        db_session.add(game)
+        db_session.commit()
+        stages.library_uuid = library.uuid
+
+        item = {'name': 'Hexen', 'full_path': str(game_path), 'game_uuid': game.uuid, 'match': {'source': 'search'}}
+        try:
+            with patch('sharewarez.utils.game_core.finish_saved_game') as mock_finish, \
+                 patch('sharewarez.utils.scan_pipeline.get_folder_size_in_bytes_updates', return_value=100), \
+                 patch('sharewarez.utils.scan_pipeline.process_game_updates') as mock_updates:
+                assert stages.post_process(item) is None
+
+            assert item['result'] == 'added'
+            db_session.refresh(game)
+            assert game.size == 100
+            assert mock_finish.call_args.args[0].uuid == game.uuid
+            assert mock_updates.call_args.args[2] == str(game_path / 'updates')
+        finally:
+            db_session.execute(delete(Game).filter_by(uuid=game.uuid))
+            db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+            db_session.commit()
+
+    def test_stage_concurrency_from_settings(self):
+        settings = GlobalSettings(scan_thread_count=2, scan_discovery_workers=8, scan_persistence_workers=None,
+                                  scan_postprocess_workers=6)
+        assert get_stage_concurrency(settings) == {
+            STAGE_DISCOVERY: 8, STAGE_MATCHING: 2, STAGE_PERSISTENCE: 1, STAGE_POST_PROCESSING: 6
+        }
+        assert get_stage_concurrency(None)[STAGE_MATCHING] == 1
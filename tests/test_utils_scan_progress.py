@@ -0,0 +1,88 @@
+import threading
+import pytest
+from sqlalchemy import delete
+
+from sharewarez.models import ScanJob
+from sharewarez.utils.scan_progress import (
+    ScanProgressWriter, ScanCancelListener, notify_scan_cancel, load_checkpoints, clear_checkpoints
+)
+
+
+@pytest.fixture
+def running_job(db_session):
+    job = ScanJob(status='Running', is_enabled=True, folders_success=3, folders_failed=0, scan_folder='/games')
+    db_session.add(job)
+    db_session.commit()
+    yield job
+    db_session.rollback()
+    db_session.execute(delete(ScanJob).filter_by(id=job.id))
+    db_session.commit()
+
+
+class TestScanProgressWriter:
+    """Test buffering and flushing of scan progress."""
+
+    def test_counters_are_flushed_in_batches(self, app, db_session, running_job):
+        writer = ScanProgressWriter(running_job.id, flush_interval=3600, flush_items=3)
+
+        writer.record(True, current='Processing: Doom (1/3)')
+        writer.record(False, error_line="Failed to process 'Quake': boom")
+        assert writer.maybe_flush() is True
+        assert writer.flushes == 0
+        db_session.refresh(running_job)
+        assert running_job.folders_success == 3
+
+        writer.record(True, current='Processing: Hexen (3/3)')
+        assert writer.maybe_flush() is True
+        assert writer.flushes == 1
+        db_session.refresh(running_job)
+        assert running_job.folders_success == 5
+        assert running_job.folders_failed == 1
+        assert running_job.error_message == "Failed to process 'Quake': boom\n"
+        assert running_job.current_processing == 'Processing: Hexen (3/3)'
+        assert running_job.last_progress_update is not None
+
+    def test_flush_reports_disabled_job(self, app, db_session, running_job):
+        writer = ScanProgressWriter(running_job.id)
+        assert writer.flush() is True
+
+        running_job.is_enabled = False
+        db_session.commit()
+        writer.record(True)
+        assert writer.flush() is False
+        db_session.refresh(running_job)
+        assert running_job.folders_success == 4
+
+
+    def test_flush_stores_checkpoints(self, app, db_session, running_job):
+        writer = ScanProgressWriter(running_job.id)
+        writer.record(True, path='/games/Doom')
+        writer.record(False, path='/games/Quake')
+        writer.record(True)
+        assert load_checkpoints(running_job.id) == {}
+
+        writer.flush()
+        assert load_checkpoints(running_job.id) == {'/games/Doom': True, '/games/Quake': False}
+
+        clear_checkpoints(running_job.id)
+        db_session.commit()
+        assert load_checkpoints(running_job.id) == {}
+
+
+class TestScanCancelListener:
+    """Test cancel notifications."""
+
+    def test_notification_cancels_matching_job(self, app, db_session, running_job):
+        cancelled = threading.Event()
+        listener = ScanCancelListener(app, running_job.id, cancelled.set).start()
+        try:
+            assert listener.wait_ready()
+            notify_scan_cancel('another-job')
+            db_session.commit()
+            assert not cancelled.wait(0.5)
+
+            notify_scan_cancel(running_job.id)
+            db_session.commit()
+            assert cancelled.wait(5)
+        finally:
+            listener.stop()
@@ -0,0 +1,196 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+from sqlalchemy import delete
+
+from sharewarez.models import (
+    Game, Library, LibraryPlatform, UnmatchedFolder, ScanJob, GlobalSettings, LibrarySnapshotEntry, ScanCheckpoint
+)
+from sharewarez.utils.scan_snapshot import take_snapshot, save_snapshot
+from sharewarez.utils.scan_scheduler import (
+    in_scan_window,
+    compute_next_run,
+    get_stagger_offset,
+    schedule_next_run,
+    get_due_jobs,
+    run_due_jobs,
+    run_scheduled_job,
+    resume_interrupted_jobs
+)
+
+
+@pytest.fixture
+def scheduled_libraries(db_session):
+    libraries = [
+        Library(uuid=str(uuid4()), name=f'Scheduled Library {index} {uuid4()}', platform=LibraryPlatform.PCWIN,
+                display_order=index)
+        for index in range(2)
+    ]
+    db_session.add_all(libraries)
+    db_session.execute(delete(GlobalSettings))
+    db_session.add(GlobalSettings(scan_window_start=1, scan_window_end=6, scan_stagger_minutes=20))
+    db_session.commit()
+    yield libraries
+    db_session.rollback()
+    for library in libraries:
+        db_session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library.uuid))
+        db_session.execute(delete(Game).filter_by(library_uuid=library.uuid))
+        db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+        db_session.execute(delete(LibrarySnapshotEntry).filter_by(library_uuid=library.uuid))
+        db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def make_job(db_session, library, scan_folder, **kwargs):
+    kwargs.setdefault('is_enabled', True)
+    job = ScanJob(library_uuid=library.uuid, scan_folder=str(scan_folder), status='Completed',
+                  schedule='24_hours', setting_filefolder=False, **kwargs)
+    db_session.add(job)
+    db_session.commit()
+    return job
+
+
+class TestScheduleComputation:
+    """Test slot, window and stagger calculations."""
+
+    def test_in_scan_window(self):
+        assert in_scan_window(datetime(2024, 5, 1, 3, 0), 1, 6) is True
+        assert in_scan_window(datetime(2024, 5, 1, 6, 0), 1, 6) is False
+        assert in_scan_window(datetime(2024, 5, 1, 23, 30), 22, 4) is True
+        assert in_scan_window(datetime(2024, 5, 1, 12, 0), 22, 4) is False
+        assert in_scan_window(datetime(2024, 5, 1, 12, 0), 3, 3) is True
+
+    def test_daily_runs_at_window_start_plus_offset(self):
+        after = datetime(2024, 5, 1, 14, 30)
+        assert compute_next_run('24_hours', after, 1, 6) == datetime(2024, 5, 2, 1, 0)
+        assert compute_next_run('24_hours', after, 1, 6, offset_minutes=40) == datetime(2024, 5, 2, 1, 40)
+        # A scan that just ran in this morning's slot waits for tomorrow's
+        assert compute_next_run('24_hours', datetime(2024, 5, 2, 1, 45), 1, 6) == datetime(2024, 5, 3, 1, 0)
+
+    def test_short_interval_only_runs_inside_window(self):
+        after = datetime(2024, 5, 1, 2, 0)
+        assert compute_next_run('8_hours', after, 1, 6) == datetime(2024, 5, 2, 1, 0)
+        assert compute_next_run('8_hours', after) == datetime(2024, 5, 1, 8, 0)
+
+    def test_stagger_offset_follows_library_order(self, db_session, scheduled_libraries, tmp_path):
+        first, second = scheduled_libraries
+        make_job(db_session, first, tmp_path)
+        make_job(db_session, second, tmp_path)
+
+        assert get_stagger_offset(first.uuid, 20) == 0
+        assert get_stagger_offset(second.uuid, 20) == 20
+        assert get_stagger_offset(second.uuid, 0) == 0
+
+    def test_schedule_next_run(self, db_session, scheduled_libraries, tmp_path):
+        job = make_job(db_session, scheduled_libraries[1], tmp_path)
+        make_job(db_session, scheduled_libraries[0], tmp_path)
+
+        schedule_next_run(job, after=datetime(2024, 5, 1, 12, 0))
+        assert job.next_run == datetime(2024, 5, 2, 1, 20)
+
+        job.schedule = None
+        assert schedule_next_run(job) is None
+        assert job.next_run is None
+
+
+class TestScheduledRuns:
+    """Test picking and running due jobs."""
+
+    def test_get_due_jobs(self, db_session, scheduled_libraries, tmp_path):
+        library = scheduled_libraries[0]
+        due = make_job(db_session, library, tmp_path, next_run=datetime.now() - timedelta(minutes=5))
+        make_job(db_session, library, tmp_path, next_run=datetime.now() + timedelta(hours=1))
+        make_job(db_session, library, tmp_path, next_run=datetime.now() - timedelta(hours=1), is_enabled=False)
+        running = make_job(db_session, library, tmp_path, next_run=datetime.now() - timedelta(hours=1))
+        running.status = 'Running'
+        db_session.commit()
+
+        assert [job.id for job in get_due_jobs() if job.library_uuid == library.uuid] == [due.id]
+
+    def test_unchanged_library_is_skipped(self, app, db_session, scheduled_libraries, tmp_path):
+        library = scheduled_libraries[0]
+        (tmp_path / 'Doom').mkdir()
+        save_snapshot(library.uuid, str(tmp_path), take_snapshot([str(tmp_path / 'Doom')]))
+        job = make_job(db_session, library, tmp_path, next_run=datetime.now() - timedelta(minutes=5))
+
+        with patch('sharewarez.utilities.scan_and_add_games') as mock_scan:
+            assert run_scheduled_job(job) == 'skipped'
+
+        mock_scan.assert_not_called()
+        assert job.status == 'Completed'
+        assert job.next_run > datetime.now()
+
+    def test_changed_library_is_scanned(self, app, db_session, scheduled_libraries, tmp_path):
+        library = scheduled_libraries[0]
+        (tmp_path / 'Doom').mkdir()
+        save_snapshot(library.uuid, str(tmp_path), take_snapshot([str(tmp_path / 'Doom')]))
+        (tmp_path / 'Quake').mkdir()
+        job = make_job(db_session, library, tmp_path, next_run=datetime.now() - timedelta(minutes=5),
+                       setting_remove=True)
+
+        def finish_scan(folder_path, **kwargs):
+            assert kwargs['existing_job'].status == 'Running'
+            kwargs['existing_job'].status = 'Completed'
+            db_session.commit()
+
+        with patch('sharewarez.utilities.scan_and_add_games', side_effect=finish_scan) as mock_scan:
+            assert run_scheduled_job(job) == 'completed'
+
+        assert mock_scan.call_args.args[0] == str(tmp_path)
+        assert mock_scan.call_args.kwargs['remove_missing'] is True
+        assert mock_scan.call_args.kwargs['library_uuid'] == library.uuid
+        assert job.next_run > datetime.now()
+        assert job.last_run is not None
+
+    def test_due_jobs_wait_for_running_scan(self, app, db_session, scheduled_libraries, tmp_path):
+        make_job(db_session, scheduled_libraries[0], tmp_path, next_run=datetime.now() - timedelta(minutes=5))
+
+        with patch('sharewarez.utils.scan_scheduler.check_scan_admission', return_value=(None, 'busy')), \
+             patch('sharewarez.utils.scan_scheduler.run_scheduled_job') as mock_run:
+            assert run_due_jobs() == 0
+        mock_run.assert_not_called()
+
+
+class TestResumeInterruptedJobs:
+    """Test resuming scans interrupted by a restart."""
+
+    def make_interrupted_job(self, db_session, library, scan_folder, last_run):
+        job = make_job(db_session, library, scan_folder, next_run=datetime.now() - timedelta(minutes=5),
+                       last_run=last_run, resume_pending=True)
+        job.status = 'Failed'
+        db_session.add(ScanCheckpoint(job_id=job.id, path=str(scan_folder / 'Doom')))
+        db_session.commit()
+        return job
+
+    def test_interrupted_job_resumes_before_due_jobs(self, app, db_session, scheduled_libraries, tmp_path):
+        job = self.make_interrupted_job(db_session, scheduled_libraries[0], tmp_path, datetime.now())
+        assert job not in get_due_jobs()
+
+        def finish_scan(folder_path, **kwargs):
+            assert kwargs['existing_job'].status == 'Running'
+            kwargs['existing_job'].status = 'Completed'
+            db_session.commit()
+
+        with patch('sharewarez.utilities.scan_and_add_games', side_effect=finish_scan) as mock_scan:
+            assert resume_interrupted_jobs() == 1
+
+        assert mock_scan.call_args.kwargs['resume'] is True
+        assert mock_scan.call_args.kwargs['existing_job'].id == job.id
+        db_session.refresh(job)
+        assert job.resume_pending is False
+        assert job.status == 'Completed'
+        assert job.next_run > datetime.now()
+
+    def test_stale_job_is_abandoned(self, app, db_session, scheduled_libraries, tmp_path):
+        job = self.make_interrupted_job(db_session, scheduled_libraries[0], tmp_path, datetime.now() - timedelta(days=5))
+
+        with patch('sharewarez.utilities.scan_and_add_games') as mock_scan:
+            assert resume_interrupted_jobs() == 1
+
+        mock_scan.assert_not_called()
+        db_session.refresh(job)
+        assert job.resume_pending is False
+        assert job.status == 'Failed'
+        assert db_session.execute(delete(ScanCheckpoint).filter_by(job_id=job.id)).rowcount == 0
+        assert job in get_due_jobs()
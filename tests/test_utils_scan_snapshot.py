@@ -0,0 +1,221 @@
+import os
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+from sqlalchemy import delete, select
+
+from sharewarez.models import (
+    Game, Library, LibraryPlatform, UnmatchedFolder, ScanJob, GlobalSettings,
+    AllowedFileType, LibrarySnapshotEntry, ScanCheckpoint, LocalMetadataIndexEntry
+)
+from sharewarez.utils.scan_snapshot import (
+    fingerprint_path,
+    take_snapshot,
+    load_snapshot,
+    diff_snapshots,
+    apply_renames,
+    save_snapshot
+)
+
+
+def make_game_folder(root, name, files=('setup.exe',)):
+    folder = root / name
+    folder.mkdir()
+    for file_name in files:
+        (folder / file_name).write_bytes(b'x' * 10)
+    return str(folder)
+
+
+@pytest.fixture
+def snapshot_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Snapshot Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    db_session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Game).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(LibrarySnapshotEntry).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(LocalMetadataIndexEntry).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+class TestSnapshotDiff:
+    """Test fingerprinting and diffing of library listings."""
+
+    def test_fingerprint_folder(self, tmp_path):
+        folder = make_game_folder(tmp_path, 'Doom', files=('doom.exe', 'readme.txt'))
+        (tmp_path / 'Doom' / 'data').mkdir()
+
+        fingerprint = fingerprint_path(folder)
+
+        assert fingerprint['file_count'] == 3
+        assert fingerprint['size'] == 20
+        assert fingerprint['inode'] == os.stat(folder).st_ino
+        assert fingerprint_path(str(tmp_path / 'missing')) is None
+
+    def test_fingerprint_file(self, tmp_path):
+        (tmp_path / 'game.iso').write_bytes(b'x' * 42)
+        fingerprint = fingerprint_path(str(tmp_path / 'game.iso'), scan_mode='files')
+        assert fingerprint['size'] == 42
+        assert fingerprint['file_count'] == 1
+
+    def test_diff_snapshots(self, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom')
+        quake = make_game_folder(tmp_path, 'Quake')
+        hexen = make_game_folder(tmp_path, 'Hexen')
+        previous = take_snapshot([doom, quake, hexen])
+
+        os.rename(quake, str(tmp_path / 'Quake (1996)'))
+        (tmp_path / 'Hexen' / 'patch.exe').write_bytes(b'y')
+        heretic = make_game_folder(tmp_path, 'Heretic')
+        current = take_snapshot([doom, str(tmp_path / 'Quake (1996)'), hexen, heretic])
+
+        changes = diff_snapshots(previous, current)
+
+        assert changes['unchanged'] == {doom}
+        assert changes['modified'] == {hexen}
+        assert changes['added'] == {heretic}
+        assert changes['renamed'] == {quake: str(tmp_path / 'Quake (1996)')}
+        assert changes['removed'] == set()
+
+        del current[doom]
+        assert diff_snapshots(previous, current)['removed'] == {doom}
+
+
+class TestSnapshotStore:
+    """Test persisting snapshots and relinking renamed entries."""
+
+    def test_save_and_load(self, db_session, snapshot_library, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom')
+        quake = make_game_folder(tmp_path, 'Quake')
+        snapshot = take_snapshot([doom, quake])
+
+        save_snapshot(snapshot_library.uuid, str(tmp_path), snapshot)
+        db_session.commit()
+        assert load_snapshot(snapshot_library.uuid, str(tmp_path)) == snapshot
+
+        del snapshot[quake]
+        save_snapshot(snapshot_library.uuid, str(tmp_path), snapshot)
+        db_session.commit()
+        assert list(load_snapshot(snapshot_library.uuid, str(tmp_path))) == [doom]
+        assert load_snapshot(snapshot_library.uuid, '/other/folder') == {}
+
+    def test_apply_renames(self, db_session, snapshot_library):
+        game = Game(uuid=str(uuid4()), name='Quake', full_disk_path='/games/Quake', library_uuid=snapshot_library.uuid)
+        db_session.add(game)
+        db_session.add(UnmatchedFolder(folder_path='/games/Unknwn', library_uuid=snapshot_library.uuid, status='Unmatched'))
+        db_session.commit()
+
+        relinked_games, relinked_unmatched = apply_renames(
+            {'/games/Quake': '/games/Quake (1996)', '/games/Unknwn': '/games/Unknown', '/games/Gone': '/games/New'},
+            snapshot_library.uuid
+        )
+        db_session.commit()
+
+        assert relinked_games == {'/games/Quake (1996)'}
+        assert relinked_unmatched == {'/games/Unknown'}
+        db_session.refresh(game)
+        assert game.full_disk_path == '/games/Quake (1996)'
+
+
+class TestIncrementalScan:
+    """Test that scan_and_add_games only processes changed entries once a snapshot exists."""
+
+    @pytest.fixture
+    def scan_settings(self, db_session):
+        db_session.execute(delete(GlobalSettings))
+        db_session.add(GlobalSettings(scan_thread_count=1, enable_game_updates=True, update_folder_name='updates',
+                                      enable_game_extras=False, extras_folder_name='extras'))
+        if not db_session.execute(select(AllowedFileType).filter_by(value='exe')).scalars().first():
+            db_session.add(AllowedFileType(value='exe'))
+        db_session.commit()
+
+    def run_scan(self, app, root, library_uuid, **kwargs):
+        from sharewarez.utilities import scan_and_add_games
+
+        with patch('sharewarez.utilities.check_scan_admission', return_value=(8, None)), \
+             patch('sharewarez.utilities.start_scan_search_prefetch', return_value=None), \
+             patch('sharewarez.utils.game_core.match_game_metadata', return_value=None) as mock_process, \
+             patch('sharewarez.utils.scan_pipeline.log_unmatched_folders', return_value=0), \
+             patch('sharewarez.utils.scan_pipeline.process_game_updates') as mock_updates:
+            scan_and_add_games(str(root), library_uuid=library_uuid, **kwargs)
+        return mock_process, mock_updates
+
+    def test_second_scan_skips_unchanged(self, app, db_session, snapshot_library, scan_settings, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom')
+        quake = make_game_folder(tmp_path, 'Quake')
+        for name, path in (('Doom', doom), ('Quake', quake)):
+            db_session.add(Game(uuid=str(uuid4()), name=name, full_disk_path=path, library_uuid=snapshot_library.uuid))
+        db_session.commit()
+
+        # First scan has no snapshot to compare against and stores one
+        self.run_scan(app, tmp_path, snapshot_library.uuid)
+        assert len(load_snapshot(snapshot_library.uuid, str(tmp_path))) == 2
+
+        # Rename one game, add an update to the other and add a new folder
+        os.rename(quake, str(tmp_path / 'Quake (1996)'))
+        (tmp_path / 'Doom' / 'updates').mkdir()
+        heretic = make_game_folder(tmp_path, 'Heretic')
+
+        mock_process, mock_updates = self.run_scan(app, tmp_path, snapshot_library.uuid)
+
+        assert [call.args[1] for call in mock_process.call_args_list] == [heretic]
+        assert mock_updates.call_args.args[1] == doom
+        renamed = db_session.execute(select(Game).filter_by(name='Quake')).scalars().first()
+        assert renamed.full_disk_path == str(tmp_path / 'Quake (1996)')
+        assert len(load_snapshot(snapshot_library.uuid, str(tmp_path))) == 3
+
+        # Nothing changed: only the still unknown folder is processed, and known entries count towards progress
+        mock_process, mock_updates = self.run_scan(app, tmp_path, snapshot_library.uuid)
+        assert [call.args[1] for call in mock_process.call_args_list] == [heretic]
+        mock_updates.assert_not_called()
+        job = db_session.execute(
+            select(ScanJob).filter_by(library_uuid=snapshot_library.uuid).order_by(ScanJob.last_run.desc())
+        ).scalars().first()
+        assert job.status == 'Completed'
+        assert job.folders_success == 2
+
+    def test_resumed_scan_skips_checkpointed_entries(self, app, db_session, snapshot_library, scan_settings, tmp_path):
+        doom = make_game_folder(tmp_path, 'Doom')
+        quake = make_game_folder(tmp_path, 'Quake')
+        heretic = make_game_folder(tmp_path, 'Heretic')
+        job = ScanJob(library_uuid=snapshot_library.uuid, scan_folder=str(tmp_path), status='Running', is_enabled=True,
+                      folders_success=7, folders_failed=7, removed_count=0, error_message='')
+        db_session.add(job)
+        db_session.commit()
+        db_session.add_all([ScanCheckpoint(job_id=job.id, path=doom, succeeded=True),
+                            ScanCheckpoint(job_id=job.id, path=quake, succeeded=False)])
+        db_session.commit()
+
+        mock_process, _ = self.run_scan(app, tmp_path, snapshot_library.uuid, existing_job=job, resume=True)
+
+        assert [call.args[1] for call in mock_process.call_args_list] == [heretic]
+        db_session.refresh(job)
+        assert job.status == 'Completed'
+        assert job.total_folders == 3
+        assert (job.folders_success, job.folders_failed) == (1, 2)
+        assert db_session.execute(select(ScanCheckpoint).filter_by(job_id=job.id)).first() is None
+
+    def test_resumed_scan_keeps_checkpointed_entries_in_snapshot_and_index(self, app, db_session, snapshot_library,
+                                                                          scan_settings, tmp_path):
+        db_session.execute(select(GlobalSettings)).scalars().first().use_local_images = True
+        doom = make_game_folder(tmp_path, 'Doom', files=('setup.exe', 'cover.jpg'))
+        heretic = make_game_folder(tmp_path, 'Heretic')
+        job = ScanJob(library_uuid=snapshot_library.uuid, scan_folder=str(tmp_path), status='Running', is_enabled=True,
+                      folders_success=1, folders_failed=0, removed_count=0, error_message='')
+        db_session.add(job)
+        db_session.commit()
+        db_session.add(ScanCheckpoint(job_id=job.id, path=doom, succeeded=True))
+        db_session.commit()
+
+        self.run_scan(app, tmp_path, snapshot_library.uuid, existing_job=job, resume=True)
+
+        # The next scan must not see the folder finished before the interruption as new
+        assert set(load_snapshot(snapshot_library.uuid, str(tmp_path))) == {doom, heretic}
+        indexed = db_session.execute(
+            select(LocalMetadataIndexEntry.folder_path).filter_by(library_uuid=snapshot_library.uuid)
+        ).scalars().all()
+        assert set(indexed) == {doom, heretic}
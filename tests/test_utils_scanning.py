@@ -12,7 +12,7 @@ from sharewarez.models import (
 from sharewarez.utils.scanning import (
     try_add_game, process_game_with_fallback, log_unmatched_folder,
     process_game_updates, process_game_extras, refresh_images_in_background,
-    delete_game_images, is_scan_job_running
+    delete_game_images, is_scan_job_running, index_update_entries
 )
 
 
@@ -238,9 +238,10 @@ class TestProcessGameWithFallback:
         )
     
     @patch('sharewarez.utils.scanning.try_add_game')
-    def test_process_game_with_fallback_success_with_fallback(self, mock_try_add, db_session, sample_library, sample_scan_job):
-        """Test successful game processing with fallback name."""
-        mock_try_add.side_effect = [False, True]  # First call fails, second succeeds
+    @patch('sharewarez.utils.scanning.log_unmatched_folder')
+    def test_process_game_with_fallback_single_attempt(self, mock_log_unmatched, mock_try_add, db_session, sample_library, sample_scan_job):
+        """Test that fallback names are left to the matcher instead of extra attempts."""
+        mock_try_add.return_value = False
 
         result = process_game_with_fallback(
             'Test Game Extended',
@@ -249,11 +250,9 @@ class TestProcessGameWithFallback:
             sample_library.uuid
         )
 
-        assert result is True
-        assert mock_try_add.call_count == 2
-        # Check the fallback name was used
-        mock_try_add.assert_any_call(
-            'Test Game',
+        assert result is False
+        mock_try_add.assert_called_once_with(
+            'Test Game Extended',
             '/test/path',
             sample_scan_job.id,
             library_uuid=sample_library.uuid,
@@ -320,8 +319,7 @@ class TestProcessGameWithFallback:
         )
         
         assert result is False
-        # Should try original name plus fallbacks
-        assert mock_try_add.call_count > 1
+        mock_try_add.assert_called_once()
         mock_log_unmatched.assert_called_once_with(
             sample_scan_job.id, 
             '/test/path', 
@@ -494,6 +492,37 @@ class TestProcessGameExtras:
         assert final_count == initial_count
 
 
+class TestIndexUpdateEntries:
+    """Test indexing update and extra sizes with bulk statements."""
+
+    def test_unchanged_entries_are_not_measured_again(self, db_session, sample_game, tmp_path):
+        patch_folder = tmp_path / 'Patch.v1.1'
+        (patch_folder / 'data').mkdir(parents=True)
+        (patch_folder / 'setup.exe').write_bytes(b'x' * 100)
+        (patch_folder / 'data' / 'patch.bin').write_bytes(b'x' * 50)
+        manual = tmp_path / 'manual.pdf'
+        manual.write_bytes(b'x' * 10)
+        entries = [(str(patch_folder), str(patch_folder)), (str(manual), str(tmp_path))]
+
+        with patch('sharewarez.utils.scanning.read_first_nfo_content', return_value='NFO'):
+            assert index_update_entries(GameUpdate, sample_game.uuid, entries) == (2, 0, 0)
+            db_session.commit()
+            with patch('sharewarez.utils.scanning.measure_path') as mock_measure:
+                assert index_update_entries(GameUpdate, sample_game.uuid, entries) == (0, 0, 2)
+            mock_measure.assert_not_called()
+
+            (patch_folder / 'readme.txt').write_bytes(b'x' * 5)
+            os.utime(patch_folder / 'readme.txt', (0, os.stat(patch_folder).st_mtime + 10))
+            assert index_update_entries(GameUpdate, sample_game.uuid, entries) == (0, 1, 1)
+            db_session.commit()
+
+        records = {record.file_path: record for record in
+                   db_session.query(GameUpdate).filter_by(game_uuid=sample_game.uuid)}
+        assert (records[str(patch_folder)].file_size, records[str(patch_folder)].file_count) == (155, 3)
+        assert (records[str(manual)].file_size, records[str(manual)].file_count) == (10, 1)
+        assert records[str(manual)].nfo_content == 'NFO'
+
+
 class TestRefreshImagesInBackground:
     """Test the refresh_images_in_background function."""
     
@@ -0,0 +1,85 @@
+import pytest
+from uuid import uuid4
+from unittest.mock import patch
+from sqlalchemy import select, delete
+
+from sharewarez.models import Game, Library, LibraryPlatform, ScanJob, UnmatchedFolder
+from sharewarez.utils.gamenames import get_name_normalizer
+from sharewarez.utils.unmatched_rematch import (
+    REMATCH_JOB_TYPE, get_rematch_folders, create_rematch_job, rematch_name, run_rematch_job
+)
+
+
+@pytest.fixture
+def rematch_library(db_session):
+    library = Library(uuid=str(uuid4()), name=f'Rematch Library {uuid4()}', platform=LibraryPlatform.PCWIN)
+    db_session.add(library)
+    db_session.commit()
+    yield library
+    db_session.rollback()
+    db_session.execute(delete(UnmatchedFolder).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(ScanJob).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Game).filter_by(library_uuid=library.uuid))
+    db_session.execute(delete(Library).filter_by(uuid=library.uuid))
+    db_session.commit()
+
+
+def add_unmatched(db_session, library, path, status='Unmatched'):
+    folder = UnmatchedFolder(folder_path=str(path), status=status, library_uuid=library.uuid)
+    db_session.add(folder)
+    db_session.commit()
+    return folder
+
+
+class TestRematchSelection:
+    """Test which unmatched folders a re-match picks up."""
+
+    def test_ignored_folders_need_an_explicit_selection(self, db_session, rematch_library, tmp_path):
+        unmatched = add_unmatched(db_session, rematch_library, tmp_path / 'Doom')
+        ignored = add_unmatched(db_session, rematch_library, tmp_path / 'Quake', status='Ignore')
+
+        by_filter = get_rematch_folders(library_uuid=rematch_library.uuid)
+        by_ids = get_rematch_folders(ids=[unmatched.id, ignored.id])
+
+        assert by_filter == {rematch_library.uuid: [(unmatched.id, unmatched.folder_path)]}
+        assert sorted(by_ids[rematch_library.uuid]) == sorted(
+            [(unmatched.id, unmatched.folder_path), (ignored.id, ignored.folder_path)])
+
+    def test_names_are_cleaned_with_the_current_filters(self, tmp_path):
+        normalizer = get_name_normalizer(['-CODEX'], [])
+        archive = tmp_path / 'Quake-CODEX.iso'
+        archive.write_bytes(b'x')
+
+        assert rematch_name(str(tmp_path / 'Doom-CODEX'), normalizer) == 'Doom'
+        assert rematch_name(str(archive), normalizer) == 'Quake'
+
+
+class TestRunRematchJob:
+    """Test a re-match job run on the current thread."""
+
+    def test_matched_folders_leave_the_list(self, app, db_session, rematch_library, tmp_path):
+        (tmp_path / 'Doom').mkdir()
+        (tmp_path / 'Quake').mkdir()
+        added = add_unmatched(db_session, rematch_library, tmp_path / 'Doom')
+        still_unmatched = add_unmatched(db_session, rematch_library, tmp_path / 'Quake')
+        # Added by hand since it was logged
+        db_session.add(Game(uuid=str(uuid4()), name='Doom', full_disk_path=str(tmp_path / 'Doom'),
+                            library_uuid=rematch_library.uuid))
+        db_session.commit()
+
+        job, reason = create_rematch_job(rematch_library.uuid, [added.folder_path, still_unmatched.folder_path])
+        assert reason is None
+        assert job.job_type == REMATCH_JOB_TYPE
+        assert job.scan_folder == str(tmp_path)
+
+        with patch('sharewarez.utils.unmatched_rematch.start_scan_search_prefetch', return_value=None), \
+             patch('sharewarez.utils.game_core.match_game_metadata', return_value=None):
+            run_rematch_job(job, [added.id, still_unmatched.id])
+
+        db_session.refresh(job)
+        assert job.status == 'Completed'
+        assert (job.folders_success, job.folders_failed) == (1, 1)
+        assert job.error_message.startswith('Re-matched 1 of 2 unmatched folders')
+        remaining = db_session.execute(
+            select(UnmatchedFolder.folder_path).filter_by(library_uuid=rematch_library.uuid)).scalars().all()
+        assert remaining == [still_unmatched.folder_path]